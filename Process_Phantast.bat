@@ -205,10 +205,58 @@ def create_comparison_image(
     return comparison
 
 
+class PhantastBatchPipeline:
+    """
+    Preprocessing followed by PHANTAST, with the intermediate image handed
+    over in memory (process_phantast accepts arrays, so nothing is written
+    to disk and decoded again between the steps).
+    """
+
+    def __init__(
+        self,
+        clip_limit=2.0,
+        tile_grid_size=(8, 8),
+        use_clahe=False,
+        sigma=1.5,
+        epsilon=0.025,
+    ):
+        self.clip_limit = clip_limit
+        self.tile_grid_size = tile_grid_size
+        self.use_clahe = use_clahe
+        self.sigma = sigma
+        self.epsilon = epsilon
+
+    def preprocess(self, gray):
+        """Step 1: CLAHE (disabled by default)."""
+        if not self.use_clahe:
+            return gray
+        return apply_clahe_fixed(gray, self.clip_limit, self.tile_grid_size)
+
+    def analyze(self, enhanced):
+        """Step 2: PHANTAST confluency detection; returns (confluency, mask)."""
+        return process_phantast(
+            enhanced,
+            sigma=self.sigma,
+            epsilon=self.epsilon,
+            do_contrast_stretching=False,  # Skip contrast stretching since we used CLAHE
+            do_halo_removal=True,
+            minimum_fill_area=100,
+            do_remove_small_objects=True,
+            minimum_object_area=100,
+            hr_remove_small_objects=100,
+            max_removal_ratio=0.3,
+            output_mask_path=None,  # We'll handle mask saving ourselves
+            output_overlay_path=None,
+        )
+
+
 def process_single_image(input_path, output_dir, clip_limit=2.0, tile_grid_size=(8, 8)):
     """Process a single image through the complete pipeline."""
     filename = Path(input_path).stem
     ext = Path(input_path).suffix
+    pipeline = PhantastBatchPipeline(clip_limit, tile_grid_size)
+    p_sigma = pipeline.sigma
+    p_epsilon = pipeline.epsilon
 
     print(f"\n{'=' * 60}")
     print(f"Processing: {filename}{ext}")
@@ -229,51 +277,22 @@ def process_single_image(input_path, output_dir, clip_limit=2.0, tile_grid_size=
     print(f"Image size: {original_gray.shape}")
 
     # Step 1: Apply CLAHE
-    print("Step 1: Applying CLAHE... (DISABLED)")
-    # clahe_enhanced = apply_clahe_fixed(original_gray, clip_limit, tile_grid_size)
-    clahe_enhanced = original_gray.copy()
+    print(f"Step 1: Applying CLAHE...{'' if pipeline.use_clahe else ' (DISABLED)'}")
+    clahe_enhanced = pipeline.preprocess(original_gray)
 
     # Step 2: Process with PHANTAST
     print("Step 2: Running PHANTAST confluency detection...")
 
-    # Temporarily save CLAHE image for PHANTAST to read
-    temp_path = os.path.join(output_dir, f"_temp_{filename}_clahe.png")
-    cv2.imwrite(temp_path, clahe_enhanced)
-
-    # PHANTAST Parameters
-    p_sigma = 1.5
-    p_epsilon = 0.025
-
     try:
-        # Run PHANTAST on CLAHE enhanced image
-        confluency, mask = process_phantast(
-            temp_path,
-            sigma=p_sigma,
-            epsilon=p_epsilon,
-            do_contrast_stretching=False,  # Skip contrast stretching since we used CLAHE
-            do_halo_removal=True,
-            minimum_fill_area=100,
-            do_remove_small_objects=True,
-            minimum_object_area=100,
-            hr_remove_small_objects=100,
-            max_removal_ratio=0.3,
-            output_mask_path=None,  # We'll handle mask saving ourselves
-            output_overlay_path=None,
-        )
+        # Run PHANTAST on the enhanced image, passed in memory
+        confluency, mask = pipeline.analyze(clahe_enhanced)
 
         print(f"  Confluency: {confluency:.2f}%")
 
     except Exception as e:
         print(f"ERROR in PHANTAST processing: {e}")
-        # Clean up temp file
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
         return None
 
-    # Clean up temp file
-    if os.path.exists(temp_path):
-        os.remove(temp_path)
-
     # Step 3: Create overlay image
     print("Step 3: Creating overlay...")
     overlay_img = create_overlay(original_gray, mask, confluency, p_sigma, p_epsilon, alpha=0.4)
@@ -0,0 +1,115 @@
+"""
+Per-image cost of the temp-file handoff in Process_Phantast batch processing.
+
+Process_Phantast.bat used to write the preprocessed image to a temporary PNG
+and let process_phantast decode it again; it now passes the array in
+memory. This benchmark times what the temp file cost per image (PNG
+encode, write, decode, delete) and checks that both handoffs give the same
+confluency. PHANTAST itself takes seconds per frame, so timing the full
+calls (--full) mostly measures its run-to-run noise.
+
+Usage:
+    python benchmarks/bench_batch_handoff.py --size 2048 --repeat 5
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from phantast_confluency_corrected import process_phantast  # noqa: E402
+
+# Parameters used by Process_Phantast.bat
+PHANTAST_PARAMS = dict(
+    sigma=1.5,
+    epsilon=0.025,
+    do_contrast_stretching=False,
+    do_halo_removal=True,
+    minimum_fill_area=100,
+    do_remove_small_objects=True,
+    minimum_object_area=100,
+    hr_remove_small_objects=100,
+    max_removal_ratio=0.3,
+)
+
+
+def make_frame(size: int) -> np.ndarray:
+    """Synthetic gray frame with blob-like structure, like a phase image."""
+    rng = np.random.default_rng(0)
+    noise = rng.integers(0, 255, (size, size), dtype=np.uint8)
+    return cv2.GaussianBlur(noise, (0, 0), 3)
+
+
+def temp_file_handoff(gray: np.ndarray, folder: str) -> np.ndarray:
+    """The old handoff: PNG to disk, decoded again by process_phantast."""
+    path = os.path.join(folder, "_temp_frame_clahe.png")
+    cv2.imwrite(path, gray)
+    image = cv2.imread(path)
+    os.remove(path)
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+
+def run_phantast(image_input):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return process_phantast(image_input, **PHANTAST_PARAMS)
+
+
+def best_of(repeat: int, func, *args) -> float:
+    """Fastest of ``repeat`` runs, in milliseconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        times.append((time.perf_counter() - start) * 1000)
+    return min(times)
+
+
+def run(size: int, repeat: int, full: bool = False) -> dict:
+    gray = make_frame(size)
+    with tempfile.TemporaryDirectory() as folder:
+
+        def via_file():
+            path = os.path.join(folder, "_temp_frame_clahe.png")
+            cv2.imwrite(path, gray)
+            result = run_phantast(path)
+            os.remove(path)
+            return result
+
+        stats = {
+            "handoff_ms": best_of(repeat, temp_file_handoff, gray, folder),
+            "same_confluency": bool(np.isclose(via_file()[0], run_phantast(gray)[0])),
+        }
+        if full:
+            stats["file_ms"] = best_of(repeat, via_file)
+            stats["memory_ms"] = best_of(repeat, run_phantast, gray)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=2048, help="Frame edge length")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per variant")
+    parser.add_argument(
+        "--full", action="store_true", help="Also time the full PHANTAST calls"
+    )
+    args = parser.parse_args()
+
+    stats = run(args.size, args.repeat, args.full)
+    print(f"Frame: {args.size}x{args.size} gray, best of {args.repeat}")
+    print(f"Saved per image (temp-file handoff): {stats['handoff_ms']:8.1f} ms")
+    if args.full:
+        print(f"PHANTAST via temp file:       {stats['file_ms']:8.1f} ms/image")
+        print(f"PHANTAST via in-memory array: {stats['memory_ms']:8.1f} ms/image")
+    print(f"Same confluency: {'yes' if stats['same_confluency'] else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Memory benchmark for PreviewPipeline node results.
+
+Runs a preview pipeline (Input -> Grayscale -> Gaussian Blur -> CLAHE) on a
+synthetic frame and reports how much memory the node results hold. It
+compares that with the copy-per-node strategy used before results became
+shared read-only arrays: one copy of the input, plus one copy per node for
+``node_results`` and one more for the ``node_completed`` signal.
+
+Usage:
+    python benchmarks/bench_preview_memory.py --size 2048
+"""
+
+import argparse
+import os
+import sys
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.preview_pipeline import PreviewPipeline  # noqa: E402
+from src.models.app_state import AppState  # noqa: E402
+from src.models.pipeline_model import PipelineNode  # noqa: E402
+
+
+def build_state() -> AppState:
+    """Create a preview pipeline without the (slow) PHANTAST output node."""
+    state = AppState()
+    state.initialize_default_pipeline()
+    state.pipeline.nodes[-1].enabled = False
+    for node_type, params in [
+        ("grayscale", {}),
+        ("gaussian_blur", {"kernel_size": 5, "sigma": 1.0}),
+        ("clahe", {"clip_limit": 2.0, "grid_size": (8, 8)}),
+    ]:
+        state.add_node(
+            PipelineNode(
+                id=node_type,
+                type=node_type,
+                name=node_type,
+                description="",
+                icon="",
+                status="ready",
+                enabled=True,
+                parameters=params,
+            )
+        )
+    return state
+
+
+def distinct_nbytes(arrays) -> int:
+    """Sum nbytes over arrays, counting each underlying buffer once."""
+    seen = {}
+    for array in arrays:
+        base = array
+        while base.base is not None and isinstance(base.base, np.ndarray):
+            base = base.base
+        seen[id(base)] = base.nbytes
+    return sum(seen.values())
+
+
+def run(size: int) -> dict:
+    image = np.random.randint(0, 255, (size, size, 3), dtype=np.uint8)
+    state = build_state()
+    pipeline = PreviewPipeline(cache_enabled=False)
+    emitted = []
+    pipeline.node_completed.connect(lambda node_id, out: emitted.append(out))
+
+    tracemalloc.start()
+    result = pipeline.execute(image, state)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    outputs = [entry["output"] for entry in result.node_results.values()]
+    per_node = sum(out.nbytes for out in outputs)
+    return {
+        "nodes": len(outputs),
+        "copy_per_node_bytes": image.nbytes + 2 * per_node,
+        "shared_bytes": distinct_nbytes(outputs + emitted),
+        "peak_bytes": peak,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=2048, help="Frame edge length")
+    args = parser.parse_args()
+
+    stats = run(args.size)
+    mb = 1024 * 1024
+    print(f"Frame: {args.size}x{args.size}x3, nodes: {stats['nodes']}")
+    print(f"Copy-per-node result memory: {stats['copy_per_node_bytes'] / mb:8.1f} MB")
+    print(f"Shared read-only memory:     {stats['shared_bytes'] / mb:8.1f} MB")
+    print(f"Peak traced allocation:      {stats['peak_bytes'] / mb:8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,13 @@ import numpy as np
 from scipy import ndimage
 from skimage import measure
 import argparse
+import logging
+import sys
+
+
+# Progress messages go to logging, so they stay out of the output of callers
+# such as the app's CLI; main() prints them
+logger = logging.getLogger(__name__)
 
 
 def gaussian_filter_separable(image, sigma):
@@ -456,26 +463,28 @@ def process_phantast(
     else:
         image_gray = image.copy()
 
-    print(f"Processing image: {image_source_name}")
-    print(f"Image size: {image_gray.shape}")
-    print(f"Parameters: sigma={sigma}, epsilon={epsilon}")
+    logger.info(f"Processing image: {image_source_name}")
+    logger.info(f"Image size: {image_gray.shape}")
+    logger.info(f"Parameters: sigma={sigma}, epsilon={epsilon}")
 
     I = image_gray.copy()
 
     # Step 1: Contrast Stretching
     if do_contrast_stretching:
-        print("Step 1: Contrast stretching...")
+        logger.info("Step 1: Contrast stretching...")
         I = contrast_stretching(
             I.astype(np.float64) / 255.0, contrast_stretching_saturation
         )
 
     # Step 2: Local Contrast (Coarse Masking)
-    print("Step 2: Local contrast thresholding (CV = std/mean)...")
+    logger.info("Step 2: Local contrast thresholding (CV = std/mean)...")
     J = local_contrast_cv(I, sigma, epsilon)
 
     # Step 3: Halo Removal
     if do_halo_removal:
-        print("Step 3: Halo removal with Kirsch edge detection and region shrinking...")
+        logger.info(
+            "Step 3: Halo removal with Kirsch edge detection and region shrinking..."
+        )
         J = halo_removal(
             I,
             J,
@@ -487,12 +496,12 @@ def process_phantast(
 
     # Step 4: Additional hole removal
     if do_additional_remove_holes:
-        print("Step 4: Additional hole filling...")
+        logger.info("Step 4: Additional hole filling...")
         J = remove_holes(J, additional_hole_fill_area)
 
     # Step 5: Remove small objects
     if do_remove_small_objects:
-        print("Step 5: Removing small objects...")
+        logger.info("Step 5: Removing small objects...")
         J = remove_small_objects(J, minimum_object_area)
 
     # Final cleanup
@@ -502,13 +511,13 @@ def process_phantast(
     # Calculate confluency
     confluency = calculate_confluency(J)
 
-    print(f"\nResults:")
-    print(f"  Confluency: {confluency:.2f}%")
+    logger.info("\nResults:")
+    logger.info(f"  Confluency: {confluency:.2f}%")
 
     # Save outputs
     if output_mask_path:
         cv2.imwrite(output_mask_path, (J * 255).astype(np.uint8))
-        print(f"  Mask saved to: {output_mask_path}")
+        logger.info(f"  Mask saved to: {output_mask_path}")
 
     if output_overlay_path:
         overlay = cv2.cvtColor(image_gray, cv2.COLOR_GRAY2BGR)
@@ -518,7 +527,7 @@ def process_phantast(
             overlay, alpha, cv2.cvtColor(image_gray, cv2.COLOR_GRAY2BGR), 1 - alpha, 0
         )
         cv2.imwrite(output_overlay_path, overlay)
-        print(f"  Overlay saved to: {output_overlay_path}")
+        logger.info(f"  Overlay saved to: {output_overlay_path}")
 
     return confluency, J
 
@@ -608,6 +617,7 @@ Key Differences from Original:
     parser.add_argument("-o", "--overlay", help="Output path for overlay visualization")
 
     args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
 
     confluency, mask = process_phantast(
         args.input,
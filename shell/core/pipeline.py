@@ -1,6 +1,6 @@
 
-import copy
 import numpy as np
+from src.core.execution_engine import EngineTask, ExecutionEngine
 from .steps import PipelineStep
 
 class ImagePipeline:
@@ -10,6 +10,8 @@ class ImagePipeline:
     def __init__(self):
         self.steps = []
         self.metadata = {} # Shared data between steps (e.g. masks, metrics)
+        # Shared execution engine; failing steps are logged and skipped
+        self._engine = ExecutionEngine(stop_on_error=False)
 
     def add_step(self, step: PipelineStep):
         """Add a step to the end of the pipeline."""
@@ -33,24 +35,17 @@ class ImagePipeline:
     def execute(self, image: np.ndarray) -> np.ndarray:
         """
         Run the pipeline on an image.
-        Returns the processed image.
+        Returns the processed (read-only) image. The input is never
+        modified, so it is not copied; none of the steps write in place.
         """
-        current_image = image.copy()
-        self.metadata = {} # Reset metadata
-        
-        for step in self.steps:
-            if step.enabled:
-                try:
-                    current_image = step.process(current_image, self.metadata)
-                except Exception as e:
-                    print(f"Error in step {step.name}: {e}")
-                    # Decide whether to continue or abort. 
-                    # For now, continue with previous image or stop?
-                    # Let's clean up semantics later. 
-                    # Returning partial result might be better than crash.
-                    pass
-        
-        return current_image
+        tasks = [
+            EngineTask(key=str(i), name=step.name, run=step.process)
+            for i, step in enumerate(self.steps)
+            if step.enabled
+        ]
+        result = self._engine.run(image, tasks)
+        self.metadata = result.metadata
+        return result.image
 
     def get_metadata(self):
         return self.metadata
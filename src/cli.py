@@ -0,0 +1,418 @@
+"""
+PhantastLab Command Line
+
+Headless entry point for running saved pipelines on machines without a
+display. Nothing here imports PyQt6, so start-up stays fast and light on
+compute nodes.
+
+Subcommands:
+
+- run: process one or more images and print their confluency
+- batch: process a folder with the streaming batch runner
+- watch: process images as they appear in a folder
+- sweep: run an image over a grid of parameter values
+- bench: time a pipeline on an image, per node
+
+Usage:
+    python -m src.cli batch pipeline.json plate/ -o results/ --workers 8
+    python -m src.cli sweep pipeline.json image.png --param clahe.clip_limit=1,2,4
+"""
+
+import argparse
+import contextlib
+import csv
+import itertools
+import json
+import logging
+import statistics
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .core.batch_manifest import BatchManifest
+from .core.batch_results import ResultsCsv
+from .core.batch_runner import (
+    CONFLUENCY_KEY,
+    BatchItemResult,
+    BatchRunner,
+    process_image,
+    read_image,
+)
+from .core.folder_watcher import watch_folder
+from .core.intermediate_store import IntermediateStore
+from .core.preview_pipeline import PreviewPipeline
+from .core.result_cache import DEFAULT_MAX_BYTES, ResultCache
+from .core.results_store import ResultsStore
+from .core.telemetry import format_duration
+from .models.pipeline_model import Pipeline
+
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+
+def _format_result(result: BatchItemResult) -> str:
+    if not result.success:
+        return f"{result.path}\tFAILED: {result.error_message}"
+    confluency = "-" if result.confluency is None else f"{result.confluency:.4f}"
+    skipped = "\t(skipped)" if result.skipped else ""
+    return f"{result.path}\t{confluency}{skipped}"
+
+
+def _result_cache(args: argparse.Namespace) -> Optional[ResultCache]:
+    if not args.result_cache:
+        return None
+    size = args.result_cache_size
+    return ResultCache(
+        args.result_cache, size * MB if size is not None else DEFAULT_MAX_BYTES
+    )
+
+
+def _make_runner(args: argparse.Namespace) -> BatchRunner:
+    """BatchRunner configured from the shared batch/watch options."""
+    manifest = BatchManifest(args.manifest) if args.manifest else None
+    intermediates = None
+    if args.intermediates:
+        budget = args.intermediates_budget
+        intermediates = IntermediateStore(
+            args.intermediates, budget * MB if budget is not None else None
+        )
+    return BatchRunner.from_file(
+        args.pipeline,
+        workers=args.workers,
+        output_dir=args.output_dir,
+        readers=args.readers,
+        max_in_flight=args.max_in_flight,
+        manifest=manifest,
+        intermediates=intermediates,
+        memory_budget=(
+            args.memory_budget * MB if args.memory_budget is not None else None
+        ),
+        shared_memory=args.shared_memory,
+        result_cache=_result_cache(args),
+    )
+
+
+def cmd_run(args: argparse.Namespace) -> int:
+    pipeline = Pipeline.load(args.pipeline)
+    executor = PreviewPipeline(cache_enabled=False, result_cache=_result_cache(args))
+    failed = 0
+    for path in args.images:
+        result = process_image(path, pipeline, executor, args.output_dir)
+        print(_format_result(result))
+        failed += not result.success
+    return 1 if failed else 0
+
+
+def cmd_batch(args: argparse.Namespace) -> int:
+    runner = _make_runner(args)
+    failed = 0
+    with contextlib.ExitStack() as stack:
+        csv_file = None
+        if args.csv:
+            csv_file = stack.enter_context(ResultsCsv(args.csv))
+
+        def on_result(done: int, total: int, result: BatchItemResult):
+            nonlocal failed
+            failed += not result.success
+            if csv_file is not None:
+                csv_file.append(result)
+            print(f"[{done}/{total}] {_format_result(result)}", flush=True)
+
+        start_time = time.time()
+        if args.db:
+            store = stack.enter_context(ResultsStore(args.db))
+            job_id, results = store.run_job(
+                runner, args.input, plate=args.plate, progress_callback=on_result
+            )
+            print(f"Job {job_id} recorded in {args.db}")
+        else:
+            results = runner.run(args.input, progress_callback=on_result)
+        elapsed_ms = (time.time() - start_time) * 1000
+
+    print(f"{len(results)} image(s), {failed} failed, in {format_duration(elapsed_ms)}")
+    return 1 if failed else 0
+
+
+def cmd_watch(args: argparse.Namespace) -> int:
+    runner = _make_runner(args)
+    stop_event = threading.Event()
+    if args.duration is not None:
+        timer = threading.Timer(args.duration, stop_event.set)
+        timer.daemon = True
+        timer.start()
+
+    with contextlib.ExitStack() as stack:
+        store = stack.enter_context(ResultsStore(args.db)) if args.db else None
+        results = watch_folder(
+            runner,
+            args.input,
+            stop_event=stop_event,
+            csv_path=args.csv,
+            store=store,
+            plate=args.plate,
+            settle_time=args.settle_time,
+            poll_interval=args.poll_interval,
+        )
+        try:
+            for result in results:
+                print(_format_result(result), flush=True)
+        except KeyboardInterrupt:
+            logger.info("Interrupted; finishing images in flight")
+        finally:
+            stop_event.set()
+            results.close()
+    return 0
+
+
+def parse_param(text: str) -> Tuple[str, str, List[Any]]:
+    """
+    Parse a sweep parameter, ``NODE.PARAM=V1,V2,...``.
+
+    Values are read as JSON where possible (numbers, booleans, lists such
+    as ``[8,8]`` - separate those with ``;`` instead of ``,``), else kept as
+    strings.
+
+    Raises:
+        ValueError: If the text is not of that form
+    """
+    name, sep, values = text.partition("=")
+    node_id, dot, param = name.partition(".")
+    if not sep or not dot or not node_id or not param or not values:
+        raise ValueError(f"Expected NODE.PARAM=V1,V2,... but got {text!r}")
+    separator = ";" if ";" in values else ","
+    parsed = []
+    for value in values.split(separator):
+        try:
+            parsed.append(json.loads(value))
+        except ValueError:
+            parsed.append(value)
+    return node_id, param, parsed
+
+
+def sweep(
+    pipeline: Pipeline,
+    images: Sequence[str],
+    grid: Sequence[Tuple[str, str, List[Any]]],
+) -> List[Dict[str, Any]]:
+    """
+    Run every image with every combination of parameter values.
+
+    Args:
+        pipeline: Pipeline to sweep; its parameters are restored afterwards
+        images: Image files
+        grid: (node ID, parameter, values) per swept parameter
+
+    Returns:
+        One row per image and combination: image, ``NODE.PARAM`` values,
+        confluency, time_ms and error
+
+    Raises:
+        ValueError: If a swept node does not exist
+    """
+    nodes = []
+    for node_id, _, _ in grid:
+        node = pipeline.get_node(node_id)
+        if node is None:
+            raise ValueError(f"Pipeline has no node {node_id!r}")
+        nodes.append(node)
+    originals = [dict(node.parameters) for node in nodes]
+
+    executor = PreviewPipeline()
+    rows = []
+    try:
+        for path in images:
+            image = read_image(path)
+            for values in itertools.product(*(values for _, _, values in grid)):
+                row: Dict[str, Any] = {"image": path}
+                for node, (node_id, param, _), value in zip(nodes, grid, values):
+                    node.parameters[param] = value
+                    row[f"{node_id}.{param}"] = value
+                result = executor.execute(image, pipeline)
+                confluency = (result.metadata or {}).get(CONFLUENCY_KEY)
+                row["confluency"] = confluency if result.success else None
+                row["time_ms"] = round(result.execution_time_ms, 1)
+                row["error"] = result.error_message or ""
+                rows.append(row)
+    finally:
+        for node, parameters in zip(nodes, originals):
+            node.parameters.clear()
+            node.parameters.update(parameters)
+    return rows
+
+
+def cmd_sweep(args: argparse.Namespace) -> int:
+    grid = [parse_param(text) for text in args.param]
+    rows = sweep(Pipeline.load(args.pipeline), args.images, grid)
+    with contextlib.ExitStack() as stack:
+        out = (
+            stack.enter_context(open(args.out, "w", newline=""))
+            if args.out
+            else sys.stdout
+        )
+        writer = csv.DictWriter(out, fieldnames=list(rows[0]) if rows else ["image"])
+        writer.writeheader()
+        writer.writerows(rows)
+    return 1 if any(row["error"] for row in rows) else 0
+
+
+def bench(
+    pipeline: Pipeline, image_path: str, repeat: int, warmup: int = 1
+) -> Dict[str, Any]:
+    """
+    Time a pipeline on an image with the cache off.
+
+    Returns:
+        Dict with the run times ("runs_ms") and each node's mean wall time
+        ("nodes": name -> ms), in pipeline order
+
+    Raises:
+        RuntimeError: If the pipeline fails
+    """
+    image = read_image(image_path)
+    executor = PreviewPipeline(cache_enabled=False)
+    runs_ms = []
+    node_ms: Dict[str, List[float]] = {}
+    names: Dict[str, str] = {}
+    for i in range(warmup + repeat):
+        start_time = time.perf_counter()
+        result = executor.execute(image, pipeline)
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        if not result.success:
+            raise RuntimeError(result.error_message)
+        if i < warmup:
+            continue
+        runs_ms.append(elapsed_ms)
+        for node_id, entry in (result.node_results or {}).items():
+            names[node_id] = entry.get("name", node_id)
+            node_ms.setdefault(node_id, []).append(entry.get("wall_ms", 0.0))
+    return {
+        "runs_ms": runs_ms,
+        "nodes": {names[key]: statistics.mean(times) for key, times in node_ms.items()},
+    }
+
+
+def cmd_bench(args: argparse.Namespace) -> int:
+    stats = bench(Pipeline.load(args.pipeline), args.image, args.repeat, args.warmup)
+    if args.json:
+        print(json.dumps(stats, indent=1))
+        return 0
+    runs = stats["runs_ms"]
+    print(f"{args.image}: {len(runs)} run(s)")
+    print(
+        f"  total  min {format_duration(min(runs))}  "
+        f"median {format_duration(statistics.median(runs))}  "
+        f"max {format_duration(max(runs))}"
+    )
+    for name, ms in stats["nodes"].items():
+        print(f"  {name:<24} {format_duration(ms)}")
+    return 0
+
+
+def _add_cache_options(parser: argparse.ArgumentParser):
+    parser.add_argument("--result-cache", metavar="FILE", help="Result cache file")
+    parser.add_argument(
+        "--result-cache-size", type=int, metavar="MB", help="Size cap of the cache"
+    )
+
+
+def _add_runner_options(parser: argparse.ArgumentParser):
+    parser.add_argument("pipeline", help="Saved pipeline JSON")
+    parser.add_argument("input", help="Folder of images")
+    parser.add_argument("-o", "--output-dir", help="Folder for output images")
+    parser.add_argument(
+        "-j", "--workers", type=int, help="Worker processes (default: CPU count)"
+    )
+    parser.add_argument("--readers", type=int, default=2, help="Decoder threads")
+    parser.add_argument("--max-in-flight", type=int, help="Most images in flight")
+    parser.add_argument(
+        "--memory-budget", type=int, metavar="MB", help="Memory for images in flight"
+    )
+    parser.add_argument(
+        "--shared-memory",
+        action="store_true",
+        help="Pass images to workers through shared memory",
+    )
+    parser.add_argument("--manifest", help="Manifest file, to resume a run")
+    parser.add_argument("--intermediates", metavar="DIR", help="Keep node outputs")
+    parser.add_argument(
+        "--intermediates-budget",
+        type=int,
+        metavar="MB",
+        help="Disk cap of --intermediates",
+    )
+    parser.add_argument("--csv", help="CSV file of the results")
+    parser.add_argument("--db", help="SQLite results store")
+    parser.add_argument(
+        "--plate", help="Plate name in the store (default: folder name)"
+    )
+    _add_cache_options(parser)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="phantast", description=__doc__.splitlines()[1]
+    )
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log progress")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Process images")
+    run.add_argument("pipeline", help="Saved pipeline JSON")
+    run.add_argument("images", nargs="+", help="Image files")
+    run.add_argument("-o", "--output-dir", help="Folder for output images")
+    _add_cache_options(run)
+    run.set_defaults(func=cmd_run)
+
+    batch = commands.add_parser("batch", help="Process a folder")
+    _add_runner_options(batch)
+    batch.set_defaults(func=cmd_batch)
+
+    watch = commands.add_parser("watch", help="Process images as they arrive")
+    _add_runner_options(watch)
+    watch.add_argument("--settle-time", type=float, default=2.0, help="Seconds")
+    watch.add_argument("--poll-interval", type=float, default=1.0, help="Seconds")
+    watch.add_argument("--duration", type=float, help="Stop after this many seconds")
+    watch.set_defaults(func=cmd_watch)
+
+    sweep_parser = commands.add_parser("sweep", help="Run a parameter grid")
+    sweep_parser.add_argument("pipeline", help="Saved pipeline JSON")
+    sweep_parser.add_argument("images", nargs="+", help="Image files")
+    sweep_parser.add_argument(
+        "-p",
+        "--param",
+        action="append",
+        required=True,
+        metavar="NODE.PARAM=V1,V2",
+        help="Parameter values to sweep (repeatable)",
+    )
+    sweep_parser.add_argument("--out", help="CSV file (default: stdout)")
+    sweep_parser.set_defaults(func=cmd_sweep)
+
+    bench_parser = commands.add_parser("bench", help="Time a pipeline")
+    bench_parser.add_argument("pipeline", help="Saved pipeline JSON")
+    bench_parser.add_argument("image", help="Image file")
+    bench_parser.add_argument("--repeat", type=int, default=5, help="Timed runs")
+    bench_parser.add_argument("--warmup", type=int, default=1, help="Untimed runs")
+    bench_parser.add_argument("--json", action="store_true", help="Print JSON")
+    bench_parser.set_defaults(func=cmd_bench)
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format="%(levelname)s %(name)s: %(message)s",
+    )
+    try:
+        return args.func(args)
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"phantast: error: {e}", file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,12 @@
 import logging
-from typing import Optional, Any
+import os
+import sqlite3
+import threading
+from typing import Callable, Optional, Any
 from uuid import uuid4
 
-from PyQt6.QtCore import QObject, pyqtSignal, QTimer
+import cv2
+from PyQt6.QtCore import QObject, QStandardPaths, Qt, pyqtSignal, QTimer
 
 from ..models.app_state import AppState, WorkflowPhase
 from ..models.image_model import ImageSessionModel
@@ -13,10 +17,30 @@ from ..core.parameter_schemas import (
     get_available_processing_nodes,
 )
 from ..core.preview_pipeline import PreviewPipeline, PreviewResult
+from ..core.result_cache import ResultCache
+from .preview_scheduler import PreviewScheduler
 
 
 logger = logging.getLogger(__name__)
 
+# Persistent PHANTAST results, in the user's application data folder
+RESULT_CACHE_FILE = "result_cache.db"
+
+
+def _open_result_cache() -> Optional[ResultCache]:
+    """Open the result cache, or None if its folder is not writable."""
+    folder = QStandardPaths.writableLocation(
+        QStandardPaths.StandardLocation.AppDataLocation
+    )
+    if not folder:
+        return None
+    try:
+        os.makedirs(folder, exist_ok=True)
+        return ResultCache(os.path.join(folder, RESULT_CACHE_FILE))
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"Result cache unavailable: {e}")
+        return None
+
 
 class MainController(QObject):
     """
@@ -50,21 +74,51 @@ class MainController(QObject):
     preview_completed = pyqtSignal(object)  # PreviewResult
     preview_image_ready = pyqtSignal(object)  # np.ndarray result image
 
+    # Preview pipeline callback from a worker thread, queued to this thread
+    _pipeline_event = pyqtSignal(object, tuple)  # handler, args
+
     def __init__(self):
         super().__init__()
+        # Thread the controller lives on (the GUI thread)
+        self._thread_id = threading.get_ident()
 
         self.state = AppState()
-        self.preview_pipeline = PreviewPipeline()
+        # Shared with the CLI and batch runs of the same user
+        self.result_cache = _open_result_cache()
+        self.preview_pipeline = PreviewPipeline(result_cache=self.result_cache)
 
         # Debounce timer for preview execution
         self._preview_timer = QTimer(self)
         self._preview_timer.setSingleShot(True)
         self._preview_timer.timeout.connect(self._execute_preview)
 
-        # Connect preview pipeline signals
-        self.preview_pipeline.execution_started.connect(self.preview_started.emit)
-        self.preview_pipeline.execution_completed.connect(self._on_preview_completed)
-        self.preview_pipeline.execution_failed.connect(self._on_preview_failed)
+        # Debounce delay adapts to measured preview times and edit rate
+        self.preview_scheduler = PreviewScheduler()
+        # Edits made while a control is held; previewed in full on release
+        self._interaction_dirty = False
+
+        # Progressive preview: low-resolution proxy first, then full resolution
+        self._progressive_preview = False
+        self._preview_input_size = None  # (width, height) of last preview input
+
+        # Viewport preview: (x, y, width, height) visible on the canvas
+        self._preview_roi = None
+
+        # Connect preview pipeline signals. Async passes call back on the
+        # pipeline's worker thread; those calls are queued to this thread
+        # before any signal reaches the UI.
+        self._pipeline_event.connect(
+            self._dispatch_pipeline_event, Qt.ConnectionType.QueuedConnection
+        )
+        pipeline = self.preview_pipeline
+        pipeline.execution_started.connect(
+            self._on_gui_thread(self._on_preview_started)
+        )
+        pipeline.proxy_ready.connect(self._on_gui_thread(self._on_preview_proxy_ready))
+        pipeline.execution_completed.connect(
+            self._on_gui_thread(self._on_preview_completed)
+        )
+        pipeline.execution_failed.connect(self._on_gui_thread(self._on_preview_failed))
 
         logger.info("MainController initialized")
 
@@ -367,11 +421,62 @@ class MainController(QObject):
     # Preview Execution
     # =========================================================================
 
+    @property
+    def progressive_preview(self) -> bool:
+        """Whether previews show a low-resolution pass first."""
+        return self._progressive_preview
+
+    def set_progressive_preview(self, enabled: bool):
+        """Show a low-resolution preview before each full-resolution one."""
+        self._progressive_preview = enabled
+
+    def set_preview_roi(self, roi: Optional[tuple]):
+        """
+        Restrict previews to the visible region of the image.
+
+        Args:
+            roi: (x, y, width, height) in image pixels, or None for the
+                whole frame
+        """
+        if roi == self._preview_roi:
+            return
+        self._preview_roi = roi
+        # Pipelines that run full-frame anyway show the same result
+        if self.has_image and self.preview_pipeline.supports_roi(self.state):
+            self._trigger_preview_debounce()
+
+    def begin_interaction(self):
+        """
+        Enter interactive mode while the user holds (drags) a control.
+
+        Until end_interaction(), previews run on the low-resolution path
+        only.
+        """
+        self.preview_scheduler.begin_interaction()
+        self._interaction_dirty = False
+
+    def end_interaction(self):
+        """Leave interactive mode and preview any edits at full resolution."""
+        if not self.preview_scheduler.interactive:
+            return
+        self.preview_scheduler.end_interaction()
+        if self._interaction_dirty and self.has_image:
+            self.preview_pipeline.cancel_pending()
+            self._preview_timer.stop()
+            self._preview_timer.start(0)
+        self._interaction_dirty = False
+
     def _trigger_preview_debounce(self):
-        """Trigger preview execution with 200ms debounce."""
+        """Trigger preview execution after an adaptive debounce delay."""
+        # Parameters changed again: abandon any pass still running
+        self.preview_pipeline.cancel_pending()
+        self.preview_scheduler.record_event()
+        if self.preview_scheduler.interactive:
+            self._interaction_dirty = True
+        delay = self.preview_scheduler.next_delay_ms()
         self._preview_timer.stop()
-        self._preview_timer.start(200)
-        logger.debug("Preview debounce triggered")
+        self._preview_timer.start(delay)
+        logger.debug(f"Preview debounce triggered ({delay}ms)")
 
     def _execute_preview(self):
         """
@@ -397,20 +502,76 @@ class MainController(QObject):
 
         # Execute preview
         self.preview_requested.emit()
+        self._preview_input_size = (img_data.shape[1], img_data.shape[0])
+
+        if self.preview_scheduler.interactive:
+            # Control still held: low resolution only, full pass on release
+            self.preview_pipeline.execute_proxy_async(img_data, self.state)
+            return
+
+        if self._preview_roi is not None and self.preview_pipeline.supports_roi(
+            self.state
+        ):
+            # Only the visible region is computed and panning reuses tiles;
+            # pipelines with global steps (CLAHE, PHANTAST) take the paths below
+            self.preview_pipeline.execute_roi(img_data, self.state, self._preview_roi)
+            return
+
+        if self._progressive_preview:
+            # Results arrive through proxy_ready / execution_completed
+            self.preview_pipeline.execute_progressive_async(img_data, self.state)
+            return
+
         result = self.preview_pipeline.execute(img_data, self.state)
 
         # Result will be emitted through signals
         logger.debug(f"Preview execution completed: success={result.success}")
 
+    def _on_gui_thread(self, handler: Callable) -> Callable:
+        """Wrap a pipeline callback so it runs on the controller's thread."""
+
+        def forward(*args):
+            if threading.get_ident() == self._thread_id:
+                handler(*args)
+            else:
+                self._pipeline_event.emit(handler, args)
+
+        return forward
+
+    def _dispatch_pipeline_event(self, handler: Callable, args: tuple):
+        """Run a queued pipeline callback (on the controller's thread)."""
+        handler(*args)
+
+    def _on_preview_started(self):
+        self.preview_started.emit()
+
     def _on_preview_completed(self, result: PreviewResult):
         """Handle preview completion."""
         if result.success and result.image is not None:
+            self.preview_scheduler.record_latency(result.execution_time_ms)
             self.preview_image_ready.emit(result.image)
             self.preview_completed.emit(result)
             logger.info(f"Preview completed in {result.execution_time_ms:.1f}ms")
         else:
             logger.error(f"Preview failed: {result.error_message}")
 
+    def _on_preview_proxy_ready(self, result: PreviewResult):
+        """Show a low-resolution proxy result, upscaled to the frame size."""
+        if not result.success or result.image is None:
+            return
+
+        self.preview_scheduler.record_latency(
+            result.execution_time_ms, interactive=True
+        )
+        image = result.image
+        if self._preview_input_size is not None:
+            # Linear interpolation: nearest neighbour looks blocky and aliased
+            image = cv2.resize(
+                image, self._preview_input_size, interpolation=cv2.INTER_LINEAR
+            )
+        self.preview_image_ready.emit(image)
+        logger.debug(f"Proxy preview ready in {result.execution_time_ms:.1f}ms")
+
     def _on_preview_failed(self, error_message: str):
         """Handle preview failure."""
         logger.error(f"Preview execution failed: {error_message}")
@@ -12,18 +12,20 @@ class PipelineController(QObject):
         self.pipeline = Pipeline()
 
     def add_node(self, node: PipelineNode):
-        self.pipeline.nodes.append(node)
+        self.pipeline.insert_node(len(self.pipeline.nodes), node)
         self.pipeline_changed.emit()
 
     def remove_node(self, node_id: str):
-        self.pipeline.nodes = [n for n in self.pipeline.nodes if n.id != node_id]
+        self.pipeline.remove_node(node_id)
         self.pipeline_changed.emit()
 
     def get_node(self, node_id: str) -> Optional[PipelineNode]:
-        for node in self.pipeline.nodes:
-            if node.id == node_id:
-                return node
-        return None
+        return self.pipeline.get_node(node_id)
+
+    @property
+    def version(self) -> int:
+        """Monotonic pipeline version; compare to detect any change."""
+        return self.pipeline.version
 
     def toggle_node(self, node_id: str, enabled: bool):
         node = self.get_node(node_id)
@@ -32,19 +34,14 @@ class PipelineController(QObject):
             self.node_toggled.emit(node_id, enabled)
 
     def reorder_nodes(self, node_id: str, new_index: int):
-        node = self.get_node(node_id)
-        if not node:
-            return
-
-        current_index = self.pipeline.nodes.index(node)
-        if current_index == new_index:
+        current_index = self.pipeline.index_of(node_id)
+        if current_index == -1 or current_index == new_index:
             return
 
         # Ensure index is within bounds
         new_index = max(0, min(new_index, len(self.pipeline.nodes) - 1))
-        
-        self.pipeline.nodes.pop(current_index)
-        self.pipeline.nodes.insert(new_index, node)
+
+        self.pipeline.move_node(node_id, new_index)
         self.pipeline_changed.emit()
 
     def update_node_params(self, node_id: str, params: Dict[str, Any]):
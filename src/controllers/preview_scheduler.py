@@ -0,0 +1,103 @@
+"""
+Preview Scheduler
+
+Chooses how long MainController waits after an edit before running the
+preview. The delay follows a moving average of recent preview times and of
+the gap between edits:
+
+- fast pipelines run almost immediately after each edit
+- slow pipelines wait until edits pause, instead of starting (and then
+  abandoning) a run for every step of a slider drag
+
+While the user holds a control ("interactive" mode) previews run at low
+resolution, so their latency is tracked separately.
+"""
+
+import time
+from typing import Callable, Dict, Optional
+
+
+class PreviewScheduler:
+    """Adaptive debounce delay from measured preview latency and edit rate."""
+
+    # Delay used until a preview time has been measured
+    DEFAULT_DELAY_MS = 200
+    MIN_DELAY_MS = 20
+    MAX_DELAY_MS = 1000
+
+    # Wait this fraction of the expected preview time after an edit
+    LATENCY_FACTOR = 0.25
+
+    # While edits arrive faster than previews complete, wait this many
+    # average edit gaps, so the preview runs once the user pauses
+    GAP_FACTOR = 2.0
+
+    # A longer gap between edits starts a new burst
+    BURST_GAP_MS = 1500
+
+    def __init__(
+        self, smoothing: float = 0.3, clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            smoothing: Weight of the newest sample in the moving averages
+            clock: Monotonic time source in seconds
+        """
+        self._smoothing = smoothing
+        self._clock = clock
+        # interactive -> average preview time in ms
+        self._latency_ms: Dict[bool, Optional[float]] = {False: None, True: None}
+        self._event_gap_ms: Optional[float] = None
+        self._last_event: Optional[float] = None
+        self.interactive = False
+
+    def _average(self, current: Optional[float], sample: float) -> float:
+        if current is None:
+            return sample
+        return current + self._smoothing * (sample - current)
+
+    def record_event(self):
+        """Note an edit that requests a preview."""
+        now = self._clock()
+        if self._last_event is not None:
+            gap_ms = (now - self._last_event) * 1000
+            if gap_ms > self.BURST_GAP_MS:
+                self._event_gap_ms = None
+            else:
+                self._event_gap_ms = self._average(self._event_gap_ms, gap_ms)
+        self._last_event = now
+
+    def record_latency(self, elapsed_ms: float, interactive: bool = False):
+        """Note how long a full (or, if ``interactive``, low-res) preview took."""
+        self._latency_ms[interactive] = self._average(
+            self._latency_ms[interactive], elapsed_ms
+        )
+
+    def latency_ms(self, interactive: bool = False) -> Optional[float]:
+        """Average preview time, or None if none was measured yet."""
+        return self._latency_ms[interactive]
+
+    @property
+    def event_gap_ms(self) -> Optional[float]:
+        """Average gap between edits in the current burst."""
+        return self._event_gap_ms
+
+    def begin_interaction(self):
+        """The user started dragging a control."""
+        self.interactive = True
+
+    def end_interaction(self):
+        """The user released the control."""
+        self.interactive = False
+
+    def next_delay_ms(self) -> int:
+        """Debounce delay for the preview requested by the latest edit."""
+        latency = self._latency_ms[self.interactive]
+        if latency is None:
+            return self.MIN_DELAY_MS if self.interactive else self.DEFAULT_DELAY_MS
+
+        delay = latency * self.LATENCY_FACTOR
+        gap = self._event_gap_ms
+        if gap is not None and gap < latency:
+            delay = max(delay, gap * self.GAP_FACTOR)
+        return int(min(self.MAX_DELAY_MS, max(self.MIN_DELAY_MS, delay)))
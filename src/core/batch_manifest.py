@@ -0,0 +1,164 @@
+"""
+Batch Manifest
+
+On-disk record of a batch run, so an interrupted run can resume. Each image
+gets an entry with the hash of its file content, the hash of the pipeline
+that processed it, its status and its output files. A re-run skips images
+whose (content, pipeline) pair already succeeded and retries failures,
+changed files and images processed by a different pipeline.
+
+The manifest is a JSON file replaced atomically (write a temporary file,
+fsync, rename), so a crash or kill -9 leaves either the previous or the new
+version, never a torn one. Entries are recorded after their outputs are
+written, so a "done" entry always has its files.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Optional
+
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+
+def content_hash(data) -> str:
+    """Hash of a file's bytes (anything supporting the buffer protocol)."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def atomic_write_json(path: str, data: Any):
+    """Replace ``path`` with ``data`` as JSON, atomically."""
+    folder = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=folder, prefix=".manifest-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=1)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+@dataclass
+class ManifestEntry:
+    """What the manifest knows about one image."""
+
+    content_hash: str
+    pipeline_hash: str
+    status: str  # STATUS_DONE or STATUS_FAILED
+    confluency: Optional[float] = None
+    output_paths: Dict[str, str] = field(default_factory=dict)
+    error_message: Optional[str] = None
+    updated: float = 0.0  # Unix time of the record
+
+
+class BatchManifest:
+    """
+    Resumable record of a batch, keyed by absolute image path.
+
+    Records are saved at most every ``flush_interval`` seconds (0 saves
+    each one); close() saves the rest. Safe to use from several threads.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 2.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._entries: Dict[str, ManifestEntry] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._last_save: Optional[float] = None
+        if os.path.exists(path):
+            self._load()
+
+    def _load(self):
+        with open(self.path, "r") as f:
+            data = json.load(f)
+        if data.get("version") != MANIFEST_VERSION:
+            logger.warning(f"Ignoring manifest {self.path}: unknown version")
+            return
+        self._entries = {
+            image_path: ManifestEntry(**entry)
+            for image_path, entry in data.get("entries", {}).items()
+        }
+
+    @staticmethod
+    def _key(image_path: str) -> str:
+        return os.path.normpath(os.path.abspath(image_path))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, image_path: str) -> Optional[ManifestEntry]:
+        """The entry for an image, if any."""
+        with self._lock:
+            return self._entries.get(self._key(image_path))
+
+    def completed(
+        self, image_path: str, content: str, pipeline: str
+    ) -> Optional[ManifestEntry]:
+        """
+        The entry of an image that can be skipped, if any.
+
+        That is a successful entry for the same content and pipeline hashes
+        whose output files still exist.
+        """
+        entry = self.get(image_path)
+        if (
+            entry is None
+            or entry.status != STATUS_DONE
+            or entry.content_hash != content
+            or entry.pipeline_hash != pipeline
+        ):
+            return None
+        if not all(os.path.exists(p) for p in entry.output_paths.values()):
+            return None
+        return entry
+
+    def record(self, image_path: str, entry: ManifestEntry):
+        """Record an image's outcome; saved according to flush_interval."""
+        entry.updated = time.time()
+        with self._lock:
+            self._entries[self._key(image_path)] = entry
+            self._dirty = True
+            if (
+                self._last_save is None
+                or time.monotonic() - self._last_save >= self.flush_interval
+            ):
+                self._save()
+
+    def flush(self):
+        """Save pending records now."""
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    def close(self):
+        self.flush()
+
+    def _save(self):
+        atomic_write_json(
+            self.path,
+            {
+                "version": MANIFEST_VERSION,
+                "entries": {
+                    image_path: asdict(entry)
+                    for image_path, entry in self._entries.items()
+                },
+            },
+        )
+        self._dirty = False
+        self._last_save = time.monotonic()
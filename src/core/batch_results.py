@@ -0,0 +1,66 @@
+"""
+Batch Results Export
+
+Writes batch results to a CSV file as they arrive, one flushed row per
+image, so the file is usable (e.g. opened in a spreadsheet) while a long or
+open-ended run such as watch mode is still going.
+"""
+
+import csv
+import os
+import time
+from typing import Optional
+
+from .batch_runner import BatchItemResult
+
+
+CSV_COLUMNS = (
+    "filename",
+    "path",
+    "success",
+    "confluency",
+    "skipped",
+    "error_message",
+    "execution_time_ms",
+    "processed_at",
+)
+
+
+class ResultsCsv:
+    """Appends BatchItemResults to a CSV file, writing the header once."""
+
+    def __init__(self, path: str):
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.path = path
+        self._file = open(path, "a", newline="")
+        self._writer = csv.writer(self._file)
+        if new_file:
+            self._writer.writerow(CSV_COLUMNS)
+            self._file.flush()
+
+    def append(self, result: BatchItemResult, processed_at: Optional[float] = None):
+        """Write one result row and flush it to disk."""
+        when = time.time() if processed_at is None else processed_at
+        self._writer.writerow(
+            (
+                os.path.basename(result.path),
+                result.path,
+                int(result.success),
+                "" if result.confluency is None else f"{result.confluency:.4f}",
+                int(result.skipped),
+                result.error_message or "",
+                f"{result.execution_time_ms:.1f}",
+                time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(when)),
+            )
+        )
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self) -> "ResultsCsv":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
@@ -0,0 +1,821 @@
+"""
+Batch Runner
+
+Applies a saved pipeline to every image of a folder. Each image flows
+through three stages that run concurrently, so decoding and encoding
+overlap with computation instead of leaving the CPU idle:
+
+    reader threads --decoded--> compute pool --computed--> writer thread
+
+- readers decode images ahead of the compute pool (cv2.imdecode releases
+  the GIL)
+- the compute pool runs the pipeline in worker processes; PHANTAST is pure
+  Python/NumPy between its OpenCV calls, so threads would serialize on the
+  GIL. Each worker builds the pipeline once and keeps its step instances.
+- the writer encodes and writes the outputs
+
+The decoded queue is bounded and at most ``max_in_flight`` images are being
+computed or written, so memory stays flat for folders of any size. A file
+that cannot be read, processed or written yields a failed result; the rest
+of the batch carries on. With a BatchManifest the run is resumable: readers
+hash each file and skip images already done. With an IntermediateStore the
+workers also save every node's output, for inspecting results step by step.
+With a memory budget the readers also hold back images whose predicted
+peak memory does not fit next to the running ones, predicted from the file
+header before decoding (see memory_budget and image_header).
+With ``shared_memory`` frames and results travel to and from the worker
+processes through shared memory slots instead of being pickled (see
+shm_transport). With a ResultCache, images analyzed before by the same
+pipeline are served from it instead of running PHANTAST again.
+"""
+
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from functools import partial
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import cv2
+import numpy as np
+
+from ..models.pipeline_model import Pipeline
+from .batch_manifest import (
+    STATUS_DONE,
+    STATUS_FAILED,
+    BatchManifest,
+    ManifestEntry,
+    content_hash,
+)
+from .execution_engine import _image_key
+from .image_header import read_image_spec
+from .intermediate_store import IntermediateStore
+from .memory_budget import JobEstimator, MemoryBudget, peak_rss, reset_peak_rss
+from .pipeline_identity import pipeline_hash
+from .pipeline_step import ImageSpec
+from .preview_pipeline import PreviewPipeline
+from .result_cache import CachedResult, ResultCache
+from .shm_transport import (
+    OUTPUT_BYTES_PER_PIXEL,
+    ArrayRef,
+    SlotClient,
+    SlotHandle,
+    SlotRing,
+)
+from .steps.phantast_step import CONFLUENCY_KEY, MASK_KEY
+
+
+logger = logging.getLogger(__name__)
+
+# File types picked up when a folder is given (same as ImageSessionModel)
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".tif", ".tiff", ".bmp")
+
+# Marks the end of a stage's input
+_END = object()
+
+# How often (seconds) blocked stages check whether the run was abandoned
+_POLL_INTERVAL = 0.1
+
+# Start method of the worker processes. The reader, dispatcher and writer
+# threads are already running when the pool starts, and forking a process
+# with threads can copy a lock some other thread holds and deadlock.
+_WORKER_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+
+@dataclass
+class BatchItemResult:
+    """Outcome of one image of a batch."""
+
+    path: str
+    success: bool
+    confluency: Optional[float] = None
+    # kind ("result", "mask") -> written file
+    output_paths: Optional[Dict[str, str]] = None
+    error_message: Optional[str] = None
+    execution_time_ms: float = 0.0
+    # Already done according to the manifest; nothing was recomputed
+    skipped: bool = False
+    content_hash: Optional[str] = None
+    # PHANTAST's result came from the result cache
+    cached: bool = False
+
+
+@dataclass
+class ComputedImage:
+    """What the compute stage hands to the writer."""
+
+    image: Optional[np.ndarray]  # Pipeline output (None if not kept)
+    confluency: Optional[float]
+    mask: Optional[np.ndarray]
+    elapsed_ms: float
+    # Size of the saved intermediate stack, if one was saved
+    intermediate_bytes: Optional[int] = None
+    # Measured peak memory of the computation, where the platform allows
+    peak_bytes: Optional[int] = None
+    # "image" / "mask" written into the image's shared memory slot
+    shared_outputs: Optional[Dict[str, ArrayRef]] = None
+    cached: bool = False
+
+
+def list_images(folder: str) -> List[str]:
+    """Image files directly inside ``folder``, sorted by name."""
+    paths = [
+        entry.path
+        for entry in os.scandir(folder)
+        if entry.is_file() and entry.name.lower().endswith(IMAGE_EXTENSIONS)
+    ]
+    return sorted(paths)
+
+
+def image_key(path: str, root: Optional[str] = None) -> str:
+    """
+    Key of an image in an IntermediateStore: its path relative to the input
+    folder ``root`` ("/" separated), or its absolute path if it is outside.
+    """
+    path = os.path.abspath(path)
+    if root is not None:
+        relative = os.path.relpath(path, os.path.abspath(root))
+        if relative != os.pardir and not relative.startswith(os.pardir + os.sep):
+            return relative.replace(os.sep, "/")
+    return path.replace(os.sep, "/")
+
+
+def decode_image(data: np.ndarray, path: str) -> np.ndarray:
+    """Decode a file's bytes at their native depth and channel count."""
+    image = cv2.imdecode(data, cv2.IMREAD_UNCHANGED)
+    if image is None:
+        raise IOError(f"Could not read image: {path}")
+    return image
+
+
+def read_image(path: str) -> np.ndarray:
+    """Read and decode an image file."""
+    return decode_image(np.fromfile(path, dtype=np.uint8), path)
+
+
+def compute_image(
+    image: np.ndarray,
+    pipeline: Pipeline,
+    executor: PreviewPipeline,
+    keep_images: bool = True,
+    intermediates: Optional[IntermediateStore] = None,
+    key: Optional[str] = None,
+    measure_peak: bool = False,
+) -> ComputedImage:
+    """
+    Run a pipeline on a decoded image.
+
+    Args:
+        image: Decoded input image
+        pipeline: Pipeline to apply
+        executor: Executor to run it on (cache disabled, reused per worker)
+        keep_images: Return the output image and mask (only needed when
+            they are written)
+        intermediates: Store to save every node's output in, under ``key``
+        key: The image's key in ``intermediates``
+        measure_peak: Measure the peak RSS of the computation; it resets
+            the process's peak mark, so only worker processes do it
+
+    Raises:
+        RuntimeError: If the pipeline fails
+    """
+    start_time = time.time()
+    rss_before = reset_peak_rss() if measure_peak else None
+    result = executor.execute(image, pipeline)
+    if not result.success:
+        raise RuntimeError(result.error_message)
+    peak_bytes = None
+    peak = peak_rss() if rss_before is not None else None
+    if peak is not None:
+        # The input was already resident (unpickled) before the reset
+        peak_bytes = peak - rss_before + image.nbytes
+
+    intermediate_bytes = None
+    if intermediates is not None and result.node_results:
+        intermediate_bytes = intermediates.save(key, result.node_results)
+
+    metadata = result.metadata or {}
+    confluency = metadata.get(CONFLUENCY_KEY)
+    return ComputedImage(
+        image=result.image if keep_images else None,
+        confluency=float(confluency) if confluency is not None else None,
+        mask=metadata.get(MASK_KEY) if keep_images else None,
+        elapsed_ms=(time.time() - start_time) * 1000,
+        intermediate_bytes=intermediate_bytes,
+        peak_bytes=peak_bytes,
+        cached=result.result_cache_hit,
+    )
+
+
+def write_outputs(
+    path: str, image: np.ndarray, mask: Optional[np.ndarray], output_dir: str
+) -> Dict[str, str]:
+    """
+    Write an image's pipeline output (and PHANTAST mask, if any) as PNG.
+
+    Returns:
+        Dict of kind -> written file
+    """
+    stem = os.path.splitext(os.path.basename(path))[0]
+    outputs = {"result": os.path.join(output_dir, f"{stem}_result.png")}
+    images = {"result": image}
+    if mask is not None:
+        outputs["mask"] = os.path.join(output_dir, f"{stem}_mask.png")
+        images["mask"] = mask.astype(np.uint8) * 255
+
+    for kind, output_path in outputs.items():
+        if not cv2.imwrite(output_path, images[kind]):
+            raise IOError(f"Could not write {output_path}")
+    return outputs
+
+
+def process_image(
+    path: str,
+    pipeline: Pipeline,
+    executor: PreviewPipeline,
+    output_dir: Optional[str] = None,
+) -> BatchItemResult:
+    """
+    Read, compute and write one image file; errors become a failed result.
+
+    Args:
+        path: Image file to process
+        pipeline: Pipeline to apply
+        executor: Executor to run it on (cache disabled, reused per worker)
+        output_dir: Folder for the output images; None writes nothing
+    """
+    start_time = time.time()
+    try:
+        image = read_image(path)
+        computed = compute_image(image, pipeline, executor, output_dir is not None)
+        output_paths = None
+        if output_dir is not None:
+            output_paths = write_outputs(
+                path, computed.image, computed.mask, output_dir
+            )
+        return BatchItemResult(
+            path=path,
+            success=True,
+            confluency=computed.confluency,
+            output_paths=output_paths,
+            execution_time_ms=(time.time() - start_time) * 1000,
+        )
+    except Exception as e:
+        logger.error(f"Batch item {path} failed: {e}")
+        return BatchItemResult(
+            path=path,
+            success=False,
+            error_message=str(e),
+            execution_time_ms=(time.time() - start_time) * 1000,
+        )
+
+
+# Per-process state of pool workers, set up once by _init_worker
+_worker_pipeline: Optional[Pipeline] = None
+_worker_executor: Optional[PreviewPipeline] = None
+_worker_intermediates: Optional[IntermediateStore] = None
+_worker_slots: Optional[SlotClient] = None
+
+
+def _init_worker(
+    pipeline_data: Dict[str, Any],
+    intermediates_root: Optional[str],
+    result_cache: Optional[Tuple[str, int]],
+):
+    """Pool initializer: rebuild the pipeline and its executor."""
+    global _worker_pipeline, _worker_executor, _worker_intermediates
+    _worker_pipeline = Pipeline.from_dict(pipeline_data)
+    # Each worker opens its own connection to the cache (path, max_bytes)
+    cache = ResultCache(*result_cache) if result_cache is not None else None
+    _worker_executor = PreviewPipeline(cache_enabled=False, result_cache=cache)
+    if intermediates_root is not None:
+        # The parent enforces the disk budget
+        _worker_intermediates = IntermediateStore(intermediates_root)
+
+
+def _compute_in_worker(
+    image: np.ndarray, keep_images: bool, key: Optional[str]
+) -> ComputedImage:
+    """Pool task: run this worker's pipeline on a decoded image."""
+    return compute_image(
+        image,
+        _worker_pipeline,
+        _worker_executor,
+        keep_images,
+        _worker_intermediates,
+        key,
+        measure_peak=True,
+    )
+
+
+def _compute_shared_in_worker(
+    handle: SlotHandle, keep_images: bool, key: Optional[str]
+) -> ComputedImage:
+    """Pool task: run on a frame in shared memory and write the results back."""
+    global _worker_slots
+    if _worker_slots is None:
+        _worker_slots = SlotClient()
+    computed = _compute_in_worker(_worker_slots.frame(handle), keep_images, key)
+    if keep_images:
+        outputs = {"image": computed.image}
+        if computed.mask is not None:
+            outputs["mask"] = computed.mask
+        computed.shared_outputs, leftover = _worker_slots.put_outputs(handle, outputs)
+        # Outputs that did not fit the slot are pickled
+        computed.image = leftover.get("image")
+        computed.mask = leftover.get("mask")
+    return computed
+
+
+def _put(q: queue.Queue, item, stop: threading.Event) -> bool:
+    """Put into a bounded queue, giving up if the run is abandoned."""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=_POLL_INTERVAL)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _get(q: queue.Queue, stop: threading.Event):
+    """Get from a queue; _END if the run is abandoned."""
+    while not stop.is_set():
+        try:
+            return q.get(timeout=_POLL_INTERVAL)
+        except queue.Empty:
+            pass
+    return _END
+
+
+@dataclass
+class _Item:
+    """One image on its way through the stages."""
+
+    index: int
+    path: str
+    read_ms: float = 0.0
+    image: Optional[np.ndarray] = None
+    error: Optional[str] = None
+    content_hash: Optional[str] = None
+    # Manifest entry of an image that is skipped
+    done: Optional[ManifestEntry] = None
+    future: Optional[Future] = None
+    # Predicted and reserved bytes of the memory budget
+    predicted_bytes: int = 0
+    reserved_bytes: int = 0
+    # Shared memory slot holding the image and its outputs
+    slot: Optional[int] = None
+    # Result cache entry of an image that needs no computing
+    cached: Optional[CachedResult] = None
+
+
+class _BatchStream:
+    """The threads and queues of one streaming run."""
+
+    def __init__(
+        self, runner: "BatchRunner", paths: Iterable[str], root: Optional[str]
+    ):
+        self.runner = runner
+        self.paths = paths
+        self.root = root
+        self.manifest = runner.manifest
+        self.pipeline_hash = None
+        if self.manifest is not None or runner.result_cache is not None:
+            self.pipeline_hash = pipeline_hash(runner.pipeline)
+        # Without output images to write, cached results need no worker
+        self.result_cache = None
+        if runner.output_dir is None:
+            self.result_cache = runner.result_cache
+        self.memory = runner.memory_budget
+        self.estimate = None
+        if self.memory is not None:
+            self.estimate = JobEstimator(runner.pipeline.nodes)
+        self.ring = None
+        if runner.shared_memory and runner.workers > 1:
+            # Each image in flight holds a slot, so one is always free
+            # once the dispatcher holds one of ``slots``
+            self.ring = SlotRing(runner.max_in_flight)
+        self.stop = threading.Event()
+        self.path_queue: queue.Queue = queue.Queue(maxsize=runner.prefetch)
+        self.decoded: queue.Queue = queue.Queue(maxsize=runner.prefetch)
+        # Bounded by the slots: each entry holds one of them
+        self.computed: queue.Queue = queue.Queue()
+        self.finished: queue.Queue = queue.Queue()
+        # Images between decode and written output
+        self.slots = threading.Semaphore(runner.max_in_flight)
+        self.error: Optional[BaseException] = None
+
+    def __iter__(self) -> Iterator[Tuple[int, BatchItemResult]]:
+        pool, compute = self.runner._compute_pool()
+        threads = [threading.Thread(target=self._guard, args=(self._feed,))]
+        threads += [
+            threading.Thread(target=self._guard, args=(self._read,))
+            for _ in range(self.runner.readers)
+        ]
+        threads.append(
+            threading.Thread(target=self._guard, args=(self._dispatch, pool, compute))
+        )
+        threads.append(threading.Thread(target=self._guard, args=(self._write,)))
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+
+        try:
+            while True:
+                item = self.finished.get()
+                if item is _END:
+                    break
+                yield item
+        finally:
+            self.stop.set()
+            for thread in threads:
+                thread.join()
+            pool.shutdown(wait=True, cancel_futures=True)
+            if self.ring is not None:
+                self.ring.close()
+            if self.manifest is not None:
+                self.manifest.flush()
+        if self.error is not None:
+            raise RuntimeError(f"Batch stream failed: {self.error}") from self.error
+
+    def _guard(self, stage: Callable, *args):
+        """Run a stage; an unexpected error ends the whole run."""
+        try:
+            stage(*args)
+        except BaseException as e:
+            logger.error(f"Batch stage {stage.__name__} failed: {e}")
+            self.error = e
+            self.stop.set()
+            self.finished.put(_END)
+
+    def _feed(self):
+        for index, path in enumerate(self.paths):
+            if not _put(self.path_queue, _Item(index, path), self.stop):
+                return
+        for _ in range(self.runner.readers):
+            _put(self.path_queue, _END, self.stop)
+
+    def _read(self):
+        while True:
+            item = _get(self.path_queue, self.stop)
+            if item is _END:
+                _put(self.decoded, _END, self.stop)
+                return
+            start_time = time.time()
+            try:
+                data = np.fromfile(item.path, dtype=np.uint8)
+                if self.manifest is not None:
+                    item.content_hash = content_hash(data)
+                    item.done = self.manifest.completed(
+                        item.path, item.content_hash, self.pipeline_hash
+                    )
+                if item.done is None:
+                    # Reserve from the header, before the decode allocates
+                    # the frame; files whose header is not read reserve after
+                    spec = read_image_spec(data) if self.memory is not None else None
+                    if spec is not None and not self._reserve(item, spec):
+                        return
+                    item.image = decode_image(data, item.path)
+                    if self.memory is not None and spec is None:
+                        if not self._reserve(item, ImageSpec.of(item.image)):
+                            return
+                if item.image is not None and self.result_cache is not None:
+                    item.cached = self._lookup(item.image)
+                    if item.cached is not None:
+                        item.image = None
+            except Exception as e:
+                item.error = str(e)
+            if item.image is None and item.reserved_bytes:
+                # Nothing to compute after all
+                self.memory.release(item.reserved_bytes)
+                item.reserved_bytes = 0
+            item.read_ms = (time.time() - start_time) * 1000
+            if not _put(self.decoded, item, self.stop):
+                return
+
+    def _reserve(self, item: _Item, spec: ImageSpec) -> bool:
+        """
+        Wait until an image's predicted peak fits the memory budget.
+
+        Returns:
+            False if the run was abandoned while waiting
+        """
+        item.predicted_bytes = self.estimate(spec)
+        reserved = self.memory.reservation(item.predicted_bytes)
+        while not self.memory.acquire(reserved, timeout=_POLL_INTERVAL):
+            if self.stop.is_set():
+                return False
+        item.reserved_bytes = reserved
+        return True
+
+    def _lookup(self, image: np.ndarray) -> Optional[CachedResult]:
+        try:
+            return self.result_cache.get(_image_key(image), self.pipeline_hash)
+        except Exception as e:
+            logger.warning(f"Result cache lookup failed: {e}")
+            return None
+
+    def _dispatch(self, pool: Executor, compute: Callable):
+        keep_images = self.runner.output_dir is not None
+        ends = count = 0
+        while ends < self.runner.readers:
+            item = _get(self.decoded, self.stop)
+            if item is _END:
+                if self.stop.is_set():
+                    return
+                ends += 1
+                continue
+            while not self.slots.acquire(timeout=_POLL_INTERVAL):
+                if self.stop.is_set():
+                    return
+            count += 1
+            if item.image is None:
+                # Failed to read, skipped or cached
+                self.computed.put(item)
+                continue
+            key = image_key(item.path, self.root)
+            payload = item.image
+            if self.ring is not None:
+                item.slot = self.ring.acquire()
+                height, width = item.image.shape[:2]
+                room = OUTPUT_BYTES_PER_PIXEL * height * width if keep_images else 0
+                payload = self.ring.put(item.slot, item.image, output_room=room)
+            item.future = pool.submit(compute, payload, keep_images, key)
+            # The worker has its own copy (or, on a thread, is done with it
+            # once the future completes)
+            item.image = None
+            item.future.add_done_callback(lambda _, item=item: self.computed.put(item))
+        self.computed.put((_END, count))
+
+    def _write(self):
+        expected = None
+        written = 0
+        while expected is None or written < expected:
+            item = _get(self.computed, self.stop)
+            if item is _END:
+                return
+            if isinstance(item, tuple):
+                expected = item[1]
+                continue
+            self.finished.put((item.index, self._finish(item)))
+            if item.reserved_bytes:
+                self.memory.release(item.reserved_bytes)
+            if item.slot is not None:
+                self.ring.release(item.slot)
+            self.slots.release()
+            written += 1
+        self.finished.put(_END)
+
+    def _finish(self, item: _Item) -> BatchItemResult:
+        """Write one computed image's outputs, record it and build its result."""
+        if item.done is not None:
+            return BatchItemResult(
+                path=item.path,
+                success=True,
+                confluency=item.done.confluency,
+                output_paths=item.done.output_paths or None,
+                skipped=True,
+                content_hash=item.content_hash,
+            )
+
+        result = self._compute_result(item)
+        if self.manifest is not None and item.content_hash is not None:
+            # Recorded after the outputs are written, so a "done" entry
+            # always has its files
+            self.manifest.record(
+                item.path,
+                ManifestEntry(
+                    content_hash=item.content_hash,
+                    pipeline_hash=self.pipeline_hash,
+                    status=STATUS_DONE if result.success else STATUS_FAILED,
+                    confluency=result.confluency,
+                    output_paths=result.output_paths or {},
+                    error_message=result.error_message,
+                ),
+            )
+        return result
+
+    def _compute_result(self, item: _Item) -> BatchItemResult:
+        elapsed_ms = item.read_ms
+        try:
+            if item.error is not None:
+                raise IOError(item.error)
+            if item.cached is not None:
+                computed = ComputedImage(
+                    image=None,
+                    confluency=item.cached.confluency,
+                    mask=None,
+                    elapsed_ms=0.0,
+                    cached=True,
+                )
+            else:
+                try:
+                    computed = item.future.result()
+                except BrokenProcessPool as e:
+                    # A worker died (e.g. killed for memory); the images
+                    # still queued on the pool fail with it
+                    raise RuntimeError(f"Worker died: {e}")
+            elapsed_ms += computed.elapsed_ms
+            for name, ref in (computed.shared_outputs or {}).items():
+                # Views of the slot; it is released after the outputs are written
+                setattr(computed, name, self.ring.view(item.slot, ref))
+            if self.memory is not None:
+                self.memory.observe(item.predicted_bytes, computed.peak_bytes)
+            intermediates = self.runner.intermediates
+            if intermediates is not None and computed.intermediate_bytes is not None:
+                intermediates.track(
+                    image_key(item.path, self.root), computed.intermediate_bytes
+                )
+                intermediates.enforce_budget()
+
+            output_paths = None
+            output_dir = self.runner.output_dir
+            if output_dir is not None:
+                start_time = time.time()
+                output_paths = write_outputs(
+                    item.path, computed.image, computed.mask, output_dir
+                )
+                elapsed_ms += (time.time() - start_time) * 1000
+            return BatchItemResult(
+                path=item.path,
+                success=True,
+                confluency=computed.confluency,
+                output_paths=output_paths,
+                execution_time_ms=elapsed_ms,
+                content_hash=item.content_hash,
+                cached=computed.cached,
+            )
+        except Exception as e:
+            logger.error(f"Batch item {item.path} failed: {e}")
+            return BatchItemResult(
+                path=item.path,
+                success=False,
+                error_message=str(e),
+                execution_time_ms=elapsed_ms,
+                content_hash=item.content_hash,
+            )
+
+
+class BatchRunner:
+    """
+    Runs a pipeline over many images as a read -> compute -> write stream.
+
+    With ``workers=1`` the pipeline runs on a thread of the calling
+    process, which avoids the pool start-up cost for small batches and
+    eases debugging; decoding and writing still overlap with it.
+    """
+
+    def __init__(
+        self,
+        pipeline: Pipeline,
+        workers: Optional[int] = None,
+        output_dir: Optional[str] = None,
+        readers: int = 2,
+        prefetch: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+        manifest: Optional[BatchManifest] = None,
+        intermediates: Optional[IntermediateStore] = None,
+        memory_budget: Optional[int] = None,
+        shared_memory: bool = False,
+        result_cache: Optional[ResultCache] = None,
+    ):
+        """
+        Args:
+            pipeline: Pipeline to apply; it is serialized when a run starts
+            workers: Number of worker processes (CPU count if None)
+            output_dir: Folder for the output images; None writes nothing
+            readers: Number of decoder threads
+            prefetch: Decoded images queued ahead of the compute pool (2 x
+                workers if None)
+            max_in_flight: Most images being computed or written (2 x
+                workers if None); with ``prefetch`` and ``readers`` it
+                bounds the run's memory
+            manifest: Records each image's outcome; images it lists as
+                done for the same content and pipeline are skipped
+            intermediates: Saves every node's output of each image, keyed
+                by image_key(); off by default as it costs disk and time
+            memory_budget: Bytes the images being computed may use at
+                their predicted peak; None bounds them by count only
+            shared_memory: Pass frames and results to and from worker
+                processes through shared memory instead of pickling them
+            result_cache: Persistent PHANTAST results; looked up before
+                computing and filled by the workers
+        """
+        self.pipeline = pipeline
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.output_dir = output_dir
+        self.readers = max(1, readers)
+        self.prefetch = max(1, prefetch or 2 * self.workers)
+        self.max_in_flight = max(1, max_in_flight or 2 * self.workers)
+        self.manifest = manifest
+        self.intermediates = intermediates
+        self.memory_budget = (
+            MemoryBudget(memory_budget) if memory_budget is not None else None
+        )
+        self.shared_memory = shared_memory
+        self.result_cache = result_cache
+
+    @classmethod
+    def from_file(cls, pipeline_path: str, **kwargs) -> "BatchRunner":
+        """Create a runner for a pipeline saved with Pipeline.save()."""
+        return cls(Pipeline.load(pipeline_path), **kwargs)
+
+    def run(
+        self,
+        inputs: Union[str, Iterable[str]],
+        progress_callback: Optional[Callable[[int, int, BatchItemResult], None]] = None,
+    ) -> List[BatchItemResult]:
+        """
+        Process a folder or a list of image files.
+
+        Args:
+            inputs: Folder (its images, sorted by name) or list of files
+            progress_callback: Optional callback(done, total, result), called
+                in completion order as each image finishes
+
+        Returns:
+            One BatchItemResult per image, in input order
+        """
+        if isinstance(inputs, str):
+            root, paths = inputs, list_images(inputs)
+        else:
+            paths = list(inputs)
+            # Files of several folders keep their folders apart
+            root = None
+            if paths:
+                folders = [os.path.dirname(os.path.abspath(p)) for p in paths]
+                root = os.path.commonpath(folders)
+        results: List[Optional[BatchItemResult]] = [None] * len(paths)
+        for done, (index, result) in enumerate(self.stream(paths, root), 1):
+            results[index] = result
+            if progress_callback:
+                progress_callback(done, len(paths), result)
+        return results
+
+    def stream(
+        self, paths: Iterable[str], root: Optional[str] = None
+    ) -> Iterator[Tuple[int, BatchItemResult]]:
+        """
+        Process image files, yielding each result as soon as it is written.
+
+        ``paths`` is consumed lazily, so it may be a generator that keeps
+        producing files. Closing the iterator early abandons the run.
+        Intermediates are keyed by path relative to ``root`` (the input
+        folder), see image_key().
+
+        Yields:
+            (index of the path in ``paths``, BatchItemResult), in completion
+            order
+        """
+        if self.output_dir is not None:
+            os.makedirs(self.output_dir, exist_ok=True)
+        return iter(_BatchStream(self, paths, root))
+
+    def _compute_pool(self) -> Tuple[Executor, Callable]:
+        """Executor for the compute stage and the task it runs."""
+        # Rebuilt from its dict, so later edits do not reach a running batch
+        data = self.pipeline.to_dict()
+        if self.workers == 1:
+            pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="batch")
+            compute = partial(
+                compute_image,
+                pipeline=Pipeline.from_dict(data),
+                executor=PreviewPipeline(
+                    cache_enabled=False, result_cache=self.result_cache
+                ),
+                intermediates=self.intermediates,
+            )
+            return pool, lambda image, keep, key: compute(
+                image, keep_images=keep, key=key
+            )
+        root = self.intermediates.root if self.intermediates is not None else None
+        cache = None
+        if self.result_cache is not None:
+            cache = (self.result_cache.path, self.result_cache.max_bytes)
+        pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=_WORKER_CONTEXT,
+            initializer=_init_worker,
+            initargs=(data, root, cache),
+        )
+        if self.shared_memory:
+            return pool, _compute_shared_in_worker
+        return pool, _compute_in_worker
@@ -0,0 +1,328 @@
+"""
+Execution Engine
+
+The single hot path behind every linear pipeline front-end: ImagePipeline,
+PreviewPipeline and the shell prototype's pipeline. Front-ends translate
+their steps into EngineTasks; the engine runs them on a read-only view of
+the input (no copy), freezes every output so results can be shared, and
+records per-node telemetry.
+
+Pluggable parts:
+- caching: any MutableMapping (a dict, an LRU mapping, a disk-backed
+  store); tasks opt in by providing a cache key
+- scheduling: run() executes tasks on the calling thread; astream()
+  dispatches each task to an Executor from asyncio code
+- instrumentation: EngineObserver hooks called around every task
+
+Graph pipelines (fan-out / fan-in) run on GraphExecutor instead.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Generator,
+    Hashable,
+    List,
+    MutableMapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import numpy as np
+
+from .pipeline_step import freeze, readonly_view
+from .telemetry import NodeTimer, node_telemetry
+
+
+logger = logging.getLogger(__name__)
+
+# (output image, metadata the step produced)
+CacheEntry = Tuple[np.ndarray, Dict[str, Any]]
+
+
+def _image_key(image: np.ndarray) -> str:
+    """Content hash of an image, computed without copying its buffer."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{image.shape}{image.dtype}".encode())
+    digest.update(np.ascontiguousarray(image).data)
+    return digest.hexdigest()
+
+
+@dataclass
+class EngineTask:
+    """One entry of a linear execution: a step run on the previous output."""
+
+    key: str  # Key of the entry in node_results (node ID or step index)
+    name: str
+    # Runs the step; None reports the incoming image without running
+    # anything (e.g. nodes the compiler elided)
+    run: Optional[Callable[[np.ndarray, dict], np.ndarray]] = None
+    # Cache key for the step's input; None (or returning None) skips the cache
+    cache_key: Optional[Callable[[np.ndarray], Optional[Hashable]]] = None
+    # Extra fields copied into the node_results entry
+    info: Dict[str, Any] = field(default_factory=dict)
+    # False when the incoming image is not the node's output (a later task
+    # does its work); its entry then has no output image
+    reports_output: bool = True
+
+
+@dataclass
+class EngineResult:
+    """Result of an engine run."""
+
+    success: bool
+    image: Optional[np.ndarray] = None
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    node_results: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    error_message: Optional[str] = None
+    cancelled: bool = False
+    execution_time_ms: float = 0.0
+
+
+class EngineObserver:
+    """Instrumentation hooks; override the ones you need."""
+
+    def task_started(self, task: EngineTask, position: int, total: int):
+        """A runnable task is about to run (``position`` counts from 1)."""
+
+    def task_finished(self, task: EngineTask, entry: Dict[str, Any]):
+        """A task's node_results entry is ready."""
+
+
+class _Collector(EngineObserver):
+    """Buffers finished entries for astream()."""
+
+    def __init__(self):
+        self.finished: List[Tuple[EngineTask, Dict[str, Any]]] = []
+
+    def task_finished(self, task: EngineTask, entry: Dict[str, Any]):
+        self.finished.append((task, entry))
+
+
+class ExecutionEngine:
+    """
+    Runs a sequence of EngineTasks on an image.
+
+    With ``stop_on_error`` a failing step ends the run with an error
+    result; otherwise the error is logged, recorded in the step's entry and
+    the previous image passed on.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[MutableMapping[Hashable, CacheEntry]] = None,
+        observers: Sequence[EngineObserver] = (),
+        stop_on_error: bool = True,
+    ):
+        self.cache = cache
+        self.observers = list(observers)
+        self.stop_on_error = stop_on_error
+
+    def run(
+        self,
+        image: np.ndarray,
+        tasks: Sequence[EngineTask],
+        metadata: Optional[Dict[str, Any]] = None,
+        should_stop: Optional[Callable[[], bool]] = None,
+        observers: Sequence[EngineObserver] = (),
+    ) -> EngineResult:
+        """
+        Run tasks in order on the calling thread.
+
+        Args:
+            image: Input image; it is never modified
+            tasks: Tasks to run
+            metadata: Dict shared by the steps (a new one if None)
+            should_stop: Checked before each task; True cancels the run
+            observers: Extra observers for this run only
+
+        Returns:
+            EngineResult
+        """
+        walk = self._walk(image, tasks, metadata, should_stop, observers)
+        try:
+            request = next(walk)
+            while True:
+                try:
+                    outcome = self._run_timed(*request)
+                except Exception as e:
+                    request = walk.throw(e)
+                else:
+                    request = walk.send(outcome)
+        except StopIteration as stop:
+            return stop.value
+
+    async def astream(
+        self,
+        image: np.ndarray,
+        tasks: Sequence[EngineTask],
+        metadata: Optional[Dict[str, Any]] = None,
+        executor: Optional[Executor] = None,
+        observers: Sequence[EngineObserver] = (),
+    ) -> AsyncIterator[Tuple[EngineTask, Dict[str, Any]]]:
+        """
+        Run tasks from asyncio code, yielding each entry as it completes.
+
+        Every task runs on ``executor`` (the loop's default executor if
+        None). Cancelling the consuming task stops before the next task; a
+        task already running finishes in the background.
+
+        Yields:
+            (task, node_results entry)
+
+        Raises:
+            RuntimeError: If a step fails and ``stop_on_error`` is set
+        """
+        loop = asyncio.get_running_loop()
+        collector = _Collector()
+        walk = self._walk(image, tasks, metadata, None, (*observers, collector))
+        try:
+            request = next(walk)
+            while True:
+                for item in collector.finished:
+                    yield item
+                collector.finished.clear()
+                try:
+                    outcome = await loop.run_in_executor(
+                        executor, self._run_timed, *request
+                    )
+                except Exception as e:
+                    request = walk.throw(e)
+                else:
+                    request = walk.send(outcome)
+        except StopIteration as stop:
+            result = stop.value
+        finally:
+            walk.close()
+
+        for item in collector.finished:
+            yield item
+        if not result.success:
+            raise RuntimeError(result.error_message)
+
+    def run_task(
+        self, task: EngineTask, image: np.ndarray, metadata: Dict[str, Any]
+    ) -> Tuple[np.ndarray, bool]:
+        """
+        Run one task through the cache.
+
+        Returns:
+            (frozen output, cache_hit)
+        """
+        key = None
+        if self.cache is not None and task.cache_key is not None:
+            key = task.cache_key(image)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                output, produced = cached
+                metadata.update(produced)
+                return output, True
+
+        metadata_before = dict(metadata)
+        output = freeze(task.run(image, metadata))
+        if key is not None:
+            # Stored with the metadata the step produced (e.g. confluency),
+            # which a cache hit restores
+            produced = {
+                name: value
+                for name, value in metadata.items()
+                if name not in metadata_before or metadata_before[name] is not value
+            }
+            self.cache[key] = (output, produced)
+        return output, False
+
+    def _run_timed(
+        self, task: EngineTask, image: np.ndarray, metadata: Dict[str, Any]
+    ) -> Tuple[np.ndarray, bool, NodeTimer]:
+        """run_task() under a NodeTimer, on the thread doing the work."""
+        with NodeTimer() as timer:
+            output, cache_hit = self.run_task(task, image, metadata)
+        return output, cache_hit, timer
+
+    def _walk(
+        self,
+        image: np.ndarray,
+        tasks: Sequence[EngineTask],
+        metadata: Optional[Dict[str, Any]],
+        should_stop: Optional[Callable[[], bool]],
+        observers: Sequence[EngineObserver],
+    ) -> Generator[Tuple, Tuple[np.ndarray, bool, NodeTimer], EngineResult]:
+        """
+        The execution loop, independent of how tasks are scheduled.
+
+        Yields (task, image, metadata) for each task to run and expects its
+        _run_timed() outcome (or exception) back; returns the EngineResult.
+        """
+        start_time = time.time()
+        metadata = {} if metadata is None else metadata
+        observers = (*self.observers, *observers)
+        total = sum(1 for task in tasks if task.run is not None)
+        current_image = readonly_view(image)
+        node_results: Dict[str, Dict[str, Any]] = {}
+        position = 0
+
+        for task in tasks:
+            if should_stop is not None and should_stop():
+                return EngineResult(
+                    success=False,
+                    metadata=metadata,
+                    node_results=node_results,
+                    error_message="Cancelled",
+                    cancelled=True,
+                )
+
+            timer = None
+            cache_hit = False
+            error = None
+            if task.run is not None:
+                position += 1
+                for observer in observers:
+                    observer.task_started(task, position, total)
+                try:
+                    current_image, cache_hit, timer = (
+                        yield task,
+                        current_image,
+                        metadata,
+                    )
+                except Exception as e:
+                    logger.error(f"Error in step {task.name}: {e}")
+                    if self.stop_on_error:
+                        return EngineResult(
+                            success=False,
+                            metadata=metadata,
+                            node_results=node_results,
+                            error_message=f"Node '{task.name}' failed: {e}",
+                        )
+                    # Continue with the previous image
+                    error = str(e)
+
+            output = current_image if task.reports_output else None
+            entry = {
+                "name": task.name,
+                "output": output,
+                **node_telemetry(output, timer, cache_hit),
+                **task.info,
+            }
+            if error is not None:
+                entry["error"] = error
+            node_results[task.key] = entry
+            for observer in observers:
+                observer.task_finished(task, entry)
+
+        return EngineResult(
+            success=True,
+            image=current_image,
+            metadata=metadata,
+            node_results=node_results,
+            execution_time_ms=(time.time() - start_time) * 1000,
+        )
@@ -0,0 +1,212 @@
+"""
+Folder Watcher
+
+Watch mode for the batch runner: picks up images as the microscope writes
+them into a folder over the course of an acquisition.
+
+New files are found by polling the folder with os.scandir. A file counts
+as complete once its size and modification time have stayed the same for
+``settle_time`` seconds, so half-written images are never decoded. On
+Linux, with the optional ``inotify_simple`` package, the watcher wakes up
+as soon as a file is closed or moved into the folder instead of at the next
+poll, and such files need no settle time.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from .batch_results import ResultsCsv
+from .batch_runner import IMAGE_EXTENSIONS, BatchItemResult, BatchRunner
+from .results_store import JOB_CANCELLED, JOB_COMPLETED, ResultsStore
+
+
+logger = logging.getLogger(__name__)
+
+# Try to import inotify bindings, but fall back to polling
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+
+    INOTIFY_AVAILABLE = True
+except ImportError:
+    INOTIFY_AVAILABLE = False
+
+# (size, mtime_ns) of a file
+Signature = Tuple[int, int]
+
+
+class FolderWatcher:
+    """Reports image files of a folder once they are completely written."""
+
+    def __init__(
+        self,
+        folder: str,
+        settle_time: float = 2.0,
+        poll_interval: float = 1.0,
+        include_existing: bool = True,
+        use_inotify: Optional[bool] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            folder: Folder to watch (not recursive)
+            settle_time: Seconds a file's size and mtime must stay unchanged
+            poll_interval: Seconds between polls
+            include_existing: Also report files present when watching starts
+            use_inotify: Wake up on inotify events (default: if available)
+            clock: Monotonic time source in seconds
+        """
+        self.folder = folder
+        self.settle_time = settle_time
+        self.poll_interval = poll_interval
+        self._clock = clock
+        # path -> (signature, time it was first seen with that signature)
+        self._pending: Dict[str, Tuple[Signature, float]] = {}
+        # path -> signature it was reported with
+        self._reported: Dict[str, Signature] = {}
+        # Files inotify saw being closed after writing or moved in
+        self._closed: Set[str] = set()
+        self._skip_existing = not include_existing
+
+        if use_inotify is None:
+            use_inotify = INOTIFY_AVAILABLE
+        if use_inotify and not INOTIFY_AVAILABLE:
+            raise ValueError("inotify requested but inotify_simple is not installed")
+        self._inotify = None
+        if use_inotify:
+            self._inotify = INotify()
+            self._inotify.add_watch(
+                folder, inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO
+            )
+
+    def _scan(self) -> Dict[str, Signature]:
+        files = {}
+        for entry in os.scandir(self.folder):
+            if entry.is_file() and entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                stat = entry.stat()
+                files[entry.path] = (stat.st_size, stat.st_mtime_ns)
+        return files
+
+    def poll(self) -> List[str]:
+        """
+        Scan the folder once.
+
+        Returns:
+            Files that became complete since the last poll, sorted by name.
+            A reported file that is later rewritten is reported again.
+        """
+        now = self._clock()
+        files = self._scan()
+        if self._skip_existing:
+            self._reported.update(files)
+            self._skip_existing = False
+
+        ready = []
+        for path, signature in files.items():
+            if self._reported.get(path) == signature:
+                continue
+            pending = self._pending.get(path)
+            if pending is None or pending[0] != signature:
+                pending = self._pending[path] = (signature, now)
+            complete = path in self._closed or now - pending[1] >= self.settle_time
+            if complete and signature[0] > 0:
+                ready.append(path)
+                self._reported[path] = signature
+                del self._pending[path]
+
+        # Forget files that were deleted
+        for table in (self._pending, self._reported):
+            for path in [p for p in table if p not in files]:
+                del table[path]
+        self._closed.clear()
+        return sorted(ready)
+
+    def wait(self, stop_event: threading.Event):
+        """Sleep until the next poll is due (or an inotify event arrives)."""
+        if self._inotify is None:
+            stop_event.wait(self.poll_interval)
+            return
+        for event in self._inotify.read(timeout=int(self.poll_interval * 1000)):
+            self._closed.add(os.path.join(self.folder, event.name))
+
+    def watch(self, stop_event: Optional[threading.Event] = None) -> Iterator[str]:
+        """
+        Yield files as they become complete until ``stop_event`` is set.
+        """
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            for path in self.poll():
+                yield path
+            self.wait(stop_event)
+
+    def close(self):
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+
+def watch_folder(
+    runner: BatchRunner,
+    folder: str,
+    stop_event: Optional[threading.Event] = None,
+    csv_path: Optional[str] = None,
+    store: Optional[ResultsStore] = None,
+    plate: Optional[str] = None,
+    **watcher_options,
+) -> Iterator[BatchItemResult]:
+    """
+    Process images as they appear in a folder until ``stop_event`` is set.
+
+    Images already being processed when the event is set are finished.
+    Each result is appended to ``csv_path`` and written to ``store`` (if
+    given) as it arrives, so readers see it while the watch runs; give the
+    runner a BatchManifest to skip images done by an earlier watch.
+
+    Args:
+        runner: Runner whose pipeline, workers and outputs are used
+        folder: Folder to watch
+        stop_event: Ends the watch when set
+        csv_path: CSV file kept up to date with every result
+        store: Results store; the watch is recorded as one job
+        plate: Plate name of the job (the folder's name if None)
+        **watcher_options: Passed to FolderWatcher
+
+    Yields:
+        BatchItemResult of each image, in completion order
+    """
+    if runner.output_dir is not None and os.path.realpath(
+        runner.output_dir
+    ) == os.path.realpath(folder):
+        raise ValueError("The output folder must differ from the watched folder")
+
+    stop_event = stop_event or threading.Event()
+    watcher = FolderWatcher(folder, **watcher_options)
+    csv_file = ResultsCsv(csv_path) if csv_path is not None else None
+    job_id = None
+    if store is not None:
+        plate = plate or os.path.basename(os.path.normpath(folder))
+        job_id = store.start_job(runner.pipeline, plate, folder, runner.output_dir)
+    stream = runner.stream(watcher.watch(stop_event), root=folder)
+    logger.info(f"Watching {folder} for new images")
+    status = JOB_CANCELLED
+    try:
+        for _, result in stream:
+            if csv_file is not None:
+                csv_file.append(result)
+            if store is not None:
+                store.add_result(job_id, result)
+                # Results arrive slowly; don't hold them for a full batch
+                store.flush()
+            yield result
+        status = JOB_COMPLETED
+    finally:
+        # Stop the watcher first, so the stream's feeder thread can finish
+        stop_event.set()
+        stream.close()
+        watcher.close()
+        if csv_file is not None:
+            csv_file.close()
+        if store is not None:
+            store.finish_job(job_id, status)
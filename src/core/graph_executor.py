@@ -0,0 +1,265 @@
+"""
+Graph Pipeline Executor
+
+Executes pipelines whose nodes form a DAG (fan-out, fan-in, named outputs).
+Independent branches run concurrently on a thread pool; OpenCV, NumPy and
+SciPy release the GIL in their heavy loops. Structurally identical nodes
+fed by the same inputs (shared prefixes) are computed only once, and nodes
+that no output depends on are skipped.
+"""
+
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from ..models.pipeline_model import NodeSnapshot, Pipeline, PipelineSnapshot
+from .parameter_schemas import create_default_node_parameters
+from .pipeline_step import PipelineStep, freeze, readonly_view
+from .steps import create_step, get_step_class
+from .telemetry import NodeTimer, node_telemetry
+
+logger = logging.getLogger(__name__)
+
+NodeOutput = Tuple[np.ndarray, Dict[str, Any]]  # (image, metadata)
+
+
+@dataclass
+class GraphResult:
+    """Result of a graph pipeline execution."""
+
+    success: bool
+    outputs: Dict[str, np.ndarray] = field(default_factory=dict)
+    metadata: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    node_results: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    error_message: Optional[str] = None
+    execution_time_ms: float = 0.0
+    cancelled: bool = False
+
+
+class GraphExecutor:
+    """
+    Executes DAG pipelines with shared-prefix reuse and parallel branches.
+
+    Each node gets its own metadata dict, seeded from its inputs' metadata,
+    so branches (e.g. two PHANTAST nodes) do not overwrite each other.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        if max_workers is None:
+            max_workers = min(4, os.cpu_count() or 1)
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="graph-node"
+        )
+        # Step instances keyed by node ID; they live as long as their node
+        self._steps: Dict[str, PipelineStep] = {}
+
+    def execute(
+        self,
+        input_image: np.ndarray,
+        pipeline: Union[Pipeline, PipelineSnapshot],
+        should_stop: Optional[Callable[[], bool]] = None,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        steps: Optional[Dict[str, PipelineStep]] = None,
+    ) -> GraphResult:
+        """
+        Execute a pipeline graph.
+
+        Args:
+            input_image: Image fed to every input node
+            pipeline: Pipeline (or snapshot) whose nodes may declare explicit
+                inputs; it is snapshotted before any work starts
+            should_stop: Checked before nodes are started; True cancels the
+                run (nodes already running finish and are discarded)
+            progress_callback: Called with (position, total) as each node
+                starts
+            steps: Step instances for this run, keyed by node ID; None uses
+                the executor's persistent ones. Concurrent runs need their
+                own, since running a node sets its step's parameters.
+
+        Returns:
+            GraphResult with one image and metadata dict per named output
+        """
+        start_time = time.time()
+        pipeline = pipeline.snapshot()
+
+        try:
+            order = pipeline.topological_order()
+        except ValueError as e:
+            return GraphResult(success=False, error_message=str(e))
+
+        outputs = pipeline.get_outputs()
+        if not outputs:
+            return GraphResult(success=False, error_message="Pipeline has no outputs")
+
+        by_id = {node.id: node for node in order}
+        canonical = self._canonical_nodes(pipeline, order)
+        needed = self._needed_nodes(pipeline, outputs.values(), canonical)
+        if steps is None:
+            steps = self._steps
+            self._prune_steps(pipeline.nodes)
+
+        source = readonly_view(input_image)
+        results: Dict[str, NodeOutput] = {}
+        telemetry: Dict[str, Dict[str, Any]] = {}
+        pending = [node.id for node in order if node.id in needed]
+        running: Dict[Future, str] = {}
+        total = len(pending)
+        position = 0
+
+        try:
+            while pending or running:
+                if should_stop is not None and should_stop():
+                    for future in running:
+                        future.cancel()
+                    return GraphResult(
+                        success=False,
+                        error_message="Cancelled",
+                        cancelled=True,
+                    )
+                for node_id in list(pending):
+                    deps = [canonical[i] for i in pipeline.get_node_inputs(node_id)]
+                    if all(dep in results for dep in deps):
+                        pending.remove(node_id)
+                        position += 1
+                        if progress_callback is not None:
+                            progress_callback(position, total)
+                        node = by_id[node_id]
+                        inputs = [results[dep] for dep in deps]
+                        step = self._get_step(node, steps) if node.enabled else None
+                        future = self._pool.submit(
+                            self._run_node, node, step, inputs, source
+                        )
+                        running[future] = node_id
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    node_id = running.pop(future)
+                    image, metadata, stats = future.result()
+                    results[node_id] = (image, metadata)
+                    telemetry[node_id] = stats
+        except Exception as e:
+            for future in running:
+                future.cancel()
+            logger.error(f"Graph execution failed: {e}")
+            return GraphResult(success=False, error_message=str(e))
+
+        node_results = {}
+        for node in order:
+            shared = canonical[node.id]
+            if shared not in results:
+                continue
+            node_results[node.id] = {
+                "name": node.name,
+                "output": results[shared][0],
+                **telemetry[shared],
+            }
+            if shared != node.id:
+                node_results[node.id]["shared_with"] = shared
+
+        return GraphResult(
+            success=True,
+            outputs={name: results[canonical[nid]][0] for name, nid in outputs.items()},
+            metadata={
+                name: results[canonical[nid]][1] for name, nid in outputs.items()
+            },
+            node_results=node_results,
+            execution_time_ms=(time.time() - start_time) * 1000,
+        )
+
+    @staticmethod
+    def _run_node(
+        node: NodeSnapshot,
+        step: Optional[PipelineStep],
+        inputs: List[NodeOutput],
+        source: np.ndarray,
+    ) -> Tuple[np.ndarray, Dict[str, Any], Dict[str, Any]]:
+        """
+        Run one node on its inputs' outputs (worker thread).
+
+        Returns:
+            (image, metadata, telemetry)
+        """
+        metadata: Dict[str, Any] = {}
+        for _, upstream_metadata in inputs:
+            metadata.update(upstream_metadata)
+
+        images = [image for image, _ in inputs] or [source]
+        if step is None:
+            # Disabled nodes pass their first input through
+            return images[0], metadata, node_telemetry(images[0])
+
+        params = create_default_node_parameters(node.type)
+        params.update(node.parameters)
+        with NodeTimer() as timer:
+            step.update_params(params)
+            output = freeze(step.apply_many(images, metadata))
+        return output, metadata, node_telemetry(output, timer)
+
+    @staticmethod
+    def _canonical_nodes(
+        pipeline: PipelineSnapshot, order: List[NodeSnapshot]
+    ) -> Dict[str, str]:
+        """
+        Map each node ID to the node that computes its result.
+
+        Nodes with the same type, parameters and (canonical) inputs share one
+        computation; disabled nodes share their first input's result.
+        """
+        canonical: Dict[str, str] = {}
+        seen: Dict[Tuple, str] = {}
+        for node in order:
+            inputs = tuple(canonical[i] for i in pipeline.get_node_inputs(node.id))
+            if not node.enabled and inputs:
+                canonical[node.id] = inputs[0]
+                continue
+            key = (
+                node.type,
+                node.enabled,
+                tuple(sorted((k, repr(v)) for k, v in node.parameters.items())),
+                inputs,
+            )
+            canonical[node.id] = seen.setdefault(key, node.id)
+        return canonical
+
+    @staticmethod
+    def _needed_nodes(
+        pipeline: PipelineSnapshot, output_ids, canonical: Dict[str, str]
+    ) -> set:
+        """Canonical nodes that some output depends on."""
+        needed: set = set()
+        stack = [canonical[node_id] for node_id in output_ids]
+        while stack:
+            node_id = stack.pop()
+            if node_id in needed:
+                continue
+            needed.add(node_id)
+            stack.extend(canonical[i] for i in pipeline.get_node_inputs(node_id))
+        return needed
+
+    def _get_step(
+        self, node: NodeSnapshot, steps: Dict[str, PipelineStep]
+    ) -> PipelineStep:
+        """Get the step instance for a node from ``steps``, creating it if needed."""
+        step = steps.get(node.id)
+        if step is None or type(step) is not get_step_class(node.type):
+            step = create_step(node.type)
+            if step is None:
+                raise ValueError(f"Unknown node type: {node.type}")
+            steps[node.id] = step
+        return step
+
+    def _prune_steps(self, nodes: Tuple[NodeSnapshot, ...]):
+        """Drop step instances whose node is no longer in the pipeline."""
+        live_ids = {node.id for node in nodes}
+        for node_id in list(self._steps):
+            if node_id not in live_ids:
+                del self._steps[node_id]
+
+    def shutdown(self):
+        """Stop the worker pool."""
+        self._pool.shutdown(wait=False)
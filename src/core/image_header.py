@@ -0,0 +1,140 @@
+"""
+Image Header
+
+Shape and dtype of an encoded image, read from its header without decoding
+the pixels. The batch runner uses it to reserve memory for an image before
+the decode allocates the full frame.
+
+PNG, JPEG, TIFF and BMP are read; the spec is the array
+``cv2.imdecode(..., cv2.IMREAD_UNCHANGED)`` returns. Other formats and
+headers that cannot be read give None, and callers fall back to decoding.
+"""
+
+import struct
+from typing import Optional
+
+import numpy as np
+
+from .pipeline_step import ImageSpec
+
+
+# PNG color type -> channels decoded (palettes expand to BGR)
+_PNG_CHANNELS = {0: 1, 2: 3, 3: 3, 4: 4, 6: 4}
+
+# JPEG start-of-frame markers (not DHT, JPG or DAC, which share the range)
+_JPEG_SOF = {0xC0 + i for i in range(16)} - {0xC4, 0xC8, 0xCC}
+
+# TIFF tags
+_TIFF_WIDTH = 256
+_TIFF_HEIGHT = 257
+_TIFF_BITS = 258
+_TIFF_SAMPLES = 277
+_TIFF_SAMPLE_FORMAT = 339
+
+# TIFF field type -> struct code of one value
+_TIFF_TYPES = {1: "B", 3: "H", 4: "I", 16: "Q"}
+
+
+def _spec(height: int, width: int, channels: int, dtype) -> Optional[ImageSpec]:
+    if height <= 0 or width <= 0 or channels <= 0:
+        return None
+    shape = (height, width) if channels == 1 else (height, width, channels)
+    return ImageSpec(shape, dtype)
+
+
+def _png_spec(data: memoryview) -> Optional[ImageSpec]:
+    width, height, depth, color_type = struct.unpack_from(">IIBB", data, 16)
+    channels = _PNG_CHANNELS.get(color_type)
+    if channels is None:
+        return None
+    return _spec(height, width, channels, np.uint16 if depth == 16 else np.uint8)
+
+
+def _jpeg_spec(data: memoryview) -> Optional[ImageSpec]:
+    position = 2
+    while True:
+        marker, kind = struct.unpack_from("BB", data, position)
+        if marker != 0xFF:
+            return None
+        if kind == 0xFF:
+            # Fill byte
+            position += 1
+            continue
+        if kind == 0x01 or 0xD0 <= kind <= 0xD9:
+            # Markers without a length
+            position += 2
+            continue
+        if kind in _JPEG_SOF:
+            height, width, components = struct.unpack_from(">HHB", data, position + 5)
+            # 4-component (CMYK) images are converted to BGR
+            return _spec(height, width, 1 if components == 1 else 3, np.uint8)
+        (length,) = struct.unpack_from(">H", data, position + 2)
+        position += 2 + length
+
+
+def _tiff_spec(data: memoryview) -> Optional[ImageSpec]:
+    order = "<" if data[:2] == b"II" else ">"
+    (offset,) = struct.unpack_from(order + "I", data, 4)
+    (count,) = struct.unpack_from(order + "H", data, offset)
+    tags = {}
+    for entry in range(offset + 2, offset + 2 + 12 * count, 12):
+        tag, kind, values = struct.unpack_from(order + "HHI", data, entry)
+        code = _TIFF_TYPES.get(kind)
+        if code is None or values < 1:
+            continue
+        position = entry + 8
+        if values * struct.calcsize(code) > 4:
+            # Stored elsewhere; only the first value is needed (e.g. of
+            # BitsPerSample, which lists every sample)
+            (position,) = struct.unpack_from(order + "I", data, position)
+        (tags[tag],) = struct.unpack_from(order + code, data, position)
+
+    if _TIFF_WIDTH not in tags or _TIFF_HEIGHT not in tags:
+        return None
+    bits = tags.get(_TIFF_BITS, 1)
+    sample_format = tags.get(_TIFF_SAMPLE_FORMAT, 1)
+    if bits <= 8:
+        dtype = np.uint8
+    elif sample_format == 3:
+        dtype = {32: np.float32, 64: np.float64}.get(bits)
+    elif sample_format == 2:
+        dtype = {16: np.int16, 32: np.int32}.get(bits)
+    else:
+        dtype = {16: np.uint16, 32: np.uint32}.get(bits)
+    if dtype is None:
+        return None
+    channels = tags.get(_TIFF_SAMPLES, 1)
+    return _spec(tags[_TIFF_HEIGHT], tags[_TIFF_WIDTH], channels, dtype)
+
+
+def _bmp_spec(data: memoryview) -> Optional[ImageSpec]:
+    width, height = struct.unpack_from("<ii", data, 18)
+    (bits,) = struct.unpack_from("<H", data, 28)
+    channels = 1 if bits == 8 else 4 if bits == 32 else 3
+    return _spec(abs(height), width, channels, np.uint8)
+
+
+def read_image_spec(data: np.ndarray) -> Optional[ImageSpec]:
+    """
+    Spec of an encoded image from its header.
+
+    Args:
+        data: The file's bytes (as read with np.fromfile)
+
+    Returns:
+        ImageSpec of the decoded image, or None if the header is not read
+    """
+    view = memoryview(np.ascontiguousarray(data, dtype=np.uint8)).cast("B")
+    try:
+        if view[:8] == b"\x89PNG\r\n\x1a\n" and view[12:16] == b"IHDR":
+            return _png_spec(view)
+        if view[:2] == b"\xff\xd8":
+            return _jpeg_spec(view)
+        if view[:4] in (b"II*\x00", b"MM\x00*"):
+            return _tiff_spec(view)
+        if view[:2] == b"BM":
+            return _bmp_spec(view)
+    except struct.error:
+        # Truncated or inconsistent header
+        pass
+    return None
@@ -0,0 +1,221 @@
+"""
+Intermediate Store
+
+Keeps every node's output of a processed image on disk, so a batch result
+can be inspected step by step ("deep dive") without re-running the
+pipeline. Each image gets a folder holding one uncompressed ``.npy`` file
+per stage and an ``index.json`` listing them in pipeline order. Stages are
+opened as read-only memory maps: scrubbing to a step maps its file instead
+of decoding an image, and only the pages actually displayed are read.
+
+Outputs shared by several nodes (elided or pass-through nodes) are stored
+once. The store can be capped at a disk budget; the least recently written
+stacks are evicted to stay under it.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import uuid
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "index.json"
+INDEX_VERSION = 1
+
+
+def _stack_dir_name(key: str) -> str:
+    """
+    Folder name for an image key (e.g. its relative path).
+
+    Keys that had characters replaced get a hash suffix, so "a/b.png" and
+    "a_b.png" do not share a folder.
+    """
+    safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in key)
+    if safe != key or not safe.strip("."):
+        digest = hashlib.blake2b(key.encode(), digest_size=4).hexdigest()
+        safe = f"{safe}-{digest}"
+    return safe
+
+
+class IntermediateStack:
+    """The stored stages of one image; stages are mapped on first access."""
+
+    def __init__(self, folder: str):
+        with open(os.path.join(folder, INDEX_FILE), "r") as f:
+            index = json.load(f)
+        self.folder = folder
+        self.stages: List[Dict[str, Any]] = index["stages"]
+        self.nbytes: int = index["bytes"]
+        self._maps: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.stages)
+
+    @property
+    def keys(self) -> List[str]:
+        """Stage keys (node IDs) in pipeline order."""
+        return [stage["key"] for stage in self.stages]
+
+    def stage(self, which: Union[int, str]) -> np.ndarray:
+        """
+        Read-only memory map of a stage's output.
+
+        Args:
+            which: Position in pipeline order or stage key (node ID)
+        """
+        if isinstance(which, int):
+            stage = self.stages[which]
+        else:
+            matches = [s for s in self.stages if s["key"] == which]
+            if not matches:
+                raise KeyError(which)
+            stage = matches[0]
+
+        array = self._maps.get(stage["file"])
+        if array is None:
+            path = os.path.join(self.folder, stage["file"])
+            array = self._maps[stage["file"]] = np.load(path, mmap_mode="r")
+        return array
+
+
+class IntermediateStore:
+    """
+    Folder of IntermediateStacks, one per image key.
+
+    save() may run in several worker processes at once; the budget is
+    enforced by the single process that calls enforce_budget().
+    """
+
+    def __init__(self, root: str, budget_bytes: Optional[int] = None):
+        """
+        Args:
+            root: Folder holding the stacks (created if missing)
+            budget_bytes: Most bytes to keep; None for no limit
+        """
+        self.root = root
+        self.budget_bytes = budget_bytes
+        os.makedirs(root, exist_ok=True)
+        # Stack folder -> bytes, in write order; built on first use
+        self._usage: Optional[Dict[str, int]] = None
+        self._lock = threading.Lock()
+
+    def folder(self, key: str) -> str:
+        return os.path.join(self.root, _stack_dir_name(key))
+
+    def save(self, key: str, node_results: Dict[str, Dict[str, Any]]) -> int:
+        """
+        Store the node outputs of one image, replacing any previous stack.
+
+        Args:
+            key: Image key, e.g. its path relative to the input folder
+            node_results: Executor node_results, in pipeline order
+
+        Returns:
+            Bytes written
+        """
+        final = self.folder(key)
+        # Hidden, so usage scans skip stacks still being written
+        temp = os.path.join(self.root, f".{os.path.basename(final)}-{uuid.uuid4().hex}")
+        os.makedirs(temp)
+        try:
+            stages = []
+            files: Dict[int, str] = {}  # id(array) -> file, for shared outputs
+            total = 0
+            for position, (node_id, entry) in enumerate(node_results.items()):
+                output = entry.get("output")
+                if output is None:
+                    continue
+                name = files.get(id(output))
+                if name is None:
+                    name = files[id(output)] = f"{position:02d}.npy"
+                    np.save(os.path.join(temp, name), np.ascontiguousarray(output))
+                    total += output.nbytes
+                stages.append(
+                    {
+                        "key": node_id,
+                        "name": entry.get("name", node_id),
+                        "file": name,
+                        "shape": list(output.shape),
+                        "dtype": str(output.dtype),
+                    }
+                )
+            with open(os.path.join(temp, INDEX_FILE), "w") as f:
+                json.dump(
+                    {"version": INDEX_VERSION, "stages": stages, "bytes": total}, f
+                )
+
+            # Readers either see the old stack or the new one
+            if os.path.exists(final):
+                shutil.rmtree(final)
+            os.replace(temp, final)
+        except BaseException:
+            shutil.rmtree(temp, ignore_errors=True)
+            raise
+        return total
+
+    def open(self, key: str) -> Optional[IntermediateStack]:
+        """The stack of an image, or None if it is not stored."""
+        folder = self.folder(key)
+        if not os.path.exists(os.path.join(folder, INDEX_FILE)):
+            return None
+        return IntermediateStack(folder)
+
+    def track(self, key: str, nbytes: int):
+        """Note a stack written (e.g. by a worker process) as the newest."""
+        with self._lock:
+            usage = self._load_usage()
+            folder = self.folder(key)
+            usage.pop(folder, None)
+            usage[folder] = nbytes
+
+    def disk_usage(self) -> int:
+        """Bytes held by the stored stacks."""
+        with self._lock:
+            return sum(self._load_usage().values())
+
+    def enforce_budget(self) -> List[str]:
+        """
+        Evict the least recently written stacks until under budget.
+
+        Returns:
+            Evicted stack folders
+        """
+        if self.budget_bytes is None:
+            return []
+        evicted = []
+        with self._lock:
+            usage = self._load_usage()
+            total = sum(usage.values())
+            while total > self.budget_bytes and usage:
+                folder = next(iter(usage))
+                total -= usage.pop(folder)
+                shutil.rmtree(folder, ignore_errors=True)
+                evicted.append(folder)
+        if evicted:
+            logger.info(f"Evicted {len(evicted)} intermediate stack(s) over budget")
+        return evicted
+
+    def _load_usage(self) -> Dict[str, int]:
+        if self._usage is None:
+            stacks = []
+            for entry in os.scandir(self.root):
+                if entry.name.startswith(".") or not entry.is_dir():
+                    continue
+                index = os.path.join(entry.path, INDEX_FILE)
+                try:
+                    with open(index, "r") as f:
+                        nbytes = json.load(f)["bytes"]
+                    stacks.append((os.path.getmtime(index), entry.path, nbytes))
+                except (OSError, ValueError, KeyError):
+                    # Not a stack, or replaced while scanning
+                    continue
+            self._usage = {path: nbytes for _, path, nbytes in sorted(stacks)}
+        return self._usage
@@ -0,0 +1,166 @@
+"""
+Memory Budget
+
+Memory-aware admission of batch jobs. PHANTAST peaks at about a hundred
+bytes per pixel, so on large images the worker count alone does not bound
+memory: a handful of workers on 20-megapixel images can exhaust RAM while
+the same count on thumbnails leaves it idle.
+
+Each job's peak is predicted from its image's shape and the pipeline's
+declared buffers: every node output (they are all kept in node_results)
+plus the largest scratch space a step declares. The dispatcher admits a job
+only while the predictions of all running jobs fit under the budget. Workers
+report their measured peak RSS, and a correction factor learned from it
+scales later predictions.
+"""
+
+import logging
+import threading
+from typing import Dict, Iterable, Optional, Union
+
+from ..models.pipeline_model import NodeSnapshot, PipelineNode
+from .pipeline_step import ImageSpec
+from .steps import create_step
+
+
+logger = logging.getLogger(__name__)
+
+# Weight of the newest measurement in the correction factor
+SMOOTHING = 0.5
+
+# Bounds of a single measurement's ratio, so one noisy reading (e.g. a tiny
+# image served from already mapped pages) cannot swing the factor too far
+MIN_RATIO = 0.25
+MAX_RATIO = 4.0
+
+_STATUS_FILE = "/proc/self/status"
+_CLEAR_REFS_FILE = "/proc/self/clear_refs"
+
+
+def estimate_job_bytes(
+    nodes: Iterable[Union[PipelineNode, NodeSnapshot]], spec: ImageSpec
+) -> int:
+    """
+    Predicted peak memory of running a linear pipeline on one image.
+
+    Args:
+        nodes: Pipeline nodes in order; disabled ones are skipped
+        spec: Shape and dtype of the input image
+    """
+    total = spec.nbytes
+    scratch = 0
+    for node in nodes:
+        if not node.enabled:
+            continue
+        step = create_step(node.type)
+        if step is None:
+            continue
+        scratch = max(scratch, step.scratch_bytes(spec))
+        try:
+            spec = step.output_spec(spec)
+        except ValueError:
+            # The run will fail on this step; keep estimating from its input
+            pass
+        total += spec.nbytes
+    return total + scratch
+
+
+def _status_bytes(field: str) -> Optional[int]:
+    """A kB figure of /proc/self/status in bytes, None where unsupported."""
+    try:
+        with open(_STATUS_FILE, "r") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def reset_peak_rss() -> Optional[int]:
+    """
+    Reset this process's peak RSS mark (Linux) and return the current RSS.
+
+    Returns:
+        Current RSS in bytes, or None if peaks cannot be measured here
+    """
+    try:
+        with open(_CLEAR_REFS_FILE, "w") as f:
+            f.write("5")
+    except OSError:
+        return None
+    return _status_bytes("VmRSS")
+
+
+def peak_rss() -> Optional[int]:
+    """This process's peak RSS in bytes since the last reset, if known."""
+    return _status_bytes("VmHWM")
+
+
+class MemoryBudget:
+    """
+    Bytes reserved by running jobs against a fixed budget.
+
+    A job is always admitted when nothing else runs, so a single image
+    larger than the budget still gets processed (on its own).
+    """
+
+    def __init__(self, budget_bytes: int):
+        self.budget_bytes = budget_bytes
+        # Measured peak / predicted peak, learned from finished jobs
+        self.factor = 1.0
+        self._in_use = 0
+        self._condition = threading.Condition()
+
+    @property
+    def in_use(self) -> int:
+        return self._in_use
+
+    def reservation(self, predicted: int) -> int:
+        """Bytes to reserve for a job predicted to need ``predicted``."""
+        return int(predicted * self.factor)
+
+    def acquire(self, nbytes: int, timeout: Optional[float] = None) -> bool:
+        """
+        Reserve ``nbytes``, waiting until they fit.
+
+        Returns:
+            Whether they were reserved before ``timeout`` seconds passed
+        """
+        with self._condition:
+            fits = self._condition.wait_for(
+                lambda: self._in_use == 0
+                or self._in_use + nbytes <= self.budget_bytes,
+                timeout,
+            )
+            if fits:
+                self._in_use += nbytes
+            return fits
+
+    def release(self, nbytes: int):
+        with self._condition:
+            self._in_use -= nbytes
+            self._condition.notify_all()
+
+    def observe(self, predicted: int, measured: Optional[int]):
+        """Learn from a finished job's measured peak (ignored if unknown)."""
+        if not measured or predicted <= 0:
+            return
+        ratio = min(MAX_RATIO, max(MIN_RATIO, measured / predicted))
+        with self._condition:
+            self.factor = (1 - SMOOTHING) * self.factor + SMOOTHING * ratio
+        logger.debug(f"Memory factor {self.factor:.2f} (job ratio {ratio:.2f})")
+
+
+class JobEstimator:
+    """Caches estimate_job_bytes() per input spec for one pipeline."""
+
+    def __init__(self, nodes: Iterable[Union[PipelineNode, NodeSnapshot]]):
+        self.nodes = list(nodes)
+        self._estimates: Dict[ImageSpec, int] = {}
+
+    def __call__(self, spec: ImageSpec) -> int:
+        estimate = self._estimates.get(spec)
+        if estimate is None:
+            estimate = self._estimates[spec] = estimate_job_bytes(self.nodes, spec)
+        return estimate
@@ -0,0 +1,101 @@
+"""
+Node Cache
+
+In-memory cache of node outputs for the execution engine, bounded by the
+bytes of the arrays it holds. An interactive session creates new keys on
+every slider tick, proxy scale and viewport tile; an unbounded dict kept
+all of their full-size outputs. Entries are evicted least recently used
+once the total exceeds ``max_bytes``.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Iterator, MutableMapping
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def entry_bytes(value: Any) -> int:
+    """Bytes of the arrays in a cache entry (nested tuples, lists, dicts)."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sum(entry_bytes(v) for v in value)
+    if isinstance(value, dict):
+        return sum(entry_bytes(v) for v in value.values())
+    return 0
+
+
+class NodeCache(MutableMapping):
+    """
+    LRU mapping bounded by the bytes of its values.
+
+    Reads mark an entry as recently used. An entry larger than the whole
+    budget is not kept. Safe to share between threads.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._sizes: dict = {}
+        self._bytes = 0
+        self._lock = threading.RLock()
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes currently held."""
+        return self._bytes
+
+    def __getitem__(self, key: Hashable) -> Any:
+        with self._lock:
+            value = self._entries[key]
+            self._entries.move_to_end(key)
+            return value
+
+    def __setitem__(self, key: Hashable, value: Any):
+        size = entry_bytes(value)
+        with self._lock:
+            if key in self._entries:
+                del self[key]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = value
+            self._sizes[key] = size
+            self._bytes += size
+            self._evict()
+
+    def __delitem__(self, key: Hashable):
+        with self._lock:
+            del self._entries[key]
+            self._bytes -= self._sizes.pop(key)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        with self._lock:
+            return iter(list(self._entries))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._entries
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._bytes = 0
+
+    def _evict(self):
+        evicted = 0
+        while self._bytes > self.max_bytes and self._entries:
+            key, _ = self._entries.popitem(last=False)
+            self._bytes -= self._sizes.pop(key)
+            evicted += 1
+        if evicted:
+            logger.debug(f"Evicted {evicted} node cache entries")
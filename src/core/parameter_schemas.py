@@ -225,6 +225,24 @@ PHANTAST_NODE_SPEC = NodeTypeSpec(
     ],
 )
 
+# Merge node - combines the outputs of several branches (graph pipelines)
+MERGE_NODE_SPEC = NodeTypeSpec(
+    type_id="merge",
+    name="Merge",
+    description="Combine branches: mean blend, min (mask AND) or max (mask OR)",
+    icon="⋈",
+    category="processing",
+    parameters=[
+        ParameterSpec(
+            name="mode",
+            param_type=ParameterType.CHOICE,
+            default="mean",
+            choices=["mean", "min", "max"],
+            description="How inputs are combined",
+        ),
+    ],
+)
+
 # =============================================================================
 # REGISTRY
 # =============================================================================
@@ -235,8 +253,10 @@ NODE_TYPE_SPECS: Dict[str, NodeTypeSpec] = {
     "gaussian_blur": GAUSSIAN_BLUR_NODE_SPEC,
     "clahe": CLAHE_NODE_SPEC,
     "output": PHANTAST_NODE_SPEC,
+    "merge": MERGE_NODE_SPEC,
 }
 
+# Node types offered for the linear pipeline stack; merge needs a graph
 PROCESSING_NODE_TYPES = ["grayscale", "gaussian_blur", "clahe"]
 
 
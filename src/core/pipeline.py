@@ -1,17 +1,42 @@
 import logging
-from typing import List
+from concurrent.futures import Executor
+from functools import partial
+from typing import AsyncIterator, Dict, Hashable, List, MutableMapping, Optional, Tuple
 import numpy as np
-from .pipeline_step import PipelineStep
+from .execution_engine import CacheEntry, EngineTask, ExecutionEngine, _image_key
+from .pipeline_step import ImageSpec, PipelineStep, readonly_view
 
 logger = logging.getLogger(__name__)
 
 
+def _step_cache_key(step: PipelineStep):
+    """Cache key function for a step: its type, parameters and input."""
+    params = tuple(sorted((name, repr(value)) for name, value in step._params.items()))
+
+    def key(image: np.ndarray) -> Hashable:
+        return (type(step).__name__, params, _image_key(image))
+
+    return key
+
+
 class ImagePipeline:
     """Manages a sequence of processing steps."""
 
-    def __init__(self):
+    def __init__(self, cache: Optional[MutableMapping[Hashable, CacheEntry]] = None):
+        """
+        Args:
+            cache: Optional mapping to cache step outputs in, keyed by step
+                type, parameters and input content
+        """
         self.steps: List[PipelineStep] = []
         self._metadata: dict = {}
+        self._node_results: Dict[str, dict] = {}
+        # Steps that fail are logged and skipped, keeping the previous image
+        self._engine = ExecutionEngine(cache=cache, stop_on_error=False)
+        # Preallocated output buffers (step index -> array) and the input
+        # spec and chain they were planned for; see prepare()
+        self._buffers: Dict[str, np.ndarray] = {}
+        self._prepared_for: Optional[Tuple] = None
 
     def add_step(self, step: PipelineStep):
         """Add a step to the end of the pipeline."""
@@ -32,29 +57,176 @@ class ImagePipeline:
         """Remove all steps."""
         self.steps.clear()
 
+    def plan(self, input_spec: ImageSpec) -> List[ImageSpec]:
+        """
+        Check the chain against each step's contract, without any pixels.
+
+        Args:
+            input_spec: Shape and dtype of the input image.
+
+        Returns:
+            Output spec of each enabled step, in order.
+
+        Raises:
+            ValueError: If a step cannot take its input (e.g. CLAHE after a
+                step producing float images).
+        """
+        specs = []
+        spec = input_spec
+        for i, step in enumerate(self.steps):
+            if not step.enabled:
+                continue
+            try:
+                spec = step.output_spec(spec)
+            except ValueError as e:
+                raise ValueError(f"Step {i} ({step.name}): {e}") from e
+            specs.append(spec)
+        return specs
+
+    def prepare(self, input_spec: ImageSpec) -> int:
+        """
+        Validate the chain and preallocate output buffers for its steps.
+
+        Later executions on images matching ``input_spec`` write each step's
+        output into these buffers instead of allocating, which suits
+        batches of same-sized images. Each result is then only valid until
+        the next execution; copy it to keep it. Buffers are not used when a
+        cache is configured, or after the steps change.
+
+        Args:
+            input_spec: Shape and dtype of the images to be processed.
+
+        Returns:
+            Bytes preallocated.
+
+        Raises:
+            ValueError: If the chain cannot process such images.
+        """
+        specs = iter(self.plan(input_spec))
+        self._buffers = {}
+        for i, step in enumerate(self.steps):
+            if not step.enabled:
+                continue
+            spec = next(specs)
+            if step.writes_into:
+                self._buffers[str(i)] = np.empty(spec.shape, spec.dtype)
+        self._prepared_for = (input_spec, self._chain())
+        return sum(buffer.nbytes for buffer in self._buffers.values())
+
+    def _chain(self) -> Tuple:
+        return tuple((id(step), step.enabled) for step in self.steps)
+
+    def _buffers_for(self, spec: ImageSpec) -> Dict[str, np.ndarray]:
+        """Prepared buffers if they fit this execution, made writable."""
+        if self._engine.cache is not None:
+            return {}
+        if self._prepared_for != (spec, self._chain()):
+            return {}
+        # Last run's results are frozen views of these buffers
+        for buffer in self._buffers.values():
+            buffer.flags.writeable = True
+        return self._buffers
+
     def execute(self, image: np.ndarray) -> np.ndarray:
         """
         Run the pipeline on an image.
 
+        The chain is checked against the step contracts first (see plan()).
+
         Args:
             image: Input image as numpy array.
 
         Returns:
-            Processed image.
+            Processed (read-only) image. It may share memory with the input,
+            which is never modified.
+
+        Raises:
+            ValueError: If the chain cannot process the image.
         """
-        current_image = image.copy()
-        self._metadata = {}  # Reset metadata
+        spec = ImageSpec.of(image)
+        self.plan(spec)
+        result = self._engine.run(image, self._tasks(self._buffers_for(spec)))
+        self._metadata = result.metadata
+        self._node_results = result.node_results
+        return result.image
 
-        for step in self.steps:
-            if step.enabled:
-                try:
-                    current_image = step.process(current_image, self._metadata)
-                except Exception as e:
-                    logger.error(f"Error in step {step.name}: {e}")
-                    # Continue with current image on error
+    async def astream(
+        self, image: np.ndarray, executor: Optional[Executor] = None
+    ) -> AsyncIterator[Tuple[PipelineStep, np.ndarray]]:
+        """
+        Run the pipeline from asyncio code, yielding after each step.
+
+        Each step runs on ``executor`` (the loop's default executor if None),
+        so the event loop stays responsive and many images can be processed
+        concurrently. Cancelling the consuming task stops before the next
+        step; a step already running finishes in the background.
+
+        Args:
+            image: Input image as numpy array.
+            executor: Executor for the CPU-bound steps.
 
+        Yields:
+            (step, output image) for each enabled step.
+        """
+        self.plan(ImageSpec.of(image))
+        steps = {str(i): step for i, step in enumerate(self.steps)}
+        metadata: dict = {}
+        node_results: Dict[str, dict] = {}
+        async for task, entry in self._engine.astream(
+            image, self._tasks(), metadata, executor
+        ):
+            node_results[task.key] = entry
+            yield steps[task.key], entry["output"]
+
+        self._metadata = metadata
+        self._node_results = node_results
+
+    async def aexecute(
+        self, image: np.ndarray, executor: Optional[Executor] = None
+    ) -> np.ndarray:
+        """
+        Async variant of execute(); see astream() for executor and
+        cancellation behaviour.
+
+        Returns:
+            Processed image.
+        """
+        current_image = readonly_view(image)
+        async for _, current_image in self.astream(image, executor):
+            pass
         return current_image
 
+    def _tasks(
+        self, buffers: Optional[Dict[str, np.ndarray]] = None
+    ) -> List[EngineTask]:
+        """Engine tasks for the enabled steps, keyed by step index."""
+        cached = self._engine.cache is not None
+        buffers = buffers or {}
+        tasks = []
+        for i, step in enumerate(self.steps):
+            if not step.enabled:
+                continue
+            key = str(i)
+            run = step.apply
+            if key in buffers:
+                run = partial(step.apply_into, out=buffers[key])
+            tasks.append(
+                EngineTask(
+                    key=key,
+                    name=step.name,
+                    run=run,
+                    cache_key=_step_cache_key(step) if cached else None,
+                )
+            )
+        return tasks
+
     def get_metadata(self) -> dict:
         """Get the metadata dict from last execution."""
         return self._metadata
+
+    def get_node_results(self) -> Dict[str, dict]:
+        """
+        Per-step results from the last execution, keyed by step index:
+        output image and telemetry (see src.core.telemetry).
+        """
+        return self._node_results
@@ -0,0 +1,236 @@
+"""
+Pipeline Compiler
+
+Turns a Pipeline model into an optimized ExecutionPlan:
+- disabled nodes and no-op nodes (e.g. a 1x1 Gaussian blur) are dropped
+- redundant grayscale conversions are folded away
+- adjacent Gaussian blurs can be fused into a single blur (opt-in: the
+  fused blur only approximates the separate ones)
+
+Plans are cached by PipelineCompiler and rebuilt when the pipeline changes.
+Only linear pipelines are compiled; graph pipelines run on GraphExecutor.
+"""
+
+import logging
+import math
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+from ..models.pipeline_model import (
+    NodeSnapshot,
+    Pipeline,
+    PipelineNode,
+    PipelineSnapshot,
+)
+from .parameter_schemas import create_default_node_parameters
+
+
+logger = logging.getLogger(__name__)
+
+# Node types whose output is always single-channel
+GRAY_OUTPUT_TYPES = ("grayscale", "clahe")
+
+# Node types that convert their input to grayscale themselves, so a
+# grayscale node directly before them changes nothing
+GRAY_INPUT_TYPES = ("grayscale", "clahe")
+
+
+@dataclass
+class PlanStep:
+    """A single step of an execution plan."""
+
+    node: Union[PipelineNode, NodeSnapshot]  # Node whose step instance runs this
+    parameters: Dict[str, Any]  # Effective parameters (defaults applied)
+    source_ids: Tuple[str, ...]  # All nodes folded into this entry
+    note: str = ""
+
+    @property
+    def node_type(self) -> str:
+        return self.node.type
+
+
+@dataclass
+class ExecutionPlan:
+    """Optimized, ordered list of steps to run for a pipeline."""
+
+    steps: List[PlanStep] = field(default_factory=list)
+    # node_id -> reason, for enabled nodes that do not run on their own
+    elided: Dict[str, str] = field(default_factory=dict)
+    # Elided nodes whose work a later step does, so the image they pass on
+    # is not their output (e.g. a grayscale folded into CLAHE)
+    deferred: Set[str] = field(default_factory=set)
+    # Enabled node IDs in pipeline order
+    node_order: List[str] = field(default_factory=list)
+
+    def dump(self) -> str:
+        """Human-readable description of the plan for debugging."""
+        lines = [f"ExecutionPlan: {len(self.steps)} step(s)"]
+        for i, step in enumerate(self.steps):
+            params = ", ".join(f"{k}={v}" for k, v in step.parameters.items())
+            line = f"  {i}: {step.node_type}[{'+'.join(step.source_ids)}]({params})"
+            if step.note:
+                line += f"  # {step.note}"
+            lines.append(line)
+        for node_id, reason in self.elided.items():
+            lines.append(f"  - {node_id}: {reason}")
+        return "\n".join(lines)
+
+
+def _effective_blur(params: Dict[str, Any]) -> Tuple[int, float]:
+    """Kernel size and sigma that cv2.GaussianBlur actually uses."""
+    k = int(params.get("kernel_size", 5))
+    if k % 2 == 0:
+        k += 1
+    sigma = float(params.get("sigma", 0) or 0)
+    if sigma <= 0:
+        # OpenCV's default sigma for a given kernel size
+        sigma = 0.3 * ((k - 1) * 0.5 - 1) + 0.8
+    return k, sigma
+
+
+def _is_noop(step: PlanStep) -> Optional[str]:
+    """Return a reason if the step leaves its input unchanged."""
+    if step.node_type == "gaussian_blur":
+        k, _ = _effective_blur(step.parameters)
+        if k <= 1:
+            return "no-op (kernel_size 1)"
+    return None
+
+
+def _fold_conversions(
+    steps: List[PlanStep], elided: Dict[str, str], deferred: Set[str]
+) -> List[PlanStep]:
+    """Drop grayscale nodes whose input is gray or whose consumer converts."""
+    result: List[PlanStep] = []
+    for i, step in enumerate(steps):
+        if step.node_type == "grayscale":
+            prev_type = result[-1].node_type if result else None
+            next_type = steps[i + 1].node_type if i + 1 < len(steps) else None
+            if prev_type in GRAY_OUTPUT_TYPES:
+                elided[step.node.id] = f"folded (input already gray from {prev_type})"
+                continue
+            if next_type in GRAY_INPUT_TYPES:
+                elided[step.node.id] = f"folded ({next_type} converts to gray)"
+                deferred.add(step.node.id)
+                continue
+        result.append(step)
+    return result
+
+
+def _fuse_blurs(steps: List[PlanStep], elided: Dict[str, str]) -> List[PlanStep]:
+    """
+    Fuse runs of adjacent Gaussian blurs into one blur.
+
+    Convolving Gaussians adds their variances and their supports, so the
+    fused blur uses sigma = sqrt(sum(sigma^2)) and k = sum(k) - (n - 1).
+    """
+    result: List[PlanStep] = []
+    for step in steps:
+        prev = result[-1] if result else None
+        if (
+            step.node_type == "gaussian_blur"
+            and prev is not None
+            and prev.node_type == "gaussian_blur"
+        ):
+            k1, s1 = _effective_blur(prev.parameters)
+            k2, s2 = _effective_blur(step.parameters)
+            fused = PlanStep(
+                node=prev.node,
+                parameters={
+                    "kernel_size": k1 + k2 - 1,
+                    "sigma": math.sqrt(s1 * s1 + s2 * s2),
+                },
+                source_ids=prev.source_ids + step.source_ids,
+                note="fused gaussian blurs",
+            )
+            elided[step.node.id] = f"fused into {prev.node.id}"
+            result[-1] = fused
+            continue
+        result.append(step)
+    return result
+
+
+def compile_pipeline(
+    pipeline: Union[Pipeline, PipelineSnapshot], fuse_blurs: bool = False
+) -> ExecutionPlan:
+    """
+    Compile a pipeline into an optimized execution plan.
+
+    Args:
+        pipeline: Pipeline model or snapshot to compile
+        fuse_blurs: Fuse adjacent Gaussian blurs. Off by default: the
+            fused blur differs from the separate ones by kernel truncation
+            and uint8 rounding, so results would change
+
+    Returns:
+        ExecutionPlan
+    """
+    plan = ExecutionPlan()
+    steps: List[PlanStep] = []
+
+    for node in pipeline.nodes:
+        if not node.enabled:
+            continue
+        plan.node_order.append(node.id)
+
+        params = create_default_node_parameters(node.type)
+        params.update(node.parameters)
+        step = PlanStep(node=node, parameters=params, source_ids=(node.id,))
+
+        reason = _is_noop(step)
+        if reason:
+            plan.elided[node.id] = reason
+            continue
+        steps.append(step)
+
+    steps = _fold_conversions(steps, plan.elided, plan.deferred)
+    if fuse_blurs:
+        steps = _fuse_blurs(steps, plan.elided)
+
+    plan.steps = steps
+    return plan
+
+
+def _pipeline_signature(pipeline) -> PipelineSnapshot:
+    """Signature used to detect pipeline changes: an immutable snapshot."""
+    return pipeline.snapshot()
+
+
+class PipelineCompiler:
+    """
+    Compiles pipelines and caches the plan until the pipeline changes.
+
+    Safe to share between threads running concurrent passes.
+    """
+
+    def __init__(self, fuse_blurs: bool = False):
+        self._fuse_blurs = fuse_blurs
+        self._signature: Optional[PipelineSnapshot] = None
+        self._version = 0
+        self._plan: Optional[ExecutionPlan] = None
+        self._lock = threading.Lock()
+
+    def compile(self, pipeline: Union[Pipeline, PipelineSnapshot]) -> ExecutionPlan:
+        """Get the execution plan for a pipeline, recompiling if it changed."""
+        with self._lock:
+            # Same pipeline version: nothing changed, skip the comparison
+            version = pipeline.version
+            if self._plan is not None and version and version == self._version:
+                return self._plan
+
+            signature = _pipeline_signature(pipeline)
+            if self._plan is None or signature != self._signature:
+                # Compile the snapshot so the plan never sees later edits
+                self._plan = compile_pipeline(signature, fuse_blurs=self._fuse_blurs)
+                self._signature = signature
+                logger.debug(self._plan.dump())
+            self._version = version
+            return self._plan
+
+    def invalidate(self):
+        """Force the next compile() to rebuild the plan."""
+        with self._lock:
+            self._signature = None
+            self._plan = None
+            self._version = 0
@@ -0,0 +1,169 @@
+"""
+Pipeline Identity
+
+Canonical serialization and hash of a pipeline, a stable identity for
+cache keys (result cache, batch manifest) and provenance (results store).
+Python's hash() changes between runs, and a pipeline's JSON is not stable
+either: parameter values change type on the way through the UI and a JSON
+round trip (a CLAHE ``grid_size`` tuple comes back as a list, a spin box
+can hand over 5.0 for 5), and the form carries fields that do not affect
+results.
+
+The canonical form keeps only what determines the output:
+- enabled nodes in order, with their type, their step's code version and
+  their parameters, with defaults filled in and each value converted to
+  the type its parameter schema declares
+- inputs as positions in that list; consumers of a disabled node read its
+  first input, as GraphExecutor runs them
+- named outputs, as positions
+
+Names, IDs, descriptions, icons and status are left out, so renaming a
+node or reloading a saved pipeline keeps its hash. CODE_VERSION and the
+steps' ``version`` attributes change the hash of every pipeline (or of the
+pipelines using one step) when processing code changes its results.
+"""
+
+import hashlib
+import json
+import numbers
+from typing import Any, Dict, List, Optional, Union
+
+from ..models.pipeline_model import Pipeline, PipelineSnapshot
+from .parameter_schemas import ParameterSpec, ParameterType, get_node_spec
+from .steps import get_step_class
+
+
+# Bump when a change to shared processing code alters results
+CODE_VERSION = 1
+
+# Version of the canonical form itself
+FORMAT_VERSION = 1
+
+
+def _plain(value: Any) -> Any:
+    """A value as plain JSON types: tuples become lists, numpy scalars numbers."""
+    if hasattr(value, "tolist"):
+        value = value.tolist()
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    if hasattr(value, "items"):
+        return {str(k): _plain(v) for k, v in value.items()}
+    return value
+
+
+def _coerce(value: Any, kind: ParameterType) -> Any:
+    """A plain value as a parameter type, or unchanged if it does not fit."""
+    if kind == ParameterType.INTEGER:
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, numbers.Integral):
+            return int(value)
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+    elif kind == ParameterType.FLOAT:
+        if isinstance(value, numbers.Real) and not isinstance(value, bool):
+            return float(value)
+    elif kind == ParameterType.BOOLEAN:
+        if isinstance(value, numbers.Integral):
+            return bool(value)
+    return value
+
+
+def _kind_of(value: Any) -> Optional[ParameterType]:
+    if isinstance(value, bool):
+        return ParameterType.BOOLEAN
+    if isinstance(value, int):
+        return ParameterType.INTEGER
+    if isinstance(value, float):
+        return ParameterType.FLOAT
+    return None
+
+
+def normalize_parameter(value: Any, spec: Optional[ParameterSpec]) -> Any:
+    """
+    A parameter value as plain JSON data of the type its schema declares.
+
+    Tuple elements take the types of the default's elements. Values that do
+    not convert (e.g. a string for an integer) are kept as they are, so an
+    invalid pipeline still gets a hash.
+    """
+    value = _plain(value)
+    if spec is None:
+        return value
+    if spec.param_type != ParameterType.TUPLE:
+        return _coerce(value, spec.param_type)
+    if not isinstance(value, list) or not isinstance(spec.default, (list, tuple)):
+        return value
+    kinds = [_kind_of(default) for default in spec.default]
+    return [
+        _coerce(v, kinds[i]) if i < len(kinds) and kinds[i] else v
+        for i, v in enumerate(value)
+    ]
+
+
+def _canonical_parameters(node_type: str, parameters) -> Dict[str, Any]:
+    node_spec = get_node_spec(node_type)
+    if node_spec is None:
+        return {str(k): _plain(v) for k, v in parameters.items()}
+    params = node_spec.get_default_parameters()
+    params.update(parameters)
+    return {
+        str(name): normalize_parameter(value, node_spec.get_parameter_spec(name))
+        for name, value in params.items()
+    }
+
+
+def canonical_pipeline(pipeline: Union[Pipeline, PipelineSnapshot]) -> Dict[str, Any]:
+    """
+    The parts of a pipeline that determine its results, as plain JSON data.
+
+    A Pipeline and its snapshots give the same canonical form.
+    """
+    # Node ID -> position among enabled nodes (None for the pipeline input)
+    positions: Dict[str, Optional[int]] = {}
+    nodes: List[Dict[str, Any]] = []
+    try:
+        order = pipeline.topological_order()
+    except ValueError:
+        # Cycles or unknown inputs; the hash only has to be stable
+        order = list(pipeline.nodes)
+    for node in order:
+        inputs = [positions.get(i) for i in pipeline.get_node_inputs(node.id)]
+        if not node.enabled:
+            positions[node.id] = inputs[0] if inputs else None
+            continue
+        step_class = get_step_class(node.type)
+        positions[node.id] = len(nodes)
+        nodes.append(
+            {
+                "type": node.type,
+                "version": getattr(step_class, "version", None),
+                "parameters": _canonical_parameters(node.type, node.parameters),
+                "inputs": inputs,
+            }
+        )
+    return {
+        "format": FORMAT_VERSION,
+        "code": CODE_VERSION,
+        "nodes": nodes,
+        "outputs": {
+            str(name): positions.get(node_id)
+            for name, node_id in pipeline.outputs.items()
+        },
+    }
+
+
+def canonical_json(pipeline: Union[Pipeline, PipelineSnapshot]) -> str:
+    """canonical_pipeline() as compact JSON with sorted keys."""
+    return json.dumps(
+        canonical_pipeline(pipeline),
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+
+
+def pipeline_hash(pipeline: Union[Pipeline, PipelineSnapshot]) -> str:
+    """Stable hash of a pipeline's canonical form."""
+    text = canonical_json(pipeline)
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
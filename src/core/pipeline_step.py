@@ -1,9 +1,61 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Any, List, Dict, Optional
+from typing import Any, List, Dict, Optional, Set, Tuple
 import numpy as np
 
 
+def readonly_view(image: np.ndarray) -> np.ndarray:
+    """
+    Return a read-only view of an array without copying its data.
+
+    The caller's array keeps its own flags; only the returned view is locked.
+    """
+    view = image.view()
+    view.flags.writeable = False
+    return view
+
+
+def freeze(image: np.ndarray) -> np.ndarray:
+    """Mark an array produced by the pipeline as immutable and return it."""
+    if image.flags.writeable:
+        image.flags.writeable = False
+    return image
+
+
+@dataclass(frozen=True)
+class ImageSpec:
+    """Shape and dtype of an image passed between steps, without its pixels."""
+
+    shape: Tuple[int, ...]
+    dtype: np.dtype
+
+    def __post_init__(self):
+        object.__setattr__(self, "shape", tuple(int(n) for n in self.shape))
+        object.__setattr__(self, "dtype", np.dtype(self.dtype))
+
+    @classmethod
+    def of(cls, image: np.ndarray) -> "ImageSpec":
+        """Spec of an existing array."""
+        return cls(image.shape, image.dtype)
+
+    @property
+    def channels(self) -> int:
+        """Channel count; 2-D arrays are single-channel."""
+        return self.shape[2] if len(self.shape) == 3 else 1
+
+    @property
+    def nbytes(self) -> int:
+        return int(np.prod(self.shape)) * self.dtype.itemsize
+
+    def with_channels(self, channels: int) -> "ImageSpec":
+        """Same image size with ``channels`` channels (1 = 2-D array)."""
+        size = self.shape[:2]
+        return ImageSpec(size if channels == 1 else size + (channels,), self.dtype)
+
+    def __str__(self) -> str:
+        return f"{'x'.join(map(str, self.shape))} {self.dtype}"
+
+
 @dataclass
 class StepParameter:
     """Metadata for a step parameter to generate UI controls."""
@@ -19,6 +71,35 @@ class StepParameter:
 class PipelineStep(ABC):
     """Abstract base class for a processing step."""
 
+    # Set to True in subclasses whose process() writes into its input array.
+    # Executors hand steps read-only arrays, so in-place steps get a private
+    # copy (copy-on-write) while all other steps share buffers.
+    in_place: bool = False
+
+    # Maps pipeline node parameter names to step parameter names where they
+    # differ (e.g. the CLAHE node's "grid_size" is the step's "tile_grid_size").
+    param_aliases: Dict[str, str] = {}
+
+    # Input contract checked by output_spec() before any image is processed:
+    # accepted dtypes (names, e.g. "uint8") and channel counts; None = any
+    input_dtypes: Optional[Tuple[str, ...]] = None
+    input_channels: Optional[Tuple[int, ...]] = None
+    # Output channel count; None = same as the input
+    output_channels: Optional[int] = None
+
+    # Scratch memory the step allocates per input pixel at its peak, on top
+    # of its input and output; used to admit batch jobs by memory
+    scratch_bytes_per_pixel: float = 0.0
+
+    # Whether roi_margin() makes region results exact. Steps with global
+    # statistics (histograms, contrast stretching, area filters) set False,
+    # and viewport previews of pipelines using them run on the full frame.
+    roi_exact: bool = True
+
+    # Bump when a change to process() alters its results; part of the
+    # pipeline hash, so cached results of pipelines using the step expire
+    version: int = 1
+
     def __init__(self):
         self.enabled = True
         self._params: Dict[str, Any] = {}
@@ -37,6 +118,91 @@ class PipelineStep(ABC):
         """
         pass
 
+    def apply(self, image: np.ndarray, metadata: dict) -> np.ndarray:
+        """
+        Run process() with copy-on-write semantics for in-place steps.
+
+        Args:
+            image: Input image, possibly read-only and shared with other results.
+            metadata: Dict to store/retrieve inter-step data.
+
+        Returns:
+            Processed image. It may share memory with the input.
+        """
+        if self.in_place and not image.flags.writeable:
+            image = image.copy()
+        return self.process(image, metadata)
+
+    def process_into(
+        self, image: np.ndarray, metadata: dict, out: np.ndarray
+    ) -> np.ndarray:
+        """
+        Process the image into a preallocated buffer.
+
+        Override in steps that can write their result into ``out`` (e.g.
+        through OpenCV's ``dst`` argument); the default ignores it.
+
+        Args:
+            image: Input image.
+            metadata: Dict to store/retrieve inter-step data.
+            out: Writable buffer matching output_spec() of the input.
+
+        Returns:
+            The result: ``out``, or a new array if the step did not use it.
+        """
+        return self.process(image, metadata)
+
+    def apply_into(
+        self, image: np.ndarray, metadata: dict, out: np.ndarray
+    ) -> np.ndarray:
+        """Like apply(), writing the result into ``out`` where supported."""
+        if self.in_place and not image.flags.writeable:
+            image = image.copy()
+        return self.process_into(image, metadata, out)
+
+    @property
+    def writes_into(self) -> bool:
+        """Whether the step uses the buffer passed to process_into()."""
+        return type(self).process_into is not PipelineStep.process_into
+
+    def output_spec(self, spec: ImageSpec) -> ImageSpec:
+        """
+        Spec of the output for an input of ``spec`` (the shape transform).
+
+        Raises:
+            ValueError: If the step cannot process such an input.
+        """
+        if self.input_dtypes is not None and spec.dtype.name not in self.input_dtypes:
+            raise ValueError(
+                f"{self.name} accepts {', '.join(self.input_dtypes)} images, "
+                f"got {spec.dtype}"
+            )
+        if self.input_channels is not None:
+            if len(spec.shape) not in (2, 3) or spec.channels not in self.input_channels:
+                accepted = ", ".join(map(str, self.input_channels))
+                raise ValueError(
+                    f"{self.name} accepts {accepted}-channel images, got {spec}"
+                )
+        if self.output_channels is not None:
+            return spec.with_channels(self.output_channels)
+        return spec
+
+    def scratch_bytes(self, spec: ImageSpec) -> int:
+        """Peak scratch memory of processing an input of ``spec``."""
+        height, width = spec.shape[:2]
+        return int(height * width * self.scratch_bytes_per_pixel)
+
+    def apply_many(self, images: List[np.ndarray], metadata: dict) -> np.ndarray:
+        """
+        Run the step on the outputs of several upstream nodes (fan-in).
+
+        Single-input steps accept exactly one image. Steps that merge
+        branches override this.
+        """
+        if len(images) != 1:
+            raise ValueError(f"{self.name} takes 1 input, got {len(images)}")
+        return self.apply(images[0], metadata)
+
     def define_params(self) -> List[StepParameter]:
         """Override to return a list of StepParameter objects."""
         return []
@@ -52,7 +218,78 @@ class PipelineStep(ABC):
 
     def set_param(self, name: str, value: Any):
         """Set a parameter value."""
+        if name in self._params and self._params[name] == value:
+            return
         self._params[name] = value
+        self.on_params_changed({name})
+
+    def update_params(self, params: Dict[str, Any]) -> bool:
+        """
+        Apply a dict of node parameters to the step.
+
+        Names are translated through ``param_aliases``. Unchanged values are
+        ignored, so calling this before every run is cheap.
+
+        Returns:
+            True if any parameter changed.
+        """
+        changed: Set[str] = set()
+        for name, value in params.items():
+            name = self.param_aliases.get(name, name)
+            if name in self._params and self._params[name] == value:
+                continue
+            self._params[name] = value
+            changed.add(name)
+
+        if changed:
+            self.on_params_changed(changed)
+        return bool(changed)
+
+    def scale_params(self, params: Dict[str, Any], scale: float) -> Dict[str, Any]:
+        """
+        Adapt node parameters for an image resized by ``scale``.
+
+        Used for low-resolution proxy previews. Steps with spatial parameters
+        (sigma, kernel sizes, areas) override this; the default returns the
+        parameters unchanged.
+
+        Args:
+            params: Node parameters at full resolution
+            scale: Proxy size relative to full resolution (0 < scale <= 1)
+
+        Returns:
+            New parameter dict for the scaled image.
+        """
+        return params
+
+    def roi_margin(self, params: Dict[str, Any], image_shape: Tuple[int, ...]) -> int:
+        """
+        Pixels of context the step needs around a region of interest.
+
+        Used for viewport (ROI) previews: running the step on the region
+        grown by this margin gives the same result inside the region as
+        running it on the whole frame. Point-wise steps need no margin.
+
+        Args:
+            params: Effective node parameters
+            image_shape: Shape of the full-resolution input frame
+
+        Returns:
+            Margin in pixels on each side.
+        """
+        return 0
+
+    def on_params_changed(self, changed: Set[str]):
+        """
+        Hook called after parameters change.
+
+        Override to drop or rebuild state derived from parameters (e.g. a
+        cv2.CLAHE object). Steps without such state can ignore it.
+
+        Args:
+            changed: Names of the parameters that changed.
+        """
+        pass
 
     @property
     def name(self) -> str:
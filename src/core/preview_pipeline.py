@@ -5,21 +5,40 @@ Executes the image processing pipeline on the current image for real-time previe
 Includes caching and async execution support.
 """
 
+import asyncio
 import logging
+import threading
 import time
 from dataclasses import dataclass
-from typing import Any, Callable, Dict, List, Optional
-from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, Union
+from concurrent.futures import Executor, ThreadPoolExecutor
 
+import cv2
 import numpy as np
 
 from ..models.app_state import AppState
-from ..models.pipeline_model import PipelineNode
-from ..core.steps.grayscale_step import GrayscaleStep
-from ..core.steps.gaussian_blur_step import GaussianBlurStep
-from ..core.steps.clahe_step import ClaheStep
-from ..core.steps.phantast_step import PhantastStep
-
+from ..models.pipeline_model import NodeSnapshot, Pipeline, PipelineSnapshot
+from ..core.parameter_schemas import create_default_node_parameters
+from ..core.execution_engine import (
+    EngineObserver,
+    EngineTask,
+    ExecutionEngine,
+    _image_key,
+)
+from ..core.graph_executor import GraphExecutor
+from ..core.node_cache import DEFAULT_MAX_BYTES as DEFAULT_CACHE_BYTES, NodeCache
+from ..core.pipeline_compiler import ExecutionPlan, PipelineCompiler
+from ..core.pipeline_identity import pipeline_hash
+from ..core.pipeline_step import PipelineStep
+from ..core.result_cache import CachedResult, ResultCache, summary_stats
+from ..core.roi_compositor import Rect, RoiCompositor, clip_rect, expand_rect
+from ..core.steps import create_step, get_step_class
+from ..core.steps.phantast_step import (
+    CONFLUENCY_KEY,
+    MASK_KEY,
+    PhantastStep,
+    render_overlay,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +52,51 @@ class PreviewResult:
     error_message: Optional[str] = None
     execution_time_ms: float = 0.0
     node_results: Optional[Dict[str, Any]] = None
+    # Metadata the steps produced (e.g. phantast_confluency); for graph
+    # pipelines, that of the first output
+    metadata: Optional[Dict[str, Any]] = None
+    # Named outputs of graph pipelines (image is the first of them)
+    outputs: Optional[Dict[str, np.ndarray]] = None
+    # Progressive previews: proxy results are downscaled by `scale`
+    is_proxy: bool = False
+    scale: float = 1.0
+    cancelled: bool = False
+    # Viewport previews: region of `image` that is up to date
+    roi: Optional[Tuple[int, int, int, int]] = None
+    # PHANTAST's result came from the persistent result cache
+    result_cache_hit: bool = False
+
+
+# Anything a pipeline can be executed from; it is snapshotted once per run
+PipelineSource = Union[AppState, Pipeline, PipelineSnapshot]
+
+
+def _snapshot(pipeline: PipelineSource) -> PipelineSnapshot:
+    """Immutable snapshot of an AppState's pipeline, a Pipeline or a snapshot."""
+    if isinstance(pipeline, AppState):
+        pipeline = pipeline.pipeline
+    return pipeline.snapshot()
+
+
+class _PassObserver(EngineObserver):
+    """Forwards one pass's engine events to signals and callbacks."""
+
+    def __init__(self, pipeline, progress_callback, node_callback, report_nodes):
+        self._pipeline = pipeline
+        self._progress_callback = progress_callback
+        self._node_callback = node_callback
+        self._report_nodes = report_nodes
+
+    def task_started(self, task: EngineTask, position: int, total: int):
+        self._pipeline.progress_updated.emit(position, total)
+        if self._progress_callback:
+            self._progress_callback(position, total)
+
+    def task_finished(self, task: EngineTask, entry: Dict[str, Any]):
+        if self._report_nodes and entry["output"] is not None:
+            self._pipeline.node_completed.emit(task.key, entry["output"])
+        if self._node_callback:
+            self._node_callback(task.key, entry)
 
 
 class PreviewPipeline:
@@ -44,18 +108,50 @@ class PreviewPipeline:
     - Async execution support
     - Progress reporting
     - Error handling
+
+    Node outputs are read-only arrays. The same buffer is shared between
+    ``node_results``, the ``node_completed`` signal and the cache, so no
+    per-node copies are made. Consumers that need to draw on a result must
+    copy it first.
     """
 
-    def __init__(self, cache_enabled: bool = True):
+    def __init__(
+        self,
+        cache_enabled: bool = True,
+        result_cache: Optional[ResultCache] = None,
+        cache_max_bytes: int = DEFAULT_CACHE_BYTES,
+    ):
+        """
+        Args:
+            cache_enabled: Keep input/output node results in memory
+            result_cache: Persistent cache of PHANTAST results, looked up
+                by image content and pipeline hash on full-resolution runs
+            cache_max_bytes: Most bytes of node results kept in memory;
+                the least recently used are evicted
+        """
         super().__init__()
 
         self._cache_enabled = cache_enabled
-        self._cache: Dict[str, np.ndarray] = {}
+        self._result_cache = result_cache
+        # (node version, scale, image hash) -> (image, metadata produced)
+        self._cache = NodeCache(cache_max_bytes)
+        self._engine = ExecutionEngine(cache=self._cache)
+        # Step instances keyed by node ID; they live as long as their node
+        self._steps: Dict[str, PipelineStep] = {}
+        # Separate instances for proxy passes, so scaled parameters do not
+        # invalidate the full-resolution steps' state
+        self._proxy_steps: Dict[str, PipelineStep] = {}
+        self._generation = 0
+        self._generation_lock = threading.Lock()
+        self._compiler = PipelineCompiler()
+        self._roi_compositor = RoiCompositor()
+        self._graph_executor: Optional[GraphExecutor] = None
         self._executor = ThreadPoolExecutor(max_workers=1)
 
         # Signals (will be connected to UI)
         self._callbacks = {
             "execution_started": [],
+            "proxy_ready": [],
             "progress_updated": [],
             "node_completed": [],
             "execution_completed": [],
@@ -69,6 +165,10 @@ class PreviewPipeline:
     def execution_started(self):
         return self._create_signal_proxy("execution_started")
 
+    @property
+    def proxy_ready(self):
+        return self._create_signal_proxy("proxy_ready")
+
     @property
     def progress_updated(self):
         return self._create_signal_proxy("progress_updated")
@@ -113,7 +213,7 @@ class PreviewPipeline:
     def execute(
         self,
         input_image: np.ndarray,
-        pipeline: AppState,
+        pipeline: PipelineSource,
         progress_callback: Optional[Callable[[int, int], None]] = None,
     ) -> PreviewResult:
         """
@@ -121,64 +221,358 @@ class PreviewPipeline:
 
         Args:
             input_image: Input image as numpy array
-            pipeline: AppState containing pipeline configuration
+            pipeline: AppState (or Pipeline / snapshot) to execute
             progress_callback: Optional callback(current, total) for progress
 
         Returns:
             PreviewResult with success status and output image
         """
-        start_time = time.time()
+        self.execution_started.emit()
+        return self._execute_pass(input_image, _snapshot(pipeline), progress_callback)
+
+    def execute_progressive(
+        self,
+        input_image: np.ndarray,
+        pipeline: PipelineSource,
+        proxy_max_size: int = 512,
+        generation: Optional[int] = None,
+    ) -> PreviewResult:
+        """
+        Execute a fast low-resolution pass, then the full-resolution pass.
+
+        The proxy pass runs on a copy downscaled so its longest edge is at
+        most ``proxy_max_size``, with spatial parameters (sigma, kernel
+        sizes, area thresholds) scaled to match. Its result is emitted
+        through ``proxy_ready``; the full-resolution result follows through
+        ``execution_completed`` and replaces it.
+
+        Both passes stop early if a newer request supersedes them (see
+        ``cancel_pending``).
+
+        Args:
+            input_image: Input image as numpy array
+            pipeline: AppState (or Pipeline / snapshot) to execute
+            proxy_max_size: Longest edge of the proxy image in pixels
+            generation: Request generation (defaults to a new one)
+
+        Returns:
+            PreviewResult of the full-resolution pass
+        """
+        if generation is None:
+            generation = self.cancel_pending()
 
         self.execution_started.emit()
+        snapshot = _snapshot(pipeline)
+        self._execute_proxy(input_image, snapshot, proxy_max_size, generation)
+        return self._execute_pass(input_image, snapshot, generation=generation)
 
-        try:
-            # Get enabled nodes only
-            nodes = [node for node in pipeline.pipeline.nodes if node.enabled]
+    def execute_proxy(
+        self,
+        input_image: np.ndarray,
+        pipeline: PipelineSource,
+        proxy_max_size: int = 512,
+        generation: Optional[int] = None,
+    ) -> Optional[PreviewResult]:
+        """
+        Execute only the low-resolution pass of ``execute_progressive``.
 
-            if not nodes:
-                return PreviewResult(
-                    success=False, error_message="No enabled nodes in pipeline"
-                )
+        Used while the user is dragging a control: the result is emitted
+        through ``proxy_ready`` and no full-resolution pass follows.
 
-            # Execute node by node
-            current_image = input_image.copy()
-            node_results = {}
-            metadata = {}  # Shared metadata across nodes
+        Args:
+            input_image: Input image as numpy array
+            pipeline: AppState (or Pipeline / snapshot) to execute
+            proxy_max_size: Longest edge of the proxy image in pixels
+            generation: Request generation (defaults to a new one)
 
-            for i, node in enumerate(nodes):
-                # Update progress
-                self.progress_updated.emit(i + 1, len(nodes))
-                if progress_callback:
-                    progress_callback(i + 1, len(nodes))
+        Returns:
+            PreviewResult of the proxy pass, or None if the image is already
+            small enough (or the pipeline is a graph) and the full-resolution
+            pass ran instead
+        """
+        if generation is None:
+            generation = self.cancel_pending()
 
-                # Execute node
-                result = self._execute_node(node, current_image, metadata)
+        self.execution_started.emit()
+        snapshot = _snapshot(pipeline)
+        result = self._execute_proxy(input_image, snapshot, proxy_max_size, generation)
+        if result is None:
+            self._execute_pass(input_image, snapshot, generation=generation)
+        return result
 
-                if not result["success"]:
-                    return PreviewResult(
-                        success=False,
-                        error_message=f"Node '{node.name}' failed: {result.get('error')}",
-                    )
+    def execute_proxy_async(
+        self,
+        input_image: np.ndarray,
+        pipeline: PipelineSource,
+        proxy_max_size: int = 512,
+    ):
+        """
+        Run execute_proxy on the worker thread.
+
+        Any pass still running for an earlier request is cancelled.
+        """
+        generation = self.cancel_pending()
+        return self._executor.submit(
+            self.execute_proxy,
+            input_image,
+            _snapshot(pipeline),
+            proxy_max_size,
+            generation,
+        )
+
+    def _execute_proxy(
+        self,
+        input_image: np.ndarray,
+        snapshot: PipelineSnapshot,
+        proxy_max_size: int,
+        generation: Optional[int],
+    ) -> Optional[PreviewResult]:
+        """Run the downscaled pass; None if no downscaling applies."""
+        scale = proxy_max_size / max(input_image.shape[:2])
+        if scale >= 1.0 or not snapshot.is_linear():
+            return None
+        proxy = cv2.resize(
+            input_image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA
+        )
+        # Actual scale after rounding to whole pixels
+        scale = proxy.shape[1] / input_image.shape[1]
+        return self._execute_pass(proxy, snapshot, scale=scale, generation=generation)
+
+    def execute_progressive_async(
+        self,
+        input_image: np.ndarray,
+        pipeline: PipelineSource,
+        proxy_max_size: int = 512,
+    ):
+        """
+        Run execute_progressive on the worker thread.
+
+        Any pass still running for an earlier request is cancelled.
+        """
+        generation = self.cancel_pending()
+        # Snapshot on the calling thread; the GUI may edit the pipeline later
+        return self._executor.submit(
+            self.execute_progressive,
+            input_image,
+            _snapshot(pipeline),
+            proxy_max_size,
+            generation,
+        )
+
+    def execute_roi(
+        self,
+        input_image: np.ndarray,
+        pipeline: PipelineSource,
+        roi: Rect,
+        generation: Optional[int] = None,
+    ) -> PreviewResult:
+        """
+        Execute the pipeline only for the visible region of the frame.
 
-                current_image = result["image"]
-                node_results[node.id] = {
-                    "name": node.name,
-                    "output": current_image.copy(),
-                }
+        The region is grown by the context every step needs (see
+        ``PipelineStep.roi_margin``), processed, and composited into a
+        full-size frame. Regions computed earlier for the same image and
+        pipeline are reused, so panning only processes newly exposed pixels.
+        Outside computed regions the frame shows the input image.
+
+        Only pipelines whose steps are exact on a grown region (see
+        ``PipelineStep.roi_exact``) run this way. Steps with global
+        statistics (CLAHE tiles, PHANTAST contrast stretching and area
+        filters) would give a different result on a region, so pipelines
+        containing them run on the full frame instead. ROI results carry no
+        metadata (such as confluency).
+
+        Args:
+            input_image: Full input image
+            pipeline: AppState (or Pipeline / snapshot) to execute
+            roi: Visible region as (x, y, width, height) in image pixels
+            generation: Request generation for cancellation
+
+        Returns:
+            PreviewResult whose image is the full composited frame
+        """
+        self.execution_started.emit()
+        start_time = time.time()
+        snapshot = _snapshot(pipeline)
+        height, width = input_image.shape[:2]
+        roi = clip_rect(roi, width, height)
+        if roi is None or roi == (0, 0, width, height) or not snapshot.is_linear():
+            return self._execute_pass(input_image, snapshot, generation=generation)
+
+        plan = self._compiler.compile(snapshot)
+        if not self._plan_is_local(plan):
+            return self._execute_pass(input_image, snapshot, generation=generation)
+
+        # The plan object changes whenever the pipeline does
+        key = (_image_key(input_image), plan)
+        if not self._roi_compositor.matches(key):
+            self._roi_compositor.reset(key)
+
+        node_results = {}
+        missing = self._roi_compositor.missing(roi)
+        if missing is not None:
+            margin = self._plan_margin(plan, input_image.shape)
+            px, py, pw, ph = expand_rect(missing, margin, width, height)
+            crop = input_image[py : py + ph, px : px + pw]
+            tile_result = self._execute_pass(
+                crop, snapshot, generation=generation, report=False
+            )
+            if not tile_result.success:
+                return tile_result
+
+            mx, my, mw, mh = missing
+            tile = tile_result.image[my - py : my - py + mh, mx - px : mx - px + mw]
+            self._roi_compositor.paste(missing, tile, input_image)
+            node_results = tile_result.node_results
+
+        result = PreviewResult(
+            success=True,
+            image=self._roi_compositor.frame,
+            execution_time_ms=(time.time() - start_time) * 1000,
+            node_results=node_results,
+            roi=roi,
+        )
+        self.execution_completed.emit(result)
+        return result
+
+    def supports_roi(self, pipeline: PipelineSource) -> bool:
+        """
+        Whether execute_roi() computes only the region for this pipeline.
+
+        False for graph pipelines and for pipelines with steps that are not
+        exact on a region (they run on the full frame).
+        """
+        snapshot = _snapshot(pipeline)
+        if not snapshot.is_linear():
+            return False
+        return self._plan_is_local(self._compiler.compile(snapshot))
+
+    @staticmethod
+    def _plan_is_local(plan: ExecutionPlan) -> bool:
+        """Whether every step of a plan is exact on a region with its margin."""
+        for plan_step in plan.steps:
+            step_class = get_step_class(plan_step.node_type)
+            if step_class is None or not step_class.roi_exact:
+                return False
+        return True
+
+    def _plan_margin(self, plan: ExecutionPlan, image_shape: Tuple[int, ...]) -> int:
+        """Total context margin of a plan; step margins add up in sequence."""
+        margin = 0
+        for plan_step in plan.steps:
+            step = self._get_step(plan_step.node)
+            if step is not None:
+                margin += step.roi_margin(plan_step.parameters, image_shape)
+        return margin
+
+    def cancel_pending(self) -> int:
+        """
+        Supersede any running progressive execution.
+
+        Returns:
+            The new request generation
+        """
+        with self._generation_lock:
+            self._generation += 1
+            return self._generation
+
+    def _is_stale(
+        self,
+        generation: Optional[int],
+        cancel_event: Optional[threading.Event] = None,
+    ) -> bool:
+        if cancel_event is not None and cancel_event.is_set():
+            return True
+        return generation is not None and generation != self._generation
+
+    def _execute_pass(
+        self,
+        input_image: np.ndarray,
+        snapshot: PipelineSnapshot,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        scale: float = 1.0,
+        generation: Optional[int] = None,
+        report: bool = True,
+        cancel_event: Optional[threading.Event] = None,
+        node_callback: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+        steps: Optional[Dict[str, PipelineStep]] = None,
+    ) -> PreviewResult:
+        """
+        Run the pipeline once at the given scale.
+
+        Full-resolution passes (scale 1.0) report through
+        ``execution_completed``; proxy passes through ``proxy_ready``.
+        With ``report=False`` (ROI tiles) no signals are emitted.
+        ``cancel_event`` stops this pass alone (``generation`` is shared by
+        all passes), and ``node_callback(node_id, node_result)`` is called
+        for this pass's nodes only. ``steps`` are step instances for this
+        pass alone; passes that may overlap need their own, since running a
+        node sets its step's parameters (None uses the persistent ones).
+        """
+        start_time = time.time()
+        is_proxy = scale != 1.0
+        try:
+            if not snapshot.is_linear():
+                return self._execute_graph(
+                    input_image,
+                    snapshot,
+                    node_callback,
+                    progress_callback,
+                    should_stop=lambda: self._is_stale(generation, cancel_event),
+                    steps=steps,
+                )
 
-                # Emit node completion signal
-                self.node_completed.emit(node.id, current_image.copy())
+            if not any(node.enabled for node in snapshot.nodes):
+                return PreviewResult(
+                    success=False, error_message="No enabled nodes in pipeline"
+                )
 
-            execution_time = (time.time() - start_time) * 1000
+            self._prune_cache(snapshot.nodes)
+            if steps is None:
+                self._prune_steps(snapshot.nodes)
+                steps = self._proxy_steps if is_proxy else self._steps
+            observer = _PassObserver(
+                self, progress_callback, node_callback, report and not is_proxy
+            )
+            tasks = self._plan_tasks(snapshot, scale, steps)
+            # Proxy passes and ROI tiles do not see the whole image
+            cache_keys = None
+            cached = None
+            if self._result_cache is not None and report and not is_proxy:
+                cache_keys = (_image_key(input_image), pipeline_hash(snapshot))
+                cached = self._lookup_result(cache_keys)
+                if cached is not None:
+                    self._serve_cached(tasks, snapshot, cached)
+            run = self._engine.run(
+                input_image,
+                tasks,
+                should_stop=lambda: self._is_stale(generation, cancel_event),
+                observers=(observer,),
+            )
+            if run.cancelled:
+                return PreviewResult(
+                    success=False, error_message="Cancelled", cancelled=True
+                )
+            if not run.success:
+                return PreviewResult(success=False, error_message=run.error_message)
 
             result = PreviewResult(
                 success=True,
-                image=current_image,
-                execution_time_ms=execution_time,
-                node_results=node_results,
+                image=run.image,
+                execution_time_ms=(time.time() - start_time) * 1000,
+                node_results=run.node_results,
+                metadata=run.metadata,
+                is_proxy=is_proxy,
+                scale=scale,
+                result_cache_hit=cached is not None,
             )
+            if cache_keys is not None and cached is None:
+                self._store_result(cache_keys, result)
 
-            self.execution_completed.emit(result)
+            if report and is_proxy:
+                self.proxy_ready.emit(result)
+            elif report:
+                self.execution_completed.emit(result)
             return result
 
         except Exception as e:
@@ -186,76 +580,274 @@ class PreviewPipeline:
             self.execution_failed.emit(str(e))
             return PreviewResult(success=False, error_message=str(e))
 
+    def _plan_tasks(
+        self,
+        snapshot: PipelineSnapshot,
+        scale: float,
+        steps: Dict[str, PipelineStep],
+    ) -> List[EngineTask]:
+        """Engine tasks for the compiled plan, one per enabled node."""
+        plan = self._compiler.compile(snapshot)
+        nodes_by_id = {node.id: node for node in snapshot.nodes}
+        step_for_node = {
+            node_id: step for step in plan.steps for node_id in step.source_ids
+        }
+
+        tasks = []
+        for node_id in plan.node_order:
+            plan_step = step_for_node.get(node_id)
+            task = EngineTask(key=node_id, name=nodes_by_id[node_id].name)
+            # Fused steps run once, on their first source node; nodes the
+            # compiler elided report the image they passed on, unless a later
+            # step does their work
+            if plan_step is not None and plan_step.source_ids[0] == node_id:
+                task.run = self._step_runner(
+                    plan_step.node, plan_step.parameters, scale, steps
+                )
+                task.cache_key = self._cache_key(plan_step.node, scale)
+            if node_id in plan.elided:
+                task.info["elided"] = plan.elided[node_id]
+            task.reports_output = node_id not in plan.deferred
+            tasks.append(task)
+        return tasks
+
+    def _serve_cached(
+        self,
+        tasks: List[EngineTask],
+        snapshot: PipelineSnapshot,
+        cached: CachedResult,
+    ):
+        """Make the PHANTAST tasks draw the cached mask instead of running."""
+        nodes_by_id = {node.id: node for node in snapshot.nodes}
+        for task in tasks:
+            node = nodes_by_id[task.key]
+            if task.run is None or get_step_class(node.type) is not PhantastStep:
+                continue
+            task.run = self._cached_runner(task.run, cached)
+            task.cache_key = None
+            task.info["result_cache"] = True
+
+    @staticmethod
+    def _cached_runner(
+        run: Callable[[np.ndarray, dict], np.ndarray], cached: CachedResult
+    ) -> Callable[[np.ndarray, dict], np.ndarray]:
+        def run_cached(image: np.ndarray, metadata: dict) -> np.ndarray:
+            if cached.mask is None or cached.mask.shape != image.shape[:2]:
+                # Not what this step produced; compute it after all
+                return run(image, metadata)
+            metadata[CONFLUENCY_KEY] = cached.confluency
+            metadata[MASK_KEY] = cached.mask
+            return render_overlay(image, cached.mask)
+
+        return run_cached
+
+    def _lookup_result(self, cache_keys: Tuple[str, str]) -> Optional[CachedResult]:
+        try:
+            return self._result_cache.get(*cache_keys)
+        except Exception as e:
+            logger.warning(f"Result cache lookup failed: {e}")
+            return None
+
+    def _store_result(self, cache_keys: Tuple[str, str], result: PreviewResult):
+        """Add a full-resolution PHANTAST result to the result cache."""
+        metadata = result.metadata or {}
+        if metadata.get(CONFLUENCY_KEY) is None:
+            return
+        mask = metadata.get(MASK_KEY)
+        try:
+            self._result_cache.put(
+                *cache_keys,
+                confluency=metadata[CONFLUENCY_KEY],
+                mask=mask,
+                stats=summary_stats(mask, result.execution_time_ms),
+            )
+        except Exception as e:
+            # A full disk or locked database must not fail the preview
+            logger.warning(f"Could not store result in cache: {e}")
+
+    def _execute_graph(
+        self,
+        input_image: np.ndarray,
+        snapshot: PipelineSnapshot,
+        node_callback: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        should_stop: Optional[Callable[[], bool]] = None,
+        steps: Optional[Dict[str, PipelineStep]] = None,
+    ) -> PreviewResult:
+        """
+        Execute a DAG pipeline (explicit node inputs or named outputs).
+
+        Branches run concurrently, so ``node_callback`` is called for all
+        nodes once the graph has finished. Progress is reported as nodes
+        start, and ``should_stop`` cancels the run between nodes, as for
+        linear pipelines.
+        """
+        if self._graph_executor is None:
+            self._graph_executor = GraphExecutor()
+
+        def on_progress(position: int, total: int):
+            self.progress_updated.emit(position, total)
+            if progress_callback:
+                progress_callback(position, total)
+
+        graph_result = self._graph_executor.execute(
+            input_image,
+            snapshot,
+            should_stop=should_stop,
+            progress_callback=on_progress,
+            steps=steps,
+        )
+        if graph_result.cancelled:
+            return PreviewResult(
+                success=False, error_message="Cancelled", cancelled=True
+            )
+        if not graph_result.success:
+            self.execution_failed.emit(graph_result.error_message)
+            return PreviewResult(
+                success=False, error_message=graph_result.error_message
+            )
+
+        for node_id, entry in graph_result.node_results.items():
+            self.node_completed.emit(node_id, entry["output"])
+            if node_callback:
+                node_callback(node_id, entry)
+
+        result = PreviewResult(
+            success=True,
+            image=next(iter(graph_result.outputs.values())),
+            execution_time_ms=graph_result.execution_time_ms,
+            node_results=graph_result.node_results,
+            metadata=next(iter(graph_result.metadata.values())),
+            outputs=graph_result.outputs,
+        )
+        self.execution_completed.emit(result)
+        return result
+
     def _execute_node(
-        self, node: PipelineNode, input_image: np.ndarray, metadata: dict
+        self,
+        node: NodeSnapshot,
+        input_image: np.ndarray,
+        metadata: dict,
+        parameters: Optional[Dict[str, Any]] = None,
+        scale: float = 1.0,
+        steps: Optional[Dict[str, PipelineStep]] = None,
     ) -> Dict[str, Any]:
         """
         Execute a single node.
 
         Args:
-            node: PipelineNode to execute
+            node: NodeSnapshot to execute
             input_image: Input image
             metadata: Metadata dictionary passed through pipeline
+            parameters: Effective parameters from the execution plan
+                (defaults to the node's own parameters)
+            scale: Image scale relative to full resolution (proxy passes)
+            steps: Step instance map to use (defaults to full-resolution)
 
         Returns:
-            Dict with 'success', 'image', and optional 'error'
+            Dict with 'success', 'image', and optional 'error' and
+            'cache_hit'
         """
+        if parameters is None:
+            parameters = self._node_parameters(node)
+        task = EngineTask(
+            key=node.id,
+            name=node.name,
+            run=self._step_runner(node, parameters, scale, steps),
+            cache_key=self._cache_key(node, scale),
+        )
         try:
-            # Check cache for input/output nodes (they don't change)
-            if self._cache_enabled and node.type in ["input", "output"]:
-                cache_key = f"{node.id}_{hash(input_image.tobytes())}"
-                if cache_key in self._cache:
-                    return {"success": True, "image": self._cache[cache_key]}
-
-            # Execute based on node type
-            if node.type == "input":
-                # Input node just passes through
-                result = input_image
-
-            elif node.type == "grayscale":
-                step = GrayscaleStep()
-                result = step.process(input_image, metadata)
-
-            elif node.type == "gaussian_blur":
-                params = node.parameters
-                step = GaussianBlurStep()
-                step.set_param("kernel_size", params.get("kernel_size", 5))
-                step.set_param("sigma", params.get("sigma", 1.0))
-                result = step.process(input_image, metadata)
-
-            elif node.type == "clahe":
-                params = node.parameters
-                step = ClaheStep()
-                step.set_param("clip_limit", params.get("clip_limit", 2.0))
-                step.set_param("tile_grid_size", params.get("grid_size", (8, 8)))
-                result = step.process(input_image, metadata)
-
-            elif node.type == "output":
-                # PHANTAST output
-                params = node.parameters
-                step = PhantastStep()
-                step.set_param("sigma", params.get("sigma", 5.0))
-                step.set_param("epsilon", params.get("epsilon", 0.5))
-                result = step.process(input_image, metadata)
-
-            else:
-                return {"success": False, "error": f"Unknown node type: {node.type}"}
-
-            # Cache result
-            if self._cache_enabled and node.type in ["input", "output"]:
-                cache_key = f"{node.id}_{hash(input_image.tobytes())}"
-                self._cache[cache_key] = result.copy()
-
-            return {"success": True, "image": result}
-
+            image, cache_hit = self._engine.run_task(task, input_image, metadata)
         except Exception as e:
             logger.error(f"Node execution failed: {e}")
             return {"success": False, "error": str(e)}
+        return {"success": True, "image": image, "cache_hit": cache_hit}
+
+    def _step_runner(
+        self,
+        node: NodeSnapshot,
+        parameters: Dict[str, Any],
+        scale: float,
+        steps: Optional[Dict[str, PipelineStep]],
+    ) -> Callable[[np.ndarray, dict], np.ndarray]:
+        """Engine callable running a node's persistent step instance."""
+
+        def run(image: np.ndarray, metadata: dict) -> np.ndarray:
+            step = self._get_step(node, steps)
+            if step is None:
+                raise ValueError(f"Unknown node type: {node.type}")
+            params = parameters
+            if scale != 1.0:
+                params = step.scale_params(params, scale)
+            step.update_params(params)
+            return step.apply(image, metadata)
+
+        return run
+
+    def _cache_key(self, node: NodeSnapshot, scale: float):
+        """
+        Engine cache key function for a node, or None if it is not cached.
+
+        Only input/output nodes are cached (they don't change). The node's
+        version is part of the key, so parameter edits miss.
+        """
+        if not self._cache_enabled or node.type not in ("input", "output"):
+            return None
+        # Snapshots carry their node's version; comparing it is cheaper
+        # than hashing parameters (hand-built snapshots have none)
+        node_key = (node.id, node.version) if node.version else node
+        return lambda image: (node_key, scale, _image_key(image))
+
+    def _get_step(
+        self, node: NodeSnapshot, steps: Optional[Dict[str, PipelineStep]] = None
+    ) -> Optional[PipelineStep]:
+        """Get the persistent step instance for a node, creating it if needed."""
+        if steps is None:
+            steps = self._steps
+        step = steps.get(node.id)
+        step_class = get_step_class(node.type)
+        if step is None or type(step) is not step_class:
+            step = create_step(node.type)
+            if step is None:
+                return None
+            steps[node.id] = step
+        return step
+
+    def _prune_steps(self, nodes: Tuple[NodeSnapshot, ...]):
+        """Drop step instances whose node is no longer in the pipeline."""
+        live_ids = {node.id for node in nodes}
+        for steps in (self._steps, self._proxy_steps):
+            for node_id in list(steps):
+                if node_id not in live_ids:
+                    del steps[node_id]
+
+    def _prune_cache(self, nodes: Tuple[NodeSnapshot, ...]):
+        """
+        Drop cached results of older versions of the pipeline's nodes.
+
+        Versions only grow, so an edited node never matches its old keys
+        again; without this they would stay until evicted by size.
+        """
+        versions = {node.id: node.version for node in nodes if node.version}
+        for key in list(self._cache):
+            node_key = key[0] if isinstance(key, tuple) and key else None
+            if not (isinstance(node_key, tuple) and len(node_key) == 2):
+                continue
+            node_id, version = node_key
+            if node_id in versions and version < versions[node_id]:
+                self._cache.pop(key, None)
+
+    @staticmethod
+    def _node_parameters(node: NodeSnapshot) -> Dict[str, Any]:
+        """Node parameters merged over the schema defaults for its type."""
+        params = create_default_node_parameters(node.type)
+        params.update(node.parameters)
+        return params
 
     def execute_async(
         self,
         input_image: np.ndarray,
-        pipeline: AppState,
+        pipeline: PipelineSource,
         callback: Optional[Callable[[PreviewResult], None]] = None,
     ):
         """
@@ -263,21 +855,125 @@ class PreviewPipeline:
 
         Args:
             input_image: Input image as numpy array
-            pipeline: AppState containing pipeline configuration
+            pipeline: AppState (or Pipeline / snapshot) to execute
             callback: Optional callback to receive result
         """
 
+        snapshot = _snapshot(pipeline)
+
         def _run():
-            result = self.execute(input_image, pipeline)
+            result = self.execute(input_image, snapshot)
             if callback:
                 callback(result)
             return result
 
         return self._executor.submit(_run)
 
+    async def aexecute(
+        self,
+        input_image: np.ndarray,
+        pipeline: PipelineSource,
+        executor: Optional[Executor] = None,
+    ) -> PreviewResult:
+        """
+        Execute the pipeline from asyncio code without blocking the loop.
+
+        The pass runs on ``executor`` (the loop's default executor if None),
+        so many images can be processed concurrently; each run uses its own
+        step instances, so overlapping runs never see each other's
+        parameters. Cancelling the awaiting task stops the pass at the next
+        node boundary; the node already running finishes in the background
+        and is discarded.
+
+        Args:
+            input_image: Input image as numpy array
+            pipeline: AppState (or Pipeline / snapshot) to execute
+            executor: Executor for the CPU-bound work
+
+        Returns:
+            PreviewResult, as from execute()
+        """
+        loop = asyncio.get_running_loop()
+        snapshot = _snapshot(pipeline)
+        cancel_event = threading.Event()
+
+        def _run():
+            self.execution_started.emit()
+            return self._execute_pass(
+                input_image, snapshot, cancel_event=cancel_event, steps={}
+            )
+
+        try:
+            return await loop.run_in_executor(executor, _run)
+        except asyncio.CancelledError:
+            cancel_event.set()
+            raise
+
+    async def astream(
+        self,
+        input_image: np.ndarray,
+        pipeline: PipelineSource,
+        executor: Optional[Executor] = None,
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Execute the pipeline, yielding each node's result as it completes.
+
+        Runs like aexecute(); breaking out of the loop or cancelling the
+        consuming task stops the pass at the next node boundary.
+
+        Args:
+            input_image: Input image as numpy array
+            pipeline: AppState (or Pipeline / snapshot) to execute
+            executor: Executor for the CPU-bound work
+
+        Yields:
+            (node_id, node_result) with the same entries as
+            PreviewResult.node_results
+
+        Raises:
+            RuntimeError: If the pipeline fails
+        """
+        loop = asyncio.get_running_loop()
+        snapshot = _snapshot(pipeline)
+        cancel_event = threading.Event()
+        queue: asyncio.Queue = asyncio.Queue()
+
+        def _on_node(node_id: str, entry: Dict[str, Any]):
+            loop.call_soon_threadsafe(queue.put_nowait, (node_id, entry))
+
+        def _run():
+            self.execution_started.emit()
+            return self._execute_pass(
+                input_image,
+                snapshot,
+                cancel_event=cancel_event,
+                node_callback=_on_node,
+                steps={},
+            )
+
+        future = loop.run_in_executor(executor, _run)
+        # Queued after every node callback the worker scheduled
+        future.add_done_callback(lambda _: queue.put_nowait(None))
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                yield item
+            result = future.result()
+            if not result.success:
+                raise RuntimeError(result.error_message)
+        finally:
+            cancel_event.set()
+
+    def get_execution_plan(self, pipeline: PipelineSource) -> ExecutionPlan:
+        """Get the (cached) optimized plan for a pipeline, e.g. to dump() it."""
+        return self._compiler.compile(_snapshot(pipeline))
+
     def clear_cache(self):
         """Clear the execution cache."""
         self._cache.clear()
+        self._roi_compositor.reset()
         logger.debug("Preview cache cleared")
 
     def set_cache_enabled(self, enabled: bool):
@@ -291,6 +987,7 @@ class PreviewPipeline:
         """Get cache statistics."""
         return {
             "size": len(self._cache),
+            "bytes": self._cache.nbytes,
             "enabled": self._cache_enabled,
         }
 
@@ -0,0 +1,211 @@
+"""
+Result Cache
+
+Persistent cache of PHANTAST results across sessions, keyed by the content
+of an image (a hash of its decoded pixels, so the same frame matches
+whether it comes from a file or the preview) and the hash of the pipeline
+that analyzed it. Each entry holds the confluency, the cell mask as a PNG
+(masks compress to a few percent of their raw size) and summary statistics.
+
+PreviewPipeline and the batch runner look images up before computing. On a
+hit the slow PHANTAST step is served from the cache; the cheap steps before
+it still run, to draw the overlay on their output.
+
+The cache is an SQLite file in WAL mode, shared safely by the GUI and batch
+worker processes. The GUI keeps it in the user's application data folder
+(see MainController); the CLI takes its path as ``--result-cache``.
+Entries are evicted least recently used once the stored bytes exceed
+``max_bytes``.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+import cv2
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    image_hash TEXT NOT NULL,
+    pipeline_hash TEXT NOT NULL,
+    confluency REAL,
+    mask BLOB,
+    stats TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (image_hash, pipeline_hash)
+);
+CREATE INDEX IF NOT EXISTS idx_entries_last_used ON entries (last_used);
+"""
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Fixed cost of a row besides the mask, counted against the budget
+ROW_OVERHEAD = 256
+
+
+@dataclass
+class CachedResult:
+    """What the cache keeps of one analysis."""
+
+    confluency: Optional[float]
+    mask: Optional[np.ndarray]  # Boolean cell mask
+    stats: Dict[str, Any] = field(default_factory=dict)
+
+
+def summary_stats(mask: Optional[np.ndarray], execution_time_ms: float) -> dict:
+    """Statistics stored next to a result."""
+    stats: Dict[str, Any] = {"execution_time_ms": round(execution_time_ms, 1)}
+    if mask is not None:
+        stats["height"], stats["width"] = mask.shape[:2]
+        stats["cell_pixels"] = int(np.count_nonzero(mask))
+    return stats
+
+
+def encode_mask(mask: np.ndarray) -> bytes:
+    ok, data = cv2.imencode(".png", mask.astype(np.uint8) * 255)
+    if not ok:
+        raise ValueError("Could not encode mask")
+    return data.tobytes()
+
+
+def decode_mask(data: bytes) -> np.ndarray:
+    mask = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+    if mask is None:
+        raise ValueError("Could not decode mask")
+    return mask > 0
+
+
+class ResultCache:
+    """
+    SQLite cache of results by (image hash, pipeline hash).
+
+    Safe to share between threads; each call holds the cache's lock.
+    Several processes may open the same file.
+    """
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Args:
+            path: Database file (created if missing)
+            max_bytes: Most bytes of entries to keep
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Worker processes may write at the same time; wait for their locks
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        with self._db:
+            self._db.executescript(SCHEMA)
+            self._db.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def get(self, image_hash: str, pipeline_hash: str) -> Optional[CachedResult]:
+        """The cached result, marked as recently used, or None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT confluency, mask, stats FROM entries "
+                "WHERE image_hash = ? AND pipeline_hash = ?",
+                (image_hash, pipeline_hash),
+            ).fetchone()
+            if row is None:
+                return None
+            with self._db:
+                self._db.execute(
+                    "UPDATE entries SET last_used = ? "
+                    "WHERE image_hash = ? AND pipeline_hash = ?",
+                    (time.time(), image_hash, pipeline_hash),
+                )
+        confluency, mask, stats = row
+        try:
+            mask = decode_mask(mask) if mask is not None else None
+        except ValueError as e:
+            logger.warning(f"Ignoring corrupt cache entry {image_hash}: {e}")
+            return None
+        return CachedResult(confluency, mask, json.loads(stats))
+
+    def put(
+        self,
+        image_hash: str,
+        pipeline_hash: str,
+        confluency: Optional[float],
+        mask: Optional[np.ndarray],
+        stats: Optional[Dict[str, Any]] = None,
+    ):
+        """Store a result (replacing any entry for the key) and evict."""
+        blob = encode_mask(mask) if mask is not None else None
+        stats_text = json.dumps(stats or {})
+        size = ROW_OVERHEAD + len(stats_text) + (len(blob) if blob else 0)
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (image_hash, pipeline_hash, "
+                "confluency, mask, stats, size, created, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    image_hash,
+                    pipeline_hash,
+                    None if confluency is None else float(confluency),
+                    blob,
+                    stats_text,
+                    size,
+                    now,
+                    now,
+                ),
+            )
+            self._evict()
+
+    def _evict(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries")
+        excess = total.fetchone()[0] - self.max_bytes
+        if excess <= 0:
+            return
+        victims = []
+        for image_hash, pipeline_hash, size in self._db.execute(
+            "SELECT image_hash, pipeline_hash, size FROM entries "
+            "ORDER BY last_used, created"
+        ):
+            victims.append((image_hash, pipeline_hash))
+            excess -= size
+            if excess <= 0:
+                break
+        self._db.executemany(
+            "DELETE FROM entries WHERE image_hash = ? AND pipeline_hash = ?",
+            victims,
+        )
+        logger.info(f"Evicted {len(victims)} result cache entries")
+
+    def stats(self) -> Dict[str, int]:
+        """Number of entries and their bytes."""
+        with self._lock:
+            count, size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        return {"entries": count, "bytes": size}
+
+    def clear(self):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM entries")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self) -> "ResultCache":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
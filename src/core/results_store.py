@@ -0,0 +1,353 @@
+"""
+Results Store
+
+Embedded SQLite database of batch results, implementing the BatchJob and
+ConfluencyResult entities of the data model:
+
+- pipelines: each distinct pipeline (by hash) with its JSON definition
+- jobs: one batch run (BatchJob) of a pipeline over a plate / folder
+- images: image files, by path and content hash
+- results: one row per image per job (ConfluencyResult)
+
+The database runs in WAL mode, so the GUI can query it while a batch
+writes. Results are buffered and written in batches of ``batch_size`` rows,
+one transaction each, to keep up with the batch runner's writer thread.
+Indexes cover the common queries: results per job, per plate, per
+pipeline and by time.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from ..models.pipeline_model import Pipeline
+from .batch_runner import BatchItemResult, BatchRunner
+from .pipeline_identity import pipeline_hash
+
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pipelines (
+    id INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL UNIQUE,
+    name TEXT,
+    definition TEXT NOT NULL,
+    created REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    pipeline_id INTEGER NOT NULL REFERENCES pipelines(id),
+    plate TEXT,
+    input_dir TEXT,
+    output_dir TEXT,
+    status TEXT NOT NULL,
+    started REAL NOT NULL,
+    finished REAL
+);
+CREATE TABLE IF NOT EXISTS images (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    content_hash TEXT NOT NULL DEFAULT '',
+    UNIQUE (path, content_hash)
+);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    job_id INTEGER NOT NULL REFERENCES jobs(id),
+    image_id INTEGER NOT NULL REFERENCES images(id),
+    success INTEGER NOT NULL,
+    skipped INTEGER NOT NULL DEFAULT 0,
+    confluency REAL,
+    error_message TEXT,
+    execution_time_ms REAL,
+    output_paths TEXT,
+    processed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_plate ON jobs (plate);
+CREATE INDEX IF NOT EXISTS idx_jobs_pipeline ON jobs (pipeline_id);
+CREATE INDEX IF NOT EXISTS idx_results_job ON results (job_id);
+CREATE INDEX IF NOT EXISTS idx_results_image ON results (image_id);
+CREATE INDEX IF NOT EXISTS idx_results_processed ON results (processed);
+"""
+
+# Columns of the rows returned by ResultsStore.results()
+RESULT_COLUMNS = (
+    "job_id",
+    "plate",
+    "pipeline_hash",
+    "path",
+    "content_hash",
+    "success",
+    "skipped",
+    "confluency",
+    "error_message",
+    "execution_time_ms",
+    "output_paths",
+    "processed",
+)
+
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_CANCELLED = "cancelled"
+
+
+class ResultsStore:
+    """
+    SQLite store of batch jobs and their per-image results.
+
+    Safe to share between threads; each call holds the store's lock.
+    """
+
+    def __init__(self, path: str, batch_size: int = 64):
+        """
+        Args:
+            path: Database file (created if missing)
+            batch_size: Results buffered before they are written
+        """
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self._lock = threading.Lock()
+        # (job_id, result, processed) waiting to be written
+        self._pending: List[Tuple[int, BatchItemResult, float]] = []
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # WAL stays consistent on a crash with NORMAL; only the last
+        # commits can be lost
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("PRAGMA foreign_keys=ON")
+        with self._db:
+            self._db.executescript(SCHEMA)
+            self._db.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    @property
+    def journal_mode(self) -> str:
+        return self._db.execute("PRAGMA journal_mode").fetchone()[0]
+
+    def start_job(
+        self,
+        pipeline: Pipeline,
+        plate: Optional[str] = None,
+        input_dir: Optional[str] = None,
+        output_dir: Optional[str] = None,
+    ) -> int:
+        """Record a new running job; returns its ID."""
+        digest = pipeline_hash(pipeline)
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR IGNORE INTO pipelines (hash, name, definition, created) "
+                "VALUES (?, ?, ?, ?)",
+                (digest, pipeline.name, json.dumps(pipeline.to_dict()), now),
+            )
+            cursor = self._db.execute(
+                "INSERT INTO jobs (pipeline_id, plate, input_dir, output_dir, "
+                "status, started) "
+                "SELECT id, ?, ?, ?, ?, ? FROM pipelines WHERE hash = ?",
+                (plate, input_dir, output_dir, JOB_RUNNING, now, digest),
+            )
+        logger.info(f"Started batch job {cursor.lastrowid} (plate {plate})")
+        return cursor.lastrowid
+
+    def add_result(self, job_id: int, result: BatchItemResult):
+        """Buffer a result; written once ``batch_size`` results are pending."""
+        with self._lock:
+            self._pending.append((job_id, result, time.time()))
+            if len(self._pending) >= self.batch_size:
+                self._write_pending()
+
+    def finish_job(self, job_id: int, status: str = JOB_COMPLETED):
+        """Write pending results and close the job."""
+        with self._lock:
+            self._write_pending()
+            with self._db:
+                self._db.execute(
+                    "UPDATE jobs SET status = ?, finished = ? WHERE id = ?",
+                    (status, time.time(), job_id),
+                )
+
+    def flush(self):
+        """Write pending results now."""
+        with self._lock:
+            self._write_pending()
+
+    def _write_pending(self):
+        if not self._pending:
+            return
+        images = {
+            (result.path, result.content_hash or "") for _, result, _ in self._pending
+        }
+        with self._db:
+            self._db.executemany(
+                "INSERT OR IGNORE INTO images (path, content_hash) VALUES (?, ?)",
+                images,
+            )
+            self._db.executemany(
+                "INSERT INTO results (job_id, image_id, success, skipped, "
+                "confluency, error_message, execution_time_ms, output_paths, "
+                "processed) "
+                "SELECT ?, id, ?, ?, ?, ?, ?, ?, ? FROM images "
+                "WHERE path = ? AND content_hash = ?",
+                [
+                    (
+                        job_id,
+                        int(result.success),
+                        int(result.skipped),
+                        result.confluency,
+                        result.error_message,
+                        result.execution_time_ms,
+                        json.dumps(result.output_paths or {}),
+                        processed,
+                        result.path,
+                        result.content_hash or "",
+                    )
+                    for job_id, result, processed in self._pending
+                ],
+            )
+        self._pending.clear()
+
+    def run_job(
+        self,
+        runner: BatchRunner,
+        inputs: Union[str, List[str]],
+        plate: Optional[str] = None,
+        progress_callback: Optional[Callable[[int, int, BatchItemResult], None]] = None,
+    ) -> Tuple[int, List[BatchItemResult]]:
+        """
+        Run a batch as a recorded job.
+
+        Args:
+            runner: Runner to use
+            inputs: Folder or list of image files (as for BatchRunner.run)
+            plate: Plate name (the folder's name if None and a folder is given)
+            progress_callback: Passed to BatchRunner.run
+
+        Returns:
+            (job ID, results in input order)
+        """
+        input_dir = inputs if isinstance(inputs, str) else None
+        if plate is None and input_dir is not None:
+            plate = os.path.basename(os.path.normpath(input_dir))
+        job_id = self.start_job(runner.pipeline, plate, input_dir, runner.output_dir)
+
+        def on_result(done: int, total: int, result: BatchItemResult):
+            self.add_result(job_id, result)
+            if progress_callback:
+                progress_callback(done, total, result)
+
+        status = JOB_CANCELLED
+        try:
+            results = runner.run(inputs, progress_callback=on_result)
+            status = JOB_COMPLETED
+        finally:
+            self.finish_job(job_id, status)
+        return job_id, results
+
+    def results(
+        self,
+        job_id: Optional[int] = None,
+        plate: Optional[str] = None,
+        pipeline: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        success: Optional[bool] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Query results; every given filter must match.
+
+        Args:
+            job_id: Results of one job
+            plate: Results of jobs on a plate
+            pipeline: Results of a pipeline, by pipeline hash
+            since, until: Unix time range of processing (inclusive)
+            success: Only successful (True) or failed (False) images
+
+        Returns:
+            Rows with the RESULT_COLUMNS, in processing order
+        """
+        filters = {
+            "r.job_id = ?": job_id,
+            "j.plate = ?": plate,
+            "p.hash = ?": pipeline,
+            "r.processed >= ?": since,
+            "r.processed <= ?": until,
+            "r.success = ?": None if success is None else int(success),
+        }
+        where = [clause for clause, value in filters.items() if value is not None]
+        params = [value for value in filters.values() if value is not None]
+        sql = (
+            "SELECT r.job_id, j.plate, p.hash AS pipeline_hash, i.path, "
+            "i.content_hash, r.success, r.skipped, r.confluency, "
+            "r.error_message, r.execution_time_ms, r.output_paths, r.processed "
+            "FROM results r "
+            "JOIN jobs j ON j.id = r.job_id "
+            "JOIN pipelines p ON p.id = j.pipeline_id "
+            "JOIN images i ON i.id = r.image_id"
+        )
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY r.id"
+
+        with self._lock:
+            self._write_pending()
+            rows = self._db.execute(sql, params).fetchall()
+        results = []
+        for row in rows:
+            entry = dict(row)
+            entry["success"] = bool(entry["success"])
+            entry["skipped"] = bool(entry["skipped"])
+            entry["output_paths"] = json.loads(entry["output_paths"] or "{}")
+            results.append(entry)
+        return results
+
+    def jobs(
+        self, plate: Optional[str] = None, pipeline: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Jobs (newest first) with image, failure and mean confluency counts."""
+        filters = {"j.plate = ?": plate, "p.hash = ?": pipeline}
+        where = [clause for clause, value in filters.items() if value is not None]
+        params = [value for value in filters.values() if value is not None]
+        sql = (
+            "SELECT j.id, j.plate, j.input_dir, j.output_dir, j.status, "
+            "j.started, j.finished, p.hash AS pipeline_hash, "
+            "p.name AS pipeline_name, "
+            "COUNT(r.id) AS images, "
+            "COALESCE(SUM(r.success = 0), 0) AS failed, "
+            "AVG(r.confluency) AS mean_confluency "
+            "FROM jobs j "
+            "JOIN pipelines p ON p.id = j.pipeline_id "
+            "LEFT JOIN results r ON r.job_id = j.id"
+        )
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " GROUP BY j.id ORDER BY j.id DESC"
+
+        with self._lock:
+            self._write_pending()
+            return [dict(row) for row in self._db.execute(sql, params).fetchall()]
+
+    def table_rows(self, job_id: int) -> List[Tuple[str, Optional[float], str]]:
+        """(file name, confluency, status) rows for the batch results table."""
+        rows = []
+        for entry in self.results(job_id=job_id):
+            name = os.path.basename(entry["path"])
+            status = "done" if entry["success"] else "failed"
+            rows.append((name, entry["confluency"], status))
+        return rows
+
+    def close(self):
+        self.flush()
+        self._db.close()
+
+    def __enter__(self) -> "ResultsStore":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
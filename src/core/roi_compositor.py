@@ -0,0 +1,117 @@
+"""
+ROI Compositor
+
+Keeps a full-size preview frame that is filled in region by region as the
+user zooms and pans. Regions that were already computed for the current
+image and execution plan are reused; only the uncovered part of a new
+viewport has to be run through the pipeline.
+"""
+
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .pipeline_step import freeze
+
+
+Rect = Tuple[int, int, int, int]  # (x, y, width, height) in image pixels
+
+
+def clip_rect(rect: Rect, width: int, height: int) -> Optional[Rect]:
+    """Clip a rect to the image bounds; None if nothing is left."""
+    x, y, w, h = (int(round(v)) for v in rect)
+    x0, y0 = max(0, x), max(0, y)
+    x1, y1 = min(width, x + w), min(height, y + h)
+    if x1 <= x0 or y1 <= y0:
+        return None
+    return x0, y0, x1 - x0, y1 - y0
+
+
+def expand_rect(rect: Rect, margin: int, width: int, height: int) -> Rect:
+    """Grow a rect by ``margin`` pixels on every side, within the image."""
+    x, y, w, h = rect
+    grown = (x - margin, y - margin, w + 2 * margin, h + 2 * margin)
+    return clip_rect(grown, width, height)
+
+
+def _match_channels(image: np.ndarray, like: np.ndarray) -> np.ndarray:
+    """Convert an input frame to the channel layout and dtype of a result."""
+    if image.dtype == like.dtype:
+        if image.ndim == 3 and like.ndim == 2:
+            return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        if image.ndim == 2 and like.ndim == 3 and like.shape[2] == 3:
+            return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+        if image.shape[2:] == like.shape[2:]:
+            return image.copy()
+    return np.zeros(image.shape[:2] + like.shape[2:], dtype=like.dtype)
+
+
+class RoiCompositor:
+    """
+    Full-size preview frame assembled from computed regions.
+
+    Pixels outside every computed region show the input image, converted to
+    the pipeline output's channel layout. The frame is read-only and
+    replaced (not modified) on each paste, so frames already handed to the
+    UI stay valid.
+    """
+
+    def __init__(self):
+        self.frame: Optional[np.ndarray] = None
+        self._valid: Optional[np.ndarray] = None
+        self._key: Optional[Tuple] = None
+
+    def reset(self, key: Optional[Tuple] = None):
+        """Forget all computed regions; ``key`` identifies the new content."""
+        self.frame = None
+        self._valid = None
+        self._key = key
+
+    def matches(self, key: Tuple) -> bool:
+        """Whether computed regions belong to ``key`` (image + plan)."""
+        return self._key == key
+
+    def missing(self, rect: Rect) -> Optional[Rect]:
+        """Bounding rect of the pixels in ``rect`` not computed yet."""
+        x, y, w, h = rect
+        if self._valid is None:
+            return rect
+        todo = ~self._valid[y : y + h, x : x + w]
+        if not todo.any():
+            return None
+        rows = np.flatnonzero(todo.any(axis=1))
+        cols = np.flatnonzero(todo.any(axis=0))
+        return (
+            x + int(cols[0]),
+            y + int(rows[0]),
+            int(cols[-1] - cols[0]) + 1,
+            int(rows[-1] - rows[0]) + 1,
+        )
+
+    def paste(self, rect: Rect, tile: np.ndarray, source: np.ndarray) -> np.ndarray:
+        """
+        Copy a computed tile into the frame and mark it valid.
+
+        Args:
+            rect: Where the tile goes in the full frame
+            tile: Pipeline output for exactly that rect
+            source: Full input image, used to fill the frame on first paste
+
+        Returns:
+            The new (read-only) frame
+        """
+        x, y, w, h = rect
+        if (
+            self.frame is None
+            or self.frame.shape[2:] != tile.shape[2:]
+            or self.frame.dtype != tile.dtype
+        ):
+            frame = _match_channels(source, tile)
+            self._valid = np.zeros(source.shape[:2], dtype=bool)
+        else:
+            frame = self.frame.copy()
+        frame[y : y + h, x : x + w] = tile
+        self._valid[y : y + h, x : x + w] = True
+        self.frame = freeze(frame)
+        return self.frame
@@ -0,0 +1,181 @@
+"""
+Shared Memory Transport
+
+Moves decoded frames and results between the batch runner and its worker
+processes through ``multiprocessing.shared_memory`` instead of pickling
+them. Pickling copies every frame into the pipe and out again, for the
+input on its way to the worker and for the output image and mask on their
+way back.
+
+The parent keeps a ring of reusable slots, one per image in flight. It
+copies each decoded frame into a free slot and sends the worker a
+SlotHandle (slot index, segment name, shape and dtype) instead of pixels.
+The worker maps the frame without copying and writes its output image and
+mask back into the same slot, behind the frame. The writer thread reads
+them from there and frees the slot once the outputs are written.
+
+Slots grow when a larger image arrives. Outputs that do not fit their slot
+are pickled as before.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+# Offsets of arrays in a slot are aligned to this many bytes
+ALIGNMENT = 64
+
+# Room reserved behind a frame per pixel for the outputs: a BGR uint8
+# result image and a one-byte mask
+OUTPUT_BYTES_PER_PIXEL = 4
+
+# (offset, shape, dtype string) of an array inside a slot
+ArrayRef = Tuple[int, Tuple[int, ...], str]
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+@dataclass(frozen=True)
+class SlotHandle:
+    """What the parent sends a worker instead of a frame."""
+
+    index: int
+    name: str  # Shared memory segment of the slot
+    size: int  # Usable bytes of the segment
+    frame: ArrayRef
+
+
+class SlotRing:
+    """
+    Reusable shared memory slots, owned by the parent process.
+
+    acquire() blocks until a slot is free, so at most ``slot_count`` frames
+    are in shared memory at once.
+    """
+
+    def __init__(self, slot_count: int):
+        self._segments: List[Optional[shared_memory.SharedMemory]] = [
+            None
+        ] * slot_count
+        self._free = list(range(slot_count))
+        self._condition = threading.Condition()
+        self._closed = False
+
+    def __len__(self) -> int:
+        return len(self._segments)
+
+    def acquire(self, timeout: Optional[float] = None) -> Optional[int]:
+        """A free slot index, or None if none became free in time."""
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._free, timeout):
+                return None
+            return self._free.pop()
+
+    def release(self, index: int):
+        with self._condition:
+            self._free.append(index)
+            self._condition.notify()
+
+    def put(self, index: int, frame: np.ndarray, output_room: int = 0) -> SlotHandle:
+        """
+        Copy a frame into a slot, growing the slot if needed.
+
+        Args:
+            index: Slot acquired by the caller
+            frame: Decoded image
+            output_room: Bytes to keep free behind the frame for outputs
+        """
+        frame = np.ascontiguousarray(frame)
+        needed = _align(frame.nbytes) + output_room
+        segment = self._segments[index]
+        if segment is None or segment.size < needed:
+            if segment is not None:
+                segment.close()
+                segment.unlink()
+            segment = shared_memory.SharedMemory(create=True, size=max(needed, 1))
+            self._segments[index] = segment
+        ref: ArrayRef = (0, frame.shape, frame.dtype.str)
+        view_of(segment.buf, ref)[...] = frame
+        return SlotHandle(index, segment.name, segment.size, ref)
+
+    def view(self, index: int, ref: ArrayRef) -> np.ndarray:
+        """Array at ``ref`` in a slot; valid until the slot is released."""
+        return view_of(self._segments[index].buf, ref)
+
+    def close(self):
+        """Free all slots; no views of them may be used afterwards."""
+        if self._closed:
+            return
+        self._closed = True
+        for segment in self._segments:
+            if segment is not None:
+                segment.close()
+                segment.unlink()
+        self._segments = [None] * len(self._segments)
+
+
+def view_of(buffer, ref: ArrayRef) -> np.ndarray:
+    """ndarray over a shared memory buffer, without copying."""
+    offset, shape, dtype = ref
+    return np.ndarray(shape, dtype=np.dtype(dtype), buffer=buffer, offset=offset)
+
+
+class SlotClient:
+    """Worker side of a SlotRing: maps slots and writes outputs into them."""
+
+    def __init__(self):
+        # Slot index -> attached segment; replaced when the slot grows
+        self._segments: Dict[int, shared_memory.SharedMemory] = {}
+
+    def _segment(self, handle: SlotHandle) -> shared_memory.SharedMemory:
+        segment = self._segments.get(handle.index)
+        if segment is None or segment.name.lstrip("/") != handle.name.lstrip("/"):
+            if segment is not None:
+                segment.close()
+            segment = shared_memory.SharedMemory(name=handle.name)
+            self._segments[handle.index] = segment
+        return segment
+
+    def frame(self, handle: SlotHandle) -> np.ndarray:
+        """Read-only view of the slot's frame."""
+        frame = view_of(self._segment(handle).buf, handle.frame)
+        frame.flags.writeable = False
+        return frame
+
+    def put_outputs(
+        self, handle: SlotHandle, arrays: Dict[str, np.ndarray]
+    ) -> Tuple[Dict[str, ArrayRef], Dict[str, np.ndarray]]:
+        """
+        Write arrays into the slot behind its frame, as far as they fit.
+
+        Returns:
+            (name -> ArrayRef of the arrays written, arrays that did not fit)
+        """
+        buffer = self._segment(handle).buf
+        offset, shape, dtype = handle.frame
+        offset = _align(offset + int(np.prod(shape)) * np.dtype(dtype).itemsize)
+        written: Dict[str, ArrayRef] = {}
+        leftover: Dict[str, np.ndarray] = {}
+        for name, array in arrays.items():
+            if offset + array.nbytes > handle.size:
+                leftover[name] = array
+                continue
+            ref: ArrayRef = (offset, array.shape, array.dtype.str)
+            view_of(buffer, ref)[...] = array
+            written[name] = ref
+            offset = _align(offset + array.nbytes)
+        return written, leftover
+
+    def close(self):
+        for segment in self._segments.values():
+            segment.close()
+        self._segments.clear()
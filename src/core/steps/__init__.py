@@ -1,6 +1,51 @@
+from typing import Dict, Optional, Type
+
+from src.core.pipeline_step import PipelineStep
+from .input_step import InputStep
 from .grayscale_step import GrayscaleStep
 from .gaussian_blur_step import GaussianBlurStep
 from .clahe_step import ClaheStep
 from .phantast_step import PhantastStep
+from .merge_step import MergeStep
+
+# Step class for each pipeline node type (see parameter_schemas.NODE_TYPE_SPECS)
+STEP_REGISTRY: Dict[str, Type[PipelineStep]] = {
+    "input": InputStep,
+    "grayscale": GrayscaleStep,
+    "gaussian_blur": GaussianBlurStep,
+    "clahe": ClaheStep,
+    "output": PhantastStep,
+    "merge": MergeStep,
+}
+
+
+def register_step(node_type: str, step_class: Type[PipelineStep]) -> None:
+    """Register (or replace) the step class used for a node type."""
+    STEP_REGISTRY[node_type] = step_class
+
+
+def get_step_class(node_type: str) -> Optional[Type[PipelineStep]]:
+    """Get the step class for a node type."""
+    return STEP_REGISTRY.get(node_type)
+
+
+def create_step(node_type: str) -> Optional[PipelineStep]:
+    """Create a new step instance for a node type, or None if unknown."""
+    step_class = get_step_class(node_type)
+    if step_class is None:
+        return None
+    return step_class()
+
 
-__all__ = ["GrayscaleStep", "GaussianBlurStep", "ClaheStep", "PhantastStep"]
+__all__ = [
+    "InputStep",
+    "GrayscaleStep",
+    "GaussianBlurStep",
+    "ClaheStep",
+    "PhantastStep",
+    "MergeStep",
+    "STEP_REGISTRY",
+    "register_step",
+    "get_step_class",
+    "create_step",
+]
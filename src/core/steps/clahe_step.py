@@ -1,14 +1,26 @@
 import cv2
 import numpy as np
 from src.core.pipeline_step import PipelineStep, StepParameter
-from typing import List
+from typing import Any, Dict, List, Set, Tuple
 
 
 class ClaheStep(PipelineStep):
     """Apply Contrast Limited Adaptive Histogram Equalization."""
 
+    param_aliases = {"grid_size": "tile_grid_size"}
+
+    # cv2.CLAHE works on 8- and 16-bit single-channel images; BGR input is
+    # converted to gray first
+    input_dtypes = ("uint8", "uint16")
+    input_channels = (1, 3)
+    output_channels = 1
+
+    # Tiles are laid out on the processed region, not the frame
+    roi_exact = False
+
     def __init__(self):
         super().__init__()
+        self._clahe = None
         self.set_param("clip_limit", 2.0)
         self.set_param("tile_grid_size", 8)
 
@@ -32,17 +44,46 @@ class ClaheStep(PipelineStep):
             ),
         ]
 
-    def process(self, image: np.ndarray, metadata: dict) -> np.ndarray:
-        clip_limit = self.get_param("clip_limit")
-        tile_size = self.get_param("tile_grid_size")
+    def on_params_changed(self, changed: Set[str]):
+        # Rebuilt lazily on the next process() call
+        self._clahe = None
+
+    def roi_margin(self, params: Dict[str, Any], image_shape: Tuple[int, ...]) -> int:
+        # Histograms are interpolated between neighbouring tiles, so keep one
+        # full-frame tile of context. Tiles are laid out on the cropped region,
+        # so ROI results approximate the full-frame equalization.
+        grid_w, grid_h = self._tile_grid(
+            params.get("grid_size", params.get("tile_grid_size"))
+        )
+        return max(image_shape[1] // grid_w, image_shape[0] // grid_h)
 
+    def _tile_grid(self, tile_size=None) -> Tuple[int, int]:
+        """Tile grid as (width, height); accepts an int or a 2-sequence."""
+        if tile_size is None:
+            tile_size = self.get_param("tile_grid_size")
+        if isinstance(tile_size, (list, tuple)):
+            return int(tile_size[0]), int(tile_size[1])
+        return int(tile_size), int(tile_size)
+
+    def _equalizer(self):
+        if self._clahe is None:
+            self._clahe = cv2.createCLAHE(
+                clipLimit=float(self.get_param("clip_limit")),
+                tileGridSize=self._tile_grid(),
+            )
+        return self._clahe
+
+    @staticmethod
+    def _gray(image: np.ndarray) -> np.ndarray:
         # Convert to grayscale if needed
         if len(image.shape) == 3:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        else:
-            gray = image
+            return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        return image
 
-        clahe = cv2.createCLAHE(
-            clipLimit=clip_limit, tileGridSize=(tile_size, tile_size)
-        )
-        return clahe.apply(gray)
+    def process(self, image: np.ndarray, metadata: dict) -> np.ndarray:
+        return self._equalizer().apply(self._gray(image))
+
+    def process_into(
+        self, image: np.ndarray, metadata: dict, out: np.ndarray
+    ) -> np.ndarray:
+        return self._equalizer().apply(self._gray(image), out)
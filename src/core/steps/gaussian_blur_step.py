@@ -1,14 +1,18 @@
 import cv2
 import numpy as np
 from src.core.pipeline_step import PipelineStep, StepParameter
-from typing import List
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 
 class GaussianBlurStep(PipelineStep):
     """Apply Gaussian blur to reduce noise."""
 
+    # Depths cv2.GaussianBlur supports; any channel count
+    input_dtypes = ("uint8", "uint16", "int16", "float32", "float64")
+
     def __init__(self):
         super().__init__()
+        self._ksize: Optional[Tuple[int, int]] = None
         self.set_param("kernel_size", 5)
         self.set_param("sigma", 0)
 
@@ -32,10 +36,38 @@ class GaussianBlurStep(PipelineStep):
             ),
         ]
 
+    def scale_params(self, params: Dict[str, Any], scale: float) -> Dict[str, Any]:
+        scaled = dict(params)
+        if "kernel_size" in params:
+            k = max(1, int(round(params["kernel_size"] * scale)))
+            scaled["kernel_size"] = k if k % 2 == 1 else k + 1
+        if params.get("sigma"):
+            scaled["sigma"] = params["sigma"] * scale
+        return scaled
+
+    def roi_margin(self, params: Dict[str, Any], image_shape: Tuple[int, ...]) -> int:
+        # Kernel radius
+        return int(params.get("kernel_size", self.get_param("kernel_size"))) // 2
+
+    def on_params_changed(self, changed: Set[str]):
+        if "kernel_size" in changed:
+            self._ksize = None
+
+    def _kernel(self) -> Tuple[int, int]:
+        if self._ksize is None:
+            k = int(self.get_param("kernel_size"))
+            # Ensure kernel size is odd
+            if k % 2 == 0:
+                k += 1
+            self._ksize = (k, k)
+        return self._ksize
+
     def process(self, image: np.ndarray, metadata: dict) -> np.ndarray:
-        k = self.get_param("kernel_size")
-        sigma = self.get_param("sigma")
-        # Ensure kernel size is odd
-        if k % 2 == 0:
-            k += 1
-        return cv2.GaussianBlur(image, (k, k), sigma)
+        return cv2.GaussianBlur(image, self._kernel(), float(self.get_param("sigma")))
+
+    def process_into(
+        self, image: np.ndarray, metadata: dict, out: np.ndarray
+    ) -> np.ndarray:
+        return cv2.GaussianBlur(
+            image, self._kernel(), float(self.get_param("sigma")), dst=out
+        )
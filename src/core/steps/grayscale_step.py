@@ -6,9 +6,21 @@ from src.core.pipeline_step import PipelineStep
 class GrayscaleStep(PipelineStep):
     """Convert image to grayscale."""
 
+    # Depths cv2.cvtColor supports
+    input_dtypes = ("uint8", "uint16", "float32")
+    input_channels = (1, 3)
+    output_channels = 1
+
     def process(self, image: np.ndarray, metadata: dict) -> np.ndarray:
         # If already grayscale, return as-is
         if len(image.shape) == 2:
             return image
         # Convert BGR to grayscale
         return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+    def process_into(
+        self, image: np.ndarray, metadata: dict, out: np.ndarray
+    ) -> np.ndarray:
+        if len(image.shape) == 2:
+            return image
+        return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY, dst=out)
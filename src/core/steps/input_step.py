@@ -0,0 +1,9 @@
+import numpy as np
+from src.core.pipeline_step import PipelineStep
+
+
+class InputStep(PipelineStep):
+    """Pass the loaded image through unchanged (pipeline input node)."""
+
+    def process(self, image: np.ndarray, metadata: dict) -> np.ndarray:
+        return image
@@ -0,0 +1,60 @@
+import cv2
+import numpy as np
+from src.core.pipeline_step import PipelineStep, StepParameter
+from typing import List
+
+MERGE_MODES = ("mean", "min", "max")
+
+
+class MergeStep(PipelineStep):
+    """
+    Combine the outputs of several branches (fan-in node).
+
+    "mean" blends the inputs equally; "min" and "max" keep the darkest or
+    brightest pixel, which is AND and OR for binary masks. Inputs must share
+    their size and dtype; if some are gray, color inputs are converted.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.set_param("mode", "mean")
+
+    def define_params(self) -> List[StepParameter]:
+        return [
+            StepParameter(
+                name="mode",
+                param_type="choice",
+                default="mean",
+                description="How inputs are combined (mean, min, max)",
+            ),
+        ]
+
+    def process(self, image: np.ndarray, metadata: dict) -> np.ndarray:
+        # A single input has nothing to merge with
+        return image
+
+    def apply_many(self, images: List[np.ndarray], metadata: dict) -> np.ndarray:
+        if len(images) == 1:
+            return images[0]
+        mode = self.get_param("mode")
+        if mode not in MERGE_MODES:
+            raise ValueError(f"{self.name}: unknown mode {mode!r}")
+        if len({image.shape[:2] for image in images}) != 1:
+            raise ValueError(f"{self.name}: inputs differ in size")
+        if len({image.dtype for image in images}) != 1:
+            raise ValueError(f"{self.name}: inputs differ in dtype")
+
+        if any(image.ndim == 2 for image in images):
+            images = [
+                cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+                for image in images
+            ]
+
+        if mode == "min":
+            return np.minimum.reduce(images)
+        if mode == "max":
+            return np.maximum.reduce(images)
+        mean = np.mean(np.stack(images), axis=0, dtype=np.float32)
+        if np.issubdtype(images[0].dtype, np.integer):
+            mean = np.rint(mean)
+        return mean.astype(images[0].dtype)
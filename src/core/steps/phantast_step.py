@@ -1,10 +1,24 @@
 import logging
+import math
 import numpy as np
-from src.core.pipeline_step import PipelineStep, StepParameter
-from typing import List
+from src.core.pipeline_step import ImageSpec, PipelineStep, StepParameter
+from typing import Any, Dict, List, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Area thresholds (pixels) passed to process_phantast
+AREA_PARAMS = ("minimum_fill_area", "minimum_object_area", "hr_remove_small_objects")
+
+# How far (pixels) halo removal can shrink a region (its iteration limit)
+HALO_REACH = 100
+
+# Reach of the majority filter passes (2 x 20 iterations of a 3x3 window)
+MORPHOLOGY_REACH = 40
+
+# Metadata keys the step writes
+CONFLUENCY_KEY = "phantast_confluency"
+MASK_KEY = "phantast_mask"
+
 # Try to import phantast, but allow graceful degradation
 try:
     from phantast_confluency_corrected import process_phantast
@@ -15,16 +29,37 @@ except ImportError:
     logger.warning("PHANTAST module not available. PhantastStep will pass-through.")
 
 
+def render_overlay(image: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """BGR copy of ``image`` with the cells of ``mask`` drawn in green."""
+    result = image.copy()
+    if len(result.shape) == 2:
+        result = np.stack([result] * 3, axis=-1)
+    result[mask] = [0, 255, 0]  # Green in BGR
+    return result
+
+
 class PhantastStep(PipelineStep):
     """
     Apply PHANTAST cell detection.
     Creates green overlay on detected cells and stores confluency in metadata.
     """
 
+    # PHANTAST scales intensities by 1/255; the overlay is BGR
+    input_dtypes = ("uint8",)
+    input_channels = (1, 3)
+    output_channels = 3
+    # Float64 working images of the contrast filter, halo removal and
+    # morphology: about 100 bytes per pixel at the peak
+    scratch_bytes_per_pixel = 100.0
+    # Contrast stretching and area filters depend on the whole frame
+    roi_exact = False
+
     def __init__(self):
         super().__init__()
         self.set_param("sigma", 4.0)
         self.set_param("epsilon", 0.05)
+        for name in AREA_PARAMS:
+            self.set_param(name, 100)
 
     def define_params(self) -> List[StepParameter]:
         return [
@@ -46,6 +81,29 @@ class PhantastStep(PipelineStep):
             ),
         ]
 
+    def scale_params(self, params: Dict[str, Any], scale: float) -> Dict[str, Any]:
+        scaled = dict(params)
+        if "sigma" in params:
+            scaled["sigma"] = params["sigma"] * scale
+        # Areas shrink with the square of the linear scale
+        for name in AREA_PARAMS:
+            area = params.get(name, self.get_param(name))
+            scaled[name] = max(1, int(round(area * scale * scale)))
+        return scaled
+
+    def roi_margin(self, params: Dict[str, Any], image_shape: Tuple[int, ...]) -> int:
+        # Local contrast kernel radius (as in gaussian_filter_separable)
+        sigma = float(params.get("sigma", self.get_param("sigma")))
+        return math.ceil(2.9786 * sigma) + HALO_REACH + MORPHOLOGY_REACH
+
+    def output_spec(self, spec: ImageSpec) -> ImageSpec:
+        output = super().output_spec(spec)
+        # Without PHANTAST the step passes its input through
+        return output if PHANTAST_AVAILABLE else spec
+
+    def scratch_bytes(self, spec: ImageSpec) -> int:
+        return super().scratch_bytes(spec) if PHANTAST_AVAILABLE else 0
+
     def process(self, image: np.ndarray, metadata: dict) -> np.ndarray:
         if not PHANTAST_AVAILABLE:
             logger.warning("PHANTAST not available, skipping step")
@@ -56,21 +114,21 @@ class PhantastStep(PipelineStep):
 
         try:
             # Process image
-            percentage, mask = process_phantast(image, sigma, epsilon)
+            percentage, mask = process_phantast(
+                image,
+                sigma,
+                epsilon,
+                minimum_fill_area=self.get_param("minimum_fill_area"),
+                minimum_object_area=self.get_param("minimum_object_area"),
+                hr_remove_small_objects=self.get_param("hr_remove_small_objects"),
+            )
 
             # Store results in metadata
-            metadata["phantast_confluency"] = percentage
-            metadata["phantast_mask"] = mask
+            metadata[CONFLUENCY_KEY] = percentage
+            metadata[MASK_KEY] = mask
 
             # Create green overlay on detected cells
-            result = image.copy()
-            if len(result.shape) == 2:
-                result = np.stack([result] * 3, axis=-1)
-
-            # Apply green overlay where mask is True
-            result[mask] = [0, 255, 0]  # Green in BGR
-
-            return result
+            return render_overlay(image, mask)
 
         except Exception as e:
             logger.error(f"PHANTAST processing error: {e}")
@@ -0,0 +1,131 @@
+"""
+Node Telemetry
+
+Per-node timing and memory figures recorded by the pipeline executors and
+stored in each ``node_results`` entry:
+
+- ``wall_ms``: elapsed wall-clock time of the node
+- ``cpu_ms``: CPU time of the executing thread (work OpenCV spreads over
+  its own worker threads is not included)
+- ``output_bytes``: size of the node's output array
+- ``cache_hit``: whether the output came from the preview cache
+"""
+
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+
+TELEMETRY_KEYS = ("wall_ms", "cpu_ms", "output_bytes", "cache_hit")
+
+
+class NodeTimer:
+    """Context manager measuring wall and thread CPU time in milliseconds."""
+
+    def __init__(self):
+        self.wall_ms = 0.0
+        self.cpu_ms = 0.0
+
+    def __enter__(self) -> "NodeTimer":
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.thread_time()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.wall_ms = (time.perf_counter() - self._wall_start) * 1000
+        self.cpu_ms = (time.thread_time() - self._cpu_start) * 1000
+        return False
+
+
+def node_telemetry(
+    output: Optional[np.ndarray],
+    timer: Optional[NodeTimer] = None,
+    cache_hit: bool = False,
+) -> Dict[str, Any]:
+    """
+    Telemetry fields for one node.
+
+    Args:
+        output: The node's output image
+        timer: Timer that wrapped the node's work (None if it did not run,
+            e.g. nodes the compiler elided)
+        cache_hit: Whether the output came from a cache
+
+    Returns:
+        Dict with the TELEMETRY_KEYS, to merge into a node_results entry
+    """
+    return {
+        "wall_ms": timer.wall_ms if timer is not None else 0.0,
+        "cpu_ms": timer.cpu_ms if timer is not None else 0.0,
+        "output_bytes": int(output.nbytes) if output is not None else 0,
+        "cache_hit": cache_hit,
+    }
+
+
+def format_bytes(num_bytes: int) -> str:
+    """Short human-readable size (e.g. '12.0 MB')."""
+    size = float(num_bytes)
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def format_duration(ms: float) -> str:
+    """Short human-readable duration (e.g. '850 µs', '42 ms', '1.3 s')."""
+    if ms < 1:
+        return f"{ms * 1000:.0f} µs"
+    if ms < 1000:
+        return f"{ms:.0f} ms"
+    return f"{ms / 1000:.1f} s"
+
+
+def format_node_badge(entry: Dict[str, Any]) -> str:
+    """Badge text for a node_results entry."""
+    if entry.get("cache_hit"):
+        return "CACHED"
+    if "elided" in entry or "shared_with" in entry:
+        return "SKIPPED"
+    return format_duration(entry.get("wall_ms", 0.0))
+
+
+def format_node_details(entry: Dict[str, Any]) -> str:
+    """Multi-line tooltip text for a node_results entry."""
+    lines = [
+        f"Wall time: {format_duration(entry.get('wall_ms', 0.0))}",
+        f"CPU time: {format_duration(entry.get('cpu_ms', 0.0))}",
+        f"Output: {format_bytes(entry.get('output_bytes', 0))}",
+        f"Cache hit: {'yes' if entry.get('cache_hit') else 'no'}",
+    ]
+    if "elided" in entry:
+        lines.append(f"Skipped: {entry['elided']}")
+    if "shared_with" in entry:
+        lines.append(f"Shared with: {entry['shared_with']}")
+    return "\n".join(lines)
+
+
+def slowest_node(node_results: Dict[str, Dict[str, Any]]) -> Optional[str]:
+    """ID of the node with the largest wall time, if any node ran."""
+    timed = {
+        node_id: entry.get("wall_ms", 0.0)
+        for node_id, entry in node_results.items()
+        if entry.get("wall_ms", 0.0) > 0
+    }
+    if not timed:
+        return None
+    return max(timed, key=timed.get)
+
+
+def summarize(node_results: Dict[str, Dict[str, Any]], total_ms: float) -> str:
+    """One-line status bar summary naming the slowest node."""
+    text = f"Preview updated in {format_duration(total_ms)}"
+    node_id = slowest_node(node_results or {})
+    if node_id is None:
+        return text
+    entry = node_results[node_id]
+    wall_ms = entry["wall_ms"]
+    share = f" ({wall_ms / total_ms:.0%})" if total_ms > 0 else ""
+    name = entry.get("name", node_id)
+    return f"{text} - slowest: {name} {format_duration(wall_ms)}{share}"
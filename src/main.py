@@ -11,6 +11,8 @@ def main():
     so no external MVC setup is needed.
     """
     app = QApplication(sys.argv)
+    # Names the application data folder (result cache)
+    app.setApplicationName("PhantastLab")
 
     # Create main window (includes controller and unified UI)
     window = MainWindow()
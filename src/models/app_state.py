@@ -55,10 +55,7 @@ class AppState:
 
     def get_node(self, node_id: str) -> Optional[PipelineNode]:
         """Get node by ID."""
-        for node in self.pipeline.nodes:
-            if node.id == node_id:
-                return node
-        return None
+        return self.pipeline.get_node(node_id)
 
     def get_selected_node(self) -> Optional[PipelineNode]:
         """Get currently selected node."""
@@ -120,10 +117,17 @@ class AppState:
 
     def get_node_index(self, node_id: str) -> int:
         """Get index of node in pipeline. Returns -1 if not found."""
-        for i, node in enumerate(self.pipeline.nodes):
-            if node.id == node_id:
-                return i
-        return -1
+        return self.pipeline.index_of(node_id)
+
+    @property
+    def pipeline_version(self) -> int:
+        """Monotonic version of the pipeline; changes on every edit."""
+        return self.pipeline.version
+
+    def get_node_version(self, node_id: str) -> int:
+        """Monotonic version of a node, or -1 if not found."""
+        node = self.get_node(node_id)
+        return node.version if node is not None else -1
 
     def can_move_node(self, node_id: str, new_index: int) -> bool:
         """
@@ -161,13 +165,7 @@ class AppState:
         if not self.can_move_node(node_id, new_index):
             return False
 
-        current_index = self.get_node_index(node_id)
-        if current_index == -1:
-            return False
-
-        node = self.pipeline.nodes.pop(current_index)
-        self.pipeline.nodes.insert(new_index, node)
-        return True
+        return self.pipeline.move_node(node_id, new_index)
 
     def insert_node_between(self, node: PipelineNode, after_node_id: str) -> bool:
         """
@@ -186,7 +184,7 @@ class AppState:
         if insert_index >= len(self.pipeline.nodes):
             return False
 
-        self.pipeline.nodes.insert(insert_index, node)
+        self.pipeline.insert_node(insert_index, node)
         return True
 
     def remove_node(self, node_id: str) -> bool:
@@ -206,7 +204,7 @@ class AppState:
         if node.type in ("input", "output"):
             return False
 
-        self.pipeline.nodes.pop(index)
+        self.pipeline.remove_node(node_id)
 
         # Clear selection if removed node was selected
         if self.selected_node_id == node_id:
@@ -226,13 +224,14 @@ class AppState:
 
         # Insert before output (last node)
         output_index = len(self.pipeline.nodes) - 1
-        self.pipeline.nodes.insert(output_index, node)
+        self.pipeline.insert_node(output_index, node)
         return True
 
     def update_node_parameter(self, node_id: str, param_name: str, value: Any) -> bool:
         """
         Update a parameter value for a node.
 
+        Bumps the node's version if the value changed.
         Returns True if update succeeded.
         """
         node = self.get_node(node_id)
@@ -1,7 +1,249 @@
+import itertools
 import json
 import os
+from collections.abc import Mapping
 from dataclasses import dataclass, field
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, Tuple, Union
+
+# Global, monotonic source of version numbers. Using one counter for every
+# node and pipeline makes versions unique, so a version identifies one state.
+_versions = itertools.count(1)
+
+
+def next_version() -> int:
+    """Return a new version number, larger than every earlier one."""
+    return next(_versions)
+
+
+class NodeParameters(dict):
+    """Parameter dict that bumps its node's version when modified."""
+
+    def __init__(self, owner: "PipelineNode", items=()):
+        super().__init__(items)
+        self._owner = owner
+
+    def _changed(self):
+        owner = getattr(self, "_owner", None)
+        if owner is not None:
+            owner.touch()
+
+    def __setitem__(self, key, value):
+        if key in self and self[key] == value:
+            return
+        super().__setitem__(key, value)
+        self._changed()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._changed()
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._changed()
+
+    def pop(self, *args):
+        result = super().pop(*args)
+        self._changed()
+        return result
+
+    def popitem(self):
+        result = super().popitem()
+        self._changed()
+        return result
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+
+class FrozenDict(Mapping):
+    """Immutable, hashable mapping used for snapshot parameters and outputs."""
+
+    __slots__ = ("_items", "_hash")
+
+    def __init__(self, items=()):
+        self._items = dict(items)
+        self._hash = None
+
+    def __getitem__(self, key):
+        return self._items[key]
+
+    def __iter__(self) -> Iterator:
+        return iter(self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            self._hash = hash(frozenset(self._items.items()))
+        return self._hash
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, FrozenDict):
+            return self._items == other._items
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"FrozenDict({self._items!r})"
+
+
+def _freeze_value(value: Any) -> Any:
+    """Recursively convert lists and dicts to hashable equivalents."""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze_value(v) for v in value)
+    if isinstance(value, dict):
+        return FrozenDict((k, _freeze_value(v)) for k, v in value.items())
+    return value
+
+
+def _freeze_params(params: Dict[str, Any]) -> FrozenDict:
+    return FrozenDict((name, _freeze_value(value)) for name, value in params.items())
+
+
+class PipelineGraph:
+    """
+    Graph queries shared by Pipeline and PipelineSnapshot.
+
+    Subclasses provide ``nodes`` (ordered node sequence) and ``outputs``
+    (output name -> node ID).
+    """
+
+    def is_linear(self) -> bool:
+        """True if no node declares explicit inputs (plain node list)."""
+        return all(not node.inputs for node in self.nodes) and not self.outputs
+
+    def get_node_inputs(self, node_id: str) -> List[str]:
+        """Resolved upstream node IDs for a node."""
+        for i, node in enumerate(self.nodes):
+            if node.id == node_id:
+                if node.inputs:
+                    return list(node.inputs)
+                if node.type == "input" or i == 0:
+                    return []
+                return [self.nodes[i - 1].id]
+        return []
+
+    def get_outputs(self) -> Dict[str, str]:
+        """Named outputs, defaulting to all sink nodes keyed by node ID."""
+        if self.outputs:
+            return dict(self.outputs)
+        consumed = {
+            upstream
+            for node in self.nodes
+            for upstream in self.get_node_inputs(node.id)
+        }
+        return {node.id: node.id for node in self.nodes if node.id not in consumed}
+
+    def topological_order(self) -> List[Any]:
+        """
+        Nodes ordered so that every node comes after its inputs.
+
+        Ties keep the order of ``nodes``. Raises ValueError on cycles or
+        unknown input IDs.
+        """
+        by_id = {node.id: node for node in self.nodes}
+        remaining = {node.id: set(self.get_node_inputs(node.id)) for node in self.nodes}
+        for node_id, deps in remaining.items():
+            unknown = deps - by_id.keys()
+            if unknown:
+                raise ValueError(f"Node {node_id}: unknown inputs {sorted(unknown)}")
+
+        order: List[Any] = []
+        done: set = set()
+        while remaining:
+            ready = [
+                n.id
+                for n in self.nodes
+                if n.id in remaining and remaining[n.id] <= done
+            ]
+            if not ready:
+                raise ValueError(f"Pipeline has a cycle among {sorted(remaining)}")
+            for node_id in ready:
+                order.append(by_id[node_id])
+                done.add(node_id)
+                del remaining[node_id]
+        return order
+
+
+@dataclass(frozen=True)
+class NodeSnapshot:
+    """
+    Immutable copy of a PipelineNode, safe to read from worker threads.
+
+    Parameters are a FrozenDict (lists become tuples), so snapshots are
+    hashable and compare by value.
+    """
+
+    id: str
+    type: str
+    name: str
+    description: str
+    icon: str
+    status: str
+    enabled: bool
+    parameters: FrozenDict = field(default_factory=FrozenDict)
+    inputs: Tuple[str, ...] = ()
+    # Version of the node this was taken from (not part of equality)
+    version: int = field(default=0, compare=False)
+
+
+@dataclass(frozen=True)
+class PipelineSnapshot(PipelineGraph):
+    """
+    Immutable copy of a Pipeline, captured once per execution.
+
+    Unchanged nodes share their NodeSnapshot with earlier snapshots, so
+    taking a snapshot is cheap. The snapshot is hashable and can be used
+    directly as a cache key.
+    """
+
+    id: str = ""
+    name: str = ""
+    nodes: Tuple[NodeSnapshot, ...] = ()
+    outputs: FrozenDict = field(default_factory=FrozenDict)
+    # Version of the pipeline this was taken from (not part of equality)
+    version: int = field(default=0, compare=False)
+
+    def __hash__(self) -> int:
+        # Computed once; snapshots are immutable
+        cached = self.__dict__.get("_hash")
+        if cached is None:
+            cached = hash((self.id, self.name, self.nodes, self.outputs))
+            object.__setattr__(self, "_hash", cached)
+        return cached
+
+    def snapshot(self) -> "PipelineSnapshot":
+        return self
+
+    def get_node(self, node_id: str) -> Optional[NodeSnapshot]:
+        for node in self.nodes:
+            if node.id == node_id:
+                return node
+        return None
+
+
+_MISSING = object()
+
+# PipelineNode fields whose assignment bumps the node's version
+_NODE_FIELDS = frozenset(
+    (
+        "id",
+        "type",
+        "name",
+        "description",
+        "icon",
+        "status",
+        "enabled",
+        "parameters",
+        "inputs",
+    )
+)
 
 
 @dataclass
@@ -14,6 +256,56 @@ class PipelineNode:
     status: str
     enabled: bool
     parameters: Dict[str, Any] = field(default_factory=dict)
+    # Upstream node IDs. Empty means "the previous node in Pipeline.nodes",
+    # which keeps plain lists of nodes working as linear pipelines.
+    inputs: List[str] = field(default_factory=list)
+    # Monotonic version, bumped whenever a field or parameter changes
+    version: int = field(default=0, init=False, repr=False, compare=False)
+    # Last snapshot, reused while the node is unchanged
+    _snapshot: Optional[NodeSnapshot] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def __setattr__(self, name: str, value: Any):
+        if name in _NODE_FIELDS:
+            if name == "parameters" and not (
+                isinstance(value, NodeParameters) and value._owner is self
+            ):
+                value = NodeParameters(self, value)
+            if getattr(self, name, _MISSING) == value:
+                return
+            object.__setattr__(self, name, value)
+            self.touch()
+        else:
+            object.__setattr__(self, name, value)
+
+    def touch(self):
+        """Mark the node as changed (bumps its version)."""
+        object.__setattr__(self, "version", next_version())
+
+    def snapshot(self) -> NodeSnapshot:
+        """Immutable copy of the node; the same object while unchanged."""
+        snap = self._snapshot
+        # inputs is a plain list, so compare it as well as the version
+        if (
+            snap is None
+            or snap.version != self.version
+            or snap.inputs != tuple(self.inputs)
+        ):
+            snap = NodeSnapshot(
+                id=self.id,
+                type=self.type,
+                name=self.name,
+                description=self.description,
+                icon=self.icon,
+                status=self.status,
+                enabled=self.enabled,
+                parameters=_freeze_params(self.parameters),
+                inputs=tuple(self.inputs),
+                version=self.version,
+            )
+            self._snapshot = snap
+        return snap
 
     def to_dict(self) -> Dict[str, Any]:
         """Serialize node to dictionary."""
@@ -25,7 +317,8 @@ class PipelineNode:
             "icon": self.icon,
             "status": self.status,
             "enabled": self.enabled,
-            "parameters": self.parameters,
+            "parameters": dict(self.parameters),
+            "inputs": list(self.inputs),
         }
 
     @classmethod
@@ -40,14 +333,107 @@ class PipelineNode:
             status=data.get("status", "ready"),
             enabled=data.get("enabled", True),
             parameters=data.get("parameters", {}),
+            inputs=list(data.get("inputs", [])),
         )
 
 
 @dataclass
-class Pipeline:
+class Pipeline(PipelineGraph):
     id: str = ""
     name: str = "New Pipeline"
     nodes: List[PipelineNode] = field(default_factory=list)
+    # Named outputs: output name -> node ID. Empty means every sink node,
+    # named by its node ID.
+    outputs: Dict[str, str] = field(default_factory=dict)
+    # Bumped when id, name, nodes or outputs are assigned
+    structure_version: int = field(default=0, init=False, repr=False, compare=False)
+    # node ID -> index in nodes; validated on lookup, rebuilt on a miss
+    _index: Dict[str, int] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _version: int = field(default=0, init=False, repr=False, compare=False)
+    _version_state: Optional[Tuple] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def __setattr__(self, name: str, value: Any):
+        object.__setattr__(self, name, value)
+        if name in ("id", "name", "nodes", "outputs"):
+            object.__setattr__(self, "structure_version", next_version())
+
+    @property
+    def version(self) -> int:
+        """
+        Monotonic version of the pipeline and all of its nodes.
+
+        Changes whenever a node field or parameter changes, nodes are added,
+        removed or reordered, or outputs are assigned. Comparing versions is
+        a cheap validity check for cached results: it compares integers
+        instead of hashing parameters. (Node ``inputs`` are tracked when
+        assigned, not when the list is modified in place.)
+        """
+        # Node versions are globally unique, so this tuple identifies the
+        # node list, its order and every node's state
+        state = (self.structure_version, tuple(node.version for node in self.nodes))
+        if state != self._version_state:
+            object.__setattr__(self, "_version_state", state)
+            object.__setattr__(self, "_version", next_version())
+        return self._version
+
+    # =========================================================================
+    # Node lookup and structural edits
+    # =========================================================================
+
+    def index_of(self, node_id: str) -> int:
+        """Index of a node in ``nodes``, or -1. O(1) while the map is valid."""
+        index = self._index.get(node_id)
+        if (
+            index is not None
+            and index < len(self.nodes)
+            and self.nodes[index].id == node_id
+        ):
+            return index
+        # nodes was edited directly; rebuild the map
+        self._reindex()
+        return self._index.get(node_id, -1)
+
+    def get_node(self, node_id: str) -> Optional[PipelineNode]:
+        """Node with the given ID, or None."""
+        index = self.index_of(node_id)
+        return self.nodes[index] if index != -1 else None
+
+    def insert_node(self, index: int, node: PipelineNode):
+        """Insert a node at ``index``."""
+        self.nodes.insert(index, node)
+        self._structure_changed()
+
+    def remove_node(self, node_id: str) -> Optional[PipelineNode]:
+        """Remove and return a node, or None if it is not in the pipeline."""
+        index = self.index_of(node_id)
+        if index == -1:
+            return None
+        node = self.nodes.pop(index)
+        self._structure_changed()
+        return node
+
+    def move_node(self, node_id: str, new_index: int) -> bool:
+        """Move a node to ``new_index``. Returns False if it does not exist."""
+        index = self.index_of(node_id)
+        if index == -1:
+            return False
+        if index != new_index:
+            self.nodes.insert(new_index, self.nodes.pop(index))
+            self._structure_changed()
+        return True
+
+    def _structure_changed(self):
+        object.__setattr__(self, "structure_version", next_version())
+        self._reindex()
+
+    def _reindex(self):
+        object.__setattr__(
+            self, "_index", {node.id: i for i, node in enumerate(self.nodes)}
+        )
 
     def to_dict(self) -> Dict[str, Any]:
         """Serialize pipeline to dictionary."""
@@ -55,6 +441,7 @@ class Pipeline:
             "id": self.id,
             "name": self.name,
             "nodes": [node.to_dict() for node in self.nodes],
+            "outputs": dict(self.outputs),
         }
 
     @classmethod
@@ -65,6 +452,7 @@ class Pipeline:
             id=data.get("id", ""),
             name=data.get("name", "New Pipeline"),
             nodes=nodes,
+            outputs=dict(data.get("outputs", {})),
         )
 
     def save(self, filepath: str):
@@ -79,6 +467,21 @@ class Pipeline:
             data = json.load(f)
         return cls.from_dict(data)
 
+    def snapshot(self) -> PipelineSnapshot:
+        """
+        Capture an immutable snapshot of the pipeline.
+
+        Executors take one snapshot per run, so the GUI can keep editing
+        the live pipeline while a background thread executes.
+        """
+        return PipelineSnapshot(
+            id=self.id,
+            name=self.name,
+            nodes=tuple(node.snapshot() for node in self.nodes),
+            outputs=FrozenDict(self.outputs),
+            version=self.version,
+        )
+
     def validate(self) -> List[str]:
         """Validate pipeline configuration. Returns list of errors."""
         errors = []
@@ -92,4 +495,14 @@ class Pipeline:
             if not node.type:
                 errors.append(f"Node {i}: Type is required")
 
+        node_ids = {node.id for node in self.nodes}
+        for name, node_id in self.outputs.items():
+            if node_id not in node_ids:
+                errors.append(f"Output '{name}': unknown node {node_id}")
+
+        try:
+            self.topological_order()
+        except ValueError as e:
+            errors.append(str(e))
+
         return errors
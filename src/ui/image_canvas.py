@@ -152,6 +152,8 @@ class FloatingToolbar(QWidget):
 
 class ImageCanvas(QGraphicsView):
     zoom_changed = pyqtSignal(int)
+    # (x, y, width, height) of the visible image area, or None if all of it
+    visible_region_changed = pyqtSignal(object)
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -178,6 +180,7 @@ class ImageCanvas(QGraphicsView):
         self.pan_active = False
         self._is_panning = False
         self._pan_start_pos = QPointF()
+        self._visible_region = None
 
         # Floating toolbar
         self.floating_toolbar = FloatingToolbar(self)
@@ -207,6 +210,7 @@ class ImageCanvas(QGraphicsView):
         self.fitInView(self._scene.sceneRect(), Qt.AspectRatioMode.KeepAspectRatio)
         self.current_scale = self.transform().m11()
         self.zoom_changed.emit(self.get_current_zoom_percentage())
+        self._update_visible_region()
 
         # Show toolbar
         self.floating_toolbar.show()
@@ -220,9 +224,12 @@ class ImageCanvas(QGraphicsView):
             self.floating_toolbar.hide()
             return
 
+        # Keep zoom and pan when a preview replaces a frame of the same size
+        same_size = pixmap.size() == self.pixmap_item.pixmap().size()
         self.pixmap_item.setPixmap(pixmap)
-        self._scene.setSceneRect(self.pixmap_item.boundingRect())
-        self.fit_to_view()
+        if not same_size:
+            self._scene.setSceneRect(self.pixmap_item.boundingRect())
+            self.fit_to_view()
 
         # Show toolbar
         self.floating_toolbar.show()
@@ -258,6 +265,7 @@ class ImageCanvas(QGraphicsView):
         zoom_pct = self.get_current_zoom_percentage()
         self.zoom_changed.emit(zoom_pct)
         self.floating_toolbar.set_zoom_percentage(zoom_pct)
+        self._update_visible_region()
 
     def fit_to_view(self):
         """Fit image to canvas view."""
@@ -267,6 +275,7 @@ class ImageCanvas(QGraphicsView):
             zoom_pct = self.get_current_zoom_percentage()
             self.zoom_changed.emit(zoom_pct)
             self.floating_toolbar.set_zoom_percentage(zoom_pct)
+            self._update_visible_region()
 
     def get_current_zoom_percentage(self) -> int:
         """Returns the zoom percentage as an integer."""
@@ -274,6 +283,37 @@ class ImageCanvas(QGraphicsView):
         # A more robust approach would compare viewport size to scene rect
         return int(self.current_scale * 100)
 
+    def visible_image_rect(self):
+        """
+        Image area currently shown in the viewport.
+
+        Returns:
+            (x, y, width, height) in image pixels, or None if the whole
+            image is visible (or no image is loaded)
+        """
+        pixmap = self.pixmap_item.pixmap()
+        if pixmap.isNull():
+            return None
+
+        visible = self.mapToScene(self.viewport().rect()).boundingRect()
+        visible = visible.intersected(self.pixmap_item.boundingRect())
+        x = max(0, int(visible.left()))
+        y = max(0, int(visible.top()))
+        right = min(pixmap.width(), int(visible.right()) + 1)
+        bottom = min(pixmap.height(), int(visible.bottom()) + 1)
+        if right <= x or bottom <= y:
+            return None
+        if x == 0 and y == 0 and right >= pixmap.width() and bottom >= pixmap.height():
+            return None
+        return (x, y, right - x, bottom - y)
+
+    def _update_visible_region(self):
+        """Emit visible_region_changed if zoom, pan or resize moved it."""
+        region = self.visible_image_rect()
+        if region != self._visible_region:
+            self._visible_region = region
+            self.visible_region_changed.emit(region)
+
     def _update_toolbar_position(self):
         """Position floating toolbar at top-center."""
         if self.floating_toolbar.isVisible():
@@ -284,6 +324,7 @@ class ImageCanvas(QGraphicsView):
         """Handle resize and reposition toolbar."""
         super().resizeEvent(event)
         self._update_toolbar_position()
+        self._update_visible_region()
 
     def wheelEvent(self, event: QWheelEvent | None):
         """Handles zooming with the mouse wheel."""
@@ -304,6 +345,7 @@ class ImageCanvas(QGraphicsView):
         delta = scene_pos_after - scene_pos_before
 
         self.translate(delta.x(), delta.y())
+        self._update_visible_region()
 
     def mousePressEvent(self, event: QMouseEvent | None):
         if event is None:
@@ -336,6 +378,7 @@ class ImageCanvas(QGraphicsView):
                 v_bar.setValue(int(v_bar.value() - delta.y()))
 
             self._pan_start_pos = event.position()
+            self._update_visible_region()
             event.accept()
         else:
             super().mouseMoveEvent(event)
@@ -20,6 +20,7 @@ from PyQt6.QtCore import Qt, pyqtSignal, QTimer
 from PyQt6.QtGui import QAction, QKeySequence, QFont
 
 from ..controllers.main_controller import MainController
+from ..core.telemetry import summarize
 from .unified_main_widget import UnifiedMainWidget
 from .pipeline_stack_widget import PipelineStackWidget
 from .node_property_editor import NodePropertyEditor
@@ -311,12 +312,8 @@ class MainWindow(QMainWindow):
     def _connect_signals(self):
         """Connect controller signals to UI updates."""
         # Status messages
-        self.controller.preview_started.connect(
-            lambda: self.status_message.emit("Processing preview...", 2000)
-        )
-        self.controller.preview_completed.connect(
-            lambda: self.status_message.emit("Preview updated", 2000)
-        )
+        self.controller.preview_started.connect(self._on_preview_started)
+        self.controller.preview_completed.connect(self._on_preview_completed)
 
         # Enable/disable run button based on image state
         self.controller.image_loaded.connect(lambda _: self.run_button.setEnabled(True))
@@ -337,6 +334,16 @@ class MainWindow(QMainWindow):
             lambda node_id: self.status_message.emit("Node removed", 2000)
         )
 
+    def _on_preview_started(self):
+        """Show that a preview is running."""
+        self.status_message.emit("Processing preview...", 2000)
+
+    def _on_preview_completed(self, result):
+        """Show the per-node timing summary of a finished preview."""
+        self.status_message.emit(
+            summarize(result.node_results, result.execution_time_ms), 5000
+        )
+
     def _setup_status_bar(self):
         """Setup the status bar with progress and info widgets."""
         self.status_bar = QStatusBar()
@@ -372,6 +379,8 @@ class MainWindow(QMainWindow):
         """Setup keyboard shortcuts for common actions."""
         # File menu actions
         self._setup_file_shortcuts()
+        # View options
+        self._setup_view_shortcuts()
         # Help shortcut
         self._setup_help_shortcut()
 
@@ -401,6 +410,23 @@ class MainWindow(QMainWindow):
         quit_action.triggered.connect(self.close)
         self.addAction(quit_action)
 
+    def _setup_view_shortcuts(self):
+        """Setup view-related keyboard shortcuts."""
+        # Ctrl+Shift+P: Toggle progressive (low-resolution first) preview
+        progressive_action = QAction("Progressive Preview", self)
+        progressive_action.setShortcut(QKeySequence("Ctrl+Shift+P"))
+        progressive_action.setCheckable(True)
+        progressive_action.setChecked(self.controller.progressive_preview)
+        progressive_action.toggled.connect(self._on_progressive_preview_toggled)
+        self.addAction(progressive_action)
+        self.progressive_preview_action = progressive_action
+
+    def _on_progressive_preview_toggled(self, enabled: bool):
+        """Handle progressive preview toggle."""
+        self.controller.set_progressive_preview(enabled)
+        state = "on" if enabled else "off"
+        self.status_message.emit(f"Progressive preview {state}", 2000)
+
     def _setup_help_shortcut(self):
         """Setup help shortcut."""
         help_action = QAction("Help", self)
@@ -447,6 +473,10 @@ class MainWindow(QMainWindow):
             <li><b>Ctrl+S</b> - Save</li>
             <li><b>Ctrl+Q</b> - Quit</li>
         </ul>
+        <h3>View</h3>
+        <ul>
+            <li><b>Ctrl+Shift+P</b> - Toggle progressive preview</li>
+        </ul>
         <h3>Help</h3>
         <ul>
             <li><b>F12</b> - Show this help</li>
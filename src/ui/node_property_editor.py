@@ -11,7 +11,7 @@ from PyQt6.QtWidgets import (
     QFrame,
     QScrollArea,
 )
-from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtCore import Qt, QEvent, pyqtSignal
 
 from ..controllers.main_controller import MainController
 from ..core.parameter_schemas import get_node_spec, ParameterType
@@ -239,6 +239,7 @@ class NodePropertyEditor(QWidget):
             spinbox.setSingleStep(int(param_spec.step))
 
         spinbox.setValue(int(value))
+        spinbox.installEventFilter(self)
 
         # Connect to controller
         spinbox.valueChanged.connect(
@@ -269,6 +270,7 @@ class NodePropertyEditor(QWidget):
 
         spinbox.setDecimals(2)
         spinbox.setValue(float(value))
+        spinbox.installEventFilter(self)
 
         # Connect to controller
         spinbox.valueChanged.connect(
@@ -277,6 +279,17 @@ class NodePropertyEditor(QWidget):
 
         return spinbox
 
+    def eventFilter(self, obj, event) -> bool:
+        """Holding a spinbox (e.g. an auto-repeating arrow) is a drag."""
+        if event.type() == QEvent.Type.MouseButtonPress:
+            self.controller.begin_interaction()
+        elif event.type() in (
+            QEvent.Type.MouseButtonRelease,
+            QEvent.Type.FocusOut,
+        ):
+            self.controller.end_interaction()
+        return super().eventFilter(obj, event)
+
     def _on_value_changed(self, node_id: str, param_name: str, value):
         """Handle parameter value change."""
         self.controller.update_node_parameter(node_id, param_name, value)
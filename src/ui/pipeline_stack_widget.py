@@ -18,6 +18,7 @@ from PyQt6.QtGui import QPainter, QColor, QDrag
 
 from ..controllers.main_controller import MainController
 from ..core.parameter_schemas import get_available_processing_nodes
+from ..core.telemetry import format_node_badge, format_node_details, slowest_node
 
 
 logger = logging.getLogger(__name__)
@@ -134,7 +135,18 @@ class PipelineNodeWidget(QFrame):
         badge.setStyleSheet(f"background-color: {badge_color}33; color: {badge_color};")
         badge.setAlignment(Qt.AlignmentFlag.AlignCenter)
 
-        actions_layout.addWidget(badge, alignment=Qt.AlignmentFlag.AlignRight)
+        # Timing badge next to the type badge, filled in after each preview run
+        self.timing_label = QLabel()
+        self.timing_label.setObjectName("nodeTiming")
+        self.timing_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.timing_label.setVisible(False)
+
+        badge_row = QHBoxLayout()
+        badge_row.setContentsMargins(0, 0, 0, 0)
+        badge_row.setSpacing(4)
+        badge_row.addWidget(self.timing_label)
+        badge_row.addWidget(badge)
+        actions_layout.addLayout(badge_row)
 
         # Toggle switch (only for toggleable nodes)
         if self.is_toggleable:
@@ -183,8 +195,35 @@ class PipelineNodeWidget(QFrame):
                 border-radius: 2px;
                 padding: 2px 4px;
             }}
+            #nodeTiming {{
+                color: #9AA0A6;
+                font-size: 9px;
+            }}
+            #nodeTiming[slowest="true"] {{
+                color: #F28B82;
+                font-weight: bold;
+            }}
         """)
 
+    def set_telemetry(self, entry: Optional[dict], slowest: bool = False):
+        """
+        Show timing for the node's last preview run.
+
+        Args:
+            entry: The node's node_results entry, or None to hide the badge
+            slowest: Highlight the node as the slowest in the run
+        """
+        if not entry:
+            self.timing_label.setVisible(False)
+            return
+
+        self.timing_label.setText(format_node_badge(entry))
+        self.timing_label.setToolTip(format_node_details(entry))
+        self.timing_label.setProperty("slowest", slowest)
+        self.timing_label.style().unpolish(self.timing_label)
+        self.timing_label.style().polish(self.timing_label)
+        self.timing_label.setVisible(True)
+
     def _on_toggle(self, checked: bool):
         """Handle toggle switch."""
         self.toggled.emit(self.node_id, checked)
@@ -264,6 +303,8 @@ class PipelineStackWidget(QWidget):
 
         self.controller = controller
         self._node_widgets: dict[str, PipelineNodeWidget] = {}
+        # node_results of the last completed preview, for timing badges
+        self._node_results: dict = {}
 
         self._setup_ui()
         self._connect_signals()
@@ -374,6 +415,7 @@ class PipelineStackWidget(QWidget):
         self.controller.pipeline_changed.connect(self._refresh_nodes)
         self.controller.node_selected.connect(self._on_selection_changed)
         self.controller.node_removed.connect(self._on_node_removed)
+        self.controller.preview_completed.connect(self._on_preview_completed)
 
     def _refresh_nodes(self):
         """Refresh the node list from controller state."""
@@ -412,6 +454,16 @@ class PipelineStackWidget(QWidget):
         if len(nodes) <= 2:
             self._add_placeholder()
 
+        self._apply_telemetry()
+
+    def _apply_telemetry(self):
+        """Update node timing badges from the last preview's node_results."""
+        slowest = slowest_node(self._node_results)
+        for node_id, widget in self._node_widgets.items():
+            widget.set_telemetry(
+                self._node_results.get(node_id), slowest=node_id == slowest
+            )
+
     def _clear_nodes_layout(self):
         """Clear all widgets from nodes layout."""
         while self.nodes_layout.count():
@@ -477,6 +529,13 @@ class PipelineStackWidget(QWidget):
         for widget in self._node_widgets.values():
             widget.refresh()
 
+    def _on_preview_completed(self, result):
+        """Show per-node timings of a completed preview."""
+        # Viewport previews that reused every tile ran no nodes
+        if result.node_results:
+            self._node_results = result.node_results
+            self._apply_telemetry()
+
     def _on_node_removed(self, node_id: str):
         """Handle node removal from controller."""
         # Will be refreshed by pipeline_changed signal
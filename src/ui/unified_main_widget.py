@@ -155,6 +155,9 @@ class UnifiedMainWidget(QWidget):
         # Canvas zoom
         self.canvas.zoom_changed.connect(self._on_zoom_changed)
 
+        # Preview only what the canvas shows
+        self.canvas.visible_region_changed.connect(self.controller.set_preview_roi)
+
         # Properties panel file selection
         self.properties_panel.file_selected.connect(self._on_file_selected_from_panel)
 
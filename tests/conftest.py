@@ -5,6 +5,14 @@ import cv2
 from pathlib import Path
 
 
+@pytest.fixture(autouse=True)
+def app_data_home(tmp_path, monkeypatch):
+    """Keep application data (e.g. the GUI's result cache) out of the home folder."""
+    data_home = tmp_path / "data-home"
+    monkeypatch.setenv("XDG_DATA_HOME", str(data_home))
+    return data_home
+
+
 @pytest.fixture
 def sample_image_gray():
     """Create a sample grayscale image."""
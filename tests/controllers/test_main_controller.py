@@ -24,6 +24,25 @@ class TestMainControllerInitialization:
             pass  # Just test connection works
 
 
+class TestResultCache:
+    """Test the persistent result cache of the GUI."""
+
+    def test_opened_in_app_data_folder(self, app_data_home):
+        controller = MainController()
+
+        assert controller.preview_pipeline._result_cache is controller.result_cache
+        assert controller.result_cache.path.startswith(str(app_data_home))
+
+    def test_unwritable_folder_disables_cache(self, app_data_home):
+        # A file where the data folder should be
+        app_data_home.write_text("")
+
+        controller = MainController()
+
+        assert controller.result_cache is None
+        assert controller.preview_pipeline._result_cache is None
+
+
 class TestPhaseTransitions:
     """Test phase transition methods."""
 
@@ -372,6 +391,206 @@ class TestPreviewDebouncing:
             controller.request_immediate_preview()
 
 
+class TestProgressivePreview:
+    """Test progressive (proxy first) preview handling."""
+
+    def test_proxy_result_upscaled_to_frame(self, qtbot):
+        """Test proxy previews are shown at the input frame size."""
+        import numpy as np
+        from src.core.preview_pipeline import PreviewResult
+
+        controller = MainController()
+        controller._preview_input_size = (100, 80)
+        proxy = PreviewResult(
+            success=True,
+            image=np.zeros((40, 50), dtype=np.uint8),
+            is_proxy=True,
+            scale=0.5,
+        )
+
+        with qtbot.waitSignal(controller.preview_image_ready) as blocker:
+            controller._on_preview_proxy_ready(proxy)
+
+        assert blocker.args[0].shape == (80, 100)
+
+    def test_proxy_upscaled_smoothly(self, qtbot):
+        """Test proxy previews are interpolated, not pixel-replicated."""
+        import numpy as np
+        from src.core.preview_pipeline import PreviewResult
+
+        controller = MainController()
+        controller._preview_input_size = (4, 1)
+        proxy = PreviewResult(
+            success=True,
+            image=np.array([[0, 200]], dtype=np.uint8),
+            is_proxy=True,
+            scale=0.5,
+        )
+
+        with qtbot.waitSignal(controller.preview_image_ready) as blocker:
+            controller._on_preview_proxy_ready(proxy)
+
+        # Nearest neighbour would give only 0 and 200
+        assert set(blocker.args[0][0]) - {0, 200}
+
+    def test_parameter_change_cancels_running_pass(self):
+        """Test debounce supersedes any in-flight progressive pass."""
+        controller = MainController()
+        generation = controller.preview_pipeline.cancel_pending()
+
+        controller._trigger_preview_debounce()
+
+        assert controller.preview_pipeline._is_stale(generation)
+
+    def test_worker_thread_results_delivered_on_gui_thread(self, qtbot):
+        """Test pipeline callbacks from a worker thread reach the UI queued."""
+        import threading
+        import numpy as np
+        from src.core.preview_pipeline import PreviewResult
+
+        controller = MainController()
+        result = PreviewResult(success=True, image=np.zeros((4, 4), np.uint8))
+        delivered_on = []
+        controller.preview_completed.connect(
+            lambda _: delivered_on.append(threading.get_ident())
+        )
+
+        with qtbot.waitSignal(controller.preview_completed):
+            worker = threading.Thread(
+                target=controller.preview_pipeline.execution_completed.emit,
+                args=(result,),
+            )
+            worker.start()
+            worker.join()
+
+        assert delivered_on == [threading.get_ident()]
+
+
+class TestViewportPreview:
+    """Test ROI preview selection."""
+
+    def test_set_preview_roi_without_image(self):
+        """Test the ROI is stored but no preview is scheduled."""
+        controller = MainController()
+        controller.set_preview_roi((0, 0, 10, 10))
+
+        assert controller._preview_roi == (0, 0, 10, 10)
+        assert not controller._preview_timer.isActive()
+
+    def _load(self, controller, phantast=True):
+        import numpy as np
+        from src.models.image_model import ImageSessionModel
+
+        session = ImageSessionModel()
+        session.mode = "SINGLE"
+        session.active_image = {"data": np.zeros((60, 80, 3), dtype=np.uint8)}
+        controller.state.current_image = session
+        controller.state.initialize_default_pipeline()
+        # The default pipeline ends in PHANTAST, which needs the full frame
+        controller.state.pipeline.nodes[-1].enabled = phantast
+        controller.state.transition_to(WorkflowPhase.IMAGE_LOADED)
+
+    def test_roi_change_ignored_for_full_frame_pipelines(self):
+        """Test panning does not re-run a pipeline that ignores the ROI."""
+        controller = MainController()
+        self._load(controller)
+
+        controller.set_preview_roi((0, 0, 10, 10))
+
+        assert not controller._preview_timer.isActive()
+
+    def test_roi_change_previews_local_pipelines(self):
+        """Test panning previews the newly visible region."""
+        controller = MainController()
+        self._load(controller, phantast=False)
+
+        controller.set_preview_roi((0, 0, 10, 10))
+
+        assert controller._preview_timer.isActive()
+
+    def test_full_frame_pipeline_keeps_progressive_mode(self, monkeypatch):
+        """Test a ROI does not divert PHANTAST previews to a blocking pass."""
+        controller = MainController()
+        controller.set_progressive_preview(True)
+        self._load(controller)
+        controller.set_preview_roi((0, 0, 10, 10))
+        calls = []
+        pipeline = controller.preview_pipeline
+        monkeypatch.setattr(pipeline, "execute_roi", lambda *a: calls.append("roi"))
+        monkeypatch.setattr(
+            pipeline,
+            "execute_progressive_async",
+            lambda *a: calls.append("progressive"),
+        )
+
+        controller._execute_preview()
+
+        assert calls == ["progressive"]
+
+
+class TestInteractivePreview:
+    """Test adaptive debounce and drag mode."""
+
+    def _load(self, controller):
+        import numpy as np
+        from src.models.image_model import ImageSessionModel
+
+        session = ImageSessionModel()
+        session.mode = "SINGLE"
+        session.active_image = {"data": np.zeros((1200, 1000, 3), dtype=np.uint8)}
+        controller.state.current_image = session
+        controller.state.initialize_default_pipeline()
+        controller.state.transition_to(WorkflowPhase.IMAGE_LOADED)
+
+    def test_debounce_follows_measured_latency(self):
+        """Test a fast pipeline is previewed sooner than the default delay."""
+        controller = MainController()
+        controller.preview_scheduler.record_latency(40)
+
+        controller._trigger_preview_debounce()
+
+        assert controller._preview_timer.interval() < 200
+
+    def test_drag_runs_proxy_only(self, monkeypatch):
+        """Test previews use the low-resolution path while a control is held."""
+        controller = MainController()
+        self._load(controller)
+        calls = []
+        monkeypatch.setattr(
+            controller.preview_pipeline,
+            "execute_proxy_async",
+            lambda image, state: calls.append(image.shape),
+        )
+
+        controller.begin_interaction()
+        controller._execute_preview()
+
+        assert calls == [(1200, 1000, 3)]
+
+    def test_release_runs_full_preview(self):
+        """Test releasing the control schedules a full preview at once."""
+        controller = MainController()
+        self._load(controller)
+
+        controller.begin_interaction()
+        controller._trigger_preview_debounce()
+        controller.end_interaction()
+
+        assert controller.preview_scheduler.interactive is False
+        assert controller._preview_timer.isActive()
+        assert controller._preview_timer.interval() == 0
+
+    def test_release_without_edits_does_nothing(self):
+        """Test a press and release with no edit runs no preview."""
+        controller = MainController()
+        self._load(controller)
+
+        controller.begin_interaction()
+        controller.end_interaction()
+
+        assert not controller._preview_timer.isActive()
+
+
 class TestUtilityMethods:
     """Test utility methods."""
 
@@ -0,0 +1,87 @@
+import pytest
+from src.controllers.preview_scheduler import PreviewScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, ms):
+        self.now += ms / 1000
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+class TestPreviewScheduler:
+    """Test adaptive debounce delays."""
+
+    def test_default_delay_before_measurement(self, clock):
+        scheduler = PreviewScheduler(clock=clock)
+        assert scheduler.next_delay_ms() == PreviewScheduler.DEFAULT_DELAY_MS
+
+    def test_fast_pipeline_short_delay(self, clock):
+        scheduler = PreviewScheduler(clock=clock)
+        scheduler.record_latency(50)
+        scheduler.record_event()
+
+        assert scheduler.next_delay_ms() == PreviewScheduler.MIN_DELAY_MS
+
+    def test_slow_pipeline_waits_for_pause_during_drag(self, clock):
+        scheduler = PreviewScheduler(clock=clock)
+        scheduler.record_latency(3000)
+        for _ in range(10):
+            scheduler.record_event()
+            clock.advance(40)
+
+        # Longer than the edit gap: no run starts mid-drag
+        assert scheduler.next_delay_ms() > 2 * 40
+        assert scheduler.next_delay_ms() <= PreviewScheduler.MAX_DELAY_MS
+
+    def test_rapid_edits_lengthen_delay(self, clock):
+        scheduler = PreviewScheduler(clock=clock)
+        scheduler.record_latency(400)
+        scheduler.record_event()
+        single = scheduler.next_delay_ms()
+
+        for _ in range(5):
+            clock.advance(150)
+            scheduler.record_event()
+
+        assert scheduler.next_delay_ms() > single
+        assert scheduler.event_gap_ms == pytest.approx(150)
+
+    def test_long_pause_starts_new_burst(self, clock):
+        scheduler = PreviewScheduler(clock=clock)
+        scheduler.record_event()
+        clock.advance(100)
+        scheduler.record_event()
+        clock.advance(5000)
+        scheduler.record_event()
+
+        assert scheduler.event_gap_ms is None
+
+    def test_latency_is_moving_average(self, clock):
+        scheduler = PreviewScheduler(smoothing=0.5, clock=clock)
+        scheduler.record_latency(100)
+        scheduler.record_latency(300)
+
+        assert scheduler.latency_ms() == pytest.approx(200)
+
+    def test_interactive_latency_tracked_separately(self, clock):
+        scheduler = PreviewScheduler(clock=clock)
+        scheduler.record_latency(3000)
+        scheduler.begin_interaction()
+        assert scheduler.next_delay_ms() == PreviewScheduler.MIN_DELAY_MS
+
+        scheduler.record_latency(200, interactive=True)
+        assert scheduler.latency_ms(interactive=True) == 200
+        assert scheduler.next_delay_ms() == 50
+
+        scheduler.end_interaction()
+        assert scheduler.next_delay_ms() == 750
@@ -1,10 +1,15 @@
 import pytest
-from src.core.pipeline_step import PipelineStep, StepParameter
+from src.core.pipeline_step import ImageSpec, PipelineStep, StepParameter
 from src.core.steps import (
+    InputStep,
     GrayscaleStep,
     GaussianBlurStep,
     ClaheStep,
     PhantastStep,
+    MergeStep,
+    STEP_REGISTRY,
+    create_step,
+    get_step_class,
 )
 import numpy as np
 
@@ -39,6 +44,23 @@ class TestGaussianBlurStep:
         result = step.process(image, {})  # Should work, adjusts to 5
         assert result.shape == image.shape
 
+    def test_scale_params(self):
+        step = GaussianBlurStep()
+        scaled = step.scale_params({"kernel_size": 21, "sigma": 4.0}, 0.25)
+        assert scaled["kernel_size"] == 5
+        assert scaled["sigma"] == 1.0
+
+    def test_roi_margin_is_kernel_radius(self):
+        step = GaussianBlurStep()
+        assert step.roi_margin({"kernel_size": 9}, (100, 100)) == 4
+
+    def test_scale_params_keeps_kernel_odd_and_positive(self):
+        step = GaussianBlurStep()
+        assert step.scale_params({"kernel_size": 3, "sigma": 0}, 0.1) == {
+            "kernel_size": 1,
+            "sigma": 0,
+        }
+
 
 class TestClaheStep:
     def test_enhances_contrast(self):
@@ -56,6 +78,31 @@ class TestClaheStep:
         result = step.process(color_image, {})
         assert result.shape == (100, 100)  # Returns grayscale
 
+    def test_accepts_node_grid_size_tuple(self):
+        step = ClaheStep()
+        step.update_params({"clip_limit": 2.0, "grid_size": (4, 8)})
+        assert step.get_param("tile_grid_size") == (4, 8)
+        image = np.random.randint(0, 255, (64, 64), dtype=np.uint8)
+        assert step.process(image, {}).shape == (64, 64)
+
+    def test_clahe_object_reused_until_params_change(self):
+        step = ClaheStep()
+        image = np.random.randint(0, 255, (64, 64), dtype=np.uint8)
+        step.process(image, {})
+        clahe = step._clahe
+
+        step.update_params({"clip_limit": 2.0})
+        step.process(image, {})
+        assert step._clahe is clahe
+
+        step.update_params({"clip_limit": 4.0})
+        step.process(image, {})
+        assert step._clahe is not clahe
+
+    def test_roi_margin_is_one_tile(self):
+        step = ClaheStep()
+        assert step.roi_margin({"grid_size": (8, 4)}, (400, 800)) == 100
+
 
 class TestPhantastStep:
     def test_processes_image(self):
@@ -82,6 +129,15 @@ class TestPhantastStep:
         assert "phantast_mask" in metadata
         assert metadata["phantast_mask"].shape == (100, 100)
 
+    def test_scale_params(self):
+        """Test sigma scales linearly and area thresholds quadratically."""
+        step = PhantastStep()
+        scaled = step.scale_params({"sigma": 4.0, "epsilon": 0.05}, 0.5)
+        assert scaled["sigma"] == 2.0
+        assert scaled["epsilon"] == 0.05
+        assert scaled["minimum_object_area"] == 25
+        assert scaled["minimum_fill_area"] == 25
+
     def test_parameters(self):
         """Test that PHANTAST parameters work correctly."""
         step = PhantastStep()
@@ -91,3 +147,93 @@ class TestPhantastStep:
         # Test parameter update
         step.set_param("sigma", 2.0)
         assert step.get_param("sigma") == 2.0
+
+
+class TestMergeStep:
+    def test_min_and_max_are_mask_and_or(self):
+        a = np.array([[0, 255, 255]], dtype=np.uint8)
+        b = np.array([[0, 0, 255]], dtype=np.uint8)
+        step = MergeStep()
+        step.set_param("mode", "min")
+        np.testing.assert_array_equal(step.apply_many([a, b], {}), [[0, 0, 255]])
+        step.set_param("mode", "max")
+        np.testing.assert_array_equal(step.apply_many([a, b], {}), [[0, 255, 255]])
+
+    def test_mean_blends_and_converts_color_inputs(self):
+        gray = np.full((4, 4), 100, dtype=np.uint8)
+        color = np.full((4, 4, 3), 200, dtype=np.uint8)
+        result = MergeStep().apply_many([gray, color], {})
+        assert result.shape == (4, 4)
+        assert result.dtype == np.uint8
+        assert result[0, 0] == 150
+
+    def test_rejects_mismatched_sizes(self):
+        with pytest.raises(ValueError, match="size"):
+            MergeStep().apply_many([np.zeros((4, 4)), np.zeros((5, 4))], {})
+
+
+class TestStepContracts:
+    """Declared output specs match what the steps actually produce."""
+
+    @pytest.mark.parametrize(
+        "step_class, shape",
+        [
+            (GrayscaleStep, (40, 50, 3)),
+            (GrayscaleStep, (40, 50)),
+            (GaussianBlurStep, (40, 50, 3)),
+            (ClaheStep, (40, 50, 3)),
+            (PhantastStep, (40, 50)),
+            (InputStep, (40, 50, 3)),
+        ],
+    )
+    def test_output_spec_matches_output(self, step_class, shape):
+        step = step_class()
+        image = np.random.randint(0, 255, shape, dtype=np.uint8)
+
+        spec = step.output_spec(ImageSpec.of(image))
+
+        assert spec == ImageSpec.of(step.process(image, {}))
+
+    def test_clahe_rejects_float_input(self):
+        with pytest.raises(ValueError, match="uint8"):
+            ClaheStep().output_spec(ImageSpec((10, 10), np.float64))
+
+    def test_grayscale_rejects_four_channels(self):
+        with pytest.raises(ValueError, match="1, 3-channel"):
+            GrayscaleStep().output_spec(ImageSpec((10, 10, 4), np.uint8))
+
+    @pytest.mark.parametrize("step_class", [GrayscaleStep, GaussianBlurStep, ClaheStep])
+    def test_process_into_writes_buffer(self, step_class):
+        step = step_class()
+        image = np.random.randint(0, 255, (40, 50, 3), dtype=np.uint8)
+        spec = step.output_spec(ImageSpec.of(image))
+        out = np.empty(spec.shape, spec.dtype)
+
+        result = step.process_into(image, {}, out)
+
+        assert step.writes_into is True
+        assert result is out
+        np.testing.assert_array_equal(result, step.process(image, {}))
+
+
+class TestStepRegistry:
+    def test_registry_covers_node_types(self):
+        from src.core.parameter_schemas import get_available_node_types
+
+        for node_type in get_available_node_types():
+            assert node_type in STEP_REGISTRY
+
+    def test_create_step_returns_new_instance(self):
+        step = create_step("clahe")
+        assert isinstance(step, ClaheStep)
+        assert create_step("clahe") is not step
+
+    def test_output_node_maps_to_phantast(self):
+        assert get_step_class("output") is PhantastStep
+
+    def test_unknown_type_returns_none(self):
+        assert create_step("unknown") is None
+
+    def test_input_step_passes_through(self):
+        image = np.zeros((4, 4), dtype=np.uint8)
+        assert InputStep().process(image, {}) is image
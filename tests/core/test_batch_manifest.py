@@ -0,0 +1,89 @@
+import json
+import os
+
+import pytest
+
+from src.core.batch_manifest import (
+    STATUS_DONE,
+    STATUS_FAILED,
+    BatchManifest,
+    ManifestEntry,
+    atomic_write_json,
+    content_hash,
+)
+
+
+def done_entry(**kwargs):
+    fields = dict(content_hash="c1", pipeline_hash="p1", status=STATUS_DONE)
+    fields.update(kwargs)
+    return ManifestEntry(**fields)
+
+
+class TestHashes:
+    def test_content_hash_depends_on_bytes(self):
+        assert content_hash(b"abc") == content_hash(bytearray(b"abc"))
+        assert content_hash(b"abc") != content_hash(b"abd")
+
+
+class TestAtomicWrite:
+    def test_replaces_file_without_leftovers(self, tmp_path):
+        path = tmp_path / "m.json"
+        atomic_write_json(str(path), {"a": 1})
+        atomic_write_json(str(path), {"a": 2})
+        assert json.loads(path.read_text()) == {"a": 2}
+        assert os.listdir(tmp_path) == ["m.json"]
+
+    def test_failed_write_keeps_previous_version(self, tmp_path):
+        path = tmp_path / "m.json"
+        atomic_write_json(str(path), {"a": 1})
+        with pytest.raises(TypeError):
+            atomic_write_json(str(path), {"a": object()})
+        assert json.loads(path.read_text()) == {"a": 1}
+        assert os.listdir(tmp_path) == ["m.json"]
+
+
+class TestBatchManifest:
+    def test_round_trip(self, tmp_path):
+        path = str(tmp_path / "manifest.json")
+        manifest = BatchManifest(path, flush_interval=0)
+        manifest.record("img/a.png", done_entry(confluency=42.0))
+
+        reloaded = BatchManifest(path)
+        entry = reloaded.get("img/a.png")
+        assert entry.confluency == 42.0
+        assert entry.updated > 0
+
+    def test_records_are_batched_until_flush(self, tmp_path):
+        path = tmp_path / "manifest.json"
+        manifest = BatchManifest(str(path), flush_interval=3600)
+        manifest.record("a.png", done_entry())  # first record saves
+        manifest.record("b.png", done_entry())
+        assert len(BatchManifest(str(path))) == 1
+        manifest.close()
+        assert len(BatchManifest(str(path))) == 2
+
+    def test_completed_requires_matching_hashes(self, tmp_path):
+        manifest = BatchManifest(str(tmp_path / "m.json"))
+        manifest.record("a.png", done_entry())
+        manifest.record("b.png", done_entry(status=STATUS_FAILED))
+
+        assert manifest.completed("a.png", "c1", "p1") is not None
+        assert manifest.completed("a.png", "c2", "p1") is None
+        assert manifest.completed("a.png", "c1", "p2") is None
+        assert manifest.completed("b.png", "c1", "p1") is None
+        assert manifest.completed("c.png", "c1", "p1") is None
+
+    def test_completed_requires_outputs(self, tmp_path):
+        output = tmp_path / "a_result.png"
+        output.write_bytes(b"x")
+        manifest = BatchManifest(str(tmp_path / "m.json"))
+        manifest.record("a.png", done_entry(output_paths={"result": str(output)}))
+
+        assert manifest.completed("a.png", "c1", "p1") is not None
+        output.unlink()
+        assert manifest.completed("a.png", "c1", "p1") is None
+
+    def test_unknown_version_is_ignored(self, tmp_path):
+        path = tmp_path / "m.json"
+        path.write_text(json.dumps({"version": 999, "entries": {"a": {}}}))
+        assert len(BatchManifest(str(path))) == 0
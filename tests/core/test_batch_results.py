@@ -0,0 +1,34 @@
+import csv
+
+from src.core.batch_results import CSV_COLUMNS, ResultsCsv
+from src.core.batch_runner import BatchItemResult
+
+
+def read_rows(path):
+    with open(path, newline="") as f:
+        return list(csv.reader(f))
+
+
+class TestResultsCsv:
+    def test_rows_are_flushed_as_they_arrive(self, tmp_path):
+        path = tmp_path / "results.csv"
+        with ResultsCsv(str(path)) as results:
+            results.append(
+                BatchItemResult(path="/d/a.png", success=True, confluency=12.5)
+            )
+            rows = read_rows(path)
+            assert rows[0] == list(CSV_COLUMNS)
+            assert rows[1][:4] == ["a.png", "/d/a.png", "1", "12.5000"]
+
+    def test_appends_to_existing_file(self, tmp_path):
+        path = tmp_path / "results.csv"
+        with ResultsCsv(str(path)) as results:
+            results.append(BatchItemResult(path="a.png", success=True))
+        with ResultsCsv(str(path)) as results:
+            results.append(
+                BatchItemResult(path="b.png", success=False, error_message="bad")
+            )
+
+        rows = read_rows(path)
+        assert len(rows) == 3  # one header
+        assert rows[2][2] == "0" and rows[2][3] == "" and rows[2][5] == "bad"
@@ -0,0 +1,441 @@
+import itertools
+import os
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from src.core.batch_manifest import BatchManifest
+from src.core.batch_runner import BatchRunner, list_images, process_image
+from src.core.intermediate_store import IntermediateStore
+from src.core.preview_pipeline import PreviewPipeline
+from src.core.result_cache import ResultCache
+from src.models.pipeline_model import Pipeline, PipelineNode
+
+
+def make_node(node_id, node_type, **params):
+    return PipelineNode(
+        id=node_id,
+        type=node_type,
+        name=node_type,
+        description="",
+        icon="",
+        status="ready",
+        enabled=True,
+        parameters=params,
+    )
+
+
+@pytest.fixture
+def gray_pipeline():
+    return Pipeline(
+        id="p1",
+        name="Gray",
+        nodes=[make_node("input", "input"), make_node("gray", "grayscale")],
+    )
+
+
+@pytest.fixture
+def phantast_pipeline():
+    return Pipeline(
+        id="p2",
+        name="Phantast",
+        nodes=[make_node("input", "input"), make_node("output", "output")],
+    )
+
+
+@pytest.fixture
+def image_folder(tmp_path):
+    folder = tmp_path / "plate"
+    folder.mkdir()
+    rng = np.random.default_rng(0)
+    for name in ("b.png", "a.png", "c.jpg"):
+        image = rng.integers(0, 255, (64, 64, 3), dtype=np.uint8)
+        cv2.imwrite(str(folder / name), image)
+    (folder / "notes.txt").write_text("not an image")
+    return folder
+
+
+class TestListImages:
+    def test_sorted_images_only(self, image_folder):
+        names = [os.path.basename(p) for p in list_images(str(image_folder))]
+        assert names == ["a.png", "b.png", "c.jpg"]
+
+
+class TestProcessImage:
+    def test_writes_outputs(self, image_folder, gray_pipeline, tmp_path):
+        out = tmp_path / "out"
+        out.mkdir()
+        result = process_image(
+            str(image_folder / "a.png"),
+            gray_pipeline,
+            PreviewPipeline(cache_enabled=False),
+            str(out),
+        )
+        assert result.success
+        written = cv2.imread(result.output_paths["result"], cv2.IMREAD_UNCHANGED)
+        assert written.shape == (64, 64)
+
+    def test_unreadable_file_fails(self, tmp_path, gray_pipeline):
+        bad = tmp_path / "bad.png"
+        bad.write_bytes(b"not a png")
+        result = process_image(
+            str(bad), gray_pipeline, PreviewPipeline(cache_enabled=False)
+        )
+        assert result.success is False
+        assert "Could not read" in result.error_message
+
+    def test_reports_confluency(self, image_folder, phantast_pipeline, tmp_path):
+        result = process_image(
+            str(image_folder / "a.png"),
+            phantast_pipeline,
+            PreviewPipeline(cache_enabled=False),
+            str(tmp_path),
+        )
+        assert result.success
+        assert 0.0 <= result.confluency <= 100.0
+        assert os.path.exists(result.output_paths["mask"])
+
+
+class TestBatchRunner:
+    def test_inline_run(self, image_folder, gray_pipeline):
+        results = BatchRunner(gray_pipeline, workers=1).run(str(image_folder))
+        assert [os.path.basename(r.path) for r in results] == [
+            "a.png",
+            "b.png",
+            "c.jpg",
+        ]
+        assert all(r.success for r in results)
+
+    def test_pool_results_in_input_order(
+        self, image_folder, phantast_pipeline, tmp_path
+    ):
+        (image_folder / "0_broken.png").write_bytes(b"truncated")
+        out = tmp_path / "out"
+        progress = []
+
+        runner = BatchRunner(phantast_pipeline, workers=2, output_dir=str(out))
+        results = runner.run(
+            str(image_folder), progress_callback=lambda *args: progress.append(args)
+        )
+
+        assert [os.path.basename(r.path) for r in results] == [
+            "0_broken.png",
+            "a.png",
+            "b.png",
+            "c.jpg",
+        ]
+        # The bad file fails on its own; the others complete
+        assert results[0].success is False
+        assert all(r.success for r in results[1:])
+        assert all(r.confluency is not None for r in results[1:])
+        assert sorted(done for done, _, _ in progress) == [1, 2, 3, 4]
+        assert os.path.exists(out / "a_result.png")
+
+    def test_matches_inline_results(self, image_folder, phantast_pipeline):
+        inline = BatchRunner(phantast_pipeline, workers=1).run(str(image_folder))
+        pooled = BatchRunner(phantast_pipeline, workers=3).run(str(image_folder))
+        assert [r.confluency for r in pooled] == [r.confluency for r in inline]
+
+    def test_pool_workers_not_forked(self, gray_pipeline):
+        # The pool starts after the batch's threads, which fork would copy
+        pool, _ = BatchRunner(gray_pipeline, workers=2)._compute_pool()
+        try:
+            assert pool._mp_context.get_start_method() != "fork"
+        finally:
+            pool.shutdown()
+
+    def test_from_file(self, tmp_path, gray_pipeline, image_folder):
+        path = tmp_path / "pipeline.json"
+        gray_pipeline.save(str(path))
+        runner = BatchRunner.from_file(str(path), workers=1)
+        results = runner.run([str(image_folder / "a.png")])
+        assert len(results) == 1 and results[0].success
+
+    def test_empty_input(self, tmp_path, gray_pipeline):
+        assert BatchRunner(gray_pipeline).run(str(tmp_path)) == []
+
+
+class TestBatchStream:
+    def test_stream_consumes_generator(self, image_folder, gray_pipeline):
+        def paths():
+            yield str(image_folder / "b.png")
+            yield str(image_folder / "a.png")
+
+        runner = BatchRunner(gray_pipeline, workers=1)
+        results = dict(runner.stream(paths()))
+        assert sorted(results) == [0, 1]
+        assert results[0].path.endswith("b.png")
+
+    def test_in_flight_images_are_bounded(
+        self, image_folder, gray_pipeline, monkeypatch, tmp_path
+    ):
+        from src.core import batch_runner
+
+        reads = []
+        written = []
+        real_read = batch_runner.decode_image
+
+        def counting_read(data, path):
+            reads.append(len(reads) - len(written))
+            return real_read(data, path)
+
+        def slow_write(*args):
+            time.sleep(0.01)
+            written.append(1)
+            return {}
+
+        monkeypatch.setattr(batch_runner, "decode_image", counting_read)
+        monkeypatch.setattr(batch_runner, "write_outputs", slow_write)
+
+        runner = BatchRunner(
+            gray_pipeline,
+            workers=1,
+            output_dir=str(tmp_path),
+            readers=1,
+            prefetch=1,
+            max_in_flight=2,
+        )
+        results = runner.run([str(image_folder / "a.png")] * 30)
+
+        assert all(r.success for r in results)
+        # The reader's image, the decoded queue, the one waiting for a slot
+        # and the in-flight ones
+        assert max(reads) <= 1 + 1 + 1 + 2
+
+    def test_closing_stream_abandons_run(self, image_folder, gray_pipeline):
+        runner = BatchRunner(gray_pipeline, workers=1)
+        stream = runner.stream(itertools.repeat(str(image_folder / "a.png")))
+        index, result = next(stream)
+        assert result.success
+        stream.close()
+
+    def test_write_failure_is_per_item(self, image_folder, gray_pipeline, tmp_path):
+        out = tmp_path / "out"
+        runner = BatchRunner(gray_pipeline, workers=1, output_dir=str(out))
+        # A directory where the output file should go makes the write fail
+        (out / "a_result.png").mkdir(parents=True)
+        results = runner.run(str(image_folder))
+        assert [r.success for r in results] == [False, True, True]
+
+
+class TestResumableBatch:
+    def run(self, pipeline, folder, tmp_path):
+        manifest = BatchManifest(str(tmp_path / "manifest.json"), flush_interval=0)
+        runner = BatchRunner(
+            pipeline, workers=1, output_dir=str(tmp_path / "out"), manifest=manifest
+        )
+        return runner.run(str(folder))
+
+    def test_rerun_skips_done_images(self, image_folder, gray_pipeline, tmp_path):
+        first = self.run(gray_pipeline, image_folder, tmp_path)
+        assert not any(r.skipped for r in first)
+
+        second = self.run(gray_pipeline, image_folder, tmp_path)
+        assert all(r.skipped and r.success for r in second)
+        assert [r.output_paths for r in second] == [r.output_paths for r in first]
+
+    def test_rerun_retries_changed_and_failed(
+        self, image_folder, gray_pipeline, tmp_path
+    ):
+        (image_folder / "d.png").write_bytes(b"broken")
+        self.run(gray_pipeline, image_folder, tmp_path)
+
+        # Fix the broken file and change another
+        image = np.zeros((8, 8, 3), dtype=np.uint8)
+        cv2.imwrite(str(image_folder / "d.png"), image)
+        cv2.imwrite(str(image_folder / "b.png"), image)
+
+        results = self.run(gray_pipeline, image_folder, tmp_path)
+        skipped = {os.path.basename(r.path): r.skipped for r in results}
+        assert skipped == {"a.png": True, "b.png": False, "c.jpg": True, "d.png": False}
+        assert all(r.success for r in results)
+
+    def test_pipeline_change_reprocesses(self, image_folder, gray_pipeline, tmp_path):
+        self.run(gray_pipeline, image_folder, tmp_path)
+        gray_pipeline.nodes.append(make_node("blur", "gaussian_blur", kernel_size=5))
+        results = self.run(gray_pipeline, image_folder, tmp_path)
+        assert not any(r.skipped for r in results)
+
+
+class TestIntermediates:
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_stacks_saved_per_image(
+        self, image_folder, gray_pipeline, tmp_path, workers
+    ):
+        store = IntermediateStore(str(tmp_path / "stacks"))
+        runner = BatchRunner(gray_pipeline, workers=workers, intermediates=store)
+        results = runner.run(str(image_folder))
+        assert all(r.success for r in results)
+
+        stack = store.open("a.png")
+        assert stack.keys == ["input", "gray"]
+        assert stack.stage("gray").shape == (64, 64)
+        assert store.disk_usage() == 3 * (64 * 64 * 3 + 64 * 64)
+
+    def test_same_file_names_in_different_folders(self, gray_pipeline, tmp_path):
+        paths = []
+        for well, size in (("A1", 16), ("A2", 24)):
+            folder = tmp_path / well
+            folder.mkdir()
+            cv2.imwrite(str(folder / "img.png"), np.zeros((size, size, 3), np.uint8))
+            paths.append(str(folder / "img.png"))
+        store = IntermediateStore(str(tmp_path / "stacks"))
+
+        BatchRunner(gray_pipeline, workers=1, intermediates=store).run(paths)
+
+        assert store.open("A1/img.png").stage("gray").shape == (16, 16)
+        assert store.open("A2/img.png").stage("gray").shape == (24, 24)
+
+    def test_budget_enforced_during_run(self, image_folder, gray_pipeline, tmp_path):
+        store = IntermediateStore(str(tmp_path / "stacks"), budget_bytes=20000)
+        BatchRunner(gray_pipeline, workers=1, intermediates=store).run(
+            str(image_folder)
+        )
+        assert store.disk_usage() <= 20000
+        assert len(os.listdir(store.root)) == 1
+
+
+class TestMemoryBudget:
+    def test_tiny_budget_still_processes_all(self, image_folder, gray_pipeline):
+        runner = BatchRunner(gray_pipeline, workers=2, memory_budget=1)
+        results = runner.run(str(image_folder))
+        assert all(r.success for r in results)
+        assert runner.memory_budget.in_use == 0
+
+    def test_reservations_fit_budget(self, image_folder, gray_pipeline, monkeypatch):
+        runner = BatchRunner(gray_pipeline, workers=1, memory_budget=40000)
+        budget = runner.memory_budget
+        peaks = []
+        acquire = budget.acquire
+
+        def tracking_acquire(nbytes, timeout=None):
+            admitted = acquire(nbytes, timeout)
+            peaks.append(budget.in_use)
+            return admitted
+
+        monkeypatch.setattr(budget, "acquire", tracking_acquire)
+        # Freeze the factor so each 64x64 job reserves exactly its estimate
+        monkeypatch.setattr(budget, "observe", lambda *_: None)
+        results = runner.run(str(image_folder))
+        assert all(r.success for r in results)
+        # 2 x 12288 + 4096 bytes per image: only one fits at a time
+        assert max(peaks) == 2 * 12288 + 4096
+
+    def test_reserved_before_decoding(self, image_folder, gray_pipeline, monkeypatch):
+        from src.core import batch_runner
+
+        runner = BatchRunner(gray_pipeline, workers=1, memory_budget=10**9)
+        in_use = []
+        decode = batch_runner.decode_image
+
+        def tracking_decode(data, path):
+            in_use.append(runner.memory_budget.in_use)
+            return decode(data, path)
+
+        monkeypatch.setattr(batch_runner, "decode_image", tracking_decode)
+        runner.run(str(image_folder))
+        assert len(in_use) == 3 and min(in_use) > 0
+
+    def test_in_process_run_leaves_peak_mark(
+        self, image_folder, gray_pipeline, monkeypatch
+    ):
+        from src.core import batch_runner
+
+        def fail():
+            raise AssertionError("peak RSS reset in the calling process")
+
+        monkeypatch.setattr(batch_runner, "reset_peak_rss", fail)
+        runner = BatchRunner(gray_pipeline, workers=1, memory_budget=10**9)
+        assert all(r.success for r in runner.run(str(image_folder)))
+
+
+class TestSharedMemory:
+    def test_matches_pickled_transport(self, image_folder, gray_pipeline, tmp_path):
+        outputs = {}
+        for shared in (False, True):
+            out = tmp_path / f"out-{shared}"
+            runner = BatchRunner(
+                gray_pipeline, workers=2, output_dir=str(out), shared_memory=shared
+            )
+            results = runner.run(str(image_folder))
+            assert all(r.success for r in results)
+            outputs[shared] = [
+                cv2.imread(r.output_paths["result"], cv2.IMREAD_UNCHANGED)
+                for r in results
+            ]
+        for pickled, shared in zip(outputs[False], outputs[True]):
+            np.testing.assert_array_equal(pickled, shared)
+
+    def test_phantast_mask_through_slots(
+        self, image_folder, phantast_pipeline, tmp_path
+    ):
+        runner = BatchRunner(
+            phantast_pipeline,
+            workers=2,
+            output_dir=str(tmp_path / "out"),
+            shared_memory=True,
+        )
+        results = runner.run(str(image_folder))
+        assert all(r.success for r in results)
+        assert all("mask" in r.output_paths for r in results)
+
+
+@pytest.fixture
+def fake_phantast(monkeypatch):
+    calls = []
+
+    def process_phantast(image, sigma, epsilon, **kwargs):
+        calls.append(image.shape)
+        mask = image[..., 0] > 127
+        return float(mask.mean() * 100), mask
+
+    monkeypatch.setattr("src.core.steps.phantast_step.PHANTAST_AVAILABLE", True)
+    monkeypatch.setattr(
+        "src.core.steps.phantast_step.process_phantast", process_phantast, raising=False
+    )
+    return calls
+
+
+class TestResultCache:
+    def test_second_run_served_from_cache(
+        self, image_folder, phantast_pipeline, tmp_path, fake_phantast
+    ):
+        cache = ResultCache(str(tmp_path / "cache.db"))
+        runner = BatchRunner(phantast_pipeline, workers=1, result_cache=cache)
+        first = runner.run(str(image_folder))
+        second = runner.run(str(image_folder))
+        assert not any(r.cached for r in first)
+        assert all(r.cached and r.success for r in second)
+        assert [r.confluency for r in second] == [r.confluency for r in first]
+        assert len(fake_phantast) == 3
+
+    def test_cached_outputs_match(
+        self, image_folder, phantast_pipeline, tmp_path, fake_phantast
+    ):
+        cache = ResultCache(str(tmp_path / "cache.db"))
+        results = {}
+        for run in ("first", "second"):
+            runner = BatchRunner(
+                phantast_pipeline,
+                workers=1,
+                output_dir=str(tmp_path / run),
+                result_cache=cache,
+            )
+            results[run] = runner.run(str(image_folder))
+        assert all(r.cached for r in results["second"])
+        assert len(fake_phantast) == 3
+        for first, second in zip(results["first"], results["second"]):
+            for kind in ("result", "mask"):
+                np.testing.assert_array_equal(
+                    cv2.imread(first.output_paths[kind]),
+                    cv2.imread(second.output_paths[kind]),
+                )
+
+    def test_pool_workers_fill_cache(self, image_folder, phantast_pipeline, tmp_path):
+        cache = ResultCache(str(tmp_path / "cache.db"))
+        runner = BatchRunner(phantast_pipeline, workers=2, result_cache=cache)
+        runner.run(str(image_folder))
+        assert cache.stats()["entries"] == 3
+        assert all(r.cached for r in runner.run(str(image_folder)))
@@ -0,0 +1,198 @@
+import asyncio
+
+import pytest
+import numpy as np
+from src.core.execution_engine import EngineObserver, EngineTask, ExecutionEngine
+
+
+def double(image, metadata):
+    return image * 2
+
+
+def record(image, metadata):
+    metadata["seen"] = int(image.sum())
+    return image
+
+
+def fail(image, metadata):
+    raise ValueError("boom")
+
+
+class RecordingObserver(EngineObserver):
+    def __init__(self):
+        self.events = []
+
+    def task_started(self, task, position, total):
+        self.events.append(("start", task.key, position, total))
+
+    def task_finished(self, task, entry):
+        self.events.append(("finish", task.key))
+
+
+class TestExecutionEngine:
+    """Test the shared linear execution loop."""
+
+    def test_runs_tasks_in_order(self):
+        engine = ExecutionEngine()
+        tasks = [
+            EngineTask("a", "A", double),
+            EngineTask("b", "B", record),
+        ]
+
+        result = engine.run(np.array([1, 2]), tasks)
+
+        assert result.success is True
+        assert result.image.tolist() == [2, 4]
+        assert result.metadata["seen"] == 6
+        assert list(result.node_results) == ["a", "b"]
+
+    def test_input_shared_read_only_and_outputs_frozen(self):
+        image = np.array([1, 2])
+        result = ExecutionEngine().run(image, [EngineTask("a", "A", record)])
+
+        assert np.shares_memory(result.image, image)
+        assert image.flags.writeable is True
+        assert result.image.flags.writeable is False
+
+    def test_entries_include_telemetry_and_info(self):
+        tasks = [
+            EngineTask("a", "A", double),
+            EngineTask("b", "B", info={"elided": "folded"}),
+        ]
+
+        result = ExecutionEngine().run(np.array([1]), tasks)
+
+        ran, skipped = result.node_results["a"], result.node_results["b"]
+        assert ran["name"] == "A"
+        assert ran["output_bytes"] == ran["output"].nbytes
+        assert skipped["elided"] == "folded"
+        assert skipped["wall_ms"] == 0.0
+        assert skipped["output"] is ran["output"]
+
+    def test_task_without_output(self):
+        tasks = [
+            EngineTask("a", "A", info={"elided": "folded"}, reports_output=False),
+            EngineTask("b", "B", double),
+        ]
+
+        result = ExecutionEngine().run(np.array([1]), tasks)
+
+        assert result.node_results["a"]["output"] is None
+        assert result.node_results["a"]["output_bytes"] == 0
+        assert result.image.tolist() == [2]
+
+    def test_stop_on_error(self):
+        tasks = [EngineTask("a", "A", fail), EngineTask("b", "B", double)]
+
+        result = ExecutionEngine().run(np.array([1]), tasks)
+
+        assert result.success is False
+        assert result.error_message == "Node 'A' failed: boom"
+        assert "b" not in result.node_results
+
+    def test_continue_on_error(self):
+        tasks = [EngineTask("a", "A", fail), EngineTask("b", "B", double)]
+
+        result = ExecutionEngine(stop_on_error=False).run(np.array([1]), tasks)
+
+        assert result.success is True
+        assert result.node_results["a"]["error"] == "boom"
+        assert result.image.tolist() == [2]
+
+    def test_should_stop_cancels(self):
+        calls = []
+        tasks = [EngineTask(str(i), str(i), double) for i in range(3)]
+
+        result = ExecutionEngine().run(
+            np.array([1]),
+            tasks,
+            should_stop=lambda: calls.append(1) or len(calls) > 1,
+        )
+
+        assert result.cancelled is True
+        assert list(result.node_results) == ["0"]
+
+    def test_observers_see_runnable_positions(self):
+        observer = RecordingObserver()
+        tasks = [
+            EngineTask("a", "A", double),
+            EngineTask("b", "B"),
+            EngineTask("c", "C", double),
+        ]
+
+        ExecutionEngine(observers=[observer]).run(np.array([1]), tasks)
+
+        assert observer.events == [
+            ("start", "a", 1, 2),
+            ("finish", "a"),
+            ("finish", "b"),
+            ("start", "c", 2, 2),
+            ("finish", "c"),
+        ]
+
+
+class TestExecutionEngineCache:
+    """Test pluggable result caching."""
+
+    def _task(self, calls):
+        def run(image, metadata):
+            calls.append(1)
+            metadata["marker"] = "set"
+            return image + 1
+
+        return EngineTask("a", "A", run, cache_key=lambda image: image.tobytes())
+
+    def test_cache_hit_skips_step_and_restores_metadata(self):
+        cache, calls = {}, []
+        engine = ExecutionEngine(cache=cache)
+
+        engine.run(np.array([1]), [self._task(calls)])
+        result = engine.run(np.array([1]), [self._task(calls)])
+
+        assert len(calls) == 1
+        assert len(cache) == 1
+        assert result.node_results["a"]["cache_hit"] is True
+        assert result.metadata["marker"] == "set"
+
+    def test_different_input_misses(self):
+        calls = []
+        engine = ExecutionEngine(cache={})
+
+        engine.run(np.array([1]), [self._task(calls)])
+        engine.run(np.array([2]), [self._task(calls)])
+
+        assert len(calls) == 2
+
+    def test_no_cache_configured(self):
+        calls = []
+        engine = ExecutionEngine()
+
+        engine.run(np.array([1]), [self._task(calls)])
+        engine.run(np.array([1]), [self._task(calls)])
+
+        assert len(calls) == 2
+
+
+class TestExecutionEngineAsync:
+    """Test executor scheduling from asyncio."""
+
+    def test_astream_yields_each_entry(self):
+        tasks = [EngineTask("a", "A", double), EngineTask("b", "B", double)]
+
+        async def collect():
+            return [
+                (task.key, entry["output"].tolist())
+                async for task, entry in ExecutionEngine().astream(np.array([1]), tasks)
+            ]
+
+        assert asyncio.run(collect()) == [("a", [2]), ("b", [4])]
+
+    def test_astream_raises_on_error(self):
+        async def consume():
+            async for _ in ExecutionEngine().astream(
+                np.array([1]), [EngineTask("a", "A", fail)]
+            ):
+                pass
+
+        with pytest.raises(RuntimeError, match="Node 'A' failed"):
+            asyncio.run(consume())
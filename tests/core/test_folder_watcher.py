@@ -0,0 +1,189 @@
+import csv
+import os
+import sqlite3
+import threading
+
+import cv2
+import numpy as np
+import pytest
+
+from src.core.batch_runner import BatchRunner
+from src.core.folder_watcher import FolderWatcher, watch_folder
+from src.core.results_store import ResultsStore
+from src.models.pipeline_model import Pipeline, PipelineNode
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def write_image(path, value=0):
+    cv2.imwrite(str(path), np.full((16, 16), value, dtype=np.uint8))
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+class TestFolderWatcher:
+    def test_reports_files_after_settle_time(self, tmp_path, clock):
+        watcher = FolderWatcher(str(tmp_path), settle_time=2.0, clock=clock)
+        write_image(tmp_path / "a.png")
+
+        assert watcher.poll() == []
+        clock.now = 1.0
+        assert watcher.poll() == []
+        clock.now = 2.5
+        assert watcher.poll() == [str(tmp_path / "a.png")]
+        # Reported once
+        clock.now = 10.0
+        assert watcher.poll() == []
+
+    def test_growing_file_is_not_reported(self, tmp_path, clock):
+        watcher = FolderWatcher(str(tmp_path), settle_time=2.0, clock=clock)
+        path = tmp_path / "a.tif"
+        path.write_bytes(b"x" * 10)
+        watcher.poll()
+
+        clock.now = 3.0
+        with open(path, "ab") as f:
+            f.write(b"x" * 10)
+        assert watcher.poll() == []  # changed: settle time restarts
+        clock.now = 5.0
+        assert watcher.poll() == [str(path)]
+
+    def test_ignores_empty_and_non_image_files(self, tmp_path, clock):
+        watcher = FolderWatcher(str(tmp_path), settle_time=0, clock=clock)
+        (tmp_path / "empty.png").write_bytes(b"")
+        (tmp_path / "notes.txt").write_text("x")
+        (tmp_path / "sub.png").mkdir()
+        assert watcher.poll() == []
+
+    def test_include_existing_false(self, tmp_path, clock):
+        write_image(tmp_path / "old.png")
+        watcher = FolderWatcher(
+            str(tmp_path), settle_time=0, include_existing=False, clock=clock
+        )
+        assert watcher.poll() == []
+        write_image(tmp_path / "new.png")
+        assert watcher.poll() == [str(tmp_path / "new.png")]
+
+    def test_rewritten_file_is_reported_again(self, tmp_path, clock):
+        watcher = FolderWatcher(str(tmp_path), settle_time=0, clock=clock)
+        path = tmp_path / "a.png"
+        write_image(path)
+        assert watcher.poll() == [str(path)]
+
+        path.write_bytes(b"rewritten")
+        assert watcher.poll() == [str(path)]
+
+    def test_watch_stops_on_event(self, tmp_path):
+        watcher = FolderWatcher(str(tmp_path), settle_time=0, poll_interval=0.01)
+        write_image(tmp_path / "a.png")
+        stop = threading.Event()
+        seen = []
+        for path in watcher.watch(stop):
+            seen.append(path)
+            stop.set()
+        assert seen == [str(tmp_path / "a.png")]
+
+    def test_inotify_requires_package(self, tmp_path, monkeypatch):
+        from src.core import folder_watcher
+
+        monkeypatch.setattr(folder_watcher, "INOTIFY_AVAILABLE", False)
+        with pytest.raises(ValueError):
+            FolderWatcher(str(tmp_path), use_inotify=True)
+
+
+class TestWatchFolder:
+    def test_processes_new_images_and_updates_csv(self, tmp_path):
+        folder = tmp_path / "scope"
+        folder.mkdir()
+        pipeline = Pipeline(
+            id="p",
+            name="Gray",
+            nodes=[
+                PipelineNode(
+                    id="input",
+                    type="input",
+                    name="Input",
+                    description="",
+                    icon="",
+                    status="ready",
+                    enabled=True,
+                )
+            ],
+        )
+        runner = BatchRunner(pipeline, workers=1, output_dir=str(tmp_path / "out"))
+        csv_path = tmp_path / "results.csv"
+        write_image(folder / "a.png")
+
+        stop = threading.Event()
+        results = []
+        for result in watch_folder(
+            runner,
+            str(folder),
+            stop_event=stop,
+            csv_path=str(csv_path),
+            settle_time=0,
+            poll_interval=0.01,
+        ):
+            results.append(result)
+            if len(results) == 1:
+                # The microscope writes another image while we watch
+                write_image(folder / "b.png", 128)
+            else:
+                stop.set()
+
+        assert [os.path.basename(r.path) for r in results] == ["a.png", "b.png"]
+        with open(csv_path, newline="") as f:
+            rows = list(csv.DictReader(f))
+        assert [row["filename"] for row in rows] == ["a.png", "b.png"]
+
+    def test_rejects_output_inside_watched_folder(self, tmp_path):
+        runner = BatchRunner(Pipeline(), workers=1, output_dir=str(tmp_path))
+        with pytest.raises(ValueError):
+            next(watch_folder(runner, str(tmp_path)))
+
+    def test_records_watch_as_job(self, tmp_path):
+        folder = tmp_path / "plate-3"
+        folder.mkdir()
+        write_image(folder / "a.png")
+        runner = BatchRunner(Pipeline(nodes=[]), workers=1)
+        stop = threading.Event()
+
+        with ResultsStore(str(tmp_path / "results.db")) as store:
+            for _ in watch_folder(
+                runner, str(folder), stop_event=stop, store=store, settle_time=0
+            ):
+                stop.set()
+            job = store.jobs()[0]
+            assert job["plate"] == "plate-3"
+            assert job["status"] == "completed"
+            assert job["images"] == 1
+
+    def test_results_visible_to_other_connections_while_watching(self, tmp_path):
+        folder = tmp_path / "scope"
+        folder.mkdir()
+        write_image(folder / "a.png")
+        db_path = str(tmp_path / "results.db")
+        runner = BatchRunner(Pipeline(nodes=[]), workers=1)
+        stop = threading.Event()
+
+        with ResultsStore(db_path) as store:
+            for _ in watch_folder(
+                runner, str(folder), stop_event=stop, store=store, settle_time=0
+            ):
+                # The watch is still running; a dashboard reads the DB
+                reader = sqlite3.connect(db_path)
+                try:
+                    (rows,) = reader.execute("SELECT COUNT(*) FROM results").fetchone()
+                finally:
+                    reader.close()
+                assert rows == 1
+                stop.set()
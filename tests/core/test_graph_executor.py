@@ -0,0 +1,294 @@
+import threading
+
+import cv2
+import pytest
+import numpy as np
+from src.core.graph_executor import GraphExecutor
+from src.core.pipeline_step import PipelineStep
+from src.core.preview_pipeline import PreviewPipeline
+from src.core.steps import STEP_REGISTRY
+from src.models.app_state import AppState
+from src.models.pipeline_model import Pipeline, PipelineNode
+
+
+class CountingStep(PipelineStep):
+    """Adds its 'offset' parameter and counts executions."""
+
+    calls = 0
+    lock = threading.Lock()
+
+    def process(self, image: np.ndarray, metadata: dict) -> np.ndarray:
+        with CountingStep.lock:
+            CountingStep.calls += 1
+        metadata.setdefault("path", []).append(self.get_param("offset"))
+        return image + self.get_param("offset")
+
+
+class BarrierStep(PipelineStep):
+    """Blocks until two branches run at the same time."""
+
+    barrier = None
+
+    def process(self, image: np.ndarray, metadata: dict) -> np.ndarray:
+        BarrierStep.barrier.wait(timeout=5)
+        return image
+
+
+class SumStep(PipelineStep):
+    """Fan-in step that adds all of its inputs."""
+
+    def apply_many(self, images, metadata):
+        return sum(image.astype(np.int32) for image in images)
+
+    def process(self, image: np.ndarray, metadata: dict) -> np.ndarray:
+        return image
+
+
+@pytest.fixture
+def test_steps(monkeypatch):
+    monkeypatch.setitem(STEP_REGISTRY, "count", CountingStep)
+    monkeypatch.setitem(STEP_REGISTRY, "barrier", BarrierStep)
+    monkeypatch.setitem(STEP_REGISTRY, "sum", SumStep)
+    CountingStep.calls = 0
+
+
+def node(node_id, node_type, inputs=None, enabled=True, **parameters):
+    return PipelineNode(
+        id=node_id,
+        type=node_type,
+        name=node_id,
+        description="",
+        icon="",
+        status="ready",
+        enabled=enabled,
+        parameters=parameters,
+        inputs=inputs or [],
+    )
+
+
+def image():
+    return np.zeros((8, 8), dtype=np.int32)
+
+
+class TestGraphExecutor:
+    """Test DAG execution."""
+
+    def test_fan_out_named_outputs(self, test_steps):
+        pipeline = Pipeline(
+            nodes=[
+                node("in", "input"),
+                node("a", "count", ["in"], offset=1),
+                node("b", "count", ["in"], offset=2),
+            ],
+            outputs={"plus_one": "a", "plus_two": "b"},
+        )
+
+        result = GraphExecutor().execute(image(), pipeline)
+
+        assert result.success is True
+        assert result.outputs["plus_one"][0, 0] == 1
+        assert result.outputs["plus_two"][0, 0] == 2
+
+    def test_branch_metadata_isolated(self, test_steps):
+        pipeline = Pipeline(
+            nodes=[
+                node("in", "input"),
+                node("a", "count", ["in"], offset=1),
+                node("b", "count", ["in"], offset=2),
+            ]
+        )
+
+        result = GraphExecutor().execute(image(), pipeline)
+
+        assert result.metadata["a"]["path"] == [1]
+        assert result.metadata["b"]["path"] == [2]
+
+    def test_fan_in(self, test_steps):
+        pipeline = Pipeline(
+            nodes=[
+                node("in", "input"),
+                node("a", "count", ["in"], offset=1),
+                node("b", "count", ["in"], offset=2),
+                node("merge", "sum", ["a", "b"]),
+            ]
+        )
+
+        result = GraphExecutor().execute(image(), pipeline)
+
+        assert result.outputs == {"merge": pytest.approx(np.full((8, 8), 3))}
+
+    def test_fan_in_rejected_by_single_input_step(self, test_steps):
+        pipeline = Pipeline(
+            nodes=[
+                node("in", "input"),
+                node("a", "count", ["in"], offset=1),
+                node("merge", "count", ["in", "a"], offset=0),
+            ]
+        )
+
+        result = GraphExecutor().execute(image(), pipeline)
+
+        assert result.success is False
+        assert "takes 1 input" in result.error_message
+
+    def test_shared_prefix_computed_once(self, test_steps):
+        pipeline = Pipeline(
+            nodes=[
+                node("in", "input"),
+                node("pre_a", "count", ["in"], offset=1),
+                node("pre_b", "count", ["in"], offset=1),
+                node("a", "count", ["pre_a"], offset=10),
+                node("b", "count", ["pre_b"], offset=20),
+            ]
+        )
+
+        result = GraphExecutor().execute(image(), pipeline)
+
+        assert CountingStep.calls == 3
+        assert result.node_results["pre_b"]["shared_with"] == "pre_a"
+        assert result.outputs["a"][0, 0] == 11
+        assert result.outputs["b"][0, 0] == 21
+
+    def test_node_results_include_telemetry(self, test_steps):
+        pipeline = Pipeline(
+            nodes=[node("in", "input"), node("a", "count", ["in"], offset=1)]
+        )
+
+        result = GraphExecutor().execute(image(), pipeline)
+
+        entry = result.node_results["a"]
+        assert entry["wall_ms"] >= 0
+        assert entry["output_bytes"] == image().nbytes
+        assert entry["cache_hit"] is False
+
+    def test_unused_nodes_skipped(self, test_steps):
+        pipeline = Pipeline(
+            nodes=[
+                node("in", "input"),
+                node("a", "count", ["in"], offset=1),
+                node("unused", "count", ["in"], offset=5),
+            ],
+            outputs={"result": "a"},
+        )
+
+        result = GraphExecutor().execute(image(), pipeline)
+
+        assert CountingStep.calls == 1
+        assert "unused" not in result.node_results
+
+    def test_disabled_node_passes_through(self, test_steps):
+        pipeline = Pipeline(
+            nodes=[
+                node("in", "input"),
+                node("a", "count", ["in"], enabled=False, offset=1),
+            ]
+        )
+
+        result = GraphExecutor().execute(image(), pipeline)
+
+        assert result.outputs["a"][0, 0] == 0
+
+    def test_independent_branches_run_concurrently(self, test_steps):
+        BarrierStep.barrier = threading.Barrier(2)
+        pipeline = Pipeline(
+            nodes=[
+                node("in", "input"),
+                node("a", "barrier", ["in"], tag="a"),
+                node("b", "barrier", ["in"], tag="b"),
+            ]
+        )
+
+        result = GraphExecutor(max_workers=2).execute(image(), pipeline)
+
+        assert result.success is True
+
+    def test_cycle_fails(self, test_steps):
+        pipeline = Pipeline(
+            nodes=[node("a", "count", ["b"]), node("b", "count", ["a"])]
+        )
+
+        result = GraphExecutor().execute(image(), pipeline)
+
+        assert result.success is False
+        assert "cycle" in result.error_message
+
+
+class TestPreviewPipelineGraph:
+    """Test PreviewPipeline delegates graph pipelines."""
+
+    def test_preview_runs_graph(self, test_steps):
+        state = AppState()
+        state.pipeline = Pipeline(
+            nodes=[
+                node("in", "input"),
+                node("a", "count", ["in"], offset=1),
+                node("b", "count", ["in"], offset=2),
+            ],
+            outputs={"first": "a", "second": "b"},
+        )
+
+        result = PreviewPipeline().execute(image(), state)
+
+        assert result.success is True
+        assert set(result.outputs) == {"first", "second"}
+        assert result.image[0, 0] == 1
+
+    def test_diamond_with_merge_step(self):
+        rng = np.random.default_rng(0)
+        frame = rng.integers(0, 255, (32, 32, 3), dtype=np.uint8)
+        pipeline = Pipeline(
+            nodes=[
+                node("in", "input"),
+                node("blur", "gaussian_blur", ["in"], kernel_size=5, sigma=1.0),
+                node("clahe", "clahe", ["in"]),
+                node("merge", "merge", ["blur", "clahe"], mode="max"),
+            ],
+            outputs={"result": "merge"},
+        )
+
+        result = PreviewPipeline().execute(frame, pipeline)
+
+        blurred = cv2.cvtColor(cv2.GaussianBlur(frame, (5, 5), 1.0), cv2.COLOR_BGR2GRAY)
+        equalized = cv2.createCLAHE(2.0, (8, 8)).apply(
+            cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        )
+        assert result.success is True
+        np.testing.assert_array_equal(result.image, np.maximum(blurred, equalized))
+
+    def test_graph_reports_progress(self, test_steps):
+        state = AppState()
+        state.pipeline = Pipeline(
+            nodes=[
+                node("in", "input"),
+                node("a", "count", ["in"], offset=1),
+                node("b", "count", ["in"], offset=2),
+            ],
+            outputs={"first": "a", "second": "b"},
+        )
+        progress = []
+
+        PreviewPipeline().execute(
+            image(), state, progress_callback=lambda *p: progress.append(p)
+        )
+
+        assert progress == [(1, 3), (2, 3), (3, 3)]
+
+    def test_graph_pass_cancelled_by_newer_request(self, test_steps):
+        preview = PreviewPipeline()
+        generation = preview.cancel_pending()
+        state = AppState()
+        state.pipeline = Pipeline(
+            nodes=[node("in", "input"), node("a", "count", ["in"], offset=1)],
+            outputs={"result": "a"},
+        )
+
+        def supersede(position, total):
+            preview.cancel_pending()
+
+        preview.progress_updated.connect(supersede)
+        result = preview._execute_pass(
+            image(), state.pipeline.snapshot(), generation=generation
+        )
+
+        assert result.cancelled is True
+        assert CountingStep.calls == 0
@@ -0,0 +1,31 @@
+import cv2
+import numpy as np
+import pytest
+
+from src.core.image_header import read_image_spec
+from src.core.pipeline_step import ImageSpec
+
+IMAGES = [
+    np.zeros((5, 7), np.uint8),
+    np.zeros((5, 7, 3), np.uint8),
+    np.zeros((5, 7, 4), np.uint8),
+    np.zeros((5, 7), np.uint16),
+    np.zeros((5, 7, 3), np.uint16),
+    np.zeros((5, 7), np.float32),
+]
+
+
+@pytest.mark.parametrize("extension", [".png", ".jpg", ".tif", ".bmp"])
+@pytest.mark.parametrize("image", IMAGES, ids=lambda i: str(ImageSpec.of(i)))
+def test_matches_decoded_image(extension, image):
+    # Encoders may convert the image; the header describes what is decoded
+    ok, data = cv2.imencode(extension, image)
+    assert ok
+    decoded = cv2.imdecode(data, cv2.IMREAD_UNCHANGED)
+    assert read_image_spec(data) == ImageSpec.of(decoded)
+
+
+def test_unreadable_headers():
+    ok, data = cv2.imencode(".png", IMAGES[1])
+    assert read_image_spec(np.frombuffer(b"not an image", np.uint8)) is None
+    assert read_image_spec(data[:12]) is None
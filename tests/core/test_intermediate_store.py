@@ -0,0 +1,79 @@
+import os
+
+import numpy as np
+import pytest
+
+from src.core.intermediate_store import IntermediateStore
+
+
+def node_results(size=8):
+    image = np.arange(size * size * 3, dtype=np.uint8).reshape(size, size, 3)
+    gray = image[..., 0].copy()
+    return {
+        "input": {"name": "Input", "output": image},
+        "gray": {"name": "Grayscale", "output": gray},
+        # A disabled / elided node passes its input through
+        "blur": {"name": "Blur", "output": gray},
+    }
+
+
+class TestIntermediateStore:
+    def test_roundtrip_as_memory_maps(self, tmp_path):
+        store = IntermediateStore(str(tmp_path / "stacks"))
+        results = node_results()
+        store.save("a.png", results)
+
+        stack = store.open("a.png")
+        assert len(stack) == 3
+        assert stack.keys == ["input", "gray", "blur"]
+        for index, entry in enumerate(results.values()):
+            stage = stack.stage(index)
+            assert isinstance(stage, np.memmap)
+            np.testing.assert_array_equal(stage, entry["output"])
+        np.testing.assert_array_equal(
+            stack.stage("gray")[2:4, 1], results["gray"]["output"][2:4, 1]
+        )
+
+    def test_shared_outputs_stored_once(self, tmp_path):
+        store = IntermediateStore(str(tmp_path))
+        nbytes = store.save("a.png", node_results())
+        assert nbytes == 8 * 8 * 3 + 8 * 8
+        files = [f for f in os.listdir(store.folder("a.png")) if f.endswith(".npy")]
+        assert len(files) == 2
+
+    def test_keys_differing_in_replaced_characters_kept_apart(self, tmp_path):
+        store = IntermediateStore(str(tmp_path))
+        store.save("A1/img.png", node_results(4))
+        store.save("A1_img.png", node_results(6))
+        assert store.folder("A1/img.png") != store.folder("A1_img.png")
+        assert store.open("A1/img.png").stage("gray").shape == (4, 4)
+
+    def test_save_replaces_stack(self, tmp_path):
+        store = IntermediateStore(str(tmp_path))
+        store.save("a.png", node_results())
+        store.save("a.png", {"input": {"name": "Input", "output": np.zeros(4)}})
+        assert store.open("a.png").keys == ["input"]
+        assert os.listdir(tmp_path) == ["a.png"]
+
+    def test_missing_stack(self, tmp_path):
+        store = IntermediateStore(str(tmp_path))
+        assert store.open("nope.png") is None
+        store.save("a.png", node_results())
+        with pytest.raises(KeyError):
+            store.open("a.png").stage("missing")
+
+    def test_budget_evicts_oldest(self, tmp_path):
+        store = IntermediateStore(str(tmp_path), budget_bytes=500)
+        for name in ("a.png", "b.png", "c.png"):
+            store.track(name, store.save(name, node_results()))
+            store.enforce_budget()
+        # Each stack is 256 bytes; only the newest fits
+        assert store.open("a.png") is None
+        assert store.open("b.png") is None
+        assert store.open("c.png") is not None
+        assert store.disk_usage() == 256
+
+    def test_usage_loaded_from_disk(self, tmp_path):
+        first = IntermediateStore(str(tmp_path))
+        first.save("a.png", node_results())
+        assert IntermediateStore(str(tmp_path)).disk_usage() == 256
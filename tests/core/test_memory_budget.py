@@ -0,0 +1,114 @@
+import threading
+
+import numpy as np
+import pytest
+
+from src.core.memory_budget import (
+    JobEstimator,
+    MemoryBudget,
+    estimate_job_bytes,
+    peak_rss,
+    reset_peak_rss,
+)
+from src.core.pipeline_step import ImageSpec
+from src.models.pipeline_model import PipelineNode
+
+
+def make_node(node_id, node_type, enabled=True):
+    return PipelineNode(
+        id=node_id,
+        type=node_type,
+        name=node_type,
+        description="",
+        icon="",
+        status="ready",
+        enabled=enabled,
+        parameters={},
+    )
+
+
+SPEC = ImageSpec((100, 200, 3), np.uint8)
+
+
+class TestEstimate:
+    def test_sums_node_outputs(self):
+        nodes = [make_node("input", "input"), make_node("gray", "grayscale")]
+        # Input image, input node output, gray output
+        assert estimate_job_bytes(nodes, SPEC) == 2 * 60000 + 20000
+
+    def test_disabled_and_unknown_nodes_skipped(self):
+        nodes = [
+            make_node("input", "input"),
+            make_node("gray", "grayscale", enabled=False),
+            make_node("x", "no_such_type"),
+        ]
+        assert estimate_job_bytes(nodes, SPEC) == 2 * 60000
+
+    def test_phantast_scratch(self):
+        from src.core.steps.phantast_step import PHANTAST_AVAILABLE
+
+        nodes = [make_node("input", "input"), make_node("output", "output")]
+        scratch = 100 * 100 * 200 if PHANTAST_AVAILABLE else 0
+        assert estimate_job_bytes(nodes, SPEC) == 3 * 60000 + scratch
+
+    def test_estimator_caches_per_spec(self, monkeypatch):
+        estimator = JobEstimator([make_node("input", "input")])
+        assert estimator(SPEC) == 120000
+        monkeypatch.setattr(
+            "src.core.memory_budget.estimate_job_bytes", lambda *_: pytest.fail()
+        )
+        assert estimator(SPEC) == 120000
+
+
+class TestMemoryBudget:
+    def test_admits_while_fitting(self):
+        budget = MemoryBudget(100)
+        assert budget.acquire(60, timeout=0)
+        assert budget.acquire(40, timeout=0)
+        assert not budget.acquire(1, timeout=0)
+        budget.release(60)
+        assert budget.acquire(50, timeout=0)
+        assert budget.in_use == 90
+
+    def test_oversized_job_runs_alone(self):
+        budget = MemoryBudget(100)
+        assert budget.acquire(500, timeout=0)
+        assert not budget.acquire(10, timeout=0)
+        budget.release(500)
+        assert budget.in_use == 0
+
+    def test_release_wakes_waiter(self):
+        budget = MemoryBudget(100)
+        budget.acquire(100)
+        admitted = threading.Event()
+
+        def wait():
+            budget.acquire(50)
+            admitted.set()
+
+        thread = threading.Thread(target=wait)
+        thread.start()
+        assert not admitted.wait(0.05)
+        budget.release(100)
+        assert admitted.wait(1)
+        thread.join()
+
+    def test_factor_adapts_to_measurements(self):
+        budget = MemoryBudget(1000)
+        assert budget.reservation(100) == 100
+        budget.observe(100, 300)
+        assert budget.factor == pytest.approx(2.0)
+        assert budget.reservation(100) == 200
+        budget.observe(100, None)
+        assert budget.factor == pytest.approx(2.0)
+        # A single reading is clamped
+        budget.observe(100, 1)
+        assert budget.factor == pytest.approx(1.125)
+
+
+def test_peak_rss_measures_allocation():
+    before = reset_peak_rss()
+    if before is None:
+        pytest.skip("peak RSS not measurable on this platform")
+    block = np.ones(32 * 1024 * 1024, dtype=np.uint8)
+    assert peak_rss() - before >= block.nbytes // 2
@@ -0,0 +1,35 @@
+import numpy as np
+
+from src.core.node_cache import NodeCache, entry_bytes
+
+
+def array(nbytes):
+    return np.zeros(nbytes, dtype=np.uint8)
+
+
+class TestNodeCache:
+    def test_entry_bytes_counts_nested_arrays(self):
+        assert entry_bytes((array(10), {"mask": array(5), "x": 1})) == 15
+
+    def test_evicts_least_recently_used_over_budget(self):
+        cache = NodeCache(max_bytes=100)
+        cache["a"] = array(40)
+        cache["b"] = array(40)
+        cache.get("a")  # a is now the most recently used
+        cache["c"] = array(40)
+
+        assert set(cache) == {"a", "c"}
+        assert cache.nbytes == 80
+
+    def test_replacing_entry_updates_bytes(self):
+        cache = NodeCache(max_bytes=100)
+        cache["a"] = array(40)
+        cache["a"] = array(10)
+        assert cache.nbytes == 10
+
+    def test_entry_larger_than_budget_not_kept(self):
+        cache = NodeCache(max_bytes=100)
+        cache["a"] = array(10)
+        cache["big"] = array(200)
+        assert "big" not in cache
+        assert "a" in cache
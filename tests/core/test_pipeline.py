@@ -1,3 +1,6 @@
+import asyncio
+import threading
+
 import pytest
 import numpy as np
 from src.core.pipeline import ImagePipeline
@@ -92,3 +95,192 @@ class TestImagePipeline:
         input_img = np.array([1, 2, 3])
         result = pipeline.execute(input_img)
         np.testing.assert_array_equal(result, input_img)  # Pass-through on error
+
+
+class GateStep(PipelineStep):
+    def __init__(self):
+        super().__init__()
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def process(self, image: np.ndarray, metadata: dict) -> np.ndarray:
+        self.started.set()
+        self.release.wait(timeout=5)
+        return image
+
+
+class TestImagePipelineAsync:
+    def test_aexecute_matches_execute(self):
+        pipeline = ImagePipeline()
+        pipeline.add_step(MultiplyStep())
+        pipeline.add_step(MetadataStep())
+        input_img = np.array([1, 2, 3])
+
+        result = asyncio.run(pipeline.aexecute(input_img))
+
+        np.testing.assert_array_equal(result, pipeline.execute(input_img))
+        assert pipeline.get_metadata()["steps"] == ["MetadataStep"]
+
+    def test_astream_yields_each_enabled_step(self):
+        pipeline = ImagePipeline()
+        first, skipped, last = MultiplyStep(), IdentityStep(), MultiplyStep()
+        skipped.enabled = False
+        for step in (first, skipped, last):
+            pipeline.add_step(step)
+
+        async def collect():
+            return [
+                (step, image.tolist())
+                async for step, image in pipeline.astream(np.array([1, 2]))
+            ]
+
+        assert asyncio.run(collect()) == [(first, [2, 4]), (last, [4, 8])]
+
+    def test_astream_error_passes_through(self):
+        pipeline = ImagePipeline()
+        pipeline.add_step(FailingStep())
+        input_img = np.array([1, 2, 3])
+
+        result = asyncio.run(pipeline.aexecute(input_img))
+
+        np.testing.assert_array_equal(result, input_img)
+
+    def test_cancel_skips_remaining_steps(self):
+        pipeline = ImagePipeline()
+        gate, after = GateStep(), GateStep()
+        pipeline.add_step(gate)
+        pipeline.add_step(after)
+
+        async def cancel_midway():
+            task = asyncio.ensure_future(pipeline.aexecute(np.array([1])))
+            while not gate.started.is_set():
+                await asyncio.sleep(0.01)
+            task.cancel()
+            gate.release.set()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancel_midway())
+
+        assert not after.started.is_set()
+
+
+class TestImagePipelineEngine:
+    def test_cache_reused_across_runs(self):
+        calls = []
+
+        class CountingStep(PipelineStep):
+            def process(self, image, metadata):
+                calls.append(1)
+                return image + 1
+
+        pipeline = ImagePipeline(cache={})
+        pipeline.add_step(CountingStep())
+        input_img = np.array([1, 2, 3])
+
+        pipeline.execute(input_img)
+        result = pipeline.execute(input_img)
+
+        assert len(calls) == 1
+        assert result.tolist() == [2, 3, 4]
+        assert pipeline.get_node_results()["0"]["cache_hit"] is True
+
+    def test_parameter_change_misses_cache(self):
+        pipeline = ImagePipeline(cache={})
+        step = MultiplyStep()
+        pipeline.add_step(step)
+        input_img = np.array([1])
+
+        pipeline.execute(input_img)
+        step.set_param("factor", 3)
+        pipeline.execute(input_img)
+
+        assert pipeline.get_node_results()["0"]["cache_hit"] is False
+
+    def test_node_results_have_timing(self):
+        pipeline = ImagePipeline()
+        pipeline.add_step(MultiplyStep())
+
+        pipeline.execute(np.array([1]))
+
+        entry = pipeline.get_node_results()["0"]
+        assert entry["name"] == "MultiplyStep"
+        assert entry["wall_ms"] >= 0.0
+
+
+class TestShellPipeline:
+    """The shell prototype's pipeline runs on the same engine."""
+
+    def test_shell_pipeline_uses_engine(self):
+        from shell.core.pipeline import ImagePipeline as ShellPipeline
+        from shell.core.steps import GaussianBlurStep, GrayscaleStep
+
+        pipeline = ShellPipeline()
+        pipeline.add_step(GrayscaleStep())
+        pipeline.add_step(GaussianBlurStep())
+        image = np.zeros((10, 10, 3), dtype=np.uint8)
+
+        result = pipeline.execute(image)
+
+        assert result.shape == (10, 10)
+        assert image.flags.writeable is True
+
+
+class TestImagePipelineContracts:
+    def _gray_chain(self):
+        from src.core.steps import ClaheStep, GaussianBlurStep, GrayscaleStep
+
+        pipeline = ImagePipeline()
+        pipeline.add_step(GrayscaleStep())
+        pipeline.add_step(GaussianBlurStep())
+        pipeline.add_step(ClaheStep())
+        return pipeline
+
+    def test_plan_reports_output_specs(self):
+        from src.core.pipeline_step import ImageSpec
+
+        specs = self._gray_chain().plan(ImageSpec((30, 40, 3), np.uint8))
+
+        assert [spec.shape for spec in specs] == [(30, 40)] * 3
+
+    def test_impossible_chain_rejected_before_running(self):
+        from src.core.pipeline_step import ImageSpec
+
+        pipeline = self._gray_chain()
+        calls = []
+        pipeline.steps[0].process = lambda image, metadata: calls.append(1)
+
+        with pytest.raises(ValueError, match="Step 2 \\(ClaheStep\\)"):
+            pipeline.plan(ImageSpec((30, 40, 3), np.float32))
+        with pytest.raises(ValueError):
+            pipeline.execute(np.zeros((30, 40, 3), dtype=np.float32))
+        assert calls == []
+
+    def test_prepared_buffers_reused(self):
+        from src.core.pipeline_step import ImageSpec
+
+        pipeline = self._gray_chain()
+        rng = np.random.default_rng(0)
+        first = rng.integers(0, 255, (30, 40, 3), dtype=np.uint8)
+        second = rng.integers(0, 255, (30, 40, 3), dtype=np.uint8)
+        expected = self._gray_chain().execute(second).copy()
+
+        allocated = pipeline.prepare(ImageSpec.of(first))
+        one = pipeline.execute(first)
+        two = pipeline.execute(second)
+
+        assert allocated == 3 * 30 * 40
+        assert np.shares_memory(one, two)
+        assert two.flags.writeable is False
+        np.testing.assert_array_equal(two, expected)
+
+    def test_buffers_skipped_for_other_sizes(self):
+        from src.core.pipeline_step import ImageSpec
+
+        pipeline = self._gray_chain()
+        pipeline.prepare(ImageSpec((30, 40, 3), np.uint8))
+
+        result = pipeline.execute(np.zeros((10, 10, 3), dtype=np.uint8))
+
+        assert result.shape == (10, 10)
+        assert not any(np.shares_memory(result, b) for b in pipeline._buffers.values())
@@ -0,0 +1,193 @@
+import pytest
+import cv2
+import numpy as np
+from src.core.pipeline_compiler import PipelineCompiler, compile_pipeline
+from src.core.preview_pipeline import PreviewPipeline
+from src.models.app_state import AppState
+from src.models.pipeline_model import Pipeline, PipelineNode
+
+
+def make_node(node_id, node_type, enabled=True, **parameters):
+    return PipelineNode(
+        id=node_id,
+        type=node_type,
+        name=node_id,
+        description="",
+        icon="",
+        status="ready",
+        enabled=enabled,
+        parameters=parameters,
+    )
+
+
+def make_pipeline(*middle):
+    return Pipeline(
+        name="Test",
+        nodes=[make_node("input", "input"), *middle, make_node("output", "output")],
+    )
+
+
+def step_types(plan):
+    return [step.node_type for step in plan.steps]
+
+
+class TestCompilePipeline:
+    """Test individual compiler passes."""
+
+    def test_plain_pipeline_unchanged(self):
+        plan = compile_pipeline(make_pipeline(make_node("c", "clahe")))
+        assert step_types(plan) == ["input", "clahe", "output"]
+        assert plan.elided == {}
+
+    def test_disabled_nodes_dropped(self):
+        plan = compile_pipeline(make_pipeline(make_node("c", "clahe", enabled=False)))
+        assert step_types(plan) == ["input", "output"]
+        assert "c" not in plan.node_order
+
+    def test_unit_kernel_blur_dropped(self):
+        plan = compile_pipeline(
+            make_pipeline(make_node("b", "gaussian_blur", kernel_size=1, sigma=1.0))
+        )
+        assert step_types(plan) == ["input", "output"]
+        assert "no-op" in plan.elided["b"]
+
+    def test_grayscale_before_clahe_folded(self):
+        plan = compile_pipeline(
+            make_pipeline(make_node("g", "grayscale"), make_node("c", "clahe"))
+        )
+        assert step_types(plan) == ["input", "clahe", "output"]
+        assert "folded" in plan.elided["g"]
+        # CLAHE does the conversion, so "g" has no output of its own
+        assert plan.deferred == {"g"}
+
+    def test_repeated_grayscale_folded(self):
+        plan = compile_pipeline(
+            make_pipeline(make_node("g1", "grayscale"), make_node("g2", "grayscale"))
+        )
+        assert step_types(plan) == ["input", "grayscale", "output"]
+        # "g2" converts for "g1"
+        assert plan.deferred == {"g1"}
+
+    def test_grayscale_before_phantast_kept(self):
+        """PHANTAST draws its overlay on its input, so gray input matters."""
+        plan = compile_pipeline(make_pipeline(make_node("g", "grayscale")))
+        assert step_types(plan) == ["input", "grayscale", "output"]
+
+    def test_adjacent_blurs_fused(self):
+        plan = compile_pipeline(
+            make_pipeline(
+                make_node("b1", "gaussian_blur", kernel_size=5, sigma=1.0),
+                make_node("b2", "gaussian_blur", kernel_size=5, sigma=1.0),
+            ),
+            fuse_blurs=True,
+        )
+        assert step_types(plan) == ["input", "gaussian_blur", "output"]
+        fused = plan.steps[1]
+        assert fused.source_ids == ("b1", "b2")
+        assert fused.parameters["kernel_size"] == 9
+        assert fused.parameters["sigma"] == pytest.approx(np.sqrt(2.0))
+
+    def test_blurs_not_fused_by_default(self):
+        plan = compile_pipeline(
+            make_pipeline(
+                make_node("b1", "gaussian_blur", kernel_size=5, sigma=1.0),
+                make_node("b2", "gaussian_blur", kernel_size=5, sigma=1.0),
+            )
+        )
+        assert step_types(plan) == ["input", "gaussian_blur", "gaussian_blur", "output"]
+
+    def test_defaults_applied(self):
+        plan = compile_pipeline(make_pipeline(make_node("c", "clahe")))
+        assert plan.steps[1].parameters["clip_limit"] == 2.0
+
+    def test_dump_lists_steps_and_elided(self):
+        plan = compile_pipeline(
+            make_pipeline(make_node("g", "grayscale"), make_node("c", "clahe"))
+        )
+        text = plan.dump()
+        assert "clahe[c]" in text
+        assert "- g: folded" in text
+
+
+class TestPipelineCompilerCache:
+    """Test plan caching and invalidation."""
+
+    def test_plan_cached_while_unchanged(self):
+        compiler = PipelineCompiler()
+        pipeline = make_pipeline(make_node("c", "clahe"))
+        assert compiler.compile(pipeline) is compiler.compile(pipeline)
+
+    def test_parameter_change_recompiles(self):
+        compiler = PipelineCompiler()
+        pipeline = make_pipeline(make_node("b", "gaussian_blur", kernel_size=5))
+        first = compiler.compile(pipeline)
+
+        pipeline.nodes[1].parameters["kernel_size"] = 1
+        second = compiler.compile(pipeline)
+
+        assert second is not first
+        assert step_types(second) == ["input", "output"]
+
+    def test_toggle_recompiles(self):
+        compiler = PipelineCompiler()
+        pipeline = make_pipeline(make_node("c", "clahe"))
+        first = compiler.compile(pipeline)
+
+        pipeline.nodes[1].enabled = False
+
+        assert compiler.compile(pipeline) is not first
+
+    def test_invalidate(self):
+        compiler = PipelineCompiler()
+        pipeline = make_pipeline(make_node("c", "clahe"))
+        first = compiler.compile(pipeline)
+        compiler.invalidate()
+        assert compiler.compile(pipeline) is not first
+
+    def test_unchanged_version_skips_comparison(self, monkeypatch):
+        import src.core.pipeline_compiler as module
+
+        compiler = PipelineCompiler()
+        pipeline = make_pipeline(make_node("c", "clahe"))
+        first = compiler.compile(pipeline)
+
+        def fail(_):
+            raise AssertionError("signature rebuilt for unchanged pipeline")
+
+        monkeypatch.setattr(module, "_pipeline_signature", fail)
+        assert compiler.compile(pipeline) is first
+
+
+class TestPreviewPipelineUsesPlan:
+    """Test the preview executes the compiled plan."""
+
+    def test_elided_nodes_reported(self):
+        state = AppState()
+        state.initialize_default_pipeline()
+        state.pipeline.nodes[-1].enabled = False
+        state.add_node(make_node("g", "grayscale"))
+        state.add_node(make_node("c", "clahe"))
+        image = np.random.randint(0, 255, (40, 40, 3), dtype=np.uint8)
+
+        result = PreviewPipeline().execute(image, state)
+
+        assert result.success is True
+        assert list(result.node_results) == ["input", "g", "c"]
+        assert "folded" in result.node_results["g"]["elided"]
+        assert result.image.shape == (40, 40)
+        # Not the color input it passed on
+        assert result.node_results["g"]["output"] is None
+        assert result.node_results["g"]["output_bytes"] == 0
+
+    def test_default_plan_matches_sequential_blurs_exactly(self):
+        state = AppState()
+        state.initialize_default_pipeline()
+        state.pipeline.nodes[-1].enabled = False
+        state.add_node(make_node("b1", "gaussian_blur", kernel_size=5, sigma=1.0))
+        state.add_node(make_node("b2", "gaussian_blur", kernel_size=5, sigma=1.0))
+        image = np.random.default_rng(0).integers(0, 255, (40, 40), dtype=np.uint8)
+
+        expected = cv2.GaussianBlur(cv2.GaussianBlur(image, (5, 5), 1.0), (5, 5), 1.0)
+        result = PreviewPipeline().execute(image, state)
+
+        np.testing.assert_array_equal(result.image, expected)
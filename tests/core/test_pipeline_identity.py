@@ -0,0 +1,134 @@
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+from src.core import pipeline_identity
+from src.core.pipeline_identity import (
+    canonical_pipeline,
+    normalize_parameter,
+    pipeline_hash,
+)
+from src.core.parameter_schemas import get_node_spec
+from src.core.steps import ClaheStep
+from src.models.pipeline_model import Pipeline, PipelineNode
+
+
+def make_node(node_id, node_type, enabled=True, inputs=(), **parameters):
+    return PipelineNode(
+        id=node_id,
+        type=node_type,
+        name=node_id.title(),
+        description="",
+        icon="",
+        status="ready",
+        enabled=enabled,
+        parameters=parameters,
+        inputs=list(inputs),
+    )
+
+
+def make_pipeline(**clahe):
+    return Pipeline(
+        id="p",
+        name="P",
+        nodes=[
+            make_node("in", "input"),
+            make_node("blur", "gaussian_blur", kernel_size=5),
+            make_node("clahe", "clahe", **clahe),
+        ],
+    )
+
+
+class TestNormalizeParameter:
+    def test_converts_to_schema_types(self):
+        blur = get_node_spec("gaussian_blur")
+        assert normalize_parameter(5.0, blur.get_parameter_spec("kernel_size")) == 5
+        sigma = normalize_parameter(np.int64(2), blur.get_parameter_spec("sigma"))
+        assert sigma == 2.0 and type(sigma) is float
+
+    def test_tuples_become_lists_of_default_element_types(self):
+        grid = get_node_spec("clahe").get_parameter_spec("grid_size")
+        assert normalize_parameter((8.0, 8), grid) == [8, 8]
+
+    def test_keeps_values_that_do_not_convert(self):
+        blur = get_node_spec("gaussian_blur")
+        assert normalize_parameter("x", blur.get_parameter_spec("kernel_size")) == "x"
+        assert normalize_parameter(5.5, blur.get_parameter_spec("kernel_size")) == 5.5
+
+
+class TestPipelineHash:
+    def test_follows_parameters(self):
+        pipeline = make_pipeline()
+        before = pipeline_hash(pipeline)
+        pipeline.nodes[1].parameters["kernel_size"] = 7
+        assert pipeline_hash(pipeline) != before
+
+    def test_stable_across_json_round_trip_and_snapshots(self):
+        pipeline = make_pipeline(grid_size=(8, 8), clip_limit=2)
+        digest = pipeline_hash(pipeline)
+        assert pipeline_hash(Pipeline.from_dict(pipeline.to_dict())) == digest
+        assert pipeline_hash(pipeline.snapshot()) == digest
+        # Missing parameters hash as their defaults
+        assert pipeline_hash(make_pipeline()) == digest
+
+    def test_ignores_ui_fields_and_disabled_nodes(self):
+        pipeline = make_pipeline()
+        digest = pipeline_hash(pipeline)
+        node = pipeline.nodes[1]
+        node.name, node.icon, node.status = "Smooth", "*", "running"
+        node.description = "Edited"
+        node.id = "renamed"
+        assert pipeline_hash(pipeline) == digest
+
+        pipeline.insert_node(1, make_node("gray", "grayscale", enabled=False))
+        assert pipeline_hash(pipeline) == digest
+        pipeline.nodes[1].enabled = True
+        assert pipeline_hash(pipeline) != digest
+
+    def test_graph_inputs_resolve_through_disabled_nodes(self):
+        def graph(enabled):
+            return Pipeline(
+                nodes=[
+                    make_node("in", "input"),
+                    make_node("gray", "grayscale", enabled=enabled, inputs=["in"]),
+                    make_node("clahe", "clahe", inputs=["gray"]),
+                ],
+                outputs={"result": "clahe"},
+            )
+
+        nodes = canonical_pipeline(graph(False))["nodes"]
+        assert [node["inputs"] for node in nodes] == [[], [0]]
+        assert canonical_pipeline(graph(False))["outputs"] == {"result": 1}
+        assert pipeline_hash(graph(False)) != pipeline_hash(graph(True))
+
+    def test_includes_code_versions(self, monkeypatch):
+        pipeline = make_pipeline()
+        digest = pipeline_hash(pipeline)
+        monkeypatch.setattr(ClaheStep, "version", ClaheStep.version + 1)
+        assert pipeline_hash(pipeline) != digest
+        monkeypatch.undo()
+        monkeypatch.setattr(pipeline_identity, "CODE_VERSION", 2)
+        assert pipeline_hash(pipeline) != digest
+
+    def test_stable_across_processes(self):
+        pipeline = make_pipeline(grid_size=[8, 8])
+        code = (
+            "import json, sys\n"
+            "from src.core.pipeline_identity import pipeline_hash\n"
+            "from src.models.pipeline_model import Pipeline\n"
+            "print(pipeline_hash(Pipeline.from_dict(json.loads(sys.argv[1]))))\n"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+        for seed in ("1", "2"):
+            output = subprocess.run(
+                [sys.executable, "-c", code, json.dumps(pipeline.to_dict())],
+                capture_output=True,
+                text=True,
+                check=True,
+                cwd=os.path.abspath(root),
+                env={**os.environ, "PYTHONHASHSEED": seed},
+            ).stdout.strip()
+            assert output == pipeline_hash(pipeline)
@@ -1,6 +1,12 @@
 import pytest
 import numpy as np
-from src.core.pipeline_step import PipelineStep, StepParameter
+from src.core.pipeline_step import (
+    ImageSpec,
+    PipelineStep,
+    StepParameter,
+    freeze,
+    readonly_view,
+)
 
 
 class DummyStep(PipelineStep):
@@ -10,6 +16,32 @@ class DummyStep(PipelineStep):
         return image
 
 
+class RecordingStep(PipelineStep):
+    """Step that records parameter change notifications."""
+
+    param_aliases = {"size": "kernel_size"}
+
+    def __init__(self):
+        super().__init__()
+        self.changes = []
+
+    def on_params_changed(self, changed):
+        self.changes.append(set(changed))
+
+    def process(self, image: np.ndarray, metadata: dict) -> np.ndarray:
+        return image
+
+
+class InPlaceStep(PipelineStep):
+    """Step that mutates its input buffer."""
+
+    in_place = True
+
+    def process(self, image: np.ndarray, metadata: dict) -> np.ndarray:
+        image += 1
+        return image
+
+
 class TestPipelineStep:
     def test_abstract_class_cannot_be_instantiated(self):
         with pytest.raises(TypeError):
@@ -38,6 +70,28 @@ class TestPipelineStep:
         step.set_param("test", 42)
         assert step.get_param("test") == 42
 
+    def test_update_params_notifies_changes(self):
+        step = RecordingStep()
+        assert step.update_params({"a": 1, "b": 2}) is True
+        assert step.changes == [{"a", "b"}]
+
+    def test_update_params_skips_unchanged(self):
+        step = RecordingStep()
+        step.update_params({"a": 1})
+        assert step.update_params({"a": 1}) is False
+        assert step.changes == [{"a"}]
+
+    def test_update_params_applies_aliases(self):
+        step = RecordingStep()
+        step.update_params({"size": 7})
+        assert step.get_param("kernel_size") == 7
+
+    def test_set_param_notifies_only_on_change(self):
+        step = RecordingStep()
+        step.set_param("a", 1)
+        step.set_param("a", 1)
+        assert step.changes == [{"a"}]
+
     def test_enabled_property(self):
         step = DummyStep()
         assert step.enabled is True
@@ -47,3 +101,85 @@ class TestPipelineStep:
     def test_name_property(self):
         step = DummyStep()
         assert step.name == "DummyStep"
+
+
+class TestReadOnlyArrays:
+    def test_readonly_view_shares_memory(self):
+        image = np.zeros((4, 4), dtype=np.uint8)
+        view = readonly_view(image)
+        assert np.shares_memory(view, image)
+        assert view.flags.writeable is False
+        assert image.flags.writeable is True
+
+    def test_freeze_locks_array(self):
+        image = np.zeros((4, 4), dtype=np.uint8)
+        assert freeze(image) is image
+        with pytest.raises(ValueError):
+            image[0, 0] = 1
+
+    def test_apply_shares_buffer_for_out_of_place_step(self):
+        image = readonly_view(np.zeros((4, 4), dtype=np.uint8))
+        result = DummyStep().apply(image, {})
+        assert result is image
+
+    def test_apply_copies_on_write_for_in_place_step(self):
+        original = np.zeros((4, 4), dtype=np.uint8)
+        result = InPlaceStep().apply(readonly_view(original), {})
+        assert result.sum() == 16
+        assert original.sum() == 0
+        assert not np.shares_memory(result, original)
+
+    def test_apply_writes_through_writable_input(self):
+        image = np.zeros((4, 4), dtype=np.uint8)
+        result = InPlaceStep().apply(image, {})
+        assert result is image
+
+
+class GrayOnlyStep(PipelineStep):
+    input_dtypes = ("uint8",)
+    input_channels = (1,)
+    output_channels = 3
+
+    def process(self, image: np.ndarray, metadata: dict) -> np.ndarray:
+        return np.stack([image] * 3, axis=-1)
+
+
+class TestImageSpec:
+    def test_of_array(self):
+        spec = ImageSpec.of(np.zeros((4, 5, 3), dtype=np.uint16))
+        assert spec.shape == (4, 5, 3)
+        assert spec.dtype == np.uint16
+        assert spec.channels == 3
+        assert spec.nbytes == 4 * 5 * 3 * 2
+
+    def test_equality_normalizes_types(self):
+        assert ImageSpec([4, 5], "uint8") == ImageSpec((4, 5), np.uint8)
+
+    def test_with_channels(self):
+        spec = ImageSpec((4, 5), np.uint8)
+        assert spec.with_channels(3).shape == (4, 5, 3)
+        assert spec.with_channels(3).with_channels(1).shape == (4, 5)
+
+
+class TestStepContract:
+    def test_default_step_accepts_anything(self):
+        spec = ImageSpec((7,), np.float64)
+        assert DummyStep().output_spec(spec) == spec
+
+    def test_declared_output_channels(self):
+        spec = GrayOnlyStep().output_spec(ImageSpec((4, 5), np.uint8))
+        assert spec == ImageSpec((4, 5, 3), np.uint8)
+
+    def test_rejects_dtype(self):
+        with pytest.raises(ValueError, match="GrayOnlyStep accepts uint8"):
+            GrayOnlyStep().output_spec(ImageSpec((4, 5), np.float32))
+
+    def test_rejects_channels(self):
+        with pytest.raises(ValueError, match="1-channel"):
+            GrayOnlyStep().output_spec(ImageSpec((4, 5, 3), np.uint8))
+
+    def test_default_process_into_ignores_buffer(self):
+        step = DummyStep()
+        image = np.ones((2, 2))
+        assert step.writes_into is False
+        assert step.apply_into(image, {}, np.empty((2, 2))) is image
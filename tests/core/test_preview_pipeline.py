@@ -1,6 +1,12 @@
+import asyncio
+import threading
+
 import pytest
 import numpy as np
+from src.core.pipeline_step import PipelineStep
 from src.core.preview_pipeline import PreviewPipeline, PreviewResult
+from src.core.result_cache import ResultCache
+from src.core.steps import STEP_REGISTRY
 from src.models.app_state import AppState, WorkflowPhase
 from src.models.pipeline_model import PipelineNode
 
@@ -131,6 +137,654 @@ class TestPreviewPipelineExecution:
         assert result.execution_time_ms > 0
 
 
+class TestPreviewPipelineStepInstances:
+    """Test that step instances persist alongside their nodes."""
+
+    def _clahe_state(self):
+        app_state = AppState()
+        app_state.initialize_default_pipeline()
+        app_state.pipeline.nodes[-1].enabled = False
+        app_state.add_node(
+            PipelineNode(
+                id="clahe_1",
+                type="clahe",
+                name="CLAHE",
+                description="",
+                icon="",
+                status="ready",
+                enabled=True,
+                parameters={"clip_limit": 2.0, "grid_size": (8, 8)},
+            )
+        )
+        return app_state
+
+    def test_step_reused_between_executions(self):
+        """Test the same step instance runs a node across previews."""
+        pipeline = PreviewPipeline()
+        app_state = self._clahe_state()
+        input_image = np.random.randint(0, 255, (50, 50, 3), dtype=np.uint8)
+
+        assert pipeline.execute(input_image, app_state).success is True
+        step = pipeline._steps["clahe_1"]
+        pipeline.execute(input_image, app_state)
+
+        assert pipeline._steps["clahe_1"] is step
+
+    def test_parameter_change_reaches_step(self):
+        """Test updated node parameters are pushed into the step."""
+        pipeline = PreviewPipeline()
+        app_state = self._clahe_state()
+        input_image = np.random.randint(0, 255, (50, 50, 3), dtype=np.uint8)
+
+        pipeline.execute(input_image, app_state)
+        app_state.update_node_parameter("clahe_1", "clip_limit", 5.0)
+        pipeline.execute(input_image, app_state)
+
+        assert pipeline._steps["clahe_1"].get_param("clip_limit") == 5.0
+
+    def test_removed_node_step_released(self):
+        """Test step instances are dropped with their node."""
+        pipeline = PreviewPipeline()
+        app_state = self._clahe_state()
+        input_image = np.random.randint(0, 255, (50, 50, 3), dtype=np.uint8)
+
+        pipeline.execute(input_image, app_state)
+        app_state.remove_node("clahe_1")
+        pipeline.execute(input_image, app_state)
+
+        assert "clahe_1" not in pipeline._steps
+
+    def test_unknown_node_type_fails(self):
+        """Test execution fails cleanly for unregistered node types."""
+        pipeline = PreviewPipeline()
+        app_state = AppState()
+        app_state.initialize_default_pipeline()
+        app_state.add_node(
+            PipelineNode(
+                id="mystery",
+                type="mystery",
+                name="Mystery",
+                description="",
+                icon="",
+                status="ready",
+                enabled=True,
+            )
+        )
+        input_image = np.random.randint(0, 255, (50, 50, 3), dtype=np.uint8)
+
+        result = pipeline.execute(input_image, app_state)
+
+        assert result.success is False
+        assert "Unknown node type" in result.error_message
+
+
+class TestPreviewPipelineProgressive:
+    """Test progressive proxy-then-full execution."""
+
+    def _blur_state(self):
+        app_state = AppState()
+        app_state.initialize_default_pipeline()
+        app_state.pipeline.nodes[-1].enabled = False
+        app_state.add_node(
+            PipelineNode(
+                id="blur_1",
+                type="gaussian_blur",
+                name="Gaussian Blur",
+                description="",
+                icon="",
+                status="ready",
+                enabled=True,
+                parameters={"kernel_size": 9, "sigma": 2.0},
+            )
+        )
+        return app_state
+
+    def test_proxy_emitted_before_full_result(self):
+        """Test proxy_ready fires with a downscaled image, then completion."""
+        pipeline = PreviewPipeline()
+        events = []
+        pipeline.proxy_ready.connect(lambda r: events.append(("proxy", r)))
+        pipeline.execution_completed.connect(lambda r: events.append(("full", r)))
+        input_image = np.random.randint(0, 255, (200, 400), dtype=np.uint8)
+
+        result = pipeline.execute_progressive(
+            input_image, self._blur_state(), proxy_max_size=100
+        )
+
+        assert [name for name, _ in events] == ["proxy", "full"]
+        proxy = events[0][1]
+        assert proxy.is_proxy is True
+        assert proxy.scale == 0.25
+        assert proxy.image.shape == (50, 100)
+        assert result.is_proxy is False
+        assert result.image.shape == (200, 400)
+
+    def test_proxy_uses_scaled_parameters(self):
+        """Test proxy steps get scaled parameters; full steps keep theirs."""
+        pipeline = PreviewPipeline()
+        input_image = np.random.randint(0, 255, (200, 400), dtype=np.uint8)
+
+        pipeline.execute_progressive(
+            input_image, self._blur_state(), proxy_max_size=100
+        )
+
+        assert pipeline._proxy_steps["blur_1"].get_param("kernel_size") == 3
+        assert pipeline._proxy_steps["blur_1"].get_param("sigma") == 0.5
+        assert pipeline._steps["blur_1"].get_param("kernel_size") == 9
+
+    def test_proxy_only_skips_full_pass(self):
+        """Test execute_proxy emits the proxy and no full-resolution result."""
+        pipeline = PreviewPipeline()
+        events = []
+        pipeline.proxy_ready.connect(lambda r: events.append("proxy"))
+        pipeline.execution_completed.connect(lambda r: events.append("full"))
+        input_image = np.random.randint(0, 255, (200, 400), dtype=np.uint8)
+
+        result = pipeline.execute_proxy(
+            input_image, self._blur_state(), proxy_max_size=100
+        )
+
+        assert events == ["proxy"]
+        assert result.image.shape == (50, 100)
+
+    def test_proxy_only_small_image_runs_full_pass(self):
+        """Test execute_proxy falls back to the full pass for small images."""
+        pipeline = PreviewPipeline()
+        completed = []
+        pipeline.execution_completed.connect(completed.append)
+        input_image = np.random.randint(0, 255, (50, 50), dtype=np.uint8)
+
+        assert pipeline.execute_proxy(input_image, self._blur_state()) is None
+        assert len(completed) == 1
+
+    def test_small_image_skips_proxy(self):
+        """Test no proxy pass when the image is already small."""
+        pipeline = PreviewPipeline()
+        proxies = []
+        pipeline.proxy_ready.connect(proxies.append)
+        input_image = np.random.randint(0, 255, (50, 50), dtype=np.uint8)
+
+        result = pipeline.execute_progressive(input_image, self._blur_state())
+
+        assert result.success is True
+        assert proxies == []
+
+    def test_newer_request_cancels_pass(self):
+        """Test a superseded progressive run stops and reports cancellation."""
+        pipeline = PreviewPipeline()
+        pipeline.progress_updated.connect(
+            lambda current, total: pipeline.cancel_pending()
+        )
+        proxies = []
+        pipeline.proxy_ready.connect(proxies.append)
+        input_image = np.random.randint(0, 255, (200, 400), dtype=np.uint8)
+
+        result = pipeline.execute_progressive(
+            input_image, self._blur_state(), proxy_max_size=100
+        )
+
+        assert result.cancelled is True
+        assert proxies == []
+
+    def test_async_progressive(self):
+        """Test the async variant completes on the worker thread."""
+        pipeline = PreviewPipeline()
+        input_image = np.random.randint(0, 255, (200, 400), dtype=np.uint8)
+
+        future = pipeline.execute_progressive_async(
+            input_image, self._blur_state(), proxy_max_size=100
+        )
+
+        assert future.result(timeout=10).success is True
+
+
+class TestPreviewPipelineRoi:
+    """Test viewport-restricted execution."""
+
+    def _state(self, *nodes):
+        app_state = AppState()
+        app_state.initialize_default_pipeline()
+        app_state.pipeline.nodes[-1].enabled = False
+        for node_id, node_type, params in nodes:
+            app_state.add_node(
+                PipelineNode(
+                    id=node_id,
+                    type=node_type,
+                    name=node_id,
+                    description="",
+                    icon="",
+                    status="ready",
+                    enabled=True,
+                    parameters=params,
+                )
+            )
+        return app_state
+
+    def test_roi_matches_full_frame_for_blur(self):
+        """Test the blur margin makes the ROI exact inside the region."""
+        state = self._state(
+            ("b1", "gaussian_blur", {"kernel_size": 7, "sigma": 2.0}),
+            ("b2", "gaussian_blur", {"kernel_size": 5, "sigma": 1.0}),
+        )
+        image = np.random.default_rng(0).integers(0, 255, (120, 160), dtype=np.uint8)
+
+        full = PreviewPipeline().execute(image, state)
+        result = PreviewPipeline().execute_roi(image, state, (40, 30, 50, 40))
+
+        assert result.success is True
+        assert result.roi == (40, 30, 50, 40)
+        assert result.image.shape == (120, 160)
+        np.testing.assert_array_equal(
+            result.image[30:70, 40:90], full.image[30:70, 40:90]
+        )
+
+    def test_roi_processes_only_grown_region(self):
+        """Test the tile pass runs on the region plus the blur margin."""
+        state = self._state(("b", "gaussian_blur", {"kernel_size": 9, "sigma": 2.0}))
+        image = np.random.randint(0, 255, (120, 160), dtype=np.uint8)
+        pipeline = PreviewPipeline()
+
+        result = pipeline.execute_roi(image, state, (40, 30, 50, 40))
+
+        assert result.node_results["b"]["output"].shape == (48, 58)
+
+    def test_pan_reuses_computed_region(self):
+        """Test panning only processes newly exposed pixels."""
+        state = self._state(("b", "gaussian_blur", {"kernel_size": 5, "sigma": 1.0}))
+        image = np.random.randint(0, 255, (120, 160), dtype=np.uint8)
+        pipeline = PreviewPipeline()
+        pipeline.execute_roi(image, state, (40, 30, 50, 40))
+
+        panned = pipeline.execute_roi(image, state, (50, 30, 50, 40))
+        again = pipeline.execute_roi(image, state, (50, 30, 50, 40))
+
+        # Newly exposed strip is 10 px wide, plus a 2 px margin on each side
+        assert panned.node_results["b"]["output"].shape == (44, 14)
+        assert again.node_results == {}
+
+    def test_pipeline_change_discards_regions(self):
+        """Test computed regions are not reused after a parameter change."""
+        state = self._state(("b", "gaussian_blur", {"kernel_size": 5, "sigma": 1.0}))
+        image = np.random.randint(0, 255, (120, 160), dtype=np.uint8)
+        pipeline = PreviewPipeline()
+        pipeline.execute_roi(image, state, (40, 30, 50, 40))
+
+        state.update_node_parameter("b", "kernel_size", 7)
+        result = pipeline.execute_roi(image, state, (40, 30, 50, 40))
+
+        assert result.node_results["b"]["output"].shape == (46, 56)
+
+    def test_roi_emits_full_frame(self):
+        """Test execution_completed carries the composited frame."""
+        state = self._state(("g", "grayscale", {}))
+        image = np.random.randint(0, 255, (60, 80, 3), dtype=np.uint8)
+        pipeline = PreviewPipeline()
+        results = []
+        pipeline.execution_completed.connect(results.append)
+
+        pipeline.execute_roi(image, state, (10, 10, 20, 20))
+
+        assert len(results) == 1
+        assert results[0].image.shape == (60, 80)
+
+    def test_global_steps_run_on_full_frame(self):
+        """Test pipelines with CLAHE are not computed region by region."""
+        state = self._state(("c", "clahe", {}))
+        image = np.random.default_rng(0).integers(0, 255, (120, 160), dtype=np.uint8)
+
+        full = PreviewPipeline().execute(image, state)
+        result = PreviewPipeline().execute_roi(image, state, (40, 30, 50, 40))
+
+        assert result.roi is None
+        assert result.node_results["c"]["output"].shape == (120, 160)
+        np.testing.assert_array_equal(result.image, full.image)
+
+    def test_supports_roi_only_for_local_plans(self):
+        """Test callers can tell whether a ROI pass would run full-frame."""
+        pipeline = PreviewPipeline()
+
+        assert pipeline.supports_roi(self._state(("g", "grayscale", {})))
+        assert not pipeline.supports_roi(self._state(("c", "clahe", {})))
+
+    def test_roi_pass_reports_no_metadata(self):
+        """Test ROI results do not carry region-only measurements."""
+        state = self._state(("b", "gaussian_blur", {"kernel_size": 5, "sigma": 1.0}))
+        image = np.random.randint(0, 255, (120, 160), dtype=np.uint8)
+
+        result = PreviewPipeline().execute_roi(image, state, (40, 30, 50, 40))
+
+        assert result.roi is not None
+        assert result.metadata is None
+
+    def test_whole_frame_roi_runs_full_pass(self):
+        """Test a ROI covering the frame falls back to normal execution."""
+        state = self._state(("g", "grayscale", {}))
+        image = np.random.randint(0, 255, (60, 80, 3), dtype=np.uint8)
+
+        result = PreviewPipeline().execute_roi(image, state, (-10, -10, 200, 200))
+
+        assert result.success is True
+        assert result.roi is None
+
+
+class TestPreviewPipelineTelemetry:
+    """Test per-node telemetry in node_results."""
+
+    def test_node_results_include_telemetry(self):
+        app_state = AppState()
+        app_state.initialize_default_pipeline()
+        app_state.pipeline.nodes[-1].enabled = False
+        image = np.random.randint(0, 255, (40, 50, 3), dtype=np.uint8)
+        pipeline = PreviewPipeline()
+
+        first = pipeline.execute(image, app_state)
+        second = pipeline.execute(image, app_state)
+
+        entry = first.node_results["input"]
+        assert entry["wall_ms"] >= 0
+        assert entry["cpu_ms"] >= 0
+        assert entry["output_bytes"] == image.nbytes
+        assert entry["cache_hit"] is False
+        assert second.node_results["input"]["cache_hit"] is True
+
+
+class MarkerStep(PipelineStep):
+    """Fast stand-in for the output node that records metadata."""
+
+    calls = 0
+
+    def process(self, image: np.ndarray, metadata: dict) -> np.ndarray:
+        MarkerStep.calls += 1
+        metadata["marker"] = self.get_param("sigma")
+        return image
+
+
+class GateStep(PipelineStep):
+    """Blocks until released, to edit the pipeline mid-run."""
+
+    started = None
+    release = None
+
+    def process(self, image: np.ndarray, metadata: dict) -> np.ndarray:
+        GateStep.started.set()
+        GateStep.release.wait(timeout=5)
+        return image + self.get_param("offset")
+
+
+class TestPreviewPipelineSnapshots:
+    """Test executions run on an immutable pipeline snapshot."""
+
+    def test_async_run_ignores_edits_made_while_running(self, monkeypatch):
+        monkeypatch.setitem(STEP_REGISTRY, "gate", GateStep)
+        GateStep.started = threading.Event()
+        GateStep.release = threading.Event()
+        app_state = AppState()
+        app_state.initialize_default_pipeline()
+        app_state.pipeline.nodes[-1].enabled = False
+        app_state.add_node(
+            PipelineNode(
+                id="gate",
+                type="gate",
+                name="Gate",
+                description="",
+                icon="",
+                status="ready",
+                enabled=True,
+                parameters={"offset": 1},
+            )
+        )
+        image = np.zeros((4, 4), dtype=np.int32)
+        pipeline = PreviewPipeline()
+
+        future = pipeline.execute_async(image, app_state)
+        assert GateStep.started.wait(timeout=5)
+        app_state.update_node_parameter("gate", "offset", 100)
+        app_state.pipeline.nodes.clear()
+        GateStep.release.set()
+
+        result = future.result(timeout=5)
+        assert result.success is True
+        assert result.image[0, 0] == 1
+
+    def test_output_cache_keyed_by_parameters(self, monkeypatch):
+        """Test parameter edits miss the output cache; hits restore metadata."""
+        monkeypatch.setitem(STEP_REGISTRY, "output", MarkerStep)
+        MarkerStep.calls = 0
+        app_state = AppState()
+        app_state.initialize_default_pipeline()
+        image = np.random.randint(0, 255, (20, 20), dtype=np.uint8)
+        pipeline = PreviewPipeline()
+
+        pipeline.execute(image, app_state)
+        cached = pipeline.execute(image, app_state)
+        assert MarkerStep.calls == 1
+        assert cached.node_results["output"]["cache_hit"] is True
+
+        app_state.update_node_parameter("output", "sigma", 7.0)
+        pipeline.execute(image, app_state)
+        assert MarkerStep.calls == 2
+
+    def test_cache_hit_restores_metadata(self, monkeypatch):
+        monkeypatch.setitem(STEP_REGISTRY, "output", MarkerStep)
+        app_state = AppState()
+        app_state.initialize_default_pipeline()
+        image = np.random.randint(0, 255, (20, 20), dtype=np.uint8)
+        pipeline = PreviewPipeline()
+        first, metadata = {}, {}
+        node = app_state.pipeline.snapshot().nodes[-1]
+
+        pipeline._execute_node(node, image, first)
+        result = pipeline._execute_node(node, image, metadata)
+
+        assert result["cache_hit"] is True
+        assert "marker" in first
+        assert metadata == first
+
+
+class TestPreviewPipelineAsyncio:
+    """Test the asyncio execution API."""
+
+    def _gate_state(self, monkeypatch):
+        monkeypatch.setitem(STEP_REGISTRY, "gate", GateStep)
+        GateStep.started = threading.Event()
+        GateStep.release = threading.Event()
+        app_state = AppState()
+        app_state.initialize_default_pipeline()
+        app_state.pipeline.nodes[-1].enabled = False
+        for node_id in ("gate", "gate_2"):
+            app_state.add_node(
+                PipelineNode(
+                    id=node_id,
+                    type="gate",
+                    name="Gate",
+                    description="",
+                    icon="",
+                    status="ready",
+                    enabled=True,
+                    parameters={"offset": 1},
+                )
+            )
+        return app_state
+
+    def test_aexecute_matches_execute(self):
+        app_state = AppState()
+        app_state.initialize_default_pipeline()
+        image = np.random.randint(0, 255, (30, 30, 3), dtype=np.uint8)
+
+        expected = PreviewPipeline().execute(image, app_state)
+        result = asyncio.run(PreviewPipeline().aexecute(image, app_state))
+
+        assert result.success is True
+        np.testing.assert_array_equal(result.image, expected.image)
+
+    def test_aexecute_runs_images_concurrently(self):
+        app_state = AppState()
+        app_state.initialize_default_pipeline()
+        pipeline = PreviewPipeline()
+        images = [np.full((20, 20), i, dtype=np.uint8) for i in range(4)]
+
+        async def run_all():
+            return await asyncio.gather(
+                *(pipeline.aexecute(image, app_state) for image in images)
+            )
+
+        results = asyncio.run(run_all())
+
+        assert all(result.success for result in results)
+        assert [int(r.image.max()) for r in results] == [0, 1, 2, 3]
+
+    def test_overlapping_runs_keep_their_own_parameters(self, monkeypatch):
+        class MeetStep(PipelineStep):
+            """Reads its offset once both runs are inside the step."""
+
+            barrier = threading.Barrier(2, timeout=5)
+
+            def process(self, image: np.ndarray, metadata: dict) -> np.ndarray:
+                MeetStep.barrier.wait()
+                return image + self.get_param("offset")
+
+        monkeypatch.setitem(STEP_REGISTRY, "meet", MeetStep)
+        pipeline = PreviewPipeline()
+        image = np.zeros((4, 4), dtype=np.int32)
+
+        def state(offset):
+            app_state = AppState()
+            app_state.initialize_default_pipeline()
+            app_state.pipeline.nodes[-1].enabled = False
+            app_state.add_node(
+                PipelineNode(
+                    id="meet",
+                    type="meet",
+                    name="Meet",
+                    description="",
+                    icon="",
+                    status="ready",
+                    enabled=True,
+                    parameters={"offset": offset},
+                )
+            )
+            return app_state
+
+        async def run_both():
+            return await asyncio.gather(
+                pipeline.aexecute(image, state(1)),
+                pipeline.aexecute(image, state(10)),
+            )
+
+        results = asyncio.run(run_both())
+
+        assert [int(result.image.max()) for result in results] == [1, 10]
+
+    def test_astream_yields_nodes_in_order(self):
+        app_state = AppState()
+        app_state.initialize_default_pipeline()
+        image = np.random.randint(0, 255, (30, 30, 3), dtype=np.uint8)
+
+        async def collect():
+            return [
+                node_id
+                async for node_id, entry in PreviewPipeline().astream(image, app_state)
+            ]
+
+        assert asyncio.run(collect()) == ["input", "output"]
+
+    def test_astream_raises_on_failure(self):
+        app_state = AppState()
+        app_state.initialize_default_pipeline()
+        for node in app_state.pipeline.nodes:
+            node.enabled = False
+        image = np.zeros((10, 10), dtype=np.uint8)
+
+        async def consume():
+            async for _ in PreviewPipeline().astream(image, app_state):
+                pass
+
+        with pytest.raises(RuntimeError, match="No enabled nodes"):
+            asyncio.run(consume())
+
+    def test_cancel_stops_at_next_node(self, monkeypatch):
+        app_state = self._gate_state(monkeypatch)
+        image = np.zeros((4, 4), dtype=np.int32)
+        pipeline = PreviewPipeline()
+        results = []
+        pipeline.execution_completed.connect(results.append)
+
+        async def cancel_midway():
+            task = asyncio.ensure_future(pipeline.aexecute(image, app_state))
+            while not GateStep.started.is_set():
+                await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            GateStep.started.clear()
+            GateStep.release.set()
+
+        asyncio.run(cancel_midway())
+
+        # The running gate finished; the second one never started
+        assert not GateStep.started.is_set()
+        assert results == []
+
+
+class TestPreviewPipelineSharedResults:
+    """Test that node results are shared read-only buffers."""
+
+    def _grayscale_state(self):
+        app_state = AppState()
+        app_state.initialize_default_pipeline()
+        app_state.pipeline.nodes[-1].enabled = False
+        app_state.add_node(
+            PipelineNode(
+                id="grayscale_1",
+                type="grayscale",
+                name="Grayscale",
+                description="",
+                icon="",
+                status="ready",
+                enabled=True,
+            )
+        )
+        return app_state
+
+    def test_input_image_not_copied_or_locked(self):
+        """Test the caller's image is shared but stays writable."""
+        pipeline = PreviewPipeline()
+        app_state = AppState()
+        app_state.initialize_default_pipeline()
+        app_state.pipeline.nodes[-1].enabled = False
+        input_image = np.random.randint(0, 255, (50, 50, 3), dtype=np.uint8)
+
+        result = pipeline.execute(input_image, app_state)
+
+        assert np.shares_memory(result.image, input_image)
+        assert result.image.flags.writeable is False
+        assert input_image.flags.writeable is True
+
+    def test_node_results_are_read_only(self):
+        """Test node outputs cannot be mutated by consumers."""
+        pipeline = PreviewPipeline()
+        input_image = np.random.randint(0, 255, (50, 50, 3), dtype=np.uint8)
+
+        result = pipeline.execute(input_image, self._grayscale_state())
+
+        for entry in result.node_results.values():
+            assert entry["output"].flags.writeable is False
+
+    def test_signal_and_result_share_buffer(self):
+        """Test node_completed emits the same array stored in node_results."""
+        pipeline = PreviewPipeline()
+        emitted = {}
+        pipeline.node_completed.connect(
+            lambda node_id, image: emitted.__setitem__(node_id, image)
+        )
+        input_image = np.random.randint(0, 255, (50, 50, 3), dtype=np.uint8)
+
+        result = pipeline.execute(input_image, self._grayscale_state())
+
+        for node_id, entry in result.node_results.items():
+            assert emitted[node_id] is entry["output"]
+
+
 class TestPreviewPipelineCache:
     """Test PreviewPipeline caching."""
 
@@ -169,6 +823,98 @@ class TestPreviewPipelineCache:
         pipeline.set_cache_enabled(True)
         assert pipeline._cache_enabled is True
 
+    def test_edit_drops_results_of_old_versions(self):
+        """Test a node's cached results are purged when its version bumps."""
+        state = AppState()
+        state.initialize_default_pipeline()
+        output = state.pipeline.nodes[-1]
+        pipeline = PreviewPipeline()
+        image = np.random.default_rng(0).integers(0, 255, (50, 50), dtype=np.uint8)
+
+        for sigma in (1.0, 2.0, 3.0):
+            state.update_node_parameter(output.id, "sigma", sigma)
+            pipeline.execute(image, state)
+
+        output_keys = [key for key in pipeline._cache if key[0][0] == output.id]
+        assert [key[0][1] for key in output_keys] == [output.version]
+
+    def test_cache_bounded_by_bytes(self):
+        """Test node results of many images do not accumulate without limit."""
+        state = AppState()
+        state.initialize_default_pipeline()
+        pipeline = PreviewPipeline(cache_max_bytes=25_000)
+        rng = np.random.default_rng(0)
+
+        for _ in range(5):
+            image = rng.integers(0, 255, (100, 100), dtype=np.uint8)
+            assert pipeline.execute(image, state).success is True
+
+        stats = pipeline.get_cache_stats()
+        assert 0 < stats["bytes"] <= 25_000
+
+
+@pytest.fixture
+def fake_phantast(monkeypatch):
+    """Replace PHANTAST with a fast threshold that counts its calls."""
+    calls = []
+
+    def process_phantast(image, sigma, epsilon, **kwargs):
+        calls.append(image.shape)
+        gray = image if image.ndim == 2 else image[..., 0]
+        mask = gray > 127
+        return float(mask.mean() * 100), mask
+
+    monkeypatch.setattr("src.core.steps.phantast_step.PHANTAST_AVAILABLE", True)
+    monkeypatch.setattr(
+        "src.core.steps.phantast_step.process_phantast", process_phantast, raising=False
+    )
+    return calls
+
+
+class TestPreviewPipelineResultCache:
+    """Test the persistent result cache."""
+
+    @pytest.fixture
+    def app_state(self):
+        app_state = AppState()
+        app_state.initialize_default_pipeline()
+        return app_state
+
+    @pytest.fixture
+    def image(self):
+        return np.random.default_rng(0).integers(0, 255, (32, 48, 3), dtype=np.uint8)
+
+    def test_hit_skips_phantast(self, tmp_path, app_state, image, fake_phantast):
+        """A second session is served from the cache with the same output."""
+        path = str(tmp_path / "cache.db")
+        first = PreviewPipeline(result_cache=ResultCache(path)).execute(
+            image, app_state
+        )
+        assert first.success and not first.result_cache_hit
+        assert len(fake_phantast) == 1
+
+        second = PreviewPipeline(result_cache=ResultCache(path)).execute(
+            image, app_state
+        )
+        assert second.success and second.result_cache_hit
+        assert len(fake_phantast) == 1
+        np.testing.assert_array_equal(second.image, first.image)
+        assert second.metadata["phantast_confluency"] == pytest.approx(
+            first.metadata["phantast_confluency"]
+        )
+        np.testing.assert_array_equal(
+            second.metadata["phantast_mask"], first.metadata["phantast_mask"]
+        )
+
+    def test_parameter_change_misses(self, tmp_path, app_state, image, fake_phantast):
+        """Another pipeline or image is computed."""
+        pipeline = PreviewPipeline(result_cache=ResultCache(str(tmp_path / "c.db")))
+        pipeline.execute(image, app_state)
+        app_state.pipeline.nodes[-1].parameters["sigma"] = 2.0
+        assert not pipeline.execute(image, app_state).result_cache_hit
+        assert not pipeline.execute(image[::-1].copy(), app_state).result_cache_hit
+        assert len(fake_phantast) == 3
+
 
 class TestPreviewResult:
     """Test PreviewResult dataclass."""
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from src.core.result_cache import ResultCache, summary_stats
+
+
+@pytest.fixture
+def mask():
+    mask = np.zeros((64, 64), dtype=bool)
+    mask[10:30, 5:50] = True
+    return mask
+
+
+class TestResultCache:
+    def test_roundtrip(self, tmp_path, mask):
+        with ResultCache(str(tmp_path / "cache.db")) as cache:
+            stats = summary_stats(mask, 12.34)
+            cache.put("img", "pipe", 21.97, mask, stats)
+            cached = cache.get("img", "pipe")
+        assert cached.confluency == pytest.approx(21.97)
+        np.testing.assert_array_equal(cached.mask, mask)
+        assert cached.stats == {
+            "execution_time_ms": 12.3,
+            "height": 64,
+            "width": 64,
+            "cell_pixels": 900,
+        }
+
+    def test_keyed_by_image_and_pipeline(self, tmp_path, mask):
+        with ResultCache(str(tmp_path / "cache.db")) as cache:
+            cache.put("img", "pipe", 1.0, mask)
+            assert cache.get("img", "other") is None
+            assert cache.get("other", "pipe") is None
+
+    def test_persists_across_sessions(self, tmp_path, mask):
+        path = str(tmp_path / "cache.db")
+        with ResultCache(path) as cache:
+            cache.put("img", "pipe", 5.0, None)
+        with ResultCache(path) as cache:
+            cached = cache.get("img", "pipe")
+        assert cached.confluency == 5.0
+        assert cached.mask is None
+
+    def test_mask_is_compressed(self, tmp_path, mask):
+        with ResultCache(str(tmp_path / "cache.db")) as cache:
+            cache.put("img", "pipe", 1.0, mask)
+            assert cache.stats()["bytes"] < mask.size // 4
+
+    def test_lru_eviction(self, tmp_path, mask, monkeypatch):
+        clock = iter(range(100))
+        monkeypatch.setattr("src.core.result_cache.time.time", lambda: next(clock))
+        with ResultCache(str(tmp_path / "cache.db")) as cache:
+            cache.put("a", "pipe", 1.0, mask)
+            entry_bytes = cache.stats()["bytes"]
+            cache.max_bytes = 2 * entry_bytes
+            cache.put("b", "pipe", 2.0, mask)
+            # Reading "a" makes "b" the least recently used
+            assert cache.get("a", "pipe") is not None
+            cache.put("c", "pipe", 3.0, mask)
+            assert cache.get("b", "pipe") is None
+            assert cache.get("a", "pipe") is not None
+            assert cache.get("c", "pipe") is not None
+            assert cache.stats()["entries"] == 2
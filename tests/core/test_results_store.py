@@ -0,0 +1,159 @@
+import sqlite3
+
+import cv2
+import numpy as np
+import pytest
+
+from src.core.batch_runner import BatchItemResult, BatchRunner
+from src.core.results_store import (
+    JOB_CANCELLED,
+    JOB_COMPLETED,
+    JOB_RUNNING,
+    RESULT_COLUMNS,
+    ResultsStore,
+)
+from src.models.pipeline_model import Pipeline, PipelineNode
+
+
+def make_pipeline(name="Gray", node_type="grayscale"):
+    node = PipelineNode(
+        id="n1",
+        type=node_type,
+        name=node_type,
+        description="",
+        icon="",
+        status="ready",
+        enabled=True,
+    )
+    return Pipeline(id="p", name=name, nodes=[node])
+
+
+@pytest.fixture
+def store(tmp_path):
+    with ResultsStore(str(tmp_path / "results.db"), batch_size=2) as store:
+        yield store
+
+
+def result(path, confluency=50.0, success=True):
+    return BatchItemResult(
+        path=path,
+        success=success,
+        confluency=confluency if success else None,
+        content_hash=f"hash-{path}",
+        error_message=None if success else "bad",
+    )
+
+
+class TestResultsStore:
+    def test_uses_wal(self, store):
+        assert store.journal_mode == "wal"
+
+    def test_job_lifecycle(self, store):
+        job_id = store.start_job(make_pipeline(), plate="plate-1")
+        assert store.jobs()[0]["status"] == JOB_RUNNING
+
+        store.add_result(job_id, result("a.png", 10.0))
+        store.add_result(job_id, result("b.png", success=False))
+        store.finish_job(job_id)
+
+        job = store.jobs()[0]
+        assert job["status"] == JOB_COMPLETED
+        assert job["images"] == 2 and job["failed"] == 1
+        assert job["mean_confluency"] == 10.0
+        assert job["finished"] >= job["started"]
+
+    def test_results_are_written_in_batches(self, store, tmp_path):
+        job_id = store.start_job(make_pipeline())
+        reader = sqlite3.connect(str(tmp_path / "results.db"))
+        count = "SELECT COUNT(*) FROM results"
+
+        store.add_result(job_id, result("a.png"))
+        assert reader.execute(count).fetchone()[0] == 0
+        store.add_result(job_id, result("b.png"))
+        assert reader.execute(count).fetchone()[0] == 2
+        reader.close()
+
+    def test_query_filters(self, store):
+        gray = make_pipeline()
+        blur = make_pipeline("Blur", "gaussian_blur")
+        job1 = store.start_job(gray, plate="plate-1")
+        job2 = store.start_job(blur, plate="plate-2")
+        store.add_result(job1, result("a.png", 10.0))
+        store.add_result(job1, result("b.png", success=False))
+        store.add_result(job2, result("a.png", 30.0))
+
+        assert len(store.results()) == 3
+        assert [r["path"] for r in store.results(plate="plate-1")] == [
+            "a.png",
+            "b.png",
+        ]
+        assert [r["confluency"] for r in store.results(job_id=job2)] == [30.0]
+        by_pipeline = store.results(
+            pipeline=store.jobs(plate="plate-2")[0]["pipeline_hash"]
+        )
+        assert [r["job_id"] for r in by_pipeline] == [job2]
+        assert [r["path"] for r in store.results(success=False)] == ["b.png"]
+
+        rows = store.results()
+        assert set(rows[0]) == set(RESULT_COLUMNS)
+        start = rows[0]["processed"]
+        assert len(store.results(since=start, until=start + 3600)) == 3
+        assert store.results(until=start - 1) == []
+
+    def test_images_are_shared_between_jobs(self, store, tmp_path):
+        pipeline = make_pipeline()
+        for _ in range(2):
+            job_id = store.start_job(pipeline)
+            store.add_result(job_id, result("a.png"))
+            store.finish_job(job_id)
+
+        db = sqlite3.connect(str(tmp_path / "results.db"))
+        assert db.execute("SELECT COUNT(*) FROM images").fetchone()[0] == 1
+        assert db.execute("SELECT COUNT(*) FROM pipelines").fetchone()[0] == 1
+        db.close()
+
+    def test_table_rows(self, store):
+        job_id = store.start_job(make_pipeline())
+        store.add_result(job_id, result("/plate/a.png", 12.0))
+        store.add_result(job_id, result("/plate/b.png", success=False))
+        assert store.table_rows(job_id) == [
+            ("a.png", 12.0, "done"),
+            ("b.png", None, "failed"),
+        ]
+
+    def test_reopen_keeps_data(self, tmp_path):
+        path = str(tmp_path / "results.db")
+        with ResultsStore(path) as store:
+            job_id = store.start_job(make_pipeline())
+            store.add_result(job_id, result("a.png"))
+        with ResultsStore(path) as store:
+            assert len(store.results()) == 1
+
+
+class TestRunJob:
+    def test_records_batch(self, store, tmp_path):
+        folder = tmp_path / "plate-7"
+        folder.mkdir()
+        for name in ("a.png", "b.png"):
+            cv2.imwrite(str(folder / name), np.zeros((8, 8, 3), dtype=np.uint8))
+
+        runner = BatchRunner(make_pipeline(), workers=1)
+        job_id, results = store.run_job(runner, str(folder))
+
+        assert len(results) == 2
+        job = store.jobs()[0]
+        assert job["id"] == job_id and job["plate"] == "plate-7"
+        assert job["status"] == JOB_COMPLETED
+        names = sorted(row[0] for row in store.table_rows(job_id))
+        assert names == ["a.png", "b.png"]
+
+    def test_failed_run_marks_job_cancelled(self, store, monkeypatch):
+        runner = BatchRunner(make_pipeline(), workers=1)
+
+        def crash(*args, **kwargs):
+            raise KeyboardInterrupt
+
+        monkeypatch.setattr(runner, "run", crash)
+        with pytest.raises(KeyboardInterrupt):
+            store.run_job(runner, ["a.png"])
+        assert store.jobs()[0]["status"] == JOB_CANCELLED
@@ -0,0 +1,68 @@
+import numpy as np
+from src.core.roi_compositor import RoiCompositor, clip_rect, expand_rect
+
+
+class TestRects:
+    """Test rect helpers."""
+
+    def test_clip_rect(self):
+        assert clip_rect((-5, 10, 20, 100), 50, 40) == (0, 10, 15, 30)
+
+    def test_clip_rect_outside(self):
+        assert clip_rect((60, 0, 10, 10), 50, 40) is None
+
+    def test_expand_rect_clipped_to_image(self):
+        assert expand_rect((10, 10, 5, 5), 20, 50, 40) == (0, 0, 35, 35)
+
+
+class TestRoiCompositor:
+    """Test incremental frame assembly."""
+
+    def test_missing_before_paste(self):
+        compositor = RoiCompositor()
+        assert compositor.missing((0, 0, 10, 10)) == (0, 0, 10, 10)
+
+    def test_paste_marks_region_valid(self):
+        compositor = RoiCompositor()
+        source = np.zeros((20, 30), dtype=np.uint8)
+        frame = compositor.paste((5, 5, 10, 10), np.full((10, 10), 7, np.uint8), source)
+
+        assert frame.shape == (20, 30)
+        assert frame.flags.writeable is False
+        assert (frame[5:15, 5:15] == 7).all()
+        assert compositor.missing((5, 5, 10, 10)) is None
+
+    def test_missing_is_only_uncovered_strip(self):
+        compositor = RoiCompositor()
+        source = np.zeros((20, 30), dtype=np.uint8)
+        compositor.paste((0, 0, 10, 20), np.ones((20, 10), np.uint8), source)
+
+        assert compositor.missing((4, 0, 10, 20)) == (10, 0, 4, 20)
+
+    def test_paste_replaces_frame(self):
+        """Frames already handed out are not modified by later pastes."""
+        compositor = RoiCompositor()
+        source = np.zeros((20, 30), dtype=np.uint8)
+        first = compositor.paste((0, 0, 5, 5), np.ones((5, 5), np.uint8), source)
+        compositor.paste((10, 10, 5, 5), np.ones((5, 5), np.uint8), source)
+
+        assert first[10, 10] == 0
+
+    def test_frame_follows_output_channels(self):
+        compositor = RoiCompositor()
+        source = np.full((20, 30), 50, dtype=np.uint8)
+        frame = compositor.paste((0, 0, 5, 5), np.zeros((5, 5, 3), np.uint8), source)
+
+        assert frame.shape == (20, 30, 3)
+        assert (frame[10, 10] == 50).all()
+
+    def test_reset_and_key(self):
+        compositor = RoiCompositor()
+        compositor.reset(("a", 1))
+        source = np.zeros((20, 30), dtype=np.uint8)
+        compositor.paste((0, 0, 5, 5), np.ones((5, 5), np.uint8), source)
+
+        assert compositor.matches(("a", 1))
+        compositor.reset(("b", 1))
+        assert compositor.frame is None
+        assert compositor.missing((0, 0, 5, 5)) == (0, 0, 5, 5)
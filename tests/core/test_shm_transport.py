@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from src.core.shm_transport import SlotClient, SlotRing
+
+
+@pytest.fixture
+def ring():
+    ring = SlotRing(2)
+    yield ring
+    ring.close()
+
+
+def frame(shape=(16, 16, 3), value=1):
+    return np.full(shape, value, dtype=np.uint8)
+
+
+class TestSlotRing:
+    def test_frame_roundtrip(self, ring):
+        slot = ring.acquire()
+        handle = ring.put(slot, frame(value=7))
+        client = SlotClient()
+        try:
+            view = client.frame(handle)
+            assert view.shape == (16, 16, 3)
+            assert not view.flags.writeable
+            assert (view == 7).all()
+        finally:
+            client.close()
+
+    def test_acquire_blocks_when_all_in_use(self, ring):
+        first, second = ring.acquire(), ring.acquire()
+        assert {first, second} == {0, 1}
+        assert ring.acquire(timeout=0.01) is None
+        ring.release(first)
+        assert ring.acquire(timeout=0.01) == first
+
+    def test_slot_grows_for_larger_frames(self, ring):
+        slot = ring.acquire()
+        small = ring.put(slot, frame((4, 4)))
+        assert ring.put(slot, frame((4, 4))).name == small.name
+        large = ring.put(slot, frame((64, 64, 3), value=3))
+        assert large.name != small.name
+        assert (SlotClient().frame(large) == 3).all()
+
+    def test_outputs_written_in_place(self, ring):
+        slot = ring.acquire()
+        handle = ring.put(slot, frame(), output_room=4 * 16 * 16)
+        client = SlotClient()
+        mask = np.eye(16, dtype=bool)
+        written, leftover = client.put_outputs(
+            handle, {"image": frame(value=9), "mask": mask}
+        )
+        assert leftover == {}
+        assert (ring.view(slot, written["image"]) == 9).all()
+        np.testing.assert_array_equal(ring.view(slot, written["mask"]), mask)
+        # The frame is untouched
+        assert (ring.view(slot, handle.frame) == 1).all()
+        client.close()
+
+    def test_outputs_that_do_not_fit_are_returned(self, ring):
+        slot = ring.acquire()
+        handle = ring.put(slot, frame())
+        client = SlotClient()
+        big = frame((256, 256, 3))
+        written, leftover = client.put_outputs(handle, {"image": big})
+        assert written == {}
+        assert leftover["image"] is big
+        client.close()
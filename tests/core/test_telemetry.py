@@ -0,0 +1,61 @@
+import numpy as np
+from src.core.telemetry import (
+    NodeTimer,
+    format_bytes,
+    format_duration,
+    format_node_badge,
+    node_telemetry,
+    slowest_node,
+    summarize,
+)
+
+
+class TestNodeTelemetry:
+    """Test telemetry recording."""
+
+    def test_timer_measures_wall_and_cpu(self):
+        with NodeTimer() as timer:
+            sum(i * i for i in range(200000))
+        assert timer.wall_ms > 0
+        assert timer.cpu_ms > 0
+
+    def test_node_telemetry_fields(self):
+        output = np.zeros((10, 20, 3), dtype=np.uint8)
+        entry = node_telemetry(output, cache_hit=True)
+        assert entry == {
+            "wall_ms": 0.0,
+            "cpu_ms": 0.0,
+            "output_bytes": 600,
+            "cache_hit": True,
+        }
+
+
+class TestFormatting:
+    """Test badge and status bar text."""
+
+    def test_format_bytes(self):
+        assert format_bytes(512) == "512 B"
+        assert format_bytes(12 * 1024 * 1024) == "12.0 MB"
+
+    def test_format_duration(self):
+        assert format_duration(0.25) == "250 µs"
+        assert format_duration(42.4) == "42 ms"
+        assert format_duration(1300) == "1.3 s"
+
+    def test_badge(self):
+        assert format_node_badge({"wall_ms": 12.0}) == "12 ms"
+        assert format_node_badge({"wall_ms": 0.0, "cache_hit": True}) == "CACHED"
+        assert format_node_badge({"wall_ms": 0.0, "elided": "folded"}) == "SKIPPED"
+
+    def test_summary_names_slowest_node(self):
+        node_results = {
+            "a": {"name": "Blur", "wall_ms": 10.0},
+            "b": {"name": "CLAHE", "wall_ms": 30.0},
+        }
+        assert slowest_node(node_results) == "b"
+        assert summarize(node_results, 40.0) == (
+            "Preview updated in 40 ms - slowest: CLAHE 30 ms (75%)"
+        )
+
+    def test_summary_without_timings(self):
+        assert summarize({}, 5.0) == "Preview updated in 5 ms"
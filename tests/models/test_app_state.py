@@ -534,3 +534,84 @@ class TestSelectionOnRemove:
         state.remove_node("grayscale")
 
         assert state.selected_node_id is None
+
+
+class TestVersionsAndLookup:
+    """Test version counters and indexed node lookup."""
+
+    def _state(self):
+        state = AppState()
+        state.initialize_default_pipeline()
+        for node_id in ("a", "b"):
+            state.add_node(
+                PipelineNode(
+                    id=node_id,
+                    type="processing",
+                    name=node_id,
+                    description="",
+                    icon="",
+                    status="ready",
+                    enabled=True,
+                    parameters={"sigma": 1.0},
+                )
+            )
+        return state
+
+    def test_index_tracks_insert_move_remove(self):
+        state = self._state()
+        assert [state.get_node_index(n) for n in ("input", "a", "b", "output")] == [
+            0,
+            1,
+            2,
+            3,
+        ]
+
+        state.move_node("b", 1)
+        assert state.get_node_index("b") == 1
+        assert state.get_node_index("a") == 2
+
+        state.remove_node("b")
+        assert state.get_node_index("b") == -1
+        assert state.get_node_index("output") == 2
+
+    def test_index_survives_direct_list_edits(self):
+        state = self._state()
+        state.pipeline.nodes.reverse()
+        assert state.get_node_index("input") == 3
+        assert state.get_node("a").id == "a"
+
+    def test_parameter_update_bumps_node_and_pipeline(self):
+        state = self._state()
+        node_version = state.get_node_version("a")
+        pipeline_version = state.pipeline_version
+        other_version = state.get_node_version("b")
+
+        state.update_node_parameter("a", "sigma", 2.0)
+
+        assert state.get_node_version("a") > node_version
+        assert state.pipeline_version > pipeline_version
+        assert state.get_node_version("b") == other_version
+
+    def test_unchanged_value_keeps_version(self):
+        state = self._state()
+        version = state.pipeline_version
+
+        state.update_node_parameter("a", "sigma", 1.0)
+
+        assert state.pipeline_version == version
+
+    def test_toggle_and_structure_bump_pipeline(self):
+        state = self._state()
+        versions = [state.pipeline_version]
+
+        state.toggle_node("a")
+        versions.append(state.pipeline_version)
+        state.move_node("b", 1)
+        versions.append(state.pipeline_version)
+        state.remove_node("b")
+        versions.append(state.pipeline_version)
+
+        assert versions == sorted(set(versions))
+
+    def test_missing_node_version(self):
+        assert self._state().get_node_version("missing") == -1
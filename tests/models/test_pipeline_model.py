@@ -147,3 +147,179 @@ class TestPipelinePersistence:
         )
         errors = pipeline.validate()
         assert any("ID is required" in e for e in errors)
+
+
+def _node(node_id, node_type="grayscale", inputs=None):
+    return PipelineNode(
+        id=node_id,
+        type=node_type,
+        name=node_id,
+        description="",
+        icon="",
+        status="ready",
+        enabled=True,
+        inputs=inputs or [],
+    )
+
+
+class TestPipelineGraph:
+    def test_plain_list_is_linear(self):
+        pipeline = Pipeline(nodes=[_node("in", "input"), _node("a"), _node("b")])
+        assert pipeline.is_linear() is True
+        assert pipeline.get_node_inputs("in") == []
+        assert pipeline.get_node_inputs("b") == ["a"]
+        assert pipeline.get_outputs() == {"b": "b"}
+
+    def test_fan_out_outputs_are_sinks(self):
+        pipeline = Pipeline(
+            nodes=[
+                _node("in", "input"),
+                _node("a", inputs=["in"]),
+                _node("b", inputs=["in"]),
+            ]
+        )
+        assert pipeline.is_linear() is False
+        assert pipeline.get_outputs() == {"a": "a", "b": "b"}
+
+    def test_named_outputs(self):
+        pipeline = Pipeline(
+            nodes=[_node("in", "input"), _node("a")], outputs={"result": "a"}
+        )
+        assert pipeline.get_outputs() == {"result": "a"}
+
+    def test_topological_order_respects_inputs(self):
+        pipeline = Pipeline(
+            nodes=[
+                _node("merge", inputs=["a", "b"]),
+                _node("a", inputs=["in"]),
+                _node("in", "input"),
+                _node("b", inputs=["in"]),
+            ]
+        )
+        order = [node.id for node in pipeline.topological_order()]
+        assert order.index("in") < order.index("a") < order.index("merge")
+        assert order.index("b") < order.index("merge")
+
+    def test_cycle_reported_by_validate(self):
+        pipeline = Pipeline(
+            name="Cycle", nodes=[_node("a", inputs=["b"]), _node("b", inputs=["a"])]
+        )
+        assert any("cycle" in e for e in pipeline.validate())
+
+    def test_unknown_input_and_output_reported(self):
+        pipeline = Pipeline(
+            name="Broken",
+            nodes=[_node("a", inputs=["missing"])],
+            outputs={"result": "nowhere"},
+        )
+        errors = pipeline.validate()
+        assert any("unknown inputs" in e for e in errors)
+        assert any("Output 'result'" in e for e in errors)
+
+    def test_graph_round_trip(self):
+        pipeline = Pipeline(
+            name="Graph",
+            nodes=[_node("in", "input"), _node("a", inputs=["in"])],
+            outputs={"result": "a"},
+        )
+        loaded = Pipeline.from_dict(pipeline.to_dict())
+        assert loaded.nodes[1].inputs == ["in"]
+        assert loaded.outputs == {"result": "a"}
+
+
+class TestPipelineSnapshot:
+    def test_snapshot_is_immutable(self):
+        snapshot = Pipeline(nodes=[_node("in", "input")]).snapshot()
+        with pytest.raises(Exception):
+            snapshot.nodes[0].enabled = False
+        with pytest.raises(TypeError):
+            snapshot.nodes[0].parameters["x"] = 1
+
+    def test_snapshot_unaffected_by_later_edits(self):
+        pipeline = Pipeline(nodes=[_node("in", "input"), _node("a")])
+        pipeline.nodes[1].parameters["sigma"] = 1.0
+        snapshot = pipeline.snapshot()
+
+        pipeline.nodes[1].parameters["sigma"] = 2.0
+        pipeline.nodes.append(_node("b"))
+
+        assert snapshot.nodes[1].parameters["sigma"] == 1.0
+        assert len(snapshot.nodes) == 2
+
+    def test_equal_snapshots_hash_equal(self):
+        pipeline = Pipeline(nodes=[_node("in", "input"), _node("a")])
+        pipeline.nodes[1].parameters["grid_size"] = [8, 8]
+
+        first = pipeline.snapshot()
+        second = Pipeline.from_dict(pipeline.to_dict()).snapshot()
+
+        assert first == second
+        assert hash(first) == hash(second)
+        assert first.nodes[1].parameters["grid_size"] == (8, 8)
+        assert {first: "cached"}[second] == "cached"
+
+    def test_parameter_change_changes_snapshot(self):
+        pipeline = Pipeline(nodes=[_node("in", "input"), _node("a")])
+        first = pipeline.snapshot()
+
+        pipeline.nodes[1].parameters["sigma"] = 3.0
+
+        assert pipeline.snapshot() != first
+
+    def test_unchanged_nodes_shared(self):
+        pipeline = Pipeline(nodes=[_node("in", "input"), _node("a")])
+        first = pipeline.snapshot()
+
+        pipeline.nodes[1].enabled = False
+        second = pipeline.snapshot()
+
+        assert second.nodes[0] is first.nodes[0]
+        assert second.nodes[1] is not first.nodes[1]
+
+    def test_snapshot_graph_queries(self):
+        pipeline = Pipeline(
+            nodes=[_node("in", "input"), _node("a", inputs=["in"])],
+            outputs={"result": "a"},
+        )
+        snapshot = pipeline.snapshot()
+
+        assert snapshot.is_linear() is False
+        assert snapshot.get_outputs() == {"result": "a"}
+        assert [n.id for n in snapshot.topological_order()] == ["in", "a"]
+
+
+class TestPipelineVersions:
+    def test_in_place_parameter_edit_bumps_version(self):
+        pipeline = Pipeline(nodes=[_node("in", "input"), _node("a")])
+        version = pipeline.version
+
+        pipeline.nodes[1].parameters["sigma"] = 2.0
+
+        assert pipeline.version > version
+
+    def test_direct_list_edit_bumps_version(self):
+        pipeline = Pipeline(nodes=[_node("in", "input"), _node("a")])
+        version = pipeline.version
+
+        pipeline.nodes.pop()
+
+        assert pipeline.version > version
+
+    def test_version_stable_without_changes(self):
+        pipeline = Pipeline(nodes=[_node("in", "input")])
+        assert pipeline.version == pipeline.version
+
+    def test_snapshot_reused_until_version_changes(self):
+        node = _node("a")
+        first = node.snapshot()
+        assert node.snapshot() is first
+
+        node.enabled = False
+
+        assert node.snapshot() is not first
+        assert node.snapshot().version == node.version
+
+    def test_serialized_parameters_are_plain_dicts(self):
+        node = _node("a")
+        node.parameters["sigma"] = 1.0
+        assert type(node.to_dict()["parameters"]) is dict
@@ -0,0 +1,193 @@
+import csv
+import json
+import os
+import subprocess
+import sys
+
+import cv2
+import numpy as np
+import pytest
+
+from src.cli import main, parse_param
+from src.models.pipeline_model import Pipeline, PipelineNode
+
+
+def make_node(node_id, node_type, **params):
+    return PipelineNode(
+        id=node_id,
+        type=node_type,
+        name=node_type,
+        description="",
+        icon="",
+        status="ready",
+        enabled=True,
+        parameters=params,
+    )
+
+
+@pytest.fixture
+def pipeline_file(tmp_path):
+    pipeline = Pipeline(
+        id="p1",
+        name="Blur",
+        nodes=[
+            make_node("input", "input"),
+            make_node("gray", "grayscale"),
+            make_node("blur", "gaussian_blur", kernel_size=3),
+        ],
+    )
+    path = tmp_path / "pipeline.json"
+    pipeline.save(str(path))
+    return str(path)
+
+
+@pytest.fixture
+def phantast_pipeline_file(tmp_path):
+    pipeline = Pipeline(
+        id="p2",
+        name="Phantast",
+        nodes=[make_node("input", "input"), make_node("output", "output")],
+    )
+    path = tmp_path / "phantast.json"
+    pipeline.save(str(path))
+    return str(path)
+
+
+@pytest.fixture
+def image_folder(tmp_path):
+    folder = tmp_path / "plate"
+    folder.mkdir()
+    rng = np.random.default_rng(0)
+    for name in ("a.png", "b.png"):
+        cv2.imwrite(str(folder / name), rng.integers(0, 255, (32, 32, 3), np.uint8))
+    return folder
+
+
+def test_no_qt_imported():
+    code = "import sys, src.cli; print(any('PyQt' in m for m in sys.modules))"
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=root, capture_output=True, text=True
+    )
+    assert output.stdout.strip() == "False"
+
+
+class TestParseParam:
+    def test_values_parsed_as_json(self):
+        assert parse_param("clahe.clip_limit=1,2.5,x") == (
+            "clahe",
+            "clip_limit",
+            [1, 2.5, "x"],
+        )
+
+    def test_list_values(self):
+        assert parse_param("clahe.grid_size=[8,8];[16,16]")[2] == [[8, 8], [16, 16]]
+
+    @pytest.mark.parametrize("text", ["clip_limit=1", "clahe.clip_limit", "x.y="])
+    def test_malformed(self, text):
+        with pytest.raises(ValueError):
+            parse_param(text)
+
+
+class TestCommands:
+    def test_run(self, pipeline_file, image_folder, tmp_path, capsys):
+        out = tmp_path / "out"
+        out.mkdir()
+        code = main(["run", pipeline_file, str(image_folder / "a.png"), "-o", str(out)])
+        assert code == 0
+        assert (out / "a_result.png").exists()
+        assert "a.png" in capsys.readouterr().out
+
+    def test_run_failure_exit_code(self, pipeline_file, tmp_path):
+        missing = str(tmp_path / "missing.png")
+        assert main(["run", pipeline_file, missing]) == 1
+
+    def test_batch_with_csv_and_manifest(self, pipeline_file, image_folder, tmp_path):
+        args = [
+            "batch",
+            pipeline_file,
+            str(image_folder),
+            "-o",
+            str(tmp_path / "out"),
+            "-j",
+            "1",
+            "--csv",
+            str(tmp_path / "results.csv"),
+            "--manifest",
+            str(tmp_path / "manifest.json"),
+        ]
+        assert main(args) == 0
+        with open(tmp_path / "results.csv") as f:
+            rows = list(csv.DictReader(f))
+        # Rows are appended in completion order
+        assert sorted(row["filename"] for row in rows) == ["a.png", "b.png"]
+
+        # Resumed: everything is skipped
+        assert main(args) == 0
+        with open(tmp_path / "results.csv") as f:
+            rows = list(csv.DictReader(f))
+        assert [row["skipped"] for row in rows[2:]] == ["1", "1"]
+
+    def test_batch_into_store(self, pipeline_file, image_folder, tmp_path, capsys):
+        db = str(tmp_path / "results.db")
+        assert (
+            main(["batch", pipeline_file, str(image_folder), "-j", "1", "--db", db])
+            == 0
+        )
+        assert f"recorded in {db}" in capsys.readouterr().out
+
+    def test_watch_for_duration(self, pipeline_file, image_folder, tmp_path, capsys):
+        args = [
+            "watch",
+            pipeline_file,
+            str(image_folder),
+            "-j",
+            "1",
+            "--settle-time",
+            "0",
+            "--poll-interval",
+            "0.05",
+            "--duration",
+            "1",
+        ]
+        assert main(args) == 0
+        output = capsys.readouterr().out
+        assert "a.png" in output and "b.png" in output
+
+    def test_sweep(self, pipeline_file, image_folder, tmp_path):
+        out = tmp_path / "sweep.csv"
+        args = ["sweep", pipeline_file, str(image_folder / "a.png"), "--out", str(out)]
+        args += ["-p", "blur.kernel_size=3,5,7", "-p", "blur.sigma=0,2"]
+        assert main(args) == 0
+        with open(out) as f:
+            rows = list(csv.DictReader(f))
+        assert len(rows) == 6
+        assert rows[0]["blur.kernel_size"] == "3"
+        assert {row["error"] for row in rows} == {""}
+
+    def test_sweep_unknown_node(self, pipeline_file, image_folder, capsys):
+        args = ["sweep", pipeline_file, str(image_folder / "a.png"), "-p", "x.y=1"]
+        assert main(args) == 2
+        assert "no node 'x'" in capsys.readouterr().err
+
+    def test_bench_json(self, pipeline_file, image_folder, capsys):
+        image = str(image_folder / "a.png")
+        assert main(["bench", pipeline_file, image, "--repeat", "3", "--json"]) == 0
+        stats = json.loads(capsys.readouterr().out)
+        assert len(stats["runs_ms"]) == 3
+        assert list(stats["nodes"]) == ["input", "grayscale", "gaussian_blur"]
+
+    def test_phantast_keeps_machine_output_clean(
+        self, phantast_pipeline_file, image_folder, capsys
+    ):
+        image = str(image_folder / "a.png")
+        args = ["bench", phantast_pipeline_file, image, "--repeat", "1", "--json"]
+        assert main(args + ["--warmup", "0"]) == 0
+        stats = json.loads(capsys.readouterr().out)
+        assert len(stats["runs_ms"]) == 1
+
+        args = ["sweep", phantast_pipeline_file, image, "-p", "output.sigma=4,8"]
+        assert main(args) == 0
+        rows = list(csv.DictReader(capsys.readouterr().out.splitlines()))
+        assert [row["output.sigma"] for row in rows] == ["4", "8"]
+        assert all(row["confluency"] for row in rows)
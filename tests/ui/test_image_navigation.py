@@ -68,6 +68,38 @@ class TestImageCanvas:
         result = canvas.load_image(str(img_path))
         assert result is True
 
+    def test_visible_region_when_zoomed(self, qtbot):
+        from PyQt6.QtGui import QPixmap
+
+        canvas = ImageCanvas()
+        qtbot.addWidget(canvas)
+        canvas.resize(200, 200)
+        pixmap = QPixmap(400, 400)
+        canvas.display_image(pixmap)
+        assert canvas.visible_image_rect() is None
+
+        regions = []
+        canvas.visible_region_changed.connect(regions.append)
+        for _ in range(10):
+            canvas.zoom_in()
+
+        assert regions[-1] == canvas.visible_image_rect()
+        x, y, w, h = regions[-1]
+        assert 0 < w < 400 and 0 < h < 400
+
+    def test_same_size_preview_keeps_zoom(self, qtbot):
+        from PyQt6.QtGui import QPixmap
+
+        canvas = ImageCanvas()
+        qtbot.addWidget(canvas)
+        canvas.display_image(QPixmap(400, 400))
+        canvas.zoom_in()
+        zoom = canvas.get_current_zoom_percentage()
+
+        canvas.display_image(QPixmap(400, 400))
+
+        assert canvas.get_current_zoom_percentage() == zoom
+
 
 class TestImageNavigationWidget:
     """Tests for ImageNavigationWidget."""
@@ -144,6 +144,20 @@ class TestMainWindowKeyboardShortcuts:
         assert "Quit" in action_texts
         assert "Help" in action_texts
 
+    def test_progressive_preview_action_toggles_controller(self, qtbot):
+        """Test the progressive preview action switches the mode both ways."""
+        window = MainWindow()
+        qtbot.addWidget(window)
+
+        action = window.progressive_preview_action
+        assert action.isCheckable()
+        assert action.isChecked() is window.controller.progressive_preview
+
+        action.setChecked(True)
+        assert window.controller.progressive_preview is True
+        action.setChecked(False)
+        assert window.controller.progressive_preview is False
+
 
 class TestMainWindowStatusBar:
     """Tests for status bar."""
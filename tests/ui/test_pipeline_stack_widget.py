@@ -0,0 +1,50 @@
+from src.controllers.main_controller import MainController
+from src.core.preview_pipeline import PreviewResult
+from src.ui.pipeline_stack_widget import PipelineStackWidget
+
+
+class TestTelemetryBadges:
+    """Tests for per-node timing badges."""
+
+    def _widget(self, qtbot):
+        controller = MainController()
+        controller.state.initialize_default_pipeline()
+        widget = PipelineStackWidget(controller)
+        qtbot.addWidget(widget)
+        return controller, widget
+
+    def test_badges_hidden_before_preview(self, qtbot):
+        _, widget = self._widget(qtbot)
+        for node_widget in widget._node_widgets.values():
+            assert node_widget.timing_label.isHidden()
+
+    def test_preview_shows_timings(self, qtbot):
+        controller, widget = self._widget(qtbot)
+        result = PreviewResult(
+            success=True,
+            node_results={
+                "input": {"name": "Input", "wall_ms": 2.0, "cache_hit": False},
+                "output": {"name": "Output", "wall_ms": 250.0, "cache_hit": False},
+            },
+        )
+
+        controller.preview_completed.emit(result)
+
+        output_label = widget._node_widgets["output"].timing_label
+        assert not output_label.isHidden()
+        assert output_label.text() == "250 ms"
+        assert output_label.property("slowest") is True
+        assert widget._node_widgets["input"].timing_label.property("slowest") is False
+
+    def test_timings_survive_refresh(self, qtbot):
+        controller, widget = self._widget(qtbot)
+        controller.preview_completed.emit(
+            PreviewResult(
+                success=True,
+                node_results={"input": {"name": "Input", "wall_ms": 3.0}},
+            )
+        )
+
+        widget.refresh()
+
+        assert widget._node_widgets["input"].timing_label.text() == "3 ms"